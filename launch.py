@@ -47,6 +47,22 @@ def init_system(log_level="INFO", app_log_level="DEBUG", service=None):
     init_domain_manager()
 
 
+def warm_widget_toolchain(quiet=False):
+    """
+    Install the shared widget build toolchain so later builds run offline.
+
+    :param quiet: Suppress non-essential output
+    :return: Process exit code
+    """
+    init_system(service="blog")
+    from react_compiler import WidgetBuilder
+
+    node_modules = WidgetBuilder(offline=False).warm_up()
+    if not quiet:
+        print(f"Widget toolchain ready in {node_modules}")
+    return 0
+
+
 def parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -64,6 +80,11 @@ def parse_args():
     parser.add_argument("--web", action="store_true", help="Launch web server (blog)")
     parser.add_argument("--trakaido", action="store_true", help="Launch trakaido API server")
     parser.add_argument("--spaceship", action="store_true", help="Launch spaceship server")
+    parser.add_argument(
+        "--warm-widgets",
+        action="store_true",
+        help="Install the shared widget build toolchain into the data directory and exit",
+    )
 
     # Server configuration
     parser.add_argument("--host", default="0.0.0.0", help="Host for server (default: 0.0.0.0)")
@@ -111,6 +132,7 @@ Examples:
   %(prog)s --mode web --dev        # Launch web server in development mode
   %(prog)s --mode trakaido --dev   # Launch trakaido server in development mode
   %(prog)s --web --postgres        # Launch web server with PostgreSQL database
+  %(prog)s --warm-widgets          # Install the widget toolchain (then set ATACAMA_WIDGET_OFFLINE=1)
 
 Note: Log files are created with timestamp and PID in the filename format: 
       atacama_YYYYMMDD_HHMMSS_pidNNNN.log
@@ -140,6 +162,9 @@ def main():
                 args.web = False
                 args.trakaido = False
 
+        if args.warm_widgets:
+            return warm_widget_toolchain(quiet=args.quiet)
+
         # Validate arguments
         if not args.web and not args.trakaido and not args.spaceship:
             print("Error: No component specified to launch.", file=sys.stderr)
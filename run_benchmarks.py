@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+AML Parser Performance Benchmarks
+
+Measures the lexer, parser, HTML generator, link rendering and annotation
+stages on a synthetic AML corpus (plain text, heavy emphasis, nested lists,
+long URLs, URL-dense link roundups, Chinese and English annotation) and
+reports per-stage ops/s and peak memory.
+Results are compared against a stored JSON baseline; the run fails when any
+stage regresses past the threshold.
+
+Usage:
+    python3 run_benchmarks.py [options]
+
+Options:
+    --stage STAGE        Only run this stage (repeatable)
+    --corpus KIND        Only run this corpus kind (repeatable)
+    --min-time SECONDS   Minimum timed seconds per stage/corpus (default 0.5)
+    --threshold FRACTION Tolerated regression (default 0.25)
+    --baseline PATH      Baseline JSON file
+    --update-baseline    Store this run as the new baseline
+    --output PATH        Also write this run's report as JSON
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add src directory to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(project_root, "src")
+if src_dir not in sys.path:
+    sys.path.insert(0, src_dir)
+
+# Change working directory to src for imports
+os.chdir(src_dir)
+
+os.environ.setdefault("TESTING", "true")
+
+from benchmarks.aml_corpus import CORPUS_KINDS  # noqa: E402
+from benchmarks.aml_parser_bench import (  # noqa: E402
+    BASELINE_PATH,
+    DEFAULT_THRESHOLD,
+    STAGES,
+    compare_to_baseline,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run AML parser performance benchmarks")
+    parser.add_argument("--stage", choices=list(STAGES), action="append")
+    parser.add_argument("--corpus", choices=CORPUS_KINDS, action="append")
+    parser.add_argument("--count", type=int, default=20, help="Messages per corpus")
+    parser.add_argument("--min-time", type=float, default=0.5)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="Write this run's report to a JSON file")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+
+    def progress(stage, kind, result):
+        line = f"{stage:<22} {kind:<14} {result['ops_per_sec']:>12.1f} ops/s {result['peak_kib']:>10.1f} KiB"
+        base = (baseline or {}).get("results", {}).get(stage, {}).get(kind)
+        if base and base["ops_per_sec"]:
+            change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+            line += f"   ({change:+.0%} vs baseline)"
+        print(line, flush=True)
+
+    print(f"{'stage':<22} {'corpus':<14} {'throughput':>18} {'peak memory':>14}")
+    report = run_benchmarks(
+        stages=args.stage,
+        kinds=args.corpus,
+        count=args.count,
+        min_time=args.min_time,
+        progress=progress,
+    )
+
+    if args.output:
+        with open(os.path.join(project_root, args.output), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        save_baseline(report, args.baseline)
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("\nNo baseline found; run with --update-baseline to create one.")
+        return 0
+
+    regressions = compare_to_baseline(report, baseline, threshold=args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  ✗ {regression}")
+        return 1
+
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,10 @@
 """Chess board processing and rendering functionality."""
 
-from typing import Dict, Match, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, Match, Tuple, Optional
+
+# Maximum number of distinct positions kept in the parse and board caches.
+BOARD_CACHE_SIZE = 1024
 
 
 def get_piece_map() -> Dict[str, str]:
@@ -21,6 +25,19 @@ def get_piece_map() -> Dict[str, str]:
     }
 
 
+def normalize_fen(fen: str) -> str:
+    """
+    Normalize a FEN string for use as a cache key.
+
+    Leading/trailing whitespace is dropped and runs of internal whitespace
+    collapse to a single space, so cosmetic differences share one entry.
+
+    :param fen: Raw FEN string (e.g. the body of a ``{{pgn|...}}`` block)
+    :return: Normalized FEN string
+    """
+    return " ".join(fen.split())
+
+
 def validate_fen(fen: str) -> Tuple[bool, Optional[str]]:
     """
     Validate a FEN string for basic correctness.
@@ -28,6 +45,12 @@ def validate_fen(fen: str) -> Tuple[bool, Optional[str]]:
     :param fen: FEN string to validate
     :return: Tuple of (is_valid, error_message)
     """
+    return _validate_normalized_fen(normalize_fen(fen))
+
+
+@lru_cache(maxsize=BOARD_CACHE_SIZE)
+def _validate_normalized_fen(fen: str) -> Tuple[bool, Optional[str]]:
+    """Memoized validation of an already-normalized FEN string."""
     parts = fen.split()
     if len(parts) < 1:
         return False, "Empty FEN string"
@@ -57,11 +80,44 @@ def fen_to_board(fen: str) -> str:
     """
     Convert FEN chess position notation into HTML board representation.
 
+    Boards are memoized by normalized FEN, so repeated positions (within a
+    post or across renders) are only validated and rendered once.
+
     :param fen: FEN string representing the chess position
     :return: HTML string representing the chess board
     """
+    return _render_board(normalize_fen(fen))
+
+
+def prerender_boards(fens: Iterable[str]) -> int:
+    """
+    Warm the board cache for a batch of positions.
+
+    :param fens: Raw FEN strings to render
+    :return: Number of distinct positions rendered
+    """
+    distinct = {normalize_fen(fen) for fen in fens}
+    for fen in distinct:
+        _render_board(fen)
+    return len(distinct)
+
+
+def board_cache_info():
+    """Return hit/miss/size statistics for the rendered board cache."""
+    return _render_board.cache_info()
+
+
+def clear_board_cache() -> None:
+    """Drop all memoized FEN validations and rendered boards."""
+    _validate_normalized_fen.cache_clear()
+    _render_board.cache_clear()
+
+
+@lru_cache(maxsize=BOARD_CACHE_SIZE)
+def _render_board(fen: str) -> str:
+    """Render the HTML board for an already-normalized FEN string."""
     # Validate FEN
-    is_valid, error = validate_fen(fen)
+    is_valid, error = _validate_normalized_fen(fen)
     if not is_valid:
         # Return plain text representation if invalid
         return f'<pre class="invalid-pgn">Invalid chess position: {error}\nInput: {fen}</pre>'
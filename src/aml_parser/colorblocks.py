@@ -3,14 +3,7 @@
 import re
 from typing import Optional, List, Tuple
 
-# Pre-compiled YouTube URL patterns for performance
-# Video IDs are exactly 11 characters: [a-zA-Z0-9_-]{11}
-_YOUTUBE_PATTERNS = [
-    re.compile(r"(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})"),
-    re.compile(r"(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]{11})"),
-    # Variant with v param not first in query string
-    re.compile(r"(?:https?://)?(?:www\.)?youtube\.com/watch\?(?:[^&]*&)*v=([a-zA-Z0-9_-]{11})"),
-]
+from aml_parser.urls import classify_url, render_url_link
 
 # Color definitions with their sigils and descriptions
 # 'TAGNAME': ('SIGIL', 'CSS Class', 'Short description')
@@ -178,11 +171,8 @@ def _detect_youtube_url(url: str) -> Tuple[bool, Optional[str]]:
     :param url: URL to check
     :return: Tuple of (is_youtube, video_id)
     """
-    for pattern in _YOUTUBE_PATTERNS:
-        match = pattern.search(url)
-        if match:
-            return True, match.group(1)
-    return False, None
+    classified = classify_url(url)
+    return classified.is_youtube, classified.video_id
 
 
 def create_url_link(url: str) -> str:
@@ -192,37 +182,7 @@ def create_url_link(url: str) -> str:
     :param url: Full URL
     :return: HTML link with optional YouTube embed container
     """
-    # Basic sanitization for the URL in href and display text
-    # Browsers are generally good at handling URLs, but minimal encoding for quotes is good.
-    # The HTMLGenerator should be providing already sanitized text for display if URL itself is token value.
-    # If URL is from a text node which has already been sanitized, then url might contain &amp; etc.
-    # Assuming 'url' parameter is the raw URL string.
-
-    sanitized_url_for_href = url.replace('"', "%22").replace("'", "%27")  # Basic href safety
-    # For display, browsers handle most characters in URLs well.
-    # If it needs strict HTML character encoding:
-    # display_url = html.escape(url)
-    display_url = url  # Typically, URLs are displayed as they are.
-
-    base_link = (
-        f'<a href="{sanitized_url_for_href}" target="_blank" '
-        f'rel="noopener noreferrer">{display_url}</a>'
-    )
-
-    is_youtube, video_id = _detect_youtube_url(url)
-    if is_youtube and video_id:
-        # The youtube-embed-container structure seems designed for specific JS handling
-        return (
-            f"{base_link}"
-            f'<span class="colorblock youtube-embed-container">'  # Uses 'colorblock' class
-            f'<span class="sigil">📺</span>'
-            f'<span class="colortext-content">'  # Content is usually hidden/shown by JS
-            f'<span class="youtube-player" data-video-id="{video_id}"></span>'
-            f"</span>"
-            f"</span>"
-        )
-
-    return base_link
+    return render_url_link(url)
 
 
 def create_wiki_link(title: str) -> str:
@@ -9,14 +9,17 @@ Words not found in the lookup but present in the stopwords section get a
 lighter annotation indicating their POS category (pronoun, article, etc.).
 """
 
+import hashlib
 import json
 import os
 import re
+import time
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
 import constants
 from common.base.logging_config import get_logger
+from common.cache import LRUCache
 
 logger = get_logger(__name__)
 
@@ -237,3 +240,97 @@ default_processor = EnglishAnnotationProcessor()
 def annotate_english(text: str) -> Dict[str, dict]:
     """Convenience function using the default processor."""
     return default_processor.annotate_text(text)
+
+
+# Paragraphs are separated by blank lines; no word can span a paragraph break,
+# so annotating paragraph by paragraph yields the same words as the whole text.
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# Maximum number of distinct paragraphs kept in the default paragraph cache.
+PARAGRAPH_CACHE_SIZE = 4096
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Split raw AML text into non-blank paragraphs."""
+    return [p for p in PARAGRAPH_BREAK.split(text or "") if p.strip()]
+
+
+def paragraph_key(paragraph: str) -> str:
+    """Stable cache key for a paragraph: SHA-1 of its normalized text."""
+    return hashlib.sha1(paragraph.strip().encode("utf-8")).hexdigest()
+
+
+class ParagraphAnnotationCache(LRUCache):
+    """Thread-safe, size-bounded LRU of paragraph annotations keyed by paragraph hash."""
+
+    def __init__(self, maxsize: int = PARAGRAPH_CACHE_SIZE) -> None:
+        super().__init__(maxsize=maxsize)
+
+
+default_paragraph_cache = ParagraphAnnotationCache()
+
+
+@dataclass
+class IncrementalAnnotation:
+    """Result of a paragraph-incremental annotation pass."""
+
+    annotations: Dict[str, dict]
+    paragraphs: int
+    cached: int
+    annotated: int
+    cpu_seconds: float
+
+    @property
+    def complete(self) -> bool:
+        """False when the CPU budget ran out before every paragraph was annotated."""
+        return self.cached + self.annotated == self.paragraphs
+
+
+def annotate_english_paragraphs(
+    text: str,
+    cache: Optional[ParagraphAnnotationCache] = None,
+    cpu_budget: Optional[float] = None,
+    processor: Optional[EnglishAnnotationProcessor] = None,
+) -> IncrementalAnnotation:
+    """
+    Annotate text paragraph by paragraph, reusing cached paragraph results.
+
+    Unchanged paragraphs of an edited message are served from the cache, so only
+    new or modified paragraphs are looked up. The merged mapping is identical to
+    annotate_english(text) once every paragraph has been processed.
+
+    :param text: Raw AML text
+    :param cache: Paragraph cache (default: the process-wide cache)
+    :param cpu_budget: Thread CPU seconds after which no further uncached paragraph
+                       is started (None for unlimited); at least one is always done
+    :param processor: Annotation processor (default: the global processor)
+    :return: IncrementalAnnotation with the merged annotations and counters
+    """
+    cache = default_paragraph_cache if cache is None else cache
+    processor = processor or default_processor
+    start = time.thread_time()
+
+    annotations: Dict[str, dict] = {}
+    paragraphs = split_paragraphs(text)
+    cached = annotated = 0
+    for paragraph in paragraphs:
+        key = paragraph_key(paragraph)
+        result = cache.get(key)
+        if result is None:
+            if cpu_budget is not None and annotated and time.thread_time() - start >= cpu_budget:
+                continue
+            result = processor.annotate_text(paragraph)
+            cache.put(key, result)
+            annotated += 1
+        else:
+            cached += 1
+        for word, annotation in result.items():
+            annotations.setdefault(word, annotation)
+
+    return IncrementalAnnotation(
+        annotations=annotations,
+        paragraphs=len(paragraphs),
+        cached=cached,
+        annotated=annotated,
+        cpu_seconds=time.thread_time() - start,
+    )
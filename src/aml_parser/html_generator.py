@@ -5,7 +5,7 @@ the Atacama parser. It handles all node types and formatting features while
 maintaining separation between parsing and output generation.
 """
 
-from typing import Any, Optional, List
+from typing import Any, Dict, Optional, List
 from aml_parser.parser import Node, NodeType, ColorNode, ListItemNode
 from aml_parser.colorblocks import (
     create_color_block,
@@ -107,6 +107,18 @@ class HTMLGenerator:
         self.db_session = db_session
         self.message = message
         self.truncated = truncated
+        # Quotes found while rendering, saved together by save_pending_quotes()
+        self.pending_quotes: List[Dict[str, str]] = []
+
+    def save_pending_quotes(self) -> None:
+        """Save every quote collected during rendering with a single lookup."""
+        if not self.pending_quotes:
+            return
+        # Local import to avoid requiring SQLAlchemy for basic parsing functionality
+        from models.quotes import save_quotes
+
+        quotes, self.pending_quotes = self.pending_quotes, []
+        save_quotes(quotes, self.message, self.db_session)
 
     def generate(self, node: Node) -> str:
         """Generate HTML from an AST node."""
@@ -279,16 +291,9 @@ class HTMLGenerator:
         """Generate HTML for a color-formatted block."""
         content = "".join(self.generate(child) for child in node.children)
 
-        # Quote saving feature - imports are local to avoid requiring SQLAlchemy
-        # for basic parsing functionality
+        # Quote saving feature: collected here, saved in one batch after rendering
         if node.color in ("yellow", "quote") and content and self.db_session and self.message:
-            from models.quotes import save_quotes
-
-            save_quotes(
-                [{"text": content.strip(), "quote_type": "reference"}],
-                self.message,
-                self.db_session,
-            )
+            self.pending_quotes.append({"text": content.strip(), "quote_type": "reference"})
 
         return create_color_block(node.color, content, node.is_line)
 
@@ -365,4 +370,6 @@ def generate_html(ast: Node, **kwargs) -> str:
         Generated HTML string
     """
     generator = HTMLGenerator(**kwargs)
-    return generator.generate(ast)
+    html = generator.generate(ast)
+    generator.save_pending_quotes()
+    return html
@@ -1,7 +1,7 @@
 from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import List, Generator, Optional, Set
+from typing import List, Generator, Optional, Set, Tuple
 import re
 
 from aml_parser.colorblocks import COLORS
@@ -95,6 +95,9 @@ class AtacamaLexer:
         self.column = 1
         self.in_parentheses_depth = 0
         self.current_char = self.text[self.pos] if self.pos < len(self.text) else None
+        # Last URL_PATTERN probe as (pos, match); the text-stop check and the
+        # URL handler probe the same position back to back.
+        self._url_probe: Tuple[int, Optional[re.Match]] = (-1, None)
 
     def _advance(self) -> None:
         if self.current_char == "\n":
@@ -309,13 +312,22 @@ class AtacamaLexer:
             return Token(TokenType.CHINESE_TEXT, value, tok_line, tok_col)
         return None
 
-    def _try_handle_url(self, tok_line: int, tok_col: int) -> Optional[Token]:
-        if self.text.startswith("http", self.pos):
+    def _match_url(self) -> Optional[re.Match]:
+        """Match URL_PATTERN at the current position, reusing the last probe if unmoved."""
+        if not self.text.startswith("http", self.pos):
+            return None
+        probe_pos, match = self._url_probe
+        if probe_pos != self.pos:
             match = self.URL_PATTERN.match(self.text, self.pos)
-            if match:
-                url = match.group(0)
-                self._advance_n(len(url))
-                return Token(TokenType.URL, url, tok_line, tok_col)
+            self._url_probe = (self.pos, match)
+        return match
+
+    def _try_handle_url(self, tok_line: int, tok_col: int) -> Optional[Token]:
+        match = self._match_url()
+        if match:
+            url = match.group(0)
+            self._advance_n(len(url))
+            return Token(TokenType.URL, url, tok_line, tok_col)
         return None
 
     def _is_at_color_tag(self) -> bool:
@@ -387,7 +399,7 @@ class AtacamaLexer:
             return True
 
         # URLs
-        if self.text.startswith("http", self.pos) and self.URL_PATTERN.match(self.text, self.pos):
+        if self._match_url():
             return True
 
         # Chinese text
@@ -0,0 +1,110 @@
+"""URL classification and link rendering for AML messages, memoized per distinct URL."""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+# Maximum number of distinct URLs kept in the classification and link caches.
+URL_CACHE_SIZE = 4096
+
+# Pre-compiled YouTube URL patterns for performance
+# Video IDs are exactly 11 characters: [a-zA-Z0-9_-]{11}
+_YOUTUBE_PATTERNS = [
+    re.compile(r"(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})"),
+    re.compile(r"(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]{11})"),
+    # Variant with v param not first in query string
+    re.compile(r"(?:https?://)?(?:www\.)?youtube\.com/watch\?(?:[^&]*&)*v=([a-zA-Z0-9_-]{11})"),
+]
+
+URL_KIND_LINK = "link"
+URL_KIND_YOUTUBE = "youtube"
+
+
+@dataclass(frozen=True)
+class ClassifiedUrl:
+    """Everything the HTML generator needs to know about one URL."""
+
+    url: str
+    kind: str
+    href: str
+    display_text: str
+    video_id: Optional[str] = None
+
+    @property
+    def is_youtube(self) -> bool:
+        return self.kind == URL_KIND_YOUTUBE
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def classify_url(url: str) -> ClassifiedUrl:
+    """
+    Classify a URL once; repeated URLs are served from the cache.
+
+    :param url: Raw URL as matched by the lexer
+    :return: Classified URL record
+    """
+    # Minimal encoding of quotes keeps the href attribute well-formed; browsers
+    # handle the remaining URL characters, so the display text stays raw.
+    href = url.replace('"', "%22").replace("'", "%27")
+
+    for pattern in _YOUTUBE_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return ClassifiedUrl(url, URL_KIND_YOUTUBE, href, url, match.group(1))
+    return ClassifiedUrl(url, URL_KIND_LINK, href, url)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def render_url_link(url: str) -> str:
+    """
+    Generate HTML for URL, with optional YouTube embed.
+
+    :param url: Full URL
+    :return: HTML link with optional YouTube embed container
+    """
+    classified = classify_url(url)
+    base_link = (
+        f'<a href="{classified.href}" target="_blank" '
+        f'rel="noopener noreferrer">{classified.display_text}</a>'
+    )
+
+    if classified.is_youtube:
+        # The youtube-embed-container structure seems designed for specific JS handling
+        return (
+            f"{base_link}"
+            f'<span class="colorblock youtube-embed-container">'  # Uses 'colorblock' class
+            f'<span class="sigil">📺</span>'
+            f'<span class="colortext-content">'  # Content is usually hidden/shown by JS
+            f'<span class="youtube-player" data-video-id="{classified.video_id}"></span>'
+            f"</span>"
+            f"</span>"
+        )
+
+    return base_link
+
+
+def classify_urls(urls: Iterable[str]) -> Dict[str, ClassifiedUrl]:
+    """
+    Classify and render a batch of URLs, warming both caches.
+
+    :param urls: Raw URLs (duplicates are classified once)
+    :return: Mapping of each distinct URL to its classification
+    """
+    classified = {}
+    for url in urls:
+        if url not in classified:
+            classified[url] = classify_url(url)
+            render_url_link(url)
+    return classified
+
+
+def url_cache_info():
+    """Return hit/miss/size statistics for the rendered link cache."""
+    return render_url_link.cache_info()
+
+
+def clear_url_cache() -> None:
+    """Drop all memoized URL classifications and rendered links."""
+    classify_url.cache_clear()
+    render_url_link.cache_clear()
@@ -11,6 +11,7 @@ but the /metrics endpoint will return an error message.
 
 import os
 import time
+from typing import Optional
 
 import psutil
 from flask import Blueprint, Response, current_app
@@ -170,6 +171,61 @@ db_query_errors_total = Counter(
     "atacama_db_query_errors_total", "Total number of database query errors"
 )
 
+# English annotation worker metrics
+english_annotation_messages_total = Counter(
+    "atacama_english_annotation_messages_total",
+    "Messages processed by the English annotation worker",
+    ["status"],
+)
+
+english_annotation_paragraphs_total = Counter(
+    "atacama_english_annotation_paragraphs_total",
+    "Paragraphs handled by the English annotation worker",
+    ["result"],
+)
+
+english_annotation_cpu_seconds = Histogram(
+    "atacama_english_annotation_cpu_seconds",
+    "CPU seconds spent annotating one message",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+english_annotation_queue_depth = Gauge(
+    "atacama_english_annotation_queue_depth", "Messages waiting for English annotation"
+)
+
+# Widget build cache metrics
+widget_build_cache_total = Counter(
+    "atacama_widget_build_cache_total",
+    "Widget build cache lookups and stores",
+    ["result"],  # hit, miss, store
+)
+
+widget_build_cache_bytes = Gauge(
+    "atacama_widget_build_cache_bytes", "Bytes of widget bundles in the build cache"
+)
+
+# Widget build service metrics
+widget_build_jobs_total = Counter(
+    "atacama_widget_build_jobs_total", "Widget build jobs finished", ["status"]
+)
+
+widget_build_queue_depth = Gauge(
+    "atacama_widget_build_queue_depth", "Widget build jobs waiting for a worker"
+)
+
+widget_build_wait_seconds = Histogram(
+    "atacama_widget_build_wait_seconds",
+    "Seconds a widget build job waited in the queue",
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+
+widget_build_duration_seconds = Histogram(
+    "atacama_widget_build_duration_seconds",
+    "Seconds spent running one widget build job",
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+
 
 def record_login(provider: str, success: bool):
     """
@@ -201,6 +257,64 @@ def record_db_error():
     db_query_errors_total.inc()
 
 
+def record_english_annotation(status: str, cached: int, annotated: int, cpu_seconds: float):
+    """
+    Record one English annotation worker pass for metrics.
+
+    :param status: 'complete', 'partial' (CPU budget exhausted) or 'error'
+    :param cached: Paragraphs served from the paragraph cache
+    :param annotated: Paragraphs annotated in this pass
+    :param cpu_seconds: CPU time spent on the message
+    """
+    english_annotation_messages_total.labels(status=status).inc()
+    english_annotation_paragraphs_total.labels(result="cached").inc(cached)
+    english_annotation_paragraphs_total.labels(result="annotated").inc(annotated)
+    english_annotation_cpu_seconds.observe(cpu_seconds)
+
+
+def set_english_annotation_queue_depth(depth: int):
+    """
+    Record the English annotation worker's backlog.
+
+    :param depth: Messages queued or in progress
+    """
+    english_annotation_queue_depth.set(depth)
+
+
+def record_widget_build_cache(result: str, size_bytes: Optional[int] = None):
+    """
+    Record a widget build cache event for metrics.
+
+    :param result: 'hit', 'miss' or 'store'
+    :param size_bytes: Cache size after the event, when known
+    """
+    widget_build_cache_total.labels(result=result).inc()
+    if size_bytes is not None:
+        widget_build_cache_bytes.set(size_bytes)
+
+
+def record_widget_build_job(status: str, wait_seconds: float, run_seconds: float):
+    """
+    Record a finished widget build job for metrics.
+
+    :param status: 'succeeded' or 'failed'
+    :param wait_seconds: Time spent queued
+    :param run_seconds: Time spent building
+    """
+    widget_build_jobs_total.labels(status=status).inc()
+    widget_build_wait_seconds.observe(wait_seconds)
+    widget_build_duration_seconds.observe(run_seconds)
+
+
+def set_widget_build_queue_depth(depth: int):
+    """
+    Record the widget build backlog.
+
+    :param depth: Jobs waiting for a worker
+    """
+    widget_build_queue_depth.set(depth)
+
+
 def update_system_metrics():
     """Update system-level metrics (CPU, memory, disk, network)."""
     try:
@@ -189,6 +189,29 @@ def create_app(testing: bool = False, blueprint_set: str = "BLOG") -> Flask:
         init_archive_service(archive_config)
         logger.info("Archive service initialized")
 
+    # Background English annotation of new and edited messages. Tests annotate
+    # synchronously instead: the in-memory database is not shared across threads.
+    if not testing:
+        from blog.annotation_worker import DEFAULT_CPU_BUDGET, init_annotation_worker
+
+        cpu_budget = float(os.getenv("ANNOTATION_CPU_BUDGET", DEFAULT_CPU_BUDGET))
+        init_annotation_worker(cpu_budget=cpu_budget or None)
+        logger.info(f"English annotation worker initialized (CPU budget {cpu_budget}s)")
+
+        # Widget builds run on a bounded pool instead of request threads
+        from blog.build_service import BUILD_WORKERS, init_build_service
+
+        build_workers = int(os.getenv("WIDGET_BUILD_WORKERS", BUILD_WORKERS))
+        init_build_service(workers=build_workers)
+        logger.info(f"Widget build service initialized ({build_workers} workers)")
+
+        # AI widget jobs are stored in the database and run on a bounded pool
+        from blog.widget_jobs import JOB_WORKERS, init_widget_job_executor
+
+        job_workers = int(os.getenv("WIDGET_JOB_WORKERS", JOB_WORKERS))
+        init_widget_job_executor(workers=job_workers)
+        logger.info(f"Widget job executor initialized ({job_workers} workers)")
+
     # Register before request handler for domain/theme processing
     app.before_request(before_request_handler)
 
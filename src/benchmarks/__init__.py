@@ -0,0 +1 @@
+"""Performance benchmarks for Atacama (run via run_benchmarks.py at the repo root)."""
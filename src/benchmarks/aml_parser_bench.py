@@ -0,0 +1,195 @@
+"""Per-stage benchmarks for the AML pipeline with baseline comparison.
+
+Stages are measured independently on pre-computed inputs (the parser gets
+tokens, the generator gets an AST), so a regression points at the stage that
+caused it rather than at process_message as a whole.
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from aml_parser import process_message
+from aml_parser.colorblocks import create_url_link
+from aml_parser.english_annotations import annotate_english
+from aml_parser.html_generator import generate_html
+from aml_parser.lexer import TokenType, tokenize
+from aml_parser.parser import parse
+from aml_parser.pinyin import annotate_chinese
+from benchmarks.aml_corpus import CORPUS_KINDS, generate_corpus
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baselines", "aml_parser.json"
+)
+
+# Fractional slowdown (or memory growth) tolerated before a result is a regression.
+DEFAULT_THRESHOLD = 0.25
+
+# Peak-memory growth below this many KiB is allocator noise, never a regression.
+MEMORY_NOISE_KIB = 16.0
+
+# (prepare, run): prepare turns raw AML into the stage's input once, outside
+# the timed loop; run is the operation being measured.
+STAGES: Dict[str, Dict[str, Callable[[Any], Any]]] = {
+    "lexer": {"prepare": lambda text: text, "run": tokenize},
+    "parser": {"prepare": tokenize, "run": lambda tokens: parse(iter(tokens))},
+    "generator": {
+        "prepare": lambda text: parse(iter(tokenize(text))),
+        "run": generate_html,
+    },
+    "url_links": {
+        "prepare": lambda text: [t.value for t in tokenize(text) if t.type == TokenType.URL],
+        "run": lambda urls: [create_url_link(url) for url in urls],
+    },
+    "english_annotations": {"prepare": lambda text: text, "run": annotate_english},
+    "chinese_annotations": {"prepare": lambda text: text, "run": annotate_chinese},
+    "end_to_end": {"prepare": lambda text: text, "run": process_message},
+}
+
+
+def measure_stage(stage: str, corpus: List[str], min_time: float = 0.5) -> Dict[str, float]:
+    """
+    Measure throughput and peak memory of one stage over a corpus.
+
+    :param stage: Stage name (key of STAGES)
+    :param corpus: AML messages
+    :param min_time: Minimum seconds to spend in the timed loop
+    :return: Dict with ops_per_sec and peak_kib (peak traced allocation per pass)
+    """
+    prepare = STAGES[stage]["prepare"]
+    run = STAGES[stage]["run"]
+    inputs = [prepare(text) for text in corpus]
+
+    # Warm-up pass: lazy dictionary loads and caches should not count
+    for item in inputs:
+        run(item)
+
+    ops = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for item in inputs:
+            run(item)
+        ops += len(inputs)
+        elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            run(item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"ops_per_sec": round(ops / elapsed, 2), "peak_kib": round(peak / 1024, 1)}
+
+
+def run_benchmarks(
+    stages: Optional[Iterable[str]] = None,
+    kinds: Optional[Iterable[str]] = None,
+    count: int = 20,
+    seed: int = 0,
+    min_time: float = 0.5,
+    progress: Optional[Callable[[str, str, Dict[str, float]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run every (stage, corpus kind) combination.
+
+    :param stages: Stages to run (default: all)
+    :param kinds: Corpus kinds to run (default: all)
+    :param count: Messages per corpus
+    :param seed: Corpus seed
+    :param min_time: Minimum timed seconds per combination
+    :param progress: Optional callback(stage, kind, result) after each measurement
+    :return: Report dict with "meta" and "results" ({stage: {kind: result}})
+    """
+    stages = list(stages or STAGES)
+    kinds = list(kinds or CORPUS_KINDS)
+    corpora = {kind: generate_corpus(kind, count=count, seed=seed) for kind in kinds}
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for stage in stages:
+        results[stage] = {}
+        for kind in kinds:
+            result = measure_stage(stage, corpora[kind], min_time=min_time)
+            results[stage][kind] = result
+            if progress:
+                progress(stage, kind, result)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "count": count,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Load a stored baseline report.
+
+    :param path: Baseline JSON path
+    :return: Report dict, or None if no baseline exists
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(report: Dict[str, Any], path: str = BASELINE_PATH) -> None:
+    """
+    Store a report as the new baseline.
+
+    :param report: Report from run_benchmarks()
+    :param path: Baseline JSON path
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_to_baseline(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """
+    List regressions of a report against a baseline.
+
+    A combination regresses when its throughput drops below
+    ``baseline * (1 - threshold)`` or its peak memory exceeds
+    ``baseline * (1 + threshold)`` (and by more than MEMORY_NOISE_KIB).
+    Combinations missing from either side are ignored.
+
+    :param report: Current report
+    :param baseline: Baseline report
+    :param threshold: Tolerated fractional change
+    :return: Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for stage, kinds in report["results"].items():
+        for kind, result in kinds.items():
+            base = baseline.get("results", {}).get(stage, {}).get(kind)
+            if not base:
+                continue
+
+            min_ops = base["ops_per_sec"] * (1 - threshold)
+            if result["ops_per_sec"] < min_ops:
+                regressions.append(
+                    f"{stage}/{kind}: {result['ops_per_sec']:.1f} ops/s "
+                    f"< {base['ops_per_sec']:.1f} baseline (-{threshold:.0%} allowed)"
+                )
+
+            max_peak = max(base["peak_kib"] * (1 + threshold), base["peak_kib"] + MEMORY_NOISE_KIB)
+            if result["peak_kib"] > max_peak:
+                regressions.append(
+                    f"{stage}/{kind}: {result['peak_kib']:.1f} KiB peak "
+                    f"> {base['peak_kib']:.1f} baseline (+{threshold:.0%} allowed)"
+                )
+    return regressions
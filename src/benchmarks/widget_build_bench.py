@@ -0,0 +1,120 @@
+"""Cold versus warm widget build latency.
+
+"cold" runs the webpack CLI as a subprocess per build, paying Node startup and
+compiler initialization each time; "warm" sends the same builds to the resident
+bundler daemon. The build cache is disabled so every build really compiles.
+Needs the widget toolchain installed (``launch.py --warm-widgets``).
+
+Usage (from src/):
+    python -m benchmarks.widget_build_bench [--builds N] [--output PATH]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from react_compiler.bundler_daemon import get_bundler_pool
+from react_compiler.react_compiler import WidgetBuilder
+
+WIDGET_TEMPLATE = """import React, {{ useState }} from 'react';
+
+const BenchWidget = () => {{
+    const [count, setCount] = useState({n});
+    return <button onClick={{() => setCount(count + 1)}}>Clicked {{count}} times</button>;
+}};
+
+export default BenchWidget;
+"""
+
+
+def measure_builds(builder: WidgetBuilder, builds: int) -> List[float]:
+    """
+    Time distinct builds of a small widget.
+
+    :param builder: WidgetBuilder to build with
+    :param builds: Number of builds
+    :return: Seconds per build
+    :raises RuntimeError: If a build fails
+    """
+    timings = []
+    for n in range(builds):
+        start = time.perf_counter()
+        success, _, error = builder.build_widget(WIDGET_TEMPLATE.format(n=n), "BenchWidget")
+        timings.append(time.perf_counter() - start)
+        if not success:
+            raise RuntimeError(f"Benchmark build failed: {error}")
+    return timings
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """
+    :param timings: Seconds per build
+    :return: First, median and mean build latency in milliseconds
+    """
+    return {
+        "first_ms": round(timings[0] * 1000, 1),
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "mean_ms": round(statistics.mean(timings) * 1000, 1),
+    }
+
+
+def run_benchmarks(builds: int = 5) -> Dict[str, Any]:
+    """
+    Build the same widgets through the webpack CLI and through the daemon.
+
+    :param builds: Builds per path
+    :return: Report dict with "meta" and "results" ({"cold"|"warm": summary})
+    """
+    cold = WidgetBuilder(offline=True, use_cache=False, use_daemon=False)
+    warm = WidgetBuilder(offline=True, use_cache=False, use_daemon=True)
+    daemons = get_bundler_pool(warm.workspace)
+    daemons.stop()  # Include daemon startup in the first warm build
+
+    results = {
+        "cold": summarize(measure_builds(cold, builds)),
+        "warm": summarize(measure_builds(warm, builds)),
+    }
+    if daemons.builds < builds:
+        raise RuntimeError("Warm builds fell back to the webpack CLI; check the daemon logs")
+    daemons.stop()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "builds": builds,
+            "toolchain": warm.workspace.fingerprint(),
+        },
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare cold and warm widget build latency")
+    parser.add_argument("--builds", type=int, default=5, help="Builds per path")
+    parser.add_argument("--output", help="Write the report to a JSON file")
+    args = parser.parse_args()
+
+    report = run_benchmarks(builds=args.builds)
+    print(f"{'path':<6} {'first':>10} {'median':>10} {'mean':>10}")
+    for path, result in report["results"].items():
+        print(
+            f"{path:<6} {result['first_ms']:>8.1f}ms {result['median_ms']:>8.1f}ms "
+            f"{result['mean_ms']:>8.1f}ms"
+        )
+    cold, warm = report["results"]["cold"], report["results"]["warm"]
+    if warm["median_ms"]:
+        print(f"\nWarm median is {cold['median_ms'] / warm['median_ms']:.1f}x faster than cold")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Per-widget page script size with whole-library globals versus tree-shaken bundles.
+
+Builds each stored widget twice - once with every library external (the page
+loads its full UMD file) and once with WidgetBuilder.TREE_SHAKEN_PACKAGES
+bundled - and reports what a page view downloads in each case. Nothing is
+written back to the database. Needs the widget toolchain installed
+(``launch.py --warm-widgets``).
+
+Usage (from src/):
+    python -m benchmarks.widget_bundle_sizes [SLUG ...] [--output PATH]
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+from models.database import db
+from models.models import ReactWidget
+from react_compiler.bundle_size import page_script_size
+from react_compiler.lib import sanitize_widget_title_for_component_name
+from react_compiler.react_compiler import WidgetBuilder
+
+
+def measure_widget(code: str, widget_name: str, builder: WidgetBuilder) -> Dict[str, Any]:
+    """
+    Build a widget and measure its page script.
+
+    :param code: Widget source
+    :param widget_name: Component name
+    :param builder: WidgetBuilder configured for the mode being measured
+    :return: page_script_size() result, plus "error" if the build failed
+    """
+    bundled, external = builder.split_dependencies(code)
+    success, built_code, error = builder.build_widget(
+        code, widget_name, dependencies=bundled, external_dependencies=external
+    )
+    if not success:
+        return {"error": error}
+    return page_script_size(built_code, external)
+
+
+def run_report(slugs: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Measure stored widgets in both modes.
+
+    :param slugs: Widgets to measure (default: all that use a tree-shaken package)
+    :return: One dict per widget with slug, before and after sizes
+    """
+    whole = WidgetBuilder(offline=True, use_cache=False, tree_shake=False)
+    shaken = WidgetBuilder(offline=True, use_cache=False, tree_shake=True)
+
+    with db.session() as session:
+        query = session.query(ReactWidget.slug, ReactWidget.title, ReactWidget.code)
+        if slugs:
+            query = query.filter(ReactWidget.slug.in_(list(slugs)))
+        widgets = query.order_by(ReactWidget.slug).all()
+
+    report = []
+    for slug, title, code in widgets:
+        if not slugs and not shaken.split_dependencies(code)[0]:
+            continue  # Nothing to tree-shake
+        name = sanitize_widget_title_for_component_name(title)
+        report.append(
+            {
+                "slug": slug,
+                "before": measure_widget(code, name, whole),
+                "after": measure_widget(code, name, shaken),
+            }
+        )
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare widget page script sizes")
+    parser.add_argument("slugs", nargs="*", help="Widget slugs (default: all affected widgets)")
+    parser.add_argument("--output", help="Write the report to a JSON file")
+    args = parser.parse_args()
+
+    report = run_report(args.slugs)
+    print(f"{'widget':<32} {'before':>12} {'after':>12} {'gzip before':>12} {'gzip after':>12}")
+    for row in report:
+        before, after = row["before"], row["after"]
+        if "error" in before or "error" in after:
+            print(f"{row['slug']:<32} build failed: {before.get('error') or after.get('error')}")
+            continue
+        print(
+            f"{row['slug']:<32} {before['total_bytes'] / 1024:>10.1f}KB "
+            f"{after['total_bytes'] / 1024:>10.1f}KB "
+            f"{before['gzip_total_bytes'] / 1024:>10.1f}KB "
+            f"{after['gzip_total_bytes'] / 1024:>10.1f}KB"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Background English annotation for newly published and edited messages.
+
+Messages are annotated off the request path, paragraph by paragraph. Paragraph
+results are cached by hash, so re-annotating an edited message only looks up
+the paragraphs that changed. Each pass is capped by a CPU budget; a message
+that exceeds it is stored with partial annotations and requeued, and the next
+pass picks up where the cache left off.
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+from aml_parser.english_annotations import (
+    IncrementalAnnotation,
+    ParagraphAnnotationCache,
+    annotate_english_paragraphs,
+    default_paragraph_cache,
+)
+from common.base.logging_config import get_logger
+from models.database import db
+from models.models import Email
+
+logger = get_logger(__name__)
+
+# CPU seconds one pass may spend on a single message before it is requeued.
+DEFAULT_CPU_BUDGET = 0.5
+
+
+def _record_pass(status: str, result: Optional[IncrementalAnnotation], depth: int) -> None:
+    try:
+        from atacama.blueprints.metrics import (
+            record_english_annotation,
+            set_english_annotation_queue_depth,
+        )
+
+        if result is None:
+            record_english_annotation(status, 0, 0, 0.0)
+        else:
+            record_english_annotation(status, result.cached, result.annotated, result.cpu_seconds)
+        set_english_annotation_queue_depth(depth)
+    except ImportError:
+        pass  # Metrics not available
+
+
+class EnglishAnnotationWorker:
+    """Single background thread that annotates queued messages."""
+
+    def __init__(
+        self,
+        cpu_budget: Optional[float] = DEFAULT_CPU_BUDGET,
+        cache: Optional[ParagraphAnnotationCache] = None,
+    ):
+        """
+        :param cpu_budget: CPU seconds per message per pass (None for unlimited)
+        :param cache: Paragraph cache (default: the process-wide cache)
+        """
+        self.cpu_budget = cpu_budget
+        self.cache = default_paragraph_cache if cache is None else cache
+        self._queue: "queue.Queue[int]" = queue.Queue()
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "complete": 0,
+            "partial": 0,
+            "error": 0,
+            "paragraphs_cached": 0,
+            "paragraphs_annotated": 0,
+            "cpu_seconds": 0.0,
+        }
+
+    def submit(self, message_id: int) -> None:
+        """
+        Queue a message for annotation; already-queued messages are not added twice.
+
+        :param message_id: ID of the message to annotate
+        """
+        with self._lock:
+            if message_id in self._pending:
+                return
+            self._pending.add(message_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="english-annotation", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(message_id)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued message has been processed.
+
+        :param timeout: Seconds to wait (None waits forever)
+        :return: True if the queue drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return cumulative counters and throughput.
+
+        :return: Dict with per-status message counts, paragraph counts, CPU seconds,
+                 paragraphs_per_cpu_second and the current queue depth
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._pending)
+        cpu = stats["cpu_seconds"]
+        stats["paragraphs_per_cpu_second"] = (
+            round(stats["paragraphs_annotated"] / cpu, 1) if cpu else 0.0
+        )
+        return stats
+
+    def annotate_message(self, message_id: int) -> Optional[IncrementalAnnotation]:
+        """
+        Annotate one message and store the result.
+
+        Content is read and the annotations written in separate short sessions so
+        no transaction stays open while annotating. If the content changes in
+        between, the stale result is discarded (the edit queues its own pass).
+
+        :param message_id: ID of the message to annotate
+        :return: The annotation pass result, or None if the message is gone or changed
+        """
+        with db.session() as db_session:
+            content = db_session.query(Email.content).filter(Email.id == message_id).scalar()
+        if content is None:
+            return None
+
+        result = annotate_english_paragraphs(content, cache=self.cache, cpu_budget=self.cpu_budget)
+        annotations_json = (
+            json.dumps(result.annotations, ensure_ascii=False) if result.annotations else None
+        )
+
+        with db.session() as db_session:
+            email = db_session.query(Email).filter(Email.id == message_id).first()
+            if email is None or email.content != content:
+                return None
+            if email.english_annotations != annotations_json:
+                email.english_annotations = annotations_json
+        return result
+
+    def _run(self) -> None:
+        while True:
+            message_id = self._queue.get()
+            status = "error"
+            result = None
+            try:
+                result = self.annotate_message(message_id)
+                status = "complete" if result is None or result.complete else "partial"
+            except Exception as e:
+                logger.error(f"Error annotating message {message_id}: {e}")
+
+            with self._lock:
+                self._stats[status] += 1
+                if result is not None:
+                    self._stats["paragraphs_cached"] += result.cached
+                    self._stats["paragraphs_annotated"] += result.annotated
+                    self._stats["cpu_seconds"] += result.cpu_seconds
+                if status != "partial":
+                    self._pending.discard(message_id)
+                depth = len(self._pending)
+
+            if status == "partial":
+                # Budget exhausted: the finished paragraphs are cached, so the
+                # next pass continues from there behind any newer messages.
+                self._queue.put(message_id)
+            _record_pass(status, result, depth)
+            self._queue.task_done()
+
+
+# Global annotation worker instance
+_annotation_worker: Optional[EnglishAnnotationWorker] = None
+
+
+def init_annotation_worker(
+    cpu_budget: Optional[float] = DEFAULT_CPU_BUDGET,
+) -> EnglishAnnotationWorker:
+    """
+    Initialize the global annotation worker instance.
+
+    :param cpu_budget: CPU seconds per message per pass (None for unlimited)
+    :return: Annotation worker instance
+    """
+    global _annotation_worker
+    _annotation_worker = EnglishAnnotationWorker(cpu_budget=cpu_budget)
+    return _annotation_worker
+
+
+def get_annotation_worker() -> Optional[EnglishAnnotationWorker]:
+    """
+    Get the global annotation worker instance.
+
+    :return: Annotation worker instance or None if not initialized
+    """
+    return _annotation_worker
+
+
+def schedule_english_annotation(message_id: int) -> None:
+    """
+    Queue a new or edited message for background English annotation, if the
+    worker is running. Never raises.
+
+    :param message_id: ID of the persisted message
+    """
+    worker = get_annotation_worker()
+    if worker is None:
+        return
+    try:
+        worker.submit(message_id)
+    except Exception as e:
+        logger.error(f"Error scheduling annotation for message {message_id}: {e}")
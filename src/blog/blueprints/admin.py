@@ -25,6 +25,7 @@ from models.users import (
 from models.messages import get_raw_message_by_id
 from atacama.blueprints.errors import handle_error
 from atacama.decorators import navigable, require_admin, require_auth
+from blog.annotation_worker import schedule_english_annotation
 from blog.blueprints.shared import create_email_message, start_archive_thread
 
 logger = get_logger(__name__)
@@ -347,6 +348,7 @@ def handle_submit() -> ResponseReturnValue:
 
         # Archive URLs and posts if archive service is enabled
         start_archive_thread(message_id, extracted_urls, channel)
+        schedule_english_annotation(message_id)
 
         flash("Message submitted successfully!", "success")
         return redirect(url_for("admin.submission_status", message_id=message_id))
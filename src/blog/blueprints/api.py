@@ -23,6 +23,7 @@ from models import get_or_create_user, get_user_allowed_channels
 from models.database import db
 from atacama.blueprints.errors import handle_error
 from atacama.decorators import require_auth
+from blog.annotation_worker import schedule_english_annotation
 from blog.blueprints.shared import content_bp, create_email_message, start_archive_thread
 
 logger = get_logger(__name__)
@@ -125,6 +126,7 @@ def create_message_api() -> ResponseReturnValue:
 
         # Archive URLs and posts if archive service is enabled
         start_archive_thread(message_id, extracted_urls, channel)
+        schedule_english_annotation(message_id)
 
         return (
             jsonify(
@@ -254,6 +256,7 @@ def create_link_api() -> ResponseReturnValue:
             message_id = message.id
 
         start_archive_thread(message_id, extracted_urls, channel)
+        schedule_english_annotation(message_id)
 
         channel_config = channel_manager.get_channel_config(channel)
         if channel_config is None:
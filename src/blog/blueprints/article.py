@@ -1,7 +1,7 @@
 """Articles blueprint for permanent content."""
 
 from datetime import datetime
-from flask import render_template, abort, g, request, redirect, url_for
+from flask import render_template, abort, g, make_response, request, redirect, url_for
 from flask.typing import ResponseReturnValue
 
 from common.config.channel_config import get_channel_manager
@@ -15,6 +15,12 @@ from aml_parser.parser import parse
 from aml_parser.lexer import tokenize
 from aml_parser.html_generator import generate_html
 from blog.blueprints.shared import content_bp
+from blog.blueprints.conditional import (
+    get_article_validator,
+    is_validator_visible,
+    not_modified_response,
+    set_validators,
+)
 
 logger = get_logger(__name__)
 
@@ -23,7 +29,16 @@ logger = get_logger(__name__)
 @optional_auth
 def view_article(slug: str) -> ResponseReturnValue:
     """View a single article by its slug."""
+    variant = "html"
+
     with db.session() as session:
+        # Answer revalidation requests before loading or rendering the article
+        validator = get_article_validator(session, slug)
+        if validator and is_validator_visible(validator, ignore_preferences=False):
+            not_modified = not_modified_response(validator, variant)
+            if not_modified is not None:
+                return not_modified
+
         article = session.query(Article).filter_by(slug=slug).first()
 
         if not article:
@@ -37,9 +52,10 @@ def view_article(slug: str) -> ResponseReturnValue:
         # Get channel configuration for display
         channel_config = get_channel_manager().get_channel_config(article.channel)
 
-        return render_template(
+        html = render_template(
             "articles/article.html", article=article, channel_config=channel_config
         )
+        return set_validators(make_response(html), validator, variant)
 
 
 @content_bp.route("/articles/channel/<channel>")
@@ -0,0 +1,276 @@
+"""Conditional GET support (ETag / Last-Modified -> 304) for message and article views.
+
+Each view first resolves a :class:`ContentValidator` with a single indexed query
+over the rows that feed its template (the message itself plus parent/children,
+the ancestor chain, or the article row). The strong ETag is derived from that
+fingerprint together with everything else that changes the rendered bytes:
+render version, response variant, viewer access class, domain and theme. When
+the client already holds a matching copy the view answers 304 without touching
+templates, sidebars or relationship loads.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from flask import Response, g, make_response, request
+from sqlalchemy import or_, select
+
+from common.config.domain_config import get_domain_manager
+from models.messages import message_ancestors_cte
+from models.models import Article, Email, Message
+from models.users import check_channel_access
+
+# Bump whenever message/chain/article templates or their JSON payloads change
+# shape, so clients holding copies rendered by older code revalidate.
+RENDER_VERSION = "1"
+
+# Flask-Compress rewrites strong ETags as "<etag>:<algorithm>" on compressed
+# responses; clients echo that form back in If-None-Match.
+_ENCODING_SUFFIX_SEPARATOR = ":"
+
+
+@dataclass
+class ContentValidator:
+    """Fingerprint of the rows a view renders, resolved before any rendering."""
+
+    message_id: int
+    channel: str
+    last_modified: datetime
+    fingerprint: str
+    channels: Tuple[str, ...] = ()
+
+
+def _build_validator(
+    message_id: int, rows: List[Tuple[int, str, datetime]]
+) -> Optional[ContentValidator]:
+    """
+    Fold (id, channel, last_modified_at) rows into a validator.
+
+    :param message_id: ID of the row the view is about
+    :param rows: Rows contributing to the rendered output
+    :return: ContentValidator, or None if the target row is missing
+    """
+    target = next((row for row in rows if row[0] == message_id), None)
+    if target is None:
+        return None
+
+    timestamps = [row[2] or datetime.min for row in rows]
+    digest = hashlib.sha256()
+    for row_id, row_channel, modified in sorted(rows, key=lambda row: row[0]):
+        digest.update(
+            f"{row_id}|{row_channel}|{modified.isoformat() if modified else ''};".encode()
+        )
+
+    return ContentValidator(
+        message_id=message_id,
+        channel=target[1],
+        last_modified=max(timestamps),
+        fingerprint=digest.hexdigest(),
+        channels=tuple(sorted({row[1] for row in rows})),
+    )
+
+
+def get_message_validator(db_session, message_id: int) -> Optional[ContentValidator]:
+    """
+    Resolve the validator for the single-message view.
+
+    Covers the message, its parent (shown as "In reply to") and its direct
+    replies, all in one query over the primary key and ``emails.parent_id``.
+
+    :param db_session: Database session
+    :param message_id: ID of the message being viewed
+    :return: ContentValidator, or None if the message does not exist
+    """
+    parent_id = select(Email.parent_id).where(Email.id == message_id).scalar_subquery()
+    stmt = (
+        select(Message.id, Message.channel, Message.last_modified_at)
+        .join(Email, Email.id == Message.id)
+        .where(
+            or_(Message.id == message_id, Email.parent_id == message_id, Message.id == parent_id)
+        )
+    )
+    return _build_validator(message_id, [tuple(row) for row in db_session.execute(stmt)])
+
+
+def get_chain_validator(db_session, message_id: int) -> Optional[ContentValidator]:
+    """
+    Resolve the validator for the chain view.
+
+    Walks the ancestors with a recursive CTE (UNION, so a corrupt cycle still
+    terminates) and adds the direct replies, in a single statement.
+
+    :param db_session: Database session
+    :param message_id: ID of the chain's target message
+    :return: ContentValidator, or None if the message does not exist
+    """
+    ancestors = message_ancestors_cte(message_id)
+    stmt = (
+        select(Message.id, Message.channel, Message.last_modified_at)
+        .join(Email, Email.id == Message.id)
+        .where(or_(Message.id.in_(select(ancestors.c.id)), Email.parent_id == message_id))
+    )
+    return _build_validator(message_id, [tuple(row) for row in db_session.execute(stmt)])
+
+
+def get_article_validator(db_session, slug: str) -> Optional[ContentValidator]:
+    """
+    Resolve the validator for an article by the same slug lookup as view_article.
+
+    :param db_session: Database session
+    :param slug: Article slug
+    :return: ContentValidator, or None if no article has this slug
+    """
+    stmt = select(Article.id, Article.channel, Article.last_modified_at).where(Article.slug == slug)
+    row = db_session.execute(stmt).first()
+    if row is None:
+        return None
+    return _build_validator(row[0], [tuple(row)])
+
+
+def viewer_access_class() -> str:
+    """
+    Describe what the current viewer is allowed to see.
+
+    Anonymous viewers share one class. Signed-in viewers get a class per user
+    that also folds in their channel preferences and admin-granted channels,
+    since both change the sidebar and which chain members are shown.
+
+    :return: Opaque access class string
+    """
+    user = getattr(g, "user", None)
+    if not user:
+        return "anonymous"
+    grants = hashlib.sha256(
+        f"{user.channel_preferences or ''}|{user.admin_channel_access or ''}".encode()
+    ).hexdigest()[:16]
+    return f"user:{user.id}:{grants}"
+
+
+def compute_etag(validator: ContentValidator, variant: str) -> str:
+    """
+    Derive the strong ETag for a validator and response variant.
+
+    :param validator: Content validator for the view
+    :param variant: Response variant (e.g. "html:ea=1" or "json")
+    :return: Hex ETag value (unquoted)
+    """
+    domain = getattr(g, "current_domain", "default")
+    domain_config = getattr(g, "domain_config", None)
+    theme = domain_config.theme if domain_config else "default"
+    parts = [
+        RENDER_VERSION,
+        validator.fingerprint,
+        variant,
+        viewer_access_class(),
+        domain,
+        theme,
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def http_timestamp(value: datetime) -> datetime:
+    """Normalize a naive UTC timestamp to HTTP-date (whole second) precision."""
+    return value.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def _matching_etag(etag: str) -> Optional[str]:
+    """
+    Return the client-supplied tag matching ``etag``, if any.
+
+    :param etag: Our strong ETag (unquoted)
+    :return: The tag as the client sent it, or None
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    if if_none_match.star_tag:
+        return etag
+    for tag in if_none_match:
+        if tag.split(_ENCODING_SUFFIX_SEPARATOR, 1)[0] == etag:
+            return tag
+    return None
+
+
+def is_validator_visible(validator: ContentValidator, ignore_preferences: bool = True) -> bool:
+    """
+    Check that the viewer may see every row behind the validator.
+
+    Only a positive answer allows a 304; anything else falls through to the
+    view's normal path, which renders the proper error or redirect.
+
+    :param validator: Content validator for the view
+    :param ignore_preferences: Passed to check_channel_access for the target
+    :return: True if the domain serves all channels and the user can access the target
+    """
+    domain_manager = get_domain_manager()
+    current_domain = getattr(g, "current_domain", "default")
+    if not all(domain_manager.is_channel_allowed(current_domain, ch) for ch in validator.channels):
+        return False
+    return check_channel_access(validator.channel, g.user, ignore_preferences)
+
+
+def match_conditional(etag: str, last_modified: Optional[datetime]) -> Optional[str]:
+    """
+    Check the request's conditional headers against our current validators.
+
+    If-Modified-Since is only consulted when no If-None-Match was sent.
+
+    :param etag: Our strong ETag (unquoted)
+    :param last_modified: Naive UTC modification time, or None if unknown
+    :return: The ETag to echo on a 304, or None if the client copy is stale
+    """
+    matched = _matching_etag(etag)
+    if matched is not None:
+        return matched
+    if request.if_none_match:
+        return None
+    if_modified_since = request.if_modified_since
+    if if_modified_since is None or last_modified is None:
+        return None
+    if http_timestamp(last_modified) > if_modified_since:
+        return None
+    return etag
+
+
+def not_modified_response(validator: ContentValidator, variant: str) -> Optional[Response]:
+    """
+    Answer If-None-Match / If-Modified-Since with 304 when the client copy is current.
+
+    :param validator: Content validator for the view
+    :param variant: Response variant
+    :return: 304 response, or None if the view must render
+    """
+    matched = match_conditional(compute_etag(validator, variant), validator.last_modified)
+    if matched is None:
+        return None
+
+    response = make_response("", 304)
+    return set_validators(response, validator, variant, etag=matched)
+
+
+def set_validators(
+    response: Response,
+    validator: Optional[ContentValidator],
+    variant: str,
+    etag: Optional[str] = None,
+) -> Response:
+    """
+    Attach ETag, Last-Modified and revalidation headers to a response.
+
+    :param response: Response to decorate
+    :param validator: Content validator for the view (no-op when None)
+    :param variant: Response variant
+    :param etag: Precomputed ETag to send (defaults to compute_etag())
+    :return: The same response
+    """
+    if validator is None:
+        return response
+    response.set_etag(etag or compute_etag(validator, variant), weak=False)
+    response.last_modified = http_timestamp(validator.last_modified)
+    # Pages are per-viewer: never store in shared caches, always revalidate.
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.update(("Accept", "Cookie", "Authorization"))
+    return response
@@ -6,9 +6,19 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 # Third-party imports
-from flask import flash, g, jsonify, redirect, render_template, request, session, url_for
+from flask import (
+    flash,
+    g,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
 from flask.typing import ResponseReturnValue
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import joinedload
 
 # Local application imports
 from common.base.logging_config import get_logger
@@ -20,10 +30,11 @@ from models.messages import (
     check_message_access,
     get_domain_filtered_messages,
     get_message_chain,
+    get_polymorphic_messages,
     get_user_allowed_channels,
 )
 
-from models.models import Message, Article, ReactWidget, Quote, Email
+from models.models import Article, ReactWidget, Quote, Email
 from atacama.blueprints.errors import handle_error
 from atacama.decorators import (
     navigable,
@@ -33,6 +44,13 @@ from atacama.decorators import (
     require_auth,
 )
 from blog.blueprints.shared import content_bp
+from blog.blueprints.conditional import (
+    get_chain_validator,
+    get_message_validator,
+    is_validator_visible,
+    not_modified_response,
+    set_validators,
+)
 
 logger = get_logger(__name__)
 
@@ -100,7 +118,18 @@ def get_message(message_id: int) -> ResponseReturnValue:
     domain_manager = get_domain_manager()
     current_domain = g.current_domain
 
+    wants_html = request.headers.get("Accept", "").startswith("text/html")
+    show_english_annotations = request.args.get("ea", "1") != "0"
+    variant = f"html:ea={int(show_english_annotations)}" if wants_html else "json"
+
     with db.session() as db_session:
+        # Answer revalidation requests before loading or rendering anything
+        validator = get_message_validator(db_session, message_id)
+        if validator and is_validator_visible(validator):
+            not_modified = not_modified_response(validator, variant)
+            if not_modified is not None:
+                return not_modified
+
         message = db_session.query(Email).get(message_id)
 
         if not message:
@@ -121,7 +150,7 @@ def get_message(message_id: int) -> ResponseReturnValue:
             )
 
         if not check_message_access(message):
-            if request.headers.get("Accept", "").startswith("text/html"):
+            if wants_html:
                 return redirect(url_for("auth.login"))
             return handle_error(
                 "401",
@@ -130,7 +159,7 @@ def get_message(message_id: int) -> ResponseReturnValue:
                 "Message requires authentication",
             )
 
-        if request.headers.get("Accept", "").startswith("text/html"):
+        if wants_html:
             channel_config = get_channel_manager().get_channel_config(message.channel)
 
             # Get available channels for sidebar
@@ -142,9 +171,7 @@ def get_message(message_id: int) -> ResponseReturnValue:
                 if domain_manager.is_channel_allowed(current_domain, ch):
                     domain_allowed_channels.append(ch)
 
-            show_english_annotations = request.args.get("ea", "1") != "0"
-
-            return render_template(
+            html = render_template(
                 "messages/message.html",
                 message=message,
                 created_at=message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
@@ -156,8 +183,9 @@ def get_message(message_id: int) -> ResponseReturnValue:
                 available_channels=domain_allowed_channels,
                 show_english_annotations=show_english_annotations,
             )
+            return set_validators(make_response(html), validator, variant)
 
-        return jsonify(
+        response = jsonify(
             {
                 "id": message.id,
                 "subject": message.subject,
@@ -170,6 +198,7 @@ def get_message(message_id: int) -> ResponseReturnValue:
                 "quotes": [{"text": q.text, "type": q.quote_type} for q in message.quotes],
             }
         )
+        return set_validators(response, validator, variant)
 
 
 @content_bp.route("/messages/<int:message_id>/chain", methods=["GET"])
@@ -184,6 +213,18 @@ def view_chain(message_id: int) -> ResponseReturnValue:
     domain_manager = get_domain_manager()
     current_domain = g.current_domain
 
+    wants_html = request.headers.get("Accept", "").startswith("text/html")
+    show_english_annotations = request.args.get("ea", "1") != "0"
+    variant = f"html:ea={int(show_english_annotations)}" if wants_html else "json"
+
+    # Answer revalidation requests before walking and rendering the chain
+    with db.session() as db_session:
+        validator = get_chain_validator(db_session, message_id)
+    if validator and is_validator_visible(validator):
+        not_modified = not_modified_response(validator, variant)
+        if not_modified is not None:
+            return not_modified
+
     chain = get_message_chain(message_id)
 
     if not chain:
@@ -210,10 +251,8 @@ def view_chain(message_id: int) -> ResponseReturnValue:
         for message in chain:
             message.created_at_formatted = message.created_at.strftime("%Y-%m-%d %H:%M:%S")
 
-    if request.headers.get("Accept", "").startswith("text/html"):
-        show_english_annotations = request.args.get("ea", "1") != "0"
-
-        return render_template(
+    if wants_html:
+        html = render_template(
             "messages/chain.html",
             messages=chain,
             target_id=message_id,
@@ -221,8 +260,9 @@ def view_chain(message_id: int) -> ResponseReturnValue:
             channel_config=channel_config,
             show_english_annotations=show_english_annotations,
         )
+        return set_validators(make_response(html), validator, variant)
 
-    return jsonify(
+    response = jsonify(
         {
             "chain": [
                 {
@@ -239,6 +279,7 @@ def view_chain(message_id: int) -> ResponseReturnValue:
             ]
         }
     )
+    return set_validators(response, validator, variant)
 
 
 @content_bp.route("/")
@@ -448,84 +489,62 @@ def all_messages(tsdate: Optional[str] = None, tstime: Optional[str] = None) ->
             if domain_channels is not None:
                 allowed_channels = [c for c in allowed_channels if c in domain_channels]
 
-        # Query Messages table with proper filtering
-        query = (
-            db_session.query(Message)
-            .options(selectinload(Message.author))
-            .filter(Message.channel.in_(allowed_channels))
+        # Load the page as concrete subclasses in a constant number of queries
+        messages, has_more = get_polymorphic_messages(
+            db_session, allowed_channels, older_than_timestamp=older_than_timestamp, limit=10
         )
 
-        # Apply timestamp filter if provided
-        if older_than_timestamp:
-            query = query.filter(Message.created_at < older_than_timestamp)
-
-        # Get messages ordered by creation date (newest first)
-        limit = 10
-        messages = query.order_by(Message.created_at.desc()).limit(limit + 1).all()
-
-        # Check if there are more messages
-        has_more = len(messages) > limit
-        messages = messages[:limit]
-
         # Transform messages into display format
         display_messages = []
 
         for message in messages:
-            # Get type-specific data by querying the specific table
             type_specific_data = None
             message_url = None
             preview = None
             title = None
             display_date = message.created_at
 
-            if message.message_type.value == "email":
-                email = db_session.query(Email).get(message.id)
-                if email:
-                    type_specific_data = email
-                    title = email.subject or "(No Subject)"
-                    # Use plain content for preview to avoid HTML tag truncation issues; "preview_content" is HTML rendered and should not be truncated further.
-                    preview_text = email.content or ""
-                    if len(preview_text) > 200:
-                        preview = preview_text[:200] + "..."
-                    else:
-                        preview = preview_text
-                    message_url = url_for("content.get_message", message_id=email.id)
-
-            elif message.message_type.value == "article":
-                article = db_session.query(Article).get(message.id)
-                if article and article.published:
-                    type_specific_data = article
-                    title = article.title
+            if isinstance(message, Email):
+                type_specific_data = message
+                title = message.subject or "(No Subject)"
+                # Use plain content for preview to avoid HTML tag truncation issues; "preview_content" is HTML rendered and should not be truncated further.
+                preview_text = message.content or ""
+                if len(preview_text) > 200:
+                    preview = preview_text[:200] + "..."
+                else:
+                    preview = preview_text
+                message_url = url_for("content.get_message", message_id=message.id)
+
+            elif isinstance(message, Article):
+                if message.published:
+                    type_specific_data = message
+                    title = message.title
                     preview = (
-                        article.processed_content[:200] + "..."
-                        if article.processed_content and len(article.processed_content) > 200
-                        else article.processed_content
+                        message.processed_content[:200] + "..."
+                        if message.processed_content and len(message.processed_content) > 200
+                        else message.processed_content
                     )
-                    message_url = url_for("content.view_article", slug=article.slug)
-                    display_date = article.published_at or article.created_at
-
-            elif message.message_type.value == "widget":
-                widget = db_session.query(ReactWidget).get(message.id)
-                if widget:
-                    type_specific_data = widget
-                    title = widget.title
-                    preview = widget.description or "Interactive React widget"
-                    message_url = url_for("widgets.view_widget", slug=widget.slug)
-                    display_date = widget.published_at or widget.created_at
-
-            elif message.message_type.value == "quote":
-                quote = db_session.query(Quote).get(message.id)
-                if quote:
-                    type_specific_data = quote
-                    title = (
-                        f"{quote.quote_type.title()}: {quote.text[:50]}..."
-                        if len(quote.text) > 50
-                        else f"{quote.quote_type.title()}: {quote.text}"
-                    )
-                    preview = f"By {quote.original_author or 'Unknown'}" + (
-                        f" - {quote.commentary[:100]}..." if quote.commentary else ""
-                    )
-                    message_url = url_for("quotes.view_quote", quote_id=quote.id) + f"#{quote.id}"
+                    message_url = url_for("content.view_article", slug=message.slug)
+                    display_date = message.published_at or message.created_at
+
+            elif isinstance(message, ReactWidget):
+                type_specific_data = message
+                title = message.title
+                preview = message.description or "Interactive React widget"
+                message_url = url_for("widgets.view_widget", slug=message.slug)
+                display_date = message.published_at or message.created_at
+
+            elif isinstance(message, Quote):
+                type_specific_data = message
+                title = (
+                    f"{message.quote_type.title()}: {message.text[:50]}..."
+                    if len(message.text) > 50
+                    else f"{message.quote_type.title()}: {message.text}"
+                )
+                preview = f"By {message.original_author or 'Unknown'}" + (
+                    f" - {message.commentary[:100]}..." if message.commentary else ""
+                )
+                message_url = url_for("quotes.view_quote", quote_id=message.id) + f"#{message.id}"
 
             # Only include if we have the type-specific data and a URL
             if type_specific_data and message_url:
@@ -22,6 +22,7 @@ from models.database import db
 from models.models import Email
 from atacama.blueprints.errors import handle_error
 from atacama.decorators import navigable, require_auth
+from blog.annotation_worker import schedule_english_annotation
 from blog.blueprints.shared import content_bp
 
 logger = get_logger(__name__)
@@ -360,6 +361,8 @@ def editor_publish(draft_id: str) -> ResponseReturnValue:
             db_session.commit()
             message_id = message.id
 
+        schedule_english_annotation(message_id)
+
         return jsonify(
             {
                 "success": True,
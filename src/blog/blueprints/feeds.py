@@ -1,20 +1,37 @@
 """Blueprint for RSS feeds and sitemaps."""
 
-from datetime import datetime
+import hashlib
 import html
-import re
-from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from flask import g, make_response, render_template_string, request
+from flask import Response, g, make_response, render_template_string, request, stream_with_context
 from flask.typing import ResponseReturnValue
+from sqlalchemy import func, update
+from sqlalchemy.orm import load_only, noload, selectinload
+
+from aml_parser.rss import clean_html_for_rss
 
 from common.base.logging_config import get_logger
+from common.cache import LRUCache
 from common.config.channel_config import AccessLevel, get_channel_manager
 from common.config.domain_config import get_domain_manager
 from models.database import db
 from models.models import Email
 from atacama.blueprints.errors import handle_error
+from blog.blueprints.conditional import http_timestamp, match_conditional
 from blog.blueprints.shared import feeds_bp
+from blog.blueprints.sitemap import (
+    cached_stream,
+    count_sitemap_messages,
+    get_cached_sitemap,
+    iter_sitemap_index,
+    iter_urlset,
+    shard_count,
+    sitemap_base_url,
+    sitemap_channels,
+)
 
 logger = get_logger(__name__)
 
@@ -23,103 +40,142 @@ logger = get_logger(__name__)
 # Helper Functions
 ##############################################################################
 
+# Number of most recent messages in a feed.
+FEED_SIZE = 20
+
+# Maximum number of rendered feeds kept in memory, one per (domain, channel, URL).
+FEED_CACHE_SIZE = 256
+
+# Bump whenever the feed template changes so cached copies and ETags roll over.
+FEED_RENDER_VERSION = "1"
+
+RSS_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+    <channel>
+        <title>{{ title }}</title>
+        <link>{{ link }}</link>
+        <description>{{ description }}</description>
+        <language>en-us</language>
+        <lastBuildDate>{{ build_date }}</lastBuildDate>
+        <atom:link href="{{ feed_link }}" rel="self" type="application/rss+xml" />
+        
+        {%- for item in items %}
+        <item>
+            <title>{{ item.title }}</title>
+            <link>{{ item.link }}</link>
+            <guid isPermaLink="true">{{ item.guid }}</guid>
+            <pubDate>{{ item.pubDate }}</pubDate>
+            <description>{{ item.description | safe }}</description>
+            <content:encoded><![CDATA[{{ item.description | safe }}]]></content:encoded>
+            <category>{{ item.category }}</category>
+            {%- if item.author %}
+            <author>{{ item.author }}</author>
+            {%- endif %}
+        </item>
+        {%- endfor %}
+    </channel>
+</rss>"""
+
+
+@dataclass
+class CachedFeed:
+    """A rendered feed and the state of the messages it was rendered from."""
+
+    fingerprint: str
+    xml: str
+
+
+_feed_cache = LRUCache(maxsize=FEED_CACHE_SIZE)
 
-def clean_html_for_rss(html_content: str) -> str:
+
+def get_feed_state(db_session, channels: List[str]) -> Tuple[str, Optional[datetime]]:
     """
-    Clean HTML content for RSS feeds by handling color tags and other formatting.
+    Summarize the messages visible in a feed with one aggregate query.
+
+    The newest id catches new posts, the latest update time catches edits and
+    the count catches deletions.
 
-    :param html_content: Original HTML content from processed message
-    :return: Cleaned HTML suitable for RSS feeds
+    :param db_session: Database session
+    :param channels: Channels the feed covers
+    :return: Tuple of (fingerprint, last modification time or None if empty)
     """
-    # Create a copy of the content to work with
-    cleaned = html_content
-
-    # Replace color blocks with their content or appropriate representation
-    def expand_color_block(match):
-        # Extract the content within the colorblock
-        full_match = match.group(0)
-        content_match = re.search(
-            r'<span class="colortext-content">(.*?)</span>', full_match, re.DOTALL
-        )
-        sigil_match = re.search(r'<span class="sigil">(.*?)</span>', full_match, re.DOTALL)
-
-        if content_match:
-            # Find the sigil for this color (emoji)
-            sigil = ""
-            if sigil_match:
-                sigil = sigil_match.group(1)
-
-            # Extract the content
-            content = content_match.group(1)
-
-            # Format with sigil
-            return f"{sigil} {content}"
-        return full_match
-
-    # Replace colorblocks with their content
-    cleaned = re.sub(
-        r'<span class="colorblock.*?">.*?<span class="colortext-content">.*?</span>\s*</span>',
-        expand_color_block,
-        cleaned,
-        flags=re.DOTALL,
+    newest_id, last_modified, count = (
+        db_session.query(func.max(Email.id), func.max(Email.last_modified_at), func.count(Email.id))
+        .filter(Email.channel.in_(channels))
+        .one()
     )
+    fingerprint = f"{newest_id}:{last_modified.isoformat() if last_modified else ''}:{count}"
+    return fingerprint, last_modified
 
-    # Handle YouTube embeds
-    def handle_youtube_embed(match):
-        video_id_match = re.search(r'data-video-id="(.*?)"', match.group(0))
-        if video_id_match:
-            video_id = video_id_match.group(1)
-            return f'<p><a href="https://www.youtube.com/watch?v={video_id}">YouTube Video: {video_id}</a></p>'
-        return ""
-
-    cleaned = re.sub(r'<span class="youtube-player".*?</span>', handle_youtube_embed, cleaned)
-
-    # Handle Chinese annotations
-    def handle_chinese_annotation(match):
-        # Extract Chinese characters and any annotations
-        chinese = match.group(0)
-        pinyin_match = re.search(r'data-pinyin="(.*?)"', chinese)
-        definition_match = re.search(r'data-definition="(.*?)"', chinese)
-
-        # Extract the Chinese text
-        text_match = re.search(r">([^<]+)</span>", chinese)
-
-        if text_match:
-            text = text_match.group(1)
-            annotations = []
-
-            if pinyin_match:
-                annotations.append(f"pinyin: {pinyin_match.group(1)}")
-            if definition_match:
-                annotations.append(f"def: {definition_match.group(1)}")
-
-            if annotations:
-                return f"{text} ({', '.join(annotations)})"
-            return text
-        return match.group(0)
-
-    cleaned = re.sub(
-        r'<span class="annotated-chinese".*?</span>', handle_chinese_annotation, cleaned
-    )
 
-    # Multi-line quotations
-    def handle_mlq(match):
-        # Extract the content from the MLQ
-        content_match = re.search(
-            r'<div class="mlq-content">(.*?)</div>', match.group(0), re.DOTALL
-        )
-        if content_match:
-            return f"<blockquote>{content_match.group(1)}</blockquote>"
-        return ""
-
-    cleaned = re.sub(
-        r'<div class="mlq">.*?<div class="mlq-content">.*?</div>\s*</div>',
-        handle_mlq,
-        cleaned,
-        flags=re.DOTALL,
-    )
+def compute_feed_etag(key: Tuple[str, str, str], fingerprint: str) -> str:
+    """
+    Derive the strong ETag of a feed.
+
+    :param key: Feed cache key (domain, channel, feed URL)
+    :param fingerprint: Fingerprint from get_feed_state()
+    :return: Hex ETag value (unquoted)
+    """
+    parts = [FEED_RENDER_VERSION, *key, fingerprint]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
 
-    return cleaned
+
+def get_cached_feed(key: Tuple[str, str, str], fingerprint: str) -> Optional[str]:
+    """Return the cached feed XML if it was rendered from the same message state."""
+    cached = _feed_cache.get(key)
+    if cached is None or cached.fingerprint != fingerprint:
+        return None
+    return cached.xml
+
+
+def store_feed(key: Tuple[str, str, str], fingerprint: str, xml: str) -> None:
+    """Cache a rendered feed, evicting the least recently used beyond FEED_CACHE_SIZE."""
+    _feed_cache.put(key, CachedFeed(fingerprint, xml))
+
+
+def clear_feed_cache() -> None:
+    """Drop every cached feed."""
+    _feed_cache.clear()
+
+
+def rss_item_content(db_session, message: Email) -> str:
+    """
+    Return a message's RSS-cleaned HTML, computed at write time.
+
+    Messages saved before rss_content existed are cleaned once here and
+    backfilled with a plain UPDATE, which leaves last_modified_at untouched.
+
+    :param db_session: Database session
+    :param message: Email with rss_content, preview_content and processed_content loaded
+    :return: Cleaned HTML
+    """
+    if message.rss_content is not None:
+        return message.rss_content
+    source = message.preview_content or message.processed_content or ""
+    content = clean_html_for_rss(source)
+    emails = Email.__table__
+    db_session.execute(update(emails).where(emails.c.id == message.id).values(rss_content=content))
+    return content
+
+
+def set_feed_validators(
+    response: Response, etag: str, last_modified: Optional[datetime]
+) -> Response:
+    """
+    Attach ETag, Last-Modified and revalidation headers to a feed response.
+
+    :param response: Response to decorate
+    :param etag: Strong ETag to send
+    :param last_modified: Naive UTC modification time, or None for an empty feed
+    :return: The same response
+    """
+    response.set_etag(etag, weak=False)
+    if last_modified is not None:
+        response.last_modified = http_timestamp(last_modified)
+    # Feeds are public and identical for every reader; revalidation is a single query.
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
 
 
 ##############################################################################
@@ -127,67 +183,72 @@ def clean_html_for_rss(html_content: str) -> str:
 ##############################################################################
 
 
+def _sitemap_response(name: str, build) -> ResponseReturnValue:
+    """
+    Serve a sitemap document from the per-domain cache, or stream and cache it.
+
+    :param name: Document name within the domain ("root" or the shard number)
+    :param build: Callable(base_url, channels, db_session) returning an XML chunk
+                  iterator, or None for a 404
+    :return: XML response
+    """
+    current_domain = g.current_domain
+    base_url = sitemap_base_url(current_domain, request.url_root.rstrip("/"))
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    key = (current_domain, base_url, name)
+
+    document = get_cached_sitemap(key, today)
+    if document is not None:
+        response = make_response(document)
+    else:
+        channels = sitemap_channels(current_domain)
+        with db.session() as db_session:
+            chunks = build(base_url, channels, db_session)
+        if chunks is None:
+            return handle_error("404", "Sitemap Not Found", "No such sitemap shard")
+        response = Response(stream_with_context(cached_stream(key, today, channels, chunks)))
+
+    response.headers["Content-Type"] = "application/xml"
+    return response
+
+
 @feeds_bp.route("/sitemap.xml")
 def sitemap() -> ResponseReturnValue:
     """
-    Generate sitemap.xml containing all public URLs for the current domain.
+    Generate sitemap.xml for the current domain.
+
+    A single urlset when every URL fits in one file, otherwise a sitemap index
+    of /sitemap-<n>.xml shards.
 
-    :return: XML response containing sitemap
+    :return: XML response containing the sitemap or sitemap index
     """
-    channel_manager = get_channel_manager()
-    domain_manager = get_domain_manager()
-    current_domain = g.current_domain
 
-    with db.session() as db_session:
-        messages = db_session.query(Email).order_by(Email.created_at.desc()).all()
-        urls = []
-        base_url = request.url_root.rstrip("/")
-
-        urls.append({"loc": f"{base_url}/", "lastmod": datetime.utcnow().strftime("%Y-%m-%d")})
-
-        # Add public channel pages that are allowed on this domain
-        for channel_name, config in channel_manager.channels.items():
-            if config.access_level == AccessLevel.PUBLIC and domain_manager.is_channel_allowed(
-                current_domain, channel_name
-            ):
-                urls.append(
-                    {
-                        "loc": f"{base_url}/stream/channel/{channel_name}",
-                        "lastmod": datetime.utcnow().strftime("%Y-%m-%d"),
-                    }
-                )
+    def build(base_url, channels, db_session):
+        total = 1 + len(channels) + count_sitemap_messages(db_session, channels)
+        shards = shard_count(total)
+        if shards == 1:
+            return iter_urlset(base_url, channels, 1)
+        return iter_sitemap_index(base_url, shards)
 
-        # Add public messages that are allowed on this domain
-        for message in messages:
-            msg_config = channel_manager.get_channel_config(message.channel)
-            if (
-                msg_config
-                and msg_config.access_level == AccessLevel.PUBLIC
-                and domain_manager.is_channel_allowed(current_domain, message.channel)
-            ):
-                urls.append(
-                    {
-                        "loc": f"{base_url}/messages/{message.id}",
-                        "lastmod": message.created_at.strftime("%Y-%m-%d"),
-                    }
-                )
+    return _sitemap_response("root", build)
+
+
+@feeds_bp.route("/sitemap-<int:shard>.xml")
+def sitemap_shard(shard: int) -> ResponseReturnValue:
+    """
+    Generate one shard of the current domain's sitemap.
+
+    :param shard: 1-based shard number
+    :return: XML response containing the shard's urlset
+    """
 
-        sitemap_xml = render_template_string(
-            """<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    {%- for url in urls %}
-    <url>
-        <loc>{{ url.loc | e }}</loc>
-        <lastmod>{{ url.lastmod }}</lastmod>
-    </url>
-    {%- endfor %}
-</urlset>""",
-            urls=urls,
-        )
+    def build(base_url, channels, db_session):
+        total = 1 + len(channels) + count_sitemap_messages(db_session, channels)
+        if not 1 <= shard <= shard_count(total):
+            return None
+        return iter_urlset(base_url, channels, shard)
 
-        response = make_response(sitemap_xml)
-        response.headers["Content-Type"] = "application/xml"
-        return response
+    return _sitemap_response(str(shard), build)
 
 
 @feeds_bp.route("/feed.xml")
@@ -223,92 +284,73 @@ def rss_feed(channel: Optional[str] = None) -> ResponseReturnValue:
             return handle_error("403", "Access Denied", "This channel is not public")
         site_title += f" - {config.get_display_name()}"
 
+    channels = [channel] if channel else sitemap_channels(current_domain)
+    feed_link = request.url
+    key = (current_domain, channel or "", feed_link)
+
     with db.session() as db_session:
-        # Get recent public messages, optionally filtered by channel
-        query = db_session.query(Email).order_by(Email.created_at.desc())
-
-        if channel:
-            query = query.filter(Email.channel == channel)
-
-        messages = query.limit(20).all()
-
-        # Filter for public messages that are allowed on this domain
-        public_messages = []
-        for message in messages:
-            config = channel_manager.get_channel_config(message.channel)
-            if (
-                config
-                and config.access_level == AccessLevel.PUBLIC
-                and domain_manager.is_channel_allowed(current_domain, message.channel)
-            ):
-                public_messages.append(message)
-
-        # Process each message for RSS
-        items = []
-        for message in public_messages:
-            # Use preview_content if available, otherwise use processed_content
-            content_to_clean = (
-                message.preview_content if message.preview_content else message.processed_content
-            )
-            content = clean_html_for_rss(content_to_clean)
-
-            # Add author info if available
-            author = ""
-            if message.author:
-                author = message.author.name
-
-            items.append(
-                {
-                    "title": html.escape(message.subject or "(No Subject)"),
-                    "link": f"{base_url}/messages/{message.id}",
-                    "guid": f"{base_url}/messages/{message.id}",
-                    "pubDate": message.created_at.strftime("%a, %d %b %Y %H:%M:%S +0000"),
-                    "description": content,
-                    "author": html.escape(author) if author else None,
-                    "category": html.escape(message.channel),
-                }
+        fingerprint, last_modified = get_feed_state(db_session, channels)
+        etag = compute_feed_etag(key, fingerprint)
+
+        matched = match_conditional(etag, last_modified)
+        if matched is not None:
+            return set_feed_validators(make_response("", 304), matched, last_modified)
+
+        rss_xml = get_cached_feed(key, fingerprint)
+        if rss_xml is None:
+            messages = (
+                db_session.query(Email)
+                .options(
+                    load_only(
+                        Email.id,
+                        Email.subject,
+                        Email.channel,
+                        Email.created_at,
+                        Email.preview_content,
+                        Email.processed_content,
+                        Email.rss_content,
+                    ),
+                    selectinload(Email.author),
+                    noload(Email.quotes),
+                )
+                .filter(Email.channel.in_(channels))
+                .order_by(Email.created_at.desc())
+                .limit(FEED_SIZE)
+                .all()
             )
 
-        # Prepare and render the RSS feed
-        feed_description = f"Recent messages from {site_title}"
-        if channel:
-            feed_description += f" in the {channel} channel"
+            items = []
+            for message in messages:
+                author = message.author.name if message.author else ""
+                items.append(
+                    {
+                        "title": html.escape(message.subject or "(No Subject)"),
+                        "link": f"{base_url}/messages/{message.id}",
+                        "guid": f"{base_url}/messages/{message.id}",
+                        "pubDate": message.created_at.strftime("%a, %d %b %Y %H:%M:%S +0000"),
+                        "description": rss_item_content(db_session, message),
+                        "author": html.escape(author) if author else None,
+                        "category": html.escape(message.channel),
+                    }
+                )
+
+            feed_description = f"Recent messages from {site_title}"
+            if channel:
+                feed_description += f" in the {channel} channel"
+
+            # lastBuildDate follows the content, so a cached copy stays byte-identical
+            build_date = last_modified or datetime.utcnow()
+            rss_xml = render_template_string(
+                RSS_TEMPLATE,
+                title=site_title,
+                link=f"{base_url}{'/stream/channel/' + channel if channel else ''}",
+                description=feed_description,
+                build_date=build_date.strftime("%a, %d %b %Y %H:%M:%S +0000"),
+                feed_link=feed_link,
+                items=items,
+            )
+            store_feed(key, fingerprint, rss_xml)
 
-        rss_xml = render_template_string(
-            """<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:content="http://purl.org/rss/1.0/modules/content/">
-    <channel>
-        <title>{{ title }}</title>
-        <link>{{ link }}</link>
-        <description>{{ description }}</description>
-        <language>en-us</language>
-        <lastBuildDate>{{ build_date }}</lastBuildDate>
-        <atom:link href="{{ feed_link }}" rel="self" type="application/rss+xml" />
-        
-        {%- for item in items %}
-        <item>
-            <title>{{ item.title }}</title>
-            <link>{{ item.link }}</link>
-            <guid isPermaLink="true">{{ item.guid }}</guid>
-            <pubDate>{{ item.pubDate }}</pubDate>
-            <description>{{ item.description | safe }}</description>
-            <content:encoded><![CDATA[{{ item.description | safe }}]]></content:encoded>
-            <category>{{ item.category }}</category>
-            {%- if item.author %}
-            <author>{{ item.author }}</author>
-            {%- endif %}
-        </item>
-        {%- endfor %}
-    </channel>
-</rss>""",
-            title=site_title,
-            link=f"{base_url}{'/stream/channel/' + channel if channel else ''}",
-            description=feed_description,
-            build_date=datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S +0000"),
-            feed_link=request.url,
-            items=items,
-        )
-
-        response = make_response(rss_xml)
-        response.headers["Content-Type"] = "application/rss+xml"
-        return response
+    response = make_response(rss_xml)
+    response.headers["Content-Type"] = "application/rss+xml"
+    return set_feed_validators(response, etag, last_modified)
@@ -27,9 +27,11 @@ def list_quotes() -> ResponseReturnValue:
     with db.session() as db_session:
         quote_type = request.args.get("type")
         search_term = request.args.get("search")
+        page = request.args.get("page", 1, type=int)
+        has_more = False
 
         if search_term:
-            quotes = search_quotes(db_session, search_term, quote_type)
+            quotes, has_more = search_quotes(db_session, search_term, quote_type, page=page)
         else:
             quotes = get_quotes_by_type(db_session, quote_type)
 
@@ -39,6 +41,8 @@ def list_quotes() -> ResponseReturnValue:
             quote_types=QUOTE_TYPES,
             current_type=quote_type,
             search_term=search_term,
+            page=page,
+            has_more=has_more,
         )
 
 
@@ -0,0 +1,262 @@
+"""Streaming, sharded sitemap generation with a per-domain shard cache.
+
+URLs are the domain's home page, its public channel streams and every message
+in those channels, in that order, sliced into shards of SITEMAP_MAX_URLS.
+Messages are ordered by id so new posts only ever change the last shard. When
+everything fits in one shard, /sitemap.xml is that shard; otherwise it is a
+sitemap index pointing at /sitemap-<n>.xml.
+
+Rendered documents are cached per domain and canonical base URL for the
+current day, in an LRU of at most SITEMAP_CACHE_SIZE documents. When a
+transaction that inserts or deletes an email, or moves it between channels,
+commits, the cached documents of every domain whose sitemap covers an affected
+channel are dropped.
+"""
+
+import math
+from datetime import datetime
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session, object_session
+
+from common.cache import LRUCache
+from common.config.channel_config import AccessLevel, get_channel_manager
+from common.config.domain_config import get_domain_manager
+from models.database import db
+from models.models import Email
+
+# The sitemaps.org protocol limit on URLs per sitemap file.
+SITEMAP_MAX_URLS = 50000
+
+# Rows fetched per round trip while streaming a shard.
+SITEMAP_FETCH_SIZE = 1000
+
+# Rendered documents kept in memory.
+SITEMAP_CACHE_SIZE = 256
+
+# Session.info key collecting channels changed by the current transaction.
+_PENDING_CHANNELS = "sitemap_changed_channels"
+
+URLSET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_CLOSE = "</urlset>\n"
+INDEX_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+INDEX_CLOSE = "</sitemapindex>\n"
+
+
+def sitemap_channels(domain: str) -> List[str]:
+    """
+    List the public channels allowed on a domain, in configuration order.
+
+    :param domain: Domain key
+    :return: Channel names whose messages belong in the domain's sitemap
+    """
+    domain_manager = get_domain_manager()
+    return [
+        name
+        for name, config in get_channel_manager().channels.items()
+        if config.access_level == AccessLevel.PUBLIC
+        and domain_manager.is_channel_allowed(domain, name)
+    ]
+
+
+def sitemap_base_url(domain: str, request_base_url: str) -> str:
+    """
+    Canonical scheme and host for a domain's sitemap URLs.
+
+    :param domain: Domain key
+    :param request_base_url: Base URL of the current request, without trailing slash
+    :return: The domain's first configured hostname, or request_base_url if it has none
+    """
+    config = get_domain_manager().get_domain_config(domain)
+    if not config.domains:
+        return request_base_url
+    scheme = "https" if config.https_enabled else urlsplit(request_base_url).scheme or "http"
+    return f"{scheme}://{config.domains[0]}"
+
+
+def _url_entry(loc: str, lastmod: str) -> str:
+    return f"  <url>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </url>\n"
+
+
+def _static_urls(base_url: str, channels: List[str], today: str) -> List[str]:
+    urls = [_url_entry(f"{base_url}/", today)]
+    urls.extend(_url_entry(f"{base_url}/stream/channel/{name}", today) for name in channels)
+    return urls
+
+
+def count_sitemap_messages(db_session, channels: List[str]) -> int:
+    """
+    Count the messages listed in a sitemap.
+
+    :param db_session: Database session
+    :param channels: Channels covered by the sitemap
+    :return: Number of emails in those channels
+    """
+    if not channels:
+        return 0
+    return db_session.query(func.count(Email.id)).filter(Email.channel.in_(channels)).scalar() or 0
+
+
+def shard_count(total_urls: int) -> int:
+    """Number of sitemap files needed for total_urls URLs (at least one)."""
+    return max(1, math.ceil(total_urls / SITEMAP_MAX_URLS))
+
+
+def iter_urlset(
+    base_url: str, channels: List[str], shard: int, today: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Stream one sitemap shard as XML fragments.
+
+    Only (id, created_at) are selected, channel filtering happens in SQL, and
+    rows are fetched in batches of SITEMAP_FETCH_SIZE, so memory stays flat
+    regardless of shard size.
+
+    :param base_url: Scheme and host prefix for every <loc>
+    :param channels: Channels covered by the sitemap
+    :param shard: 1-based shard number
+    :param today: lastmod for the static pages (default: today, UTC)
+    :return: Iterator of XML text chunks
+    """
+    today = today or datetime.utcnow().strftime("%Y-%m-%d")
+    static_urls = _static_urls(base_url, channels, today)
+
+    # Position of this shard in the sequence static URLs + messages
+    start = (shard - 1) * SITEMAP_MAX_URLS
+    end = start + SITEMAP_MAX_URLS
+
+    yield URLSET_OPEN
+    yield from static_urls[start:end]
+
+    message_offset = max(0, start - len(static_urls))
+    message_limit = end - max(start, len(static_urls))
+    if channels and message_limit > 0:
+        with db.session() as db_session:
+            rows = (
+                db_session.query(Email.id, Email.created_at)
+                .filter(Email.channel.in_(channels))
+                .order_by(Email.id)
+                .offset(message_offset)
+                .limit(message_limit)
+                .execution_options(yield_per=SITEMAP_FETCH_SIZE)
+            )
+            for message_id, created_at in rows:
+                yield _url_entry(
+                    f"{base_url}/messages/{message_id}", created_at.strftime("%Y-%m-%d")
+                )
+    yield URLSET_CLOSE
+
+
+def iter_sitemap_index(base_url: str, shards: int, today: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream a sitemap index referencing shards 1..shards.
+
+    :param base_url: Scheme and host prefix
+    :param shards: Number of shards
+    :param today: lastmod for every shard (default: today, UTC)
+    :return: Iterator of XML text chunks
+    """
+    today = today or datetime.utcnow().strftime("%Y-%m-%d")
+    yield INDEX_OPEN
+    for shard in range(1, shards + 1):
+        yield (
+            f"  <sitemap>\n    <loc>{escape(f'{base_url}/sitemap-{shard}.xml')}</loc>\n"
+            f"    <lastmod>{today}</lastmod>\n  </sitemap>\n"
+        )
+    yield INDEX_CLOSE
+
+
+# (domain, base_url, document name)
+SitemapKey = Tuple[str, str, str]
+
+# (day rendered, channels covered, document)
+SitemapEntry = Tuple[str, FrozenSet[str], str]
+
+
+sitemap_cache = LRUCache(maxsize=SITEMAP_CACHE_SIZE)
+
+
+def get_cached_sitemap(key: SitemapKey, day: str) -> Optional[str]:
+    """
+    :param key: Cache key (domain, base_url, document name)
+    :param day: Current day; documents rendered on another day are stale
+    :return: Cached document, or None
+    """
+    entry = sitemap_cache.get(key)
+    if entry is None or entry[0] != day:
+        return None
+    return entry[2]
+
+
+def invalidate_sitemaps(channels: Iterable[str]) -> None:
+    """Drop every document whose sitemap covers any of the given channels."""
+    changed = set(channels)
+    sitemap_cache.invalidate(lambda key, entry: bool(entry[1] & changed))
+
+
+def cached_stream(
+    key: SitemapKey, day: str, channels: List[str], chunks: Iterator[str]
+) -> Iterator[str]:
+    """
+    Pass chunks through while recording them; store the document once complete.
+
+    A client that disconnects mid-stream leaves nothing half-written in the cache.
+
+    :param key: Cache key (domain, base_url, document name)
+    :param day: Day the document was rendered
+    :param channels: Channels the document covers, for invalidation
+    :param chunks: XML chunks being streamed
+    :return: The same chunks
+    """
+    generation = sitemap_cache.generation
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    entry: SitemapEntry = (day, frozenset(channels), "".join(parts))
+    sitemap_cache.put(key, entry, generation)
+
+
+def _channels_changed(target: Email, channels: Iterable[str]) -> None:
+    """Remember changed channels until the transaction commits."""
+    session = object_session(target)
+    if session is None:
+        invalidate_sitemaps(channels)
+        return
+    session.info.setdefault(_PENDING_CHANNELS, set()).update(channels)
+
+
+@event.listens_for(Email, "after_insert")
+@event.listens_for(Email, "after_delete")
+def _invalidate_on_insert_or_delete(mapper, connection, target):
+    _channels_changed(target, [target.channel])
+
+
+@event.listens_for(Email, "after_update")
+def _invalidate_on_rechannel(mapper, connection, target):
+    history = inspect(target).attrs.channel.history
+    if history.has_changes():
+        _channels_changed(
+            target, [c for c in list(history.added or ()) + list(history.deleted or ()) if c]
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    channels = session.info.pop(_PENDING_CHANNELS, None)
+    if channels:
+        invalidate_sitemaps(channels)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_CHANNELS, None)
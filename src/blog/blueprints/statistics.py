@@ -1,14 +1,22 @@
-"""Channel statistics functionality for viewing metrics about each channel."""
+"""Channel statistics functionality for viewing metrics about each channel.
 
-from typing import Dict, List, Tuple
-from collections import defaultdict
+Statistics for every channel are computed together in three grouped queries
+(per-channel counts and latest date, ranked top authors joined to their names,
+and daily activity) and cached for STATISTICS_TTL seconds. Committing a transaction
+that inserts, deletes or re-channels an email drops the cached snapshot.
+"""
+
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
 from flask import g, render_template
 from flask.typing import ResponseReturnValue
-from sqlalchemy import func, select, desc
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
 
 from atacama.decorators import optional_auth, navigable
+from common.cache import LRUCache
 from common.config.channel_config import get_channel_manager
 from models.database import db
 from common.base.logging_config import get_logger
@@ -18,6 +26,152 @@ from blog.blueprints.shared import statistics_bp
 
 logger = get_logger(__name__)
 
+# Seconds a computed statistics snapshot is served before being recomputed
+STATISTICS_TTL = 300.0
+
+# Most active authors listed per channel
+TOP_AUTHORS = 3
+
+# Session.info key set when the current transaction changes the statistics
+_STATISTICS_CHANGED = "statistics_changed"
+
+
+@dataclass(frozen=True)
+class StatisticsSnapshot:
+    """Per-channel counts, top authors and daily activity at one point in time."""
+
+    # channel -> {"total_count", "week_count", "month_count", "latest_date", "authors"}
+    channels: Dict[str, Dict[str, Any]]
+    # "YYYY-MM-DD" -> messages that day, over the past 30 days
+    activity: Dict[str, int]
+    computed_at: datetime
+
+
+def compute_statistics(db_session, now: Optional[datetime] = None) -> StatisticsSnapshot:
+    """
+    Compute statistics for every channel with a fixed number of queries.
+
+    :param db_session: Database session
+    :param now: Reference time for the week/month windows (default: utcnow)
+    :return: StatisticsSnapshot covering all channels with messages
+    """
+    now = now or datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    month_ago = now - timedelta(days=30)
+
+    channels: Dict[str, Dict[str, Any]] = {}
+    counts = db_session.execute(
+        select(
+            Email.channel,
+            func.count(),
+            func.sum(case((Email.created_at >= week_ago, 1), else_=0)),
+            func.sum(case((Email.created_at >= month_ago, 1), else_=0)),
+            func.max(Email.created_at),
+        ).group_by(Email.channel)
+    ).all()
+    for channel, total, week, month, latest in counts:
+        channels[channel] = {
+            "total_count": total or 0,
+            "week_count": week or 0,
+            "month_count": month or 0,
+            "latest_date": latest,
+            "authors": [],
+        }
+
+    # Rank authors within each channel, then join only the top few to users
+    author_counts = (
+        select(Email.channel, Email.author_id, func.count().label("count"))
+        .where(Email.author_id.isnot(None))
+        .group_by(Email.channel, Email.author_id)
+        .subquery()
+    )
+    ranked = select(
+        author_counts,
+        func.row_number()
+        .over(
+            partition_by=author_counts.c.channel,
+            order_by=(author_counts.c.count.desc(), author_counts.c.author_id),
+        )
+        .label("rank"),
+    ).subquery()
+    top_authors = db_session.execute(
+        select(ranked.c.channel, ranked.c.count, User.name, User.email)
+        .join(User, User.id == ranked.c.author_id)
+        .where(ranked.c.rank <= TOP_AUTHORS)
+        .order_by(ranked.c.channel, ranked.c.rank)
+    ).all()
+    for channel, count, name, email in top_authors:
+        if channel in channels:
+            channels[channel]["authors"].append({"name": name, "email": email, "count": count})
+
+    activity = db_session.execute(
+        select(func.date(Email.created_at).label("date"), func.count().label("count"))
+        .where(Email.created_at >= month_ago)
+        .group_by("date")
+        .order_by("date")
+    ).all()
+
+    return StatisticsSnapshot(
+        channels=channels,
+        activity={str(date): count for date, count in activity},
+        computed_at=now,
+    )
+
+
+# Holds one snapshot, under _SNAPSHOT
+statistics_cache = LRUCache(maxsize=1, ttl=STATISTICS_TTL)
+_SNAPSHOT = "all"
+
+
+def get_statistics() -> StatisticsSnapshot:
+    """
+    Return the cached statistics snapshot, computing it if missing or expired.
+
+    :return: StatisticsSnapshot
+    """
+    snapshot = statistics_cache.get(_SNAPSHOT)
+    if snapshot is not None:
+        return snapshot
+
+    generation = statistics_cache.generation
+    with db.session() as db_session:
+        snapshot = compute_statistics(db_session)
+    statistics_cache.put(_SNAPSHOT, snapshot, generation)
+    return snapshot
+
+
+def _statistics_changed(target: Email) -> None:
+    """Remember that statistics changed until the transaction commits."""
+    session = object_session(target)
+    if session is None:
+        statistics_cache.invalidate()
+        return
+    session.info[_STATISTICS_CHANGED] = True
+
+
+@event.listens_for(Email, "after_insert")
+@event.listens_for(Email, "after_delete")
+def _invalidate_on_insert_or_delete(mapper, connection, target):
+    _statistics_changed(target)
+
+
+@event.listens_for(Email, "after_update")
+def _invalidate_on_move(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.channel.history.has_changes() or state.attrs.author_id.history.has_changes():
+        _statistics_changed(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_STATISTICS_CHANGED, False):
+        statistics_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_STATISTICS_CHANGED, None)
+
 
 @statistics_bp.route("/stats")
 @optional_auth
@@ -28,115 +182,37 @@ def channel_statistics() -> ResponseReturnValue:
 
     # Get channel manager for config information
     channel_manager = get_channel_manager()
+    snapshot = get_statistics()
+
+    channel_stats: List[Dict[str, Any]] = []
+    for channel in allowed_channels:
+        # Get channel configuration
+        config = channel_manager.get_channel_config(channel)
+        if not config:
+            continue
+
+        stats = snapshot.channels.get(channel, {})
+        channel_stats.append(
+            {
+                "name": channel,
+                "display_name": config.get_display_name(),
+                "description": config.description,
+                "access_level": config.access_level.value,
+                "group": config.group,
+                "total_count": stats.get("total_count", 0),
+                "week_count": stats.get("week_count", 0),
+                "month_count": stats.get("month_count", 0),
+                "authors": stats.get("authors", []),
+                "latest_date": stats.get("latest_date"),
+            }
+        )
 
-    channel_stats = []
-    current_time = datetime.utcnow()
+    # Sort channels by total count
+    channel_stats.sort(key=lambda x: x["total_count"], reverse=True)
 
-    with db.session() as db_session:
-        for channel in allowed_channels:
-            # Get channel configuration
-            config = channel_manager.get_channel_config(channel)
-            if not config:
-                continue
-
-            # Get basic channel stats
-            total_count = (
-                db_session.execute(
-                    select(func.count()).select_from(Email).where(Email.channel == channel)
-                ).scalar()
-                or 0
-            )
-
-            # Get count from past week
-            week_ago = current_time - timedelta(days=7)
-            week_count = (
-                db_session.execute(
-                    select(func.count())
-                    .select_from(Email)
-                    .where(Email.channel == channel)
-                    .where(Email.created_at >= week_ago)
-                ).scalar()
-                or 0
-            )
-
-            # Get count from past month
-            month_ago = current_time - timedelta(days=30)
-            month_count = (
-                db_session.execute(
-                    select(func.count())
-                    .select_from(Email)
-                    .where(Email.channel == channel)
-                    .where(Email.created_at >= month_ago)
-                ).scalar()
-                or 0
-            )
-
-            # Get most active authors
-            top_authors = db_session.execute(
-                select(Email.author_id, func.count().label("count"))
-                .where(Email.channel == channel)
-                .where(Email.author_id != None)
-                .group_by(Email.author_id)
-                .order_by(desc("count"))
-                .limit(3)
-            ).all()
-
-            # Get author details
-            author_details = []
-            for author_id, count in top_authors:
-                author = db_session.execute(
-                    select(User).where(User.id == author_id)
-                ).scalar_one_or_none()
-                if author:
-                    author_details.append(
-                        {"name": author.name, "email": author.email, "count": count}
-                    )
-
-            # Get most recent message
-            latest_message = db_session.execute(
-                select(Email)
-                .where(Email.channel == channel)
-                .order_by(desc(Email.created_at))
-                .limit(1)
-            ).scalar_one_or_none()
-
-            latest_date = latest_message.created_at if latest_message else None
-
-            # Compile channel stats
-            channel_stats.append(
-                {
-                    "name": channel,
-                    "display_name": config.get_display_name(),
-                    "description": config.description,
-                    "access_level": config.access_level.value,
-                    "group": config.group,
-                    "total_count": total_count,
-                    "week_count": week_count,
-                    "month_count": month_count,
-                    "authors": author_details,
-                    "latest_date": latest_date,
-                }
-            )
-
-        # Get weekly activity data
-        date_counts = defaultdict(int)
-        past_30days = current_time - timedelta(days=30)
-        activity_data = db_session.execute(
-            select(func.date(Email.created_at).label("date"), func.count().label("count"))
-            .where(Email.created_at >= past_30days)
-            .group_by("date")
-            .order_by("date")
-        ).all()
-
-        for date, count in activity_data:
-            date_counts[str(date)] = count
-
-        # Sort channels by total count (total_count is always int from scalar() or 0)
-        channel_stats.sort(key=lambda x: x["total_count"] or 0, reverse=True)  # type: ignore[return-value]
-
-        return render_template(
-            "admin/channel_statistics.html",
-            channel_stats=channel_stats,
-            activity_data=dict(date_counts),
-            channel_manager=channel_manager,
-        )
+    return render_template(
+        "admin/channel_statistics.html",
+        channel_stats=channel_stats,
+        activity_data=dict(snapshot.activity),
+        channel_manager=channel_manager,
+    )
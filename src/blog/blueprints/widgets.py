@@ -1,14 +1,54 @@
-from flask import render_template, abort, flash, redirect, url_for, g, request, jsonify
+from flask import (
+    render_template,
+    abort,
+    flash,
+    redirect,
+    url_for,
+    g,
+    request,
+    jsonify,
+    send_file,
+    current_app,
+)
 from flask.typing import ResponseReturnValue
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 import hashlib
-import threading
-import time
-import uuid
+from sqlalchemy.orm import defer
 from models.database import db
 from models.models import ReactWidget, WidgetVersion
 from models.messages import check_channel_access
+from blog.build_service import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    SUCCEEDED,
+    build_version_task,
+    build_widget_task,
+    get_build_service,
+)
+from blog.widget_jobs import (
+    COMPLETED,
+    ERROR,
+    JobQueueFullError,
+    create_job,
+    get_job,
+    get_widget_job_executor,
+    list_recent_jobs,
+)
+from blog.widget_listing import (
+    MAX_WIDGET_PAGE_SIZE,
+    WIDGET_PAGE_SIZE,
+    count_widgets,
+    get_widget_page,
+    widget_summary,
+)
+from blog.widget_assets import (
+    ASSET_MAX_AGE,
+    BUNDLE_HASH_PATTERN,
+    ENCODINGS,
+    get_widget_asset_store,
+    get_widget_data_store,
+)
 from atacama.decorators import navigable, optional_auth, require_admin
 from common.base.logging_config import get_logger
 from common.config.channel_config import get_channel_manager
@@ -18,15 +58,13 @@ from common.llm.widget_initiator import widget_initiator
 from common.llm.widget_schemas import DUAL_FILE_WIDGET_SCHEMA
 from common.llm.types import Schema
 from react_compiler.lib import sanitize_widget_title_for_component_name
+from react_compiler.widget_data import WIDGET_DATA_GLOBAL, reads_external_data, widget_data_json
 
 from models.messages import get_user_allowed_channels
 from blog.blueprints.shared import widgets_bp
 
 logger = get_logger(__name__)
 
-# Global storage for improvement jobs
-improvement_jobs: Dict[str, Dict[str, Any]] = {}
-
 # OpenAI API Schema Requirements:
 # - All schema properties must be properly typed using Schema and SchemaProperty from common.llm.types
 # - Missing parameters should be removed from schema definitions (not marked as optional with None defaults)
@@ -77,12 +115,76 @@ def generate_widget_content_hash(code: str, data_file: Optional[str] = None) ->
     return hashlib.md5(composite_content.encode("utf-8")).hexdigest()
 
 
+def submit_widget_build(widget: ReactWidget, priority: int = PRIORITY_INTERACTIVE):
+    """
+    Queue a rebuild of a widget's current code.
+
+    :param widget: Persisted (committed) widget
+    :param priority: Build service priority
+    :return: The BuildJob
+    """
+    return get_build_service().submit(
+        f"widget:{widget.id}",
+        build_widget_task(widget.id),
+        user_id=g.user.id if g.get("user") else None,
+        priority=priority,
+        description=f"Build widget {widget.slug}",
+    )
+
+
+def submit_version_build(
+    version: WidgetVersion,
+    slug: str,
+    activate: bool = False,
+    user_id=None,
+    priority: int = PRIORITY_INTERACTIVE,
+):
+    """
+    Queue a build of a widget version.
+
+    :param version: Persisted (committed) version
+    :param slug: Widget slug, for the job description
+    :param activate: Make the version active if it builds
+    :param user_id: Submitting user (default: the current user)
+    :param priority: Build service priority
+    :return: The BuildJob
+    """
+    if user_id is None and g.get("user"):
+        user_id = g.user.id
+    return get_build_service().submit(
+        f"version:{version.id}:{int(activate)}",
+        build_version_task(version.id, activate=activate),
+        user_id=user_id,
+        priority=priority,
+        description=f"Build {slug} version {version.version_number}",
+    )
+
+
+def build_job_response(job) -> Dict[str, Any]:
+    """
+    JSON body describing a build job, with the URL to poll.
+
+    :param job: BuildJob
+    :return: Response dictionary
+    """
+    response = job.to_dict()
+    response["status_url"] = url_for("widgets.build_status", job_id=job.id)
+    return response
+
+
 @widgets_bp.route("/widget/<string:slug>")
 @optional_auth
 def view_widget(slug: str) -> ResponseReturnValue:
     """Display a React widget by slug."""
     with db.session() as session:
-        widget = session.query(ReactWidget).filter_by(slug=slug).first()
+        # The page links the bundle (and JSON data) by hash; only unhashed legacy rows
+        # load the bundle inline
+        widget = (
+            session.query(ReactWidget)
+            .options(defer(ReactWidget.compiled_code), defer(ReactWidget.data_file))
+            .filter_by(slug=slug)
+            .first()
+        )
 
         if not widget:
             abort(404)
@@ -116,7 +218,125 @@ def view_widget(slug: str) -> ResponseReturnValue:
             widget=widget,
             channel_config=channel_config,
             sanitized_component_name=sanitize_widget_title_for_component_name(widget.title),
+            widget_data_global=WIDGET_DATA_GLOBAL,
+        )
+
+
+def abort_unless_visible(widget: ReactWidget) -> None:
+    """
+    Answer 404 for a widget asset the current user could not see on the widget page.
+
+    :param widget: Widget the asset belongs to
+    """
+    if widget.requires_auth and not g.user:
+        abort(404)
+    if not get_domain_manager().is_channel_allowed(g.current_domain, widget.channel):
+        abort(404)
+    if not check_channel_access(widget.channel, user=g.user, ignore_preferences=True):
+        abort(404)
+
+
+@widgets_bp.route("/widgets/assets/<string:bundle_hash>.js")
+@optional_auth
+def widget_asset(bundle_hash: str) -> ResponseReturnValue:
+    """Serve a compiled widget bundle as an immutable asset named by its hash."""
+    if not BUNDLE_HASH_PATTERN.match(bundle_hash):
+        abort(404)
+
+    with db.session() as session:
+        widget = (
+            session.query(ReactWidget)
+            .options(defer(ReactWidget.compiled_code))
+            .filter_by(bundle_hash=bundle_hash)
+            .first()
+        )
+        if not widget:
+            abort(404)
+
+        abort_unless_visible(widget)
+        shared = not widget.requires_auth
+
+        store = get_widget_asset_store()
+        if not store.has(bundle_hash):
+            store.put(bundle_hash, widget.compiled_code)
+
+    accepted = tuple(encoding for encoding in ENCODINGS if request.accept_encodings[encoding])
+    path, encoding = store.select(bundle_hash, accepted)
+    # Each encoding is a different byte sequence, so it gets its own validator
+    etag = f"{bundle_hash}.{encoding}" if encoding else bundle_hash
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = send_file(
+            path, mimetype="text/javascript", conditional=False, etag=False, max_age=ASSET_MAX_AGE
+        )
+        if encoding:
+            response.content_encoding = encoding
+
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.max_age = ASSET_MAX_AGE
+    response.cache_control.immutable = True
+    if shared:
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    return response
+
+
+@widgets_bp.route("/widgets/data/<string:data_hash>.json")
+@optional_auth
+def widget_data(data_hash: str) -> ResponseReturnValue:
+    """
+    Serve a widget's data file as JSON named by its hash.
+
+    Like bundles, data URLs change whenever the data does and are cached as
+    immutable. Range and conditional requests are answered from the stored file.
+    """
+    if not BUNDLE_HASH_PATTERN.match(data_hash):
+        abort(404)
+
+    with db.session() as session:
+        widget = (
+            session.query(ReactWidget)
+            .options(
+                defer(ReactWidget.code),
+                defer(ReactWidget.compiled_code),
+                defer(ReactWidget.data_file),
+            )
+            .filter_by(data_hash=data_hash)
+            .first()
         )
+        if not widget:
+            abort(404)
+
+        abort_unless_visible(widget)
+        shared = not widget.requires_auth
+
+        store = get_widget_data_store()
+        if not store.has(data_hash):
+            store.put(data_hash, widget.data_json)
+
+    accepted = tuple(encoding for encoding in ENCODINGS if request.accept_encodings[encoding])
+    path, encoding = store.select(data_hash, accepted)
+    # Each encoding is a different byte sequence, so it gets its own validator
+    etag = f"{data_hash}.{encoding}" if encoding else data_hash
+    response = send_file(
+        path,
+        mimetype="application/json",
+        conditional=True,
+        etag=etag,
+        max_age=ASSET_MAX_AGE,
+    )
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.immutable = True
+    if shared:
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    return response
 
 
 @widgets_bp.route("/widget/<string:slug>/edit", methods=["GET", "POST"])
@@ -174,15 +394,21 @@ def edit_widget(slug: str) -> ResponseReturnValue:
 
                 session.add(version)
                 session.flush()  # To get the ID
-
-                # Build the version
-                build_success = version.build()
-                logger.info(
-                    f"Created version {version_number} for widget {slug}, build success: {build_success}"
-                )
+                logger.info(f"Created version {version_number} for widget {slug}")
+
+            # A bundle that reads its data at runtime takes new JSON data without a rebuild,
+            # but it registers its component under a name derived from the title
+            new_title = request.form.get("title", widget.title)
+            data_only = (
+                new_code == widget.code
+                and new_title == widget.title
+                and widget.data_hash is not None
+                and reads_external_data(widget.compiled_code)
+                and widget_data_json(new_data_file) is not None
+            )
 
             # Update widget properties
-            widget.title = request.form.get("title", widget.title)
+            widget.title = new_title
             widget.description = request.form.get("description", widget.description)
             widget.code = new_code
             widget.data_file = new_data_file
@@ -190,18 +416,19 @@ def edit_widget(slug: str) -> ResponseReturnValue:
 
             session.commit()
 
-            # Auto-build the widget after saving
-            try:
-                build_success = widget.build()
-                session.commit()
-
-                if build_success:
-                    flash("Widget updated and built successfully!", "success")
-                else:
-                    flash("Widget updated, but build failed. Check server logs.", "warning")
-            except Exception as e:
-                logger.error(f"Widget build error during save: {str(e)}")
-                flash("Widget updated, but build encountered an error.", "warning")
+            # Build the new version and the widget after saving
+            if not existing_version:
+                submit_version_build(version, slug)
+            if data_only:
+                flash("Widget data updated; no rebuild was needed.", "success")
+                return redirect(url_for("widgets.view_widget", slug=slug))
+            job = submit_widget_build(widget)
+            if job.status == SUCCEEDED:
+                flash("Widget updated and built successfully!", "success")
+            elif job.finished:
+                flash("Widget updated, but build failed. Check server logs.", "warning")
+            else:
+                flash("Widget updated; the build has been queued.", "info")
 
             return redirect(url_for("widgets.view_widget", slug=slug))
 
@@ -210,23 +437,65 @@ def edit_widget(slug: str) -> ResponseReturnValue:
         )
 
 
+def listing_channels() -> Optional[List[str]]:
+    """
+    :return: Channels the current user may list widgets from (None for all channels)
+    """
+    if g.user and g.user.admin_channel_access is not None:
+        return None
+    return get_user_allowed_channels(user=g.user, ignore_preferences=True)
+
+
 @widgets_bp.route("/widgets")
+@widgets_bp.route("/widgets/older/<int:older_than_id>")
 @navigable("React Widgets", description="View and manage React widgets", category="main")
 @optional_auth
-def list_widgets() -> ResponseReturnValue:
-    """List all accessible React widgets."""
-    allowed_channels = get_user_allowed_channels(user=g.user, ignore_preferences=True)
+def list_widgets(older_than_id: Optional[int] = None) -> ResponseReturnValue:
+    """
+    List accessible React widgets, one page at a time.
 
+    :param older_than_id: Start the page after this widget
+    """
     with db.session() as session:
-        query = session.query(ReactWidget).filter(ReactWidget.published == True)
+        widgets, has_more = get_widget_page(
+            session, listing_channels(), older_than_id=older_than_id
+        )
+        return render_template(
+            "widgets/list.html",
+            widgets=widgets,
+            has_more=has_more,
+            older_than_id=widgets[-1].id if has_more else None,
+        )
+
 
-        # Filter by allowed channels
-        if not g.user or g.user.admin_channel_access is None:
-            query = query.filter(ReactWidget.channel.in_(allowed_channels))
+@widgets_bp.route("/api/widgets", methods=["GET"])
+@optional_auth
+def list_widgets_api() -> ResponseReturnValue:
+    """
+    List accessible React widgets as JSON, newest first.
 
-        widgets = query.order_by(ReactWidget.created_at.desc()).all()
+    Query parameters: ``older_than`` (widget ID cursor from ``next_older_than``)
+    and ``limit`` (at most MAX_WIDGET_PAGE_SIZE).
 
-        return render_template("widgets/list.html", widgets=widgets)
+    :return: JSON with the page of widgets, the next cursor and the total count
+    """
+    older_than_id = request.args.get("older_than", type=int)
+    limit = request.args.get("limit", WIDGET_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_WIDGET_PAGE_SIZE))
+    channels = listing_channels()
+
+    with db.session() as session:
+        widgets, has_more = get_widget_page(
+            session, channels, older_than_id=older_than_id, limit=limit
+        )
+        return jsonify(
+            {
+                "widgets": [widget_summary(widget) for widget in widgets],
+                "has_more": has_more,
+                "next_older_than": widgets[-1].id if has_more else None,
+                "total": count_widgets(session, channels),
+            }
+        )
 
 
 @widgets_bp.route("/widget/new", methods=["GET", "POST"])
@@ -280,15 +549,16 @@ def create_widget() -> ResponseReturnValue:
                 )
                 session.add(initial_version)
                 session.flush()
-
-                # Build the initial version
-                build_success = initial_version.build()
-                logger.info(
-                    f"Created initial version for widget {slug}, build success: {build_success}"
-                )
+            else:
+                initial_version = None
 
             session.commit()
 
+            # Build the initial version
+            if initial_version is not None:
+                job = submit_version_build(initial_version, slug)
+                logger.info(f"Created initial version for widget {slug}, build {job.status}")
+
             flash("Widget created successfully!", "success")
             return redirect(url_for("widgets.edit_widget", slug=slug))
 
@@ -312,24 +582,24 @@ def build_widget(slug: str) -> ResponseReturnValue:
         ):
             abort(403)
 
-        # Build the widget
-        success = widget.build()
-        session.commit()
+        job = submit_widget_build(widget)
 
-    logger.info(f"Widget {slug} build status: {success}")
-    if success:
-        return (
-            jsonify(
-                {
-                    "status": "success",
-                    "message": "Widget built successfully!",
-                    "redirect": url_for("widgets.view_widget", slug=slug),
-                }
-            ),
-            200,
-        )
-    else:
-        return jsonify({"status": "error", "message": f"Build failed!  Check server logs."}), 400
+    logger.info(f"Widget {slug} build job {job.id}: {job.status}")
+    response = build_job_response(job)
+    response["redirect"] = url_for("widgets.view_widget", slug=slug)
+    if not job.finished:
+        return jsonify(response), 202
+    return jsonify(response), 200 if job.status == SUCCEEDED else 400
+
+
+@widgets_bp.route("/widget/build_status/<string:job_id>", methods=["GET"])
+@require_admin
+def build_status(job_id: str) -> ResponseReturnValue:
+    """Report the status of a widget build job."""
+    job = get_build_service().get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Build job not found"}), 404
+    return jsonify(build_job_response(job))
 
 
 @widgets_bp.route("/widget/<string:slug>/publish", methods=["POST"])
@@ -403,57 +673,41 @@ def improve_widget(slug: str) -> ResponseReturnValue:
         # Extract widget data while in session context
         widget_title = widget.title
 
-        # Generate unique job ID
-        job_id = str(uuid.uuid4())
-
-        # Initialize job status
-        improvement_jobs[job_id] = {
-            "status": "processing",
-            "progress": "Starting AI improvement...",
-            "result": None,
-            "error": None,
-            "started_at": time.time(),
-            "widget_info": {"slug": slug, "title": widget_title},
-        }
-
-        # Start background thread for AI improvement
-        def improve_in_background():
-            try:
-                logger.info(f"Starting background improvement for widget {slug}, job {job_id}")
-                improvement_jobs[job_id]["progress"] = "AI is analyzing and improving code..."
-
-                result = widget_improver.improve_widget(
-                    current_code=base_code,
-                    prompt=prompt,
-                    improvement_type=improvement_type,
-                    widget_title=widget_title,
-                    use_advanced_model=use_advanced_model,
-                    data_file=base_data_file,
-                    target_files=target_files,
-                )
+    job_id = create_job(
+        "improve",
+        author_id=g.user.id,
+        widget_slug=slug,
+        widget_title=widget_title,
+        progress="Starting AI improvement...",
+    )
 
-                improvement_jobs[job_id]["status"] = "completed"
-                improvement_jobs[job_id]["result"] = result
-                improvement_jobs[job_id]["progress"] = "Improvement completed"
-                improvement_jobs[job_id]["finished_at"] = time.time()
-                logger.info(f"Completed background improvement for widget {slug}, job {job_id}")
+    def improve(progress):
+        logger.info(f"Starting background improvement for widget {slug}, job {job_id}")
+        progress("AI is analyzing and improving code...")
 
-            except Exception as e:
-                logger.error(
-                    f"Error in background improvement for widget {slug}, job {job_id}: {str(e)}"
-                )
-                improvement_jobs[job_id]["status"] = "error"
-                improvement_jobs[job_id]["error"] = str(e)
-                improvement_jobs[job_id]["progress"] = "Error occurred during improvement"
-                improvement_jobs[job_id]["finished_at"] = time.time()
+        result = widget_improver.improve_widget(
+            current_code=base_code,
+            prompt=prompt,
+            improvement_type=improvement_type,
+            widget_title=widget_title,
+            use_advanced_model=use_advanced_model,
+            data_file=base_data_file,
+            target_files=target_files,
+        )
 
-        thread = threading.Thread(target=improve_in_background)
-        thread.daemon = True
-        thread.start()
+        progress("Improvement completed")
+        return result
 
-        return jsonify(
-            {"success": True, "job_id": job_id, "message": "Improvement started in background"}
+    try:
+        get_widget_job_executor().submit(
+            job_id, improve, error_progress="Error occurred during improvement"
         )
+    except JobQueueFullError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+
+    return jsonify(
+        {"success": True, "job_id": job_id, "message": "Improvement started in background"}
+    )
 
 
 @widgets_bp.route("/widget/<string:slug>/improve_status/<string:job_id>", methods=["GET"])
@@ -473,29 +727,7 @@ def improve_status(slug: str, job_id: str) -> ResponseReturnValue:
         ):
             abort(403)
 
-        if job_id not in improvement_jobs:
-            return jsonify({"success": False, "error": "Job not found"}), 404
-
-        job = improvement_jobs[job_id]
-
-        # Clean up old completed/errored jobs (older than 24 hours)
-        current_time = time.time()
-        if job["status"] in ["completed", "error"] and current_time - job["started_at"] > 86400:
-            del improvement_jobs[job_id]
-            return jsonify({"success": False, "error": "Job has expired"}), 404
-
-        response = {"success": True, "status": job["status"], "progress": job["progress"]}
-
-        if job["status"] == "completed" and job["result"]:
-            response["result"] = job["result"]
-            # Mark job as accessed but don't delete it yet - let it show in admin jobs page
-            job["accessed_at"] = current_time
-        elif job["status"] == "error":
-            response["error"] = job["error"]
-            # Mark job as accessed but don't delete it yet - let it show in admin jobs page
-            job["accessed_at"] = current_time
-
-        return jsonify(response)
+    return job_status_response(job_id, slug=slug)
 
 
 @widgets_bp.route("/widget/<string:slug>/save_version", methods=["POST"])
@@ -555,27 +787,18 @@ def save_version(slug: str) -> ResponseReturnValue:
         )
 
         session.add(version)
-        session.flush()  # To get the ID
-
-        # Build the version
-        build_success = version.build()
-
-        if set_active and build_success:
-            widget.active_version_id = version.id
-            widget.code = code
-            widget.data_file = data_file
-            widget.compiled_code = version.compiled_code
-            widget.dependencies = version.dependencies
-            widget.last_modified_at = datetime.utcnow()
-
         session.commit()
 
+        # Build the version, activating it once it builds
+        job = submit_version_build(version, slug, activate=set_active)
+
         return jsonify(
             {
                 "success": True,
                 "version_id": version.id,
                 "version_number": version_number,
-                "build_success": build_success,
+                "build_success": job.status == SUCCEEDED,
+                "build": build_job_response(job),
             }
         )
 
@@ -730,148 +953,126 @@ def initiate_widget() -> ResponseReturnValue:
                 word.capitalize() for word in slug.replace("-", " ").replace("_", " ").split()
             )
 
-        # Generate unique job ID
-        job_id = str(uuid.uuid4())
-
-        # Initialize job status
-        improvement_jobs[job_id] = {
-            "status": "processing",
-            "progress": "Starting AI widget generation...",
-            "result": None,
-            "error": None,
-            "started_at": time.time(),
-            "widget_data": {
-                "slug": slug,
-                "title": title,
-                "description": description,
-                "channel": channel,
-                "author_id": g.user.id,
-            },
+        widget_data = {
+            "slug": slug,
+            "title": title,
+            "description": description,
+            "channel": channel,
+            "author_id": g.user.id,
         }
+        job_id = create_job(
+            "initiate",
+            author_id=g.user.id,
+            widget_slug=slug,
+            widget_title=title,
+            progress="Starting AI widget generation...",
+            details=widget_data,
+        )
 
-        # Start background thread for AI generation
-        def initiate_in_background():
-            try:
-                logger.info(f"Starting background widget initiation for slug {slug}, job {job_id}")
-                improvement_jobs[job_id]["progress"] = "AI is generating widget code..."
-
-                # Determine dual_file mode based on schema type
-                dual_file = (
-                    widget_schema == DUAL_FILE_WIDGET_SCHEMA
-                    if isinstance(widget_schema, Schema)
-                    else widget_schema == "dual_file"
-                )
+        def initiate(progress):
+            logger.info(f"Starting background widget initiation for slug {slug}, job {job_id}")
+            progress("AI is generating widget code...")
 
-                # Use AI to generate the widget code
-                result = widget_initiator.create_widget(
-                    slug=slug,
-                    description=description,
-                    widget_title=title,
-                    use_advanced_model=use_advanced_model,
-                    look_and_feel=look_and_feel,
-                    dual_file=dual_file,
-                )
+            # Determine dual_file mode based on schema type
+            dual_file = (
+                widget_schema == DUAL_FILE_WIDGET_SCHEMA
+                if isinstance(widget_schema, Schema)
+                else widget_schema == "dual_file"
+            )
 
-                if not result["success"]:
-                    improvement_jobs[job_id]["status"] = "error"
-                    improvement_jobs[job_id][
-                        "error"
-                    ] = f"Failed to generate widget: {result['error']}"
-                    improvement_jobs[job_id]["progress"] = "Error occurred during widget generation"
-                    improvement_jobs[job_id]["finished_at"] = time.time()
-                    return
+            # Use AI to generate the widget code
+            result = widget_initiator.create_widget(
+                slug=slug,
+                description=description,
+                widget_title=title,
+                use_advanced_model=use_advanced_model,
+                look_and_feel=look_and_feel,
+                dual_file=dual_file,
+            )
 
-                improvement_jobs[job_id]["progress"] = "Creating widget in database..."
+            if not result["success"]:
+                raise RuntimeError(f"Failed to generate widget: {result['error']}")
 
-                # Create the widget in the database
-                with db.session() as session:
-                    try:
-                        # Extract code based on whether it's dual-file or single-file
-                        widget_code_content = ""
-                        data_file_content = None
-
-                        if isinstance(result["widget_code"], dict):
-                            # Dual-file response
-                            widget_code_content = result["widget_code"]["code_file"]["content"]
-                            data_file_content = result["widget_code"]["data_file"]["content"]
-                        else:
-                            # Single-file response
-                            widget_code_content = result["widget_code"]
-
-                        widget = ReactWidget(
-                            slug=slug,
-                            title=title,
-                            code=widget_code_content,
-                            description=description,
-                            channel=channel,
-                            author_id=improvement_jobs[job_id]["widget_data"]["author_id"],
-                            published=False,
-                            data_file=data_file_content,
-                        )
-                        session.add(widget)
-                        session.flush()  # To get widget ID
-
-                        # Create initial version
-                        code_hash = hashlib.md5(widget_code_content.encode("utf-8")).hexdigest()
-                        initial_version = WidgetVersion(
-                            widget_id=widget.id,
-                            version_number=1,
-                            code=widget_code_content,
-                            code_hash=code_hash,
-                            data_file=data_file_content,
-                            improvement_type="ai_generated",
-                            dev_comments="Initial AI-generated widget from description",
-                            ai_model_used="openai",
-                        )
-
-                        session.add(initial_version)
-                        session.flush()
-
-                        improvement_jobs[job_id]["progress"] = "Building widget..."
-
-                        # Build the initial version
-                        build_success = initial_version.build()
-                        logger.info(
-                            f"Created AI-generated widget {slug}, build success: {build_success}"
-                        )
-
-                        session.commit()
-
-                        improvement_jobs[job_id]["status"] = "completed"
-                        improvement_jobs[job_id]["result"] = {
-                            "widget_slug": slug,
-                            "widget_title": title,
-                            "build_success": build_success,
-                            "usage_stats": result["usage_stats"],
-                            "redirect_url": f"/widget/{slug}/edit",
-                        }
-                        improvement_jobs[job_id]["progress"] = "Widget creation completed"
-                        improvement_jobs[job_id]["finished_at"] = time.time()
-                        logger.info(
-                            f"Completed background widget initiation for slug {slug}, job {job_id}"
-                        )
-
-                    except Exception as e:
-                        logger.error(
-                            f"Error creating widget in database for job {job_id}: {str(e)}"
-                        )
-                        improvement_jobs[job_id]["status"] = "error"
-                        improvement_jobs[job_id]["error"] = f"Failed to create widget: {str(e)}"
-                        improvement_jobs[job_id][
-                            "progress"
-                        ] = "Error occurred during database creation"
-                        improvement_jobs[job_id]["finished_at"] = time.time()
+            progress("Creating widget in database...")
 
+            # Create the widget in the database
+            try:
+                with db.session() as session:
+                    # Extract code based on whether it's dual-file or single-file
+                    widget_code_content = ""
+                    data_file_content = None
+
+                    if isinstance(result["widget_code"], dict):
+                        # Dual-file response
+                        widget_code_content = result["widget_code"]["code_file"]["content"]
+                        data_file_content = result["widget_code"]["data_file"]["content"]
+                    else:
+                        # Single-file response
+                        widget_code_content = result["widget_code"]
+
+                    widget = ReactWidget(
+                        slug=slug,
+                        title=title,
+                        code=widget_code_content,
+                        description=description,
+                        channel=channel,
+                        author_id=widget_data["author_id"],
+                        published=False,
+                        data_file=data_file_content,
+                    )
+                    session.add(widget)
+                    session.flush()  # To get widget ID
+
+                    # Create initial version
+                    code_hash = hashlib.md5(widget_code_content.encode("utf-8")).hexdigest()
+                    initial_version = WidgetVersion(
+                        widget_id=widget.id,
+                        version_number=1,
+                        code=widget_code_content,
+                        code_hash=code_hash,
+                        data_file=data_file_content,
+                        improvement_type="ai_generated",
+                        dev_comments="Initial AI-generated widget from description",
+                        ai_model_used="openai",
+                    )
+
+                    session.add(initial_version)
+                    session.commit()
+
+                    progress("Building widget...")
+
+                    # Build the initial version on the build pool
+                    build_service = get_build_service()
+                    build_job = submit_version_build(
+                        initial_version,
+                        slug,
+                        user_id=widget_data["author_id"],
+                        priority=PRIORITY_BACKGROUND,
+                    )
             except Exception as e:
-                logger.error(f"Error in background widget initiation for job {job_id}: {str(e)}")
-                improvement_jobs[job_id]["status"] = "error"
-                improvement_jobs[job_id]["error"] = str(e)
-                improvement_jobs[job_id]["progress"] = "Error occurred during widget generation"
-                improvement_jobs[job_id]["finished_at"] = time.time()
+                logger.error(f"Error creating widget in database for job {job_id}: {str(e)}")
+                raise RuntimeError(f"Failed to create widget: {str(e)}")
+
+            build_job = build_service.wait(build_job.id)
+            build_success = build_job is not None and build_job.status == SUCCEEDED
+            logger.info(f"Created AI-generated widget {slug}, build success: {build_success}")
+
+            progress("Widget creation completed")
+            return {
+                "widget_slug": slug,
+                "widget_title": title,
+                "build_success": build_success,
+                "usage_stats": result["usage_stats"],
+                "redirect_url": f"/widget/{slug}/edit",
+            }
 
-        thread = threading.Thread(target=initiate_in_background)
-        thread.daemon = True
-        thread.start()
+        try:
+            get_widget_job_executor().submit(
+                job_id, initiate, error_progress="Error occurred during widget generation"
+            )
+        except JobQueueFullError as e:
+            flash(str(e), "error")
+            return redirect(url_for("widgets.initiate_widget"))
 
         # Redirect to waiting page instead of returning JSON
         return redirect(url_for("widgets.widget_waiting", job_id=job_id))
@@ -884,50 +1085,46 @@ def initiate_widget() -> ResponseReturnValue:
     )
 
 
-@widgets_bp.route("/widget/initiate_status/<string:job_id>", methods=["GET"])
-@require_admin
-def initiate_status(job_id: str) -> ResponseReturnValue:
-    """Check the status of a widget initiation job."""
-    if job_id not in improvement_jobs:
-        return jsonify({"success": False, "error": "Job not found"}), 404
-
-    job = improvement_jobs[job_id]
+def job_status_response(job_id: str, slug: Optional[str] = None) -> ResponseReturnValue:
+    """
+    JSON status of a widget job, for the improve and initiate pages to poll.
 
-    # Clean up old completed/errored jobs (older than 24 hours)
-    current_time = time.time()
-    if job["status"] in ["completed", "error"] and current_time - job["started_at"] > 86400:
-        del improvement_jobs[job_id]
-        return jsonify({"success": False, "error": "Job has expired"}), 404
+    :param job_id: Job ID
+    :param slug: Widget the job must belong to, if any
+    :return: Response with status and progress, plus result or error once finished
+    """
+    job = get_job(job_id, mark_accessed=True)
+    if job is None or (slug is not None and job["widget_slug"] != slug):
+        return jsonify({"success": False, "error": "Job not found"}), 404
 
     response = {"success": True, "status": job["status"], "progress": job["progress"]}
-
-    if job["status"] == "completed" and job["result"]:
+    if job["status"] == COMPLETED and job["result"]:
         response["result"] = job["result"]
-        # Mark job as accessed but don't delete it yet - let it show in admin jobs page
-        job["accessed_at"] = current_time
-    elif job["status"] == "error":
+    elif job["status"] == ERROR:
         response["error"] = job["error"]
-        # Mark job as accessed but don't delete it yet - let it show in admin jobs page
-        job["accessed_at"] = current_time
-
     return jsonify(response)
 
 
+@widgets_bp.route("/widget/initiate_status/<string:job_id>", methods=["GET"])
+@require_admin
+def initiate_status(job_id: str) -> ResponseReturnValue:
+    """Check the status of a widget initiation job."""
+    return job_status_response(job_id)
+
+
 @widgets_bp.route("/widget/waiting/<string:job_id>")
 @require_admin
 def widget_waiting(job_id: str) -> ResponseReturnValue:
     """Show waiting page for widget creation with available information."""
-    if job_id not in improvement_jobs:
+    job = get_job(job_id)
+    if job is None:
         flash("Widget creation job not found or has expired.", "error")
         return redirect(url_for("widgets.initiate_widget"))
 
-    job = improvement_jobs[job_id]
-    widget_data = job.get("widget_data", {})
-
     return render_template(
         "widgets/waiting.html",
         job_id=job_id,
-        widget_data=widget_data,
+        widget_data=job["details"],
         status=job["status"],
         progress=job["progress"],
     )
@@ -938,72 +1135,25 @@ def widget_waiting(job_id: str) -> ResponseReturnValue:
 @require_admin
 def list_jobs() -> ResponseReturnValue:
     """List all jobs currently underway and recently completed."""
-    current_time = time.time()
-
-    # Clean up very old jobs (older than 24 hours) to prevent memory leaks
-    jobs_to_delete = []
-    for job_id, job_data in improvement_jobs.items():
-        if (
-            job_data["status"] in ["completed", "error"]
-            and current_time - job_data["started_at"] > 86400
-        ):
-            jobs_to_delete.append(job_id)
-
-    for job_id in jobs_to_delete:
-        del improvement_jobs[job_id]
-
-    # Separate running and completed jobs
-    running_jobs = []
-    completed_jobs = []
-
-    for job_id, job_data in improvement_jobs.items():
-        # Calculate duration based on job status
-        if job_data["status"] in ["completed", "error"] and "finished_at" in job_data:
-            duration = job_data["finished_at"] - job_data["started_at"]
-            finished_at = datetime.fromtimestamp(job_data["finished_at"])
-        else:
-            duration = current_time - job_data["started_at"]
-            finished_at = None
-
-        job_info = {
-            "id": job_id,
-            "status": job_data["status"],
-            "progress": job_data["progress"],
-            "started_at": datetime.fromtimestamp(job_data["started_at"]),
-            "finished_at": finished_at,
-            "error": job_data.get("error"),
-            "duration": duration,
+    now = datetime.utcnow()
+    running, finished = list_recent_jobs(finished_limit=10)
+
+    def job_info(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": job["id"],
+            "status": job["status"],
+            "progress": job["progress"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "error": job["error"],
+            "duration": ((job["finished_at"] or now) - job["started_at"]).total_seconds(),
+            "type": "Widget Creation" if job["kind"] == "initiate" else "Widget Improvement",
+            "widget_slug": job["widget_slug"] or "Unknown",
+            "widget_title": job["widget_title"] or "Unknown",
         }
 
-        # Determine job type and add relevant info
-        if "widget_data" in job_data:
-            # This is a widget initiation job
-            job_info["type"] = "Widget Creation"
-            job_info["widget_slug"] = job_data["widget_data"].get("slug", "Unknown")
-            job_info["widget_title"] = job_data["widget_data"].get("title", "Unknown")
-        elif "widget_info" in job_data:
-            # This is a widget improvement job with widget info
-            job_info["type"] = "Widget Improvement"
-            job_info["widget_slug"] = job_data["widget_info"].get("slug", "Unknown")
-            job_info["widget_title"] = job_data["widget_info"].get("title", "Unknown")
-        else:
-            # This is a legacy widget improvement job without widget info
-            job_info["type"] = "Widget Improvement"
-            job_info["widget_slug"] = "Unknown"
-            job_info["widget_title"] = "Unknown"
-
-        if job_data["status"] == "processing":
-            running_jobs.append(job_info)
-        else:
-            completed_jobs.append(job_info)
-
-    # Sort completed jobs by start time (most recent first) and limit to 10
-    completed_jobs.sort(key=lambda x: x["started_at"], reverse=True)
-    completed_jobs = completed_jobs[:10]
-
-    # Sort running jobs by start time (oldest first)
-    running_jobs.sort(key=lambda x: x["started_at"])
-
     return render_template(
-        "admin/jobs.html", running_jobs=running_jobs, completed_jobs=completed_jobs
+        "admin/jobs.html",
+        running_jobs=[job_info(job) for job in running],
+        completed_jobs=[job_info(job) for job in finished],
     )
@@ -0,0 +1,368 @@
+"""Bounded worker pool for widget builds.
+
+Build endpoints submit jobs here and poll their status instead of running
+webpack on a request thread. A fixed number of worker threads take jobs in
+priority order (FIFO within a priority), skipping a user's jobs while that user
+already has the maximum number of builds running, so one author queueing many
+builds cannot starve everyone else. Each webpack run is killed after a timeout.
+
+Without a running pool (tests and command-line scripts), jobs run inline on
+the submitting thread.
+"""
+
+import bisect
+import itertools
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common.base.logging_config import get_logger
+from models.database import db
+from models.models import ReactWidget, WidgetVersion
+from react_compiler import WidgetBuilder, get_widget_builder, set_bundler_pool_size
+
+logger = get_logger(__name__)
+
+# Worker threads, i.e. concurrent webpack runs per process
+BUILD_WORKERS = 2
+
+# Builds a single user may have running at once
+BUILD_PER_USER_LIMIT = 1
+
+# Seconds a webpack run may take before it is killed
+BUILD_TIMEOUT = 300.0
+
+# Seconds finished jobs stay available to status polls
+JOB_RETENTION = 3600
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# A task builds something with the given builder and returns (success, error)
+BuildTask = Callable[[WidgetBuilder], Tuple[bool, Optional[str]]]
+
+
+@dataclass
+class BuildJob:
+    """One queued, running or finished build."""
+
+    id: str
+    key: str  # Identifies the build target, e.g. "widget:12"; queued duplicates are merged
+    description: str
+    user_id: Optional[int]
+    priority: int
+    seq: int
+    task: BuildTask = field(repr=False)
+    status: str = QUEUED
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: JSON-serializable job status
+        """
+        return {
+            "job_id": self.id,
+            "description": self.description,
+            "status": self.status,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _record_job(job: BuildJob) -> None:
+    try:
+        from atacama.blueprints.metrics import record_widget_build_job
+
+        record_widget_build_job(
+            job.status, job.started_at - job.submitted_at, job.finished_at - job.started_at
+        )
+    except ImportError:
+        pass  # Metrics not available
+
+
+def _record_depth(depth: int) -> None:
+    try:
+        from atacama.blueprints.metrics import set_widget_build_queue_depth
+
+        set_widget_build_queue_depth(depth)
+    except ImportError:
+        pass  # Metrics not available
+
+
+class WidgetBuildService:
+    """Priority queue of build jobs served by a fixed pool of worker threads."""
+
+    def __init__(
+        self,
+        workers: int = BUILD_WORKERS,
+        per_user_limit: int = BUILD_PER_USER_LIMIT,
+        timeout: Optional[float] = BUILD_TIMEOUT,
+        inline: bool = False,
+        builder: Optional[WidgetBuilder] = None,
+    ):
+        """
+        :param workers: Number of worker threads
+        :param per_user_limit: Builds one user may have running at once
+        :param timeout: Seconds before a webpack run is killed (None for no limit)
+        :param inline: Run jobs on the submitting thread instead of the pool
+        :param builder: WidgetBuilder to use (default: the shared builder for this timeout)
+        """
+        self.workers = workers
+        self.per_user_limit = per_user_limit
+        self.timeout = timeout
+        self.inline = inline
+        self._builder = builder
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int, str]] = []  # (priority, seq, job_id), kept sorted
+        self._jobs: Dict[str, BuildJob] = {}
+        self._running: Dict[Optional[int], int] = {}
+        self._threads: List[threading.Thread] = []
+        self._seq = itertools.count()
+
+    @property
+    def builder(self) -> WidgetBuilder:
+        if self._builder is None:
+            self._builder = get_widget_builder(timeout=self.timeout)
+        return self._builder
+
+    def submit(
+        self,
+        key: str,
+        task: BuildTask,
+        user_id: Optional[int] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        description: str = "",
+    ) -> BuildJob:
+        """
+        Queue a build. A job for the same key that has not started yet is reused.
+
+        :param key: Build target, e.g. "widget:12"
+        :param task: Callable performing the build
+        :param user_id: Submitting user, for the per-user concurrency cap
+        :param priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND (lower runs first)
+        :param description: Human-readable label for status pages
+        :return: The queued (or, when inline, finished) job
+        """
+        with self._cond:
+            self._prune()
+            for _, _, job_id in self._queue:
+                job = self._jobs[job_id]
+                if job.key == key:
+                    if priority < job.priority:
+                        self._queue.remove((job.priority, job.seq, job.id))
+                        job.priority = priority
+                        bisect.insort(self._queue, (job.priority, job.seq, job.id))
+                    return job
+
+            job = BuildJob(
+                id=str(uuid.uuid4()),
+                key=key,
+                description=description or key,
+                user_id=user_id,
+                priority=priority,
+                seq=next(self._seq),
+                task=task,
+            )
+            self._jobs[job.id] = job
+            if self.inline:
+                self._start(job)
+            else:
+                bisect.insort(self._queue, (job.priority, job.seq, job.id))
+                self._start_workers()
+                self._cond.notify_all()
+                depth = len(self._queue)
+
+        if self.inline:
+            self._execute(job)
+        else:
+            _record_depth(depth)
+        return job
+
+    def get(self, job_id: str) -> Optional[BuildJob]:
+        """
+        :param job_id: Job ID returned by submit
+        :return: The job, or None if unknown or expired
+        """
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[BuildJob]:
+        """
+        Block until a job finishes.
+
+        :param job_id: Job ID returned by submit
+        :param timeout: Seconds to wait (None waits forever)
+        :return: The job (possibly still unfinished on timeout), or None if unknown
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id].finished, timeout
+            )
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: Queued, running and finished job counts
+        """
+        with self._cond:
+            counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def _start_workers(self) -> None:
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"widget-build-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [
+            job.id for job in self._jobs.values() if job.finished and job.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
+
+    def _next_job(self) -> Optional[BuildJob]:
+        """Highest-priority queued job whose user is under the concurrency cap."""
+        for entry in self._queue:
+            job = self._jobs[entry[2]]
+            if job.user_id is None or self._running.get(job.user_id, 0) < self.per_user_limit:
+                self._queue.remove(entry)
+                self._start(job)
+                return job
+        return None
+
+    def _start(self, job: BuildJob) -> None:
+        """Mark a job running; called with the lock held."""
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._running[job.user_id] = self._running.get(job.user_id, 0) + 1
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                job = self._cond.wait_for(self._next_job)
+                depth = len(self._queue)
+            _record_depth(depth)
+            self._execute(job)
+
+    def _execute(self, job: BuildJob) -> None:
+        try:
+            success, error = job.task(self.builder)
+        except Exception as e:
+            logger.error(f"Build job {job.description} failed: {e}")
+            success, error = False, str(e)
+
+        with self._cond:
+            job.status = SUCCEEDED if success else FAILED
+            job.error = None if success else (error or "Build failed")
+            job.finished_at = time.time()
+            self._running[job.user_id] -= 1
+            self._cond.notify_all()
+        logger.info(
+            f"Build job {job.description} {job.status} in {job.finished_at - job.started_at:.1f}s"
+        )
+        _record_job(job)
+
+
+def build_widget_task(widget_id: int, development_mode: Optional[bool] = None) -> BuildTask:
+    """
+    Task that rebuilds a widget's current code and stores the bundle.
+
+    :param widget_id: ReactWidget ID
+    :param development_mode: Passed to ReactWidget.build
+    :return: Build task
+    """
+
+    def task(builder: WidgetBuilder) -> Tuple[bool, Optional[str]]:
+        with db.session() as session:
+            widget = session.get(ReactWidget, widget_id)
+            if widget is None:
+                return False, "Widget not found"
+            success = widget.build(development_mode, builder=builder)
+            return success, None if success else "Build failed. Check server logs."
+
+    return task
+
+
+def build_version_task(
+    version_id: int, activate: bool = False, development_mode: Optional[bool] = None
+) -> BuildTask:
+    """
+    Task that builds a widget version, optionally making it the active version.
+
+    :param version_id: WidgetVersion ID
+    :param activate: Copy the version onto its widget if the build succeeds
+    :param development_mode: Passed to WidgetVersion.build
+    :return: Build task
+    """
+
+    def task(builder: WidgetBuilder) -> Tuple[bool, Optional[str]]:
+        with db.session() as session:
+            version = session.get(WidgetVersion, version_id)
+            if version is None:
+                return False, "Version not found"
+            success = version.build(development_mode, builder=builder)
+            if success and activate:
+                version.activate()
+            return success, version.build_error
+
+    return task
+
+
+# Global build service instance
+_build_service: Optional[WidgetBuildService] = None
+
+
+def init_build_service(
+    workers: int = BUILD_WORKERS,
+    per_user_limit: int = BUILD_PER_USER_LIMIT,
+    timeout: Optional[float] = BUILD_TIMEOUT,
+) -> WidgetBuildService:
+    """
+    Initialize the global build service with a worker pool.
+
+    :param workers: Number of worker threads
+    :param per_user_limit: Builds one user may have running at once
+    :param timeout: Seconds before a webpack run is killed
+    :return: Build service instance
+    """
+    global _build_service
+    set_bundler_pool_size(workers)  # One warm bundler per worker, so builds run in parallel
+    _build_service = WidgetBuildService(
+        workers=workers, per_user_limit=per_user_limit, timeout=timeout
+    )
+    return _build_service
+
+
+def get_build_service() -> WidgetBuildService:
+    """
+    Get the global build service, falling back to inline builds if no pool was started.
+
+    :return: Build service instance
+    """
+    global _build_service
+    if _build_service is None:
+        _build_service = WidgetBuildService(inline=True)
+    return _build_service
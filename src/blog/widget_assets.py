@@ -0,0 +1,150 @@
+"""Content-addressed store for compiled widget bundles served as static assets.
+
+Widget pages reference their bundle as ``/widgets/assets/<bundle_hash>.js``
+instead of inlining it, so browsers and CDNs cache it independently of the HTML
+shell. Because the URL changes whenever the bundle does, the bytes behind a URL
+never change and can be cached as immutable. Each bundle is written once under
+``DATA_DIR`` together with precompressed gzip and brotli variants, so requests
+never compress on the fly. Widget data delivered as JSON is kept the same way in a second store, as ``<data_hash>.json``.
+"""
+
+import gzip
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import brotli
+
+import constants
+from common.base.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds an asset may be cached; its URL changes whenever its content does
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+BUNDLE_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS: Dict[str, str] = {"br": ".br", "gzip": ".gz"}
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    """
+    :param encoding: "br" or "gzip"
+    :param data: Uncompressed bundle
+    :return: Compressed bytes
+    """
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br":
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+    raise ValueError(f"Unknown encoding: {encoding}")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class WidgetAssetStore:
+    """Write-once files holding each compiled bundle and its compressed variants."""
+
+    def __init__(self, root: Optional[str] = None, suffix: str = ".js"):
+        """
+        :param root: Asset directory (default: DATA_DIR/widget_assets)
+        :param suffix: File extension of the stored assets
+        """
+        self.root = root or os.path.join(constants.DATA_DIR, "widget_assets")
+        self.suffix = suffix
+
+    def path(self, bundle_hash: str, encoding: Optional[str] = None) -> str:
+        """
+        :param bundle_hash: Hex sha256 of the bundle
+        :param encoding: None for the plain file, or a key of ENCODINGS
+        :return: File path of that variant
+        """
+        return os.path.join(
+            self.root, bundle_hash + self.suffix + (ENCODINGS[encoding] if encoding else "")
+        )
+
+    def has(self, bundle_hash: str) -> bool:
+        return os.path.exists(self.path(bundle_hash))
+
+    def put(self, bundle_hash: str, compiled_code: str) -> None:
+        """
+        Store a bundle and its compressed variants unless already stored.
+
+        The plain file is written last, so its presence means every variant exists.
+
+        :param bundle_hash: Hex sha256 of the bundle
+        :param compiled_code: Compiled bundle
+        """
+        if self.has(bundle_hash):
+            return
+        os.makedirs(self.root, exist_ok=True)
+        data = compiled_code.encode("utf-8")
+        for encoding in ENCODINGS:
+            compressed = _compress(encoding, data)
+            if len(compressed) < len(data):
+                _write_atomic(self.path(bundle_hash, encoding), compressed)
+        _write_atomic(self.path(bundle_hash), data)
+        logger.info(f"Stored widget asset {bundle_hash[:12]} ({len(data)} bytes)")
+
+    def variants(self, bundle_hash: str) -> List[str]:
+        """
+        :param bundle_hash: Hex sha256 of the bundle
+        :return: Stored encodings, in order of preference
+        """
+        return [
+            encoding for encoding in ENCODINGS if os.path.exists(self.path(bundle_hash, encoding))
+        ]
+
+    def select(self, bundle_hash: str, accepted: Tuple[str, ...]) -> Tuple[str, Optional[str]]:
+        """
+        Pick the best stored variant the client accepts.
+
+        :param bundle_hash: Hex sha256 of the bundle
+        :param accepted: Content codings the client accepts
+        :return: Tuple of (file path, Content-Encoding or None)
+        """
+        for encoding in self.variants(bundle_hash):
+            if encoding in accepted:
+                return self.path(bundle_hash, encoding), encoding
+        return self.path(bundle_hash), None
+
+
+_default_store: Optional[WidgetAssetStore] = None
+_default_data_store: Optional[WidgetAssetStore] = None
+
+
+def get_widget_asset_store() -> WidgetAssetStore:
+    """
+    Process-wide asset store under DATA_DIR.
+
+    :return: Shared WidgetAssetStore instance
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = WidgetAssetStore()
+    return _default_store
+
+
+def get_widget_data_store() -> WidgetAssetStore:
+    """
+    Process-wide store of widget data JSON, alongside the bundles.
+
+    :return: Shared WidgetAssetStore instance for ``.json`` assets
+    """
+    global _default_data_store
+    if _default_data_store is None:
+        _default_data_store = WidgetAssetStore(suffix=".json")
+    return _default_data_store
@@ -0,0 +1,315 @@
+"""Durable store and bounded executor for widget improvement and initiation jobs.
+
+Job state lives in the ``widget_jobs`` table, so status polls are a primary
+key lookup that works from any worker process and jobs survive a restart. The
+LLM and build work runs on a fixed pool of threads with a cap on pending jobs,
+and a background sweeper deletes finished jobs past their retention and fails
+jobs whose process died mid-run.
+"""
+
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, update
+
+from common.base.logging_config import get_logger
+from models.database import db
+from models.models import WidgetJob
+
+logger = get_logger(__name__)
+
+# Threads running LLM and build work
+JOB_WORKERS = 2
+
+# Jobs queued or running per process before new ones are refused
+MAX_PENDING_JOBS = 16
+
+# Seconds finished jobs stay visible to status polls and the jobs page
+JOB_RETENTION = 24 * 3600
+
+# Seconds after which a still-processing job is assumed lost with its process
+JOB_STALE_AFTER = 3600
+
+# Seconds between expiry sweeps
+SWEEP_INTERVAL = 600
+
+PROCESSING = "processing"
+COMPLETED = "completed"
+ERROR = "error"
+
+# Work receives a progress(message) callback and returns the job result
+JobWork = Callable[[Callable[[str], None]], Dict[str, Any]]
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many widget jobs are already pending."""
+
+    pass
+
+
+def job_to_dict(job: WidgetJob) -> Dict[str, Any]:
+    """
+    :param job: WidgetJob row
+    :return: Plain dictionary, with result and details decoded
+    """
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "author_id": job.author_id,
+        "widget_slug": job.widget_slug,
+        "widget_title": job.widget_title,
+        "details": json.loads(job.details) if job.details else {},
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "accessed_at": job.accessed_at,
+    }
+
+
+def create_job(
+    kind: str,
+    author_id: Optional[int],
+    widget_slug: str,
+    widget_title: str,
+    progress: str,
+    details: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Record a new processing job.
+
+    :param kind: "improve" or "initiate"
+    :param author_id: Requesting user
+    :param widget_slug: Widget the job is about
+    :param widget_title: Widget title, for the jobs page
+    :param progress: Initial progress message
+    :param details: JSON-serializable request data
+    :return: Job ID
+    """
+    job_id = str(uuid.uuid4())
+    with db.session() as session:
+        session.add(
+            WidgetJob(
+                id=job_id,
+                kind=kind,
+                status=PROCESSING,
+                progress=progress,
+                author_id=author_id,
+                widget_slug=widget_slug,
+                widget_title=widget_title,
+                details=json.dumps(details) if details else None,
+                started_at=datetime.utcnow(),
+            )
+        )
+    return job_id
+
+
+def update_job(
+    job_id: str,
+    progress: Optional[str] = None,
+    status: Optional[str] = None,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> None:
+    """
+    Update a job's progress or finish it.
+
+    :param job_id: Job ID
+    :param progress: New progress message
+    :param status: New status; COMPLETED or ERROR also sets finished_at
+    :param result: JSON-serializable result
+    :param error: Error message
+    """
+    values: Dict[str, Any] = {}
+    if progress is not None:
+        values["progress"] = progress
+    if status is not None:
+        values["status"] = status
+        if status in (COMPLETED, ERROR):
+            values["finished_at"] = datetime.utcnow()
+    if result is not None:
+        values["result"] = json.dumps(result, default=str)
+    if error is not None:
+        values["error"] = error
+    if not values:
+        return
+    with db.session() as session:
+        session.execute(update(WidgetJob).where(WidgetJob.id == job_id).values(**values))
+
+
+def get_job(job_id: str, mark_accessed: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Look up a job by ID.
+
+    :param job_id: Job ID
+    :param mark_accessed: Record that a finished job's outcome was delivered
+    :return: Job dictionary, or None if unknown or expired
+    """
+    with db.session() as session:
+        job = session.get(WidgetJob, job_id)
+        if job is None:
+            return None
+        if mark_accessed and job.status in (COMPLETED, ERROR):
+            job.accessed_at = datetime.utcnow()
+        return job_to_dict(job)
+
+
+def list_recent_jobs(finished_limit: int = 10) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Jobs for the admin jobs page.
+
+    :param finished_limit: Most recent finished jobs to return
+    :return: Tuple of (processing jobs oldest first, finished jobs newest first)
+    """
+    with db.session() as session:
+        running = (
+            session.query(WidgetJob)
+            .filter(WidgetJob.status == PROCESSING)
+            .order_by(WidgetJob.started_at)
+            .all()
+        )
+        finished = (
+            session.query(WidgetJob)
+            .filter(WidgetJob.status != PROCESSING)
+            .order_by(WidgetJob.started_at.desc())
+            .limit(finished_limit)
+            .all()
+        )
+        return [job_to_dict(job) for job in running], [job_to_dict(job) for job in finished]
+
+
+def sweep_expired_jobs(now: Optional[datetime] = None) -> Tuple[int, int]:
+    """
+    Delete finished jobs past retention and fail jobs stuck processing.
+
+    :param now: Current time (naive UTC)
+    :return: Tuple of (jobs deleted, stale jobs failed)
+    """
+    now = now or datetime.utcnow()
+    with db.session() as session:
+        deleted = session.execute(
+            delete(WidgetJob).where(
+                WidgetJob.status != PROCESSING,
+                WidgetJob.started_at < now - timedelta(seconds=JOB_RETENTION),
+            )
+        ).rowcount
+        failed = session.execute(
+            update(WidgetJob)
+            .where(
+                WidgetJob.status == PROCESSING,
+                WidgetJob.started_at < now - timedelta(seconds=JOB_STALE_AFTER),
+            )
+            .values(
+                status=ERROR,
+                error="Job was interrupted",
+                progress="Job did not finish",
+                finished_at=now,
+            )
+        ).rowcount
+    if deleted or failed:
+        logger.info(f"Swept widget jobs: {deleted} expired, {failed} interrupted")
+    return deleted, failed
+
+
+class WidgetJobExecutor:
+    """Runs widget jobs on a fixed thread pool, recording their outcome in the job table."""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_pending: int = MAX_PENDING_JOBS,
+        sweep_interval: Optional[float] = SWEEP_INTERVAL,
+        inline: bool = False,
+    ):
+        """
+        :param workers: Number of worker threads
+        :param max_pending: Jobs queued or running before submit refuses more
+        :param sweep_interval: Seconds between expiry sweeps (None disables the sweeper)
+        :param inline: Run jobs on the submitting thread instead of the pool
+        """
+        self.inline = inline
+        self._pool = None if inline else ThreadPoolExecutor(workers, "widget-job")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if sweep_interval and not inline:
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, args=(sweep_interval,), name="widget-job-sweeper"
+            )
+            self._sweeper.daemon = True
+            self._sweeper.start()
+
+    def submit(self, job_id: str, work: JobWork, error_progress: str = "Error occurred") -> None:
+        """
+        Run a job's work in the background.
+
+        :param job_id: Job created with create_job
+        :param work: Callable doing the work
+        :param error_progress: Progress message recorded if the work raises
+        :raises JobQueueFullError: If max_pending jobs are already pending (the job is failed)
+        """
+        if not self._slots.acquire(blocking=False):
+            update_job(job_id, status=ERROR, error="Too many jobs pending", progress=error_progress)
+            raise JobQueueFullError("Too many widget jobs pending; try again later")
+        if self.inline:
+            self._run(job_id, work, error_progress)
+        else:
+            self._pool.submit(self._run, job_id, work, error_progress)
+
+    def _run(self, job_id: str, work: JobWork, error_progress: str) -> None:
+        try:
+            result = work(lambda message: update_job(job_id, progress=message))
+            update_job(job_id, status=COMPLETED, result=result)
+            logger.info(f"Widget job {job_id} completed")
+        except Exception as e:
+            logger.error(f"Widget job {job_id} failed: {e}")
+            update_job(job_id, status=ERROR, error=str(e), progress=error_progress)
+        finally:
+            self._slots.release()
+
+    def _sweep_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                sweep_expired_jobs()
+            except Exception as e:
+                logger.error(f"Widget job sweep failed: {e}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the sweeper and the pool."""
+        self._stop.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+
+# Global executor instance
+_executor: Optional[WidgetJobExecutor] = None
+
+
+def init_widget_job_executor(workers: int = JOB_WORKERS) -> WidgetJobExecutor:
+    """
+    Initialize the global job executor with a thread pool and expiry sweeper.
+
+    :param workers: Number of worker threads
+    :return: Executor instance
+    """
+    global _executor
+    _executor = WidgetJobExecutor(workers=workers)
+    return _executor
+
+
+def get_widget_job_executor() -> WidgetJobExecutor:
+    """
+    Get the global executor, falling back to inline jobs if no pool was started.
+
+    :return: Executor instance
+    """
+    global _executor
+    if _executor is None:
+        _executor = WidgetJobExecutor(inline=True)
+    return _executor
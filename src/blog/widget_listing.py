@@ -0,0 +1,173 @@
+"""Paginated widget listing that never loads widget code or bundles.
+
+The listing pages and the JSON API select only the columns a widget card
+shows (code, compiled bundles and data files stay in the database), walk the
+published widgets newest first with a (created_at, id) keyset cursor, and
+report totals from a per-channel-set counter cached for WIDGET_COUNT_TTL
+seconds. Committing a transaction that publishes, unpublishes, re-channels,
+creates or deletes a widget drops the cached counts.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, event, func, inspect, or_, select
+from sqlalchemy.orm import Session, load_only, object_session, selectinload
+
+from common.cache import LRUCache
+from models.models import ReactWidget, User
+
+# Widgets per listing page
+WIDGET_PAGE_SIZE = 24
+
+# Largest page the JSON API will return
+MAX_WIDGET_PAGE_SIZE = 100
+
+# Seconds a widget count is served before being recounted
+WIDGET_COUNT_TTL = 300.0
+
+# Channel sets whose counts are kept
+WIDGET_COUNT_CACHE_SIZE = 64
+
+# Session.info key set when the current transaction changes the widget counts
+_WIDGET_COUNTS_CHANGED = "widget_counts_changed"
+
+
+def _listing_query(db_session, allowed_channels: Optional[Sequence[str]]):
+    """
+    :param db_session: Database session
+    :param allowed_channels: Channels to include (None for all channels)
+    :return: Query over published widgets loading only the listing columns
+    """
+    query = (
+        db_session.query(ReactWidget)
+        .options(
+            load_only(
+                ReactWidget.id,
+                ReactWidget.created_at,
+                ReactWidget.channel,
+                ReactWidget.author_id,
+                ReactWidget.slug,
+                ReactWidget.title,
+                ReactWidget.description,
+                ReactWidget.published,
+            ),
+            selectinload(ReactWidget.author).load_only(User.id, User.name),
+        )
+        .filter(ReactWidget.published == True)
+    )
+    if allowed_channels is not None:
+        query = query.filter(ReactWidget.channel.in_(allowed_channels))
+    return query
+
+
+def get_widget_page(
+    db_session,
+    allowed_channels: Optional[Sequence[str]],
+    older_than_id: Optional[int] = None,
+    limit: int = WIDGET_PAGE_SIZE,
+) -> Tuple[List[ReactWidget], bool]:
+    """
+    Retrieve one page of published widgets, newest first.
+
+    :param db_session: Database session
+    :param allowed_channels: Channels to include (None for all channels)
+    :param older_than_id: Return widgets listed after this widget
+    :param limit: Maximum widgets to return
+    :return: Tuple of (widgets, has_more)
+    """
+    query = _listing_query(db_session, allowed_channels)
+
+    if older_than_id is not None:
+        cursor_created_at = db_session.execute(
+            select(ReactWidget.created_at).where(ReactWidget.id == older_than_id)
+        ).scalar_one_or_none()
+        if cursor_created_at is None:
+            return [], False
+        query = query.filter(
+            or_(
+                ReactWidget.created_at < cursor_created_at,
+                and_(
+                    ReactWidget.created_at == cursor_created_at,
+                    ReactWidget.id < older_than_id,
+                ),
+            )
+        )
+
+    widgets = (
+        query.order_by(ReactWidget.created_at.desc(), ReactWidget.id.desc()).limit(limit + 1).all()
+    )
+    return widgets[:limit], len(widgets) > limit
+
+
+def widget_summary(widget: ReactWidget) -> Dict[str, Any]:
+    """
+    :param widget: Widget loaded by get_widget_page
+    :return: JSON-serializable listing entry
+    """
+    return {
+        "id": widget.id,
+        "slug": widget.slug,
+        "title": widget.title,
+        "description": widget.description,
+        "channel": widget.channel,
+        "author": widget.author.name if widget.author else None,
+        "created_at": widget.created_at.isoformat() if widget.created_at else None,
+    }
+
+
+widget_count_cache = LRUCache(maxsize=WIDGET_COUNT_CACHE_SIZE, ttl=WIDGET_COUNT_TTL)
+
+
+def count_widgets(db_session, allowed_channels: Optional[Sequence[str]]) -> int:
+    """
+    Number of published widgets in the given channels, cached.
+
+    :param db_session: Database session
+    :param allowed_channels: Channels to include (None for all channels)
+    :return: Widget count
+    """
+    key = frozenset(allowed_channels) if allowed_channels is not None else None
+    count = widget_count_cache.get(key)
+    if count is not None:
+        return count
+
+    generation = widget_count_cache.generation
+    statement = select(func.count(ReactWidget.id)).where(ReactWidget.published == True)
+    if allowed_channels is not None:
+        statement = statement.where(ReactWidget.channel.in_(allowed_channels))
+    count = db_session.execute(statement).scalar_one()
+    widget_count_cache.put(key, count, generation)
+    return count
+
+
+def _widget_counts_changed(target: ReactWidget) -> None:
+    """Remember that widget counts changed until the transaction commits."""
+    session = object_session(target)
+    if session is None:
+        widget_count_cache.invalidate()
+        return
+    session.info[_WIDGET_COUNTS_CHANGED] = True
+
+
+@event.listens_for(ReactWidget, "after_insert")
+@event.listens_for(ReactWidget, "after_delete")
+def _invalidate_on_insert_or_delete(mapper, connection, target):
+    _widget_counts_changed(target)
+
+
+@event.listens_for(ReactWidget, "after_update")
+def _invalidate_on_publish_or_move(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.published.history.has_changes() or state.attrs.channel.history.has_changes():
+        _widget_counts_changed(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_WIDGET_COUNTS_CHANGED, False):
+        widget_count_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_WIDGET_COUNTS_CHANGED, None)
@@ -0,0 +1,113 @@
+"""Small thread-safe in-memory cache shared by Atacama's read paths.
+
+LRUCache keeps at most ``maxsize`` entries, dropping the least recently used,
+and optionally expires entries ``ttl`` seconds after they were stored. Caches
+invalidated by database writes read ``generation`` before computing a value and
+pass it to put(); an invalidation in between bumps the generation, so the stale
+value is not stored.
+
+Usage:
+    from common.cache import LRUCache
+
+    cache = LRUCache(maxsize=256, ttl=300.0)
+    value = cache.get(key)
+    if value is None:
+        generation = cache.generation
+        value = compute()
+        cache.put(key, value, generation)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU with an optional TTL and generation-guarded stores."""
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None) -> None:
+        """
+        :param maxsize: Entries kept before the least recently used is dropped
+        :param ttl: Seconds an entry is served after being stored (None for no expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expiry on the monotonic clock or None, value)
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so values computed earlier are not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a live entry, marking it recently used.
+
+        :param key: Cache key
+        :param default: Returned on a miss or an expired entry
+        :return: Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and time.monotonic() >= entry[0]:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Store a value, evicting the least recently used entries beyond maxsize.
+
+        :param key: Cache key
+        :param value: Value to store
+        :param generation: ``generation`` read before computing the value; the store is
+                           skipped if the cache was invalidated since (None to always store)
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            expires = None if self.ttl is None else time.monotonic() + self.ttl
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable, Any], bool]] = None) -> None:
+        """
+        Drop entries and bump the generation.
+
+        :param predicate: Called with (key, value); only matching entries are dropped
+                          (None drops every entry)
+        """
+        with self._lock:
+            self.generation += 1
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [k for k, (_, value) in self._entries.items() if predicate(k, value)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry and reset the hit and miss counters."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: Hits, misses and current entry count
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
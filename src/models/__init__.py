@@ -22,6 +22,7 @@ from .messages import (
     get_message_chain,
     get_filtered_messages,
     get_domain_filtered_messages,
+    get_polymorphic_messages,
 )
 
 # Import quote-related functions and constants
@@ -51,6 +52,7 @@ from .users import (
     check_admin_approval,
     check_channel_access,
     get_user_allowed_channels,
+    resolve_channel_access,
 )
 
 __all__ = [
@@ -73,11 +75,13 @@ __all__ = [
     "check_admin_approval",
     "check_channel_access",
     "get_user_allowed_channels",
+    "resolve_channel_access",
     "check_message_access",
     "get_message_by_id",
     "get_message_chain",
     "get_filtered_messages",
     "get_domain_filtered_messages",
+    "get_polymorphic_messages",
     # Quote functions and constants
     "QUOTE_TYPES",
     "QuoteExtractionError",
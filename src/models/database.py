@@ -27,6 +27,12 @@ def upgrade_schema(engine) -> None:
         ("emails", "public_content", "TEXT"),
         ("emails", "public_processed_content", "TEXT"),
         ("emails", "english_annotations", "TEXT"),
+        ("emails", "rss_content", "TEXT"),
+        ("emails", "content_hash", "VARCHAR(64)"),
+        ("quotes", "content_hash", "VARCHAR(64)"),
+        ("react_widgets", "bundle_hash", "VARCHAR(64)"),
+        ("react_widgets", "data_json", "TEXT"),
+        ("react_widgets", "data_hash", "VARCHAR(64)"),
     ]
 
     with engine.connect() as conn:
@@ -50,6 +56,72 @@ def upgrade_schema(engine) -> None:
             except Exception as e:
                 logger.warning(f"Could not add column {column_name} to {table_name}: {e}")
 
+        # Hash legacy quotes before their unique index is created
+        if "quotes" in inspector.get_table_names():
+            from models.models import backfill_quote_hashes
+
+            hashed = backfill_quote_hashes(conn)
+            conn.commit()
+            if hashed:
+                logger.info(f"Backfilled content_hash for {hashed} quotes")
+
+        if "emails" in inspector.get_table_names():
+            from models.models import backfill_message_hashes
+
+            hashed = backfill_message_hashes(conn)
+            conn.commit()
+            if hashed:
+                logger.info(f"Backfilled content_hash for {hashed} emails")
+
+        if "react_widgets" in inspector.get_table_names():
+            from models.models import backfill_widget_bundle_hashes
+
+            hashed = backfill_widget_bundle_hashes(conn)
+            conn.commit()
+            if hashed:
+                logger.info(f"Backfilled bundle_hash for {hashed} widgets")
+
+        # Indexes declared on models after initial table creation.
+        # Format: (table_name, create_statement)
+        index_upgrades = [
+            (
+                "emails",
+                "CREATE INDEX IF NOT EXISTS ix_emails_parent_id ON emails (parent_id)",
+            ),
+            (
+                "emails",
+                "CREATE INDEX IF NOT EXISTS ix_emails_content_hash ON emails (content_hash)",
+            ),
+            (
+                "quotes",
+                "CREATE UNIQUE INDEX IF NOT EXISTS ix_quotes_content_hash ON quotes (content_hash)",
+            ),
+            (
+                "react_widgets",
+                "CREATE INDEX IF NOT EXISTS ix_react_widgets_bundle_hash "
+                "ON react_widgets (bundle_hash)",
+            ),
+            (
+                "react_widgets",
+                "CREATE INDEX IF NOT EXISTS ix_react_widgets_data_hash ON react_widgets (data_hash)",
+            ),
+        ]
+        for table_name, stmt in index_upgrades:
+            if table_name not in inspector.get_table_names():
+                continue
+            try:
+                conn.execute(text(stmt))
+                conn.commit()
+            except Exception as e:
+                logger.warning(f"Could not create index with '{stmt}': {e}")
+
+        # Full-text index over quotes, maintained by the database itself
+        if "quotes" in inspector.get_table_names():
+            from models.quote_search import ensure_quote_search_index
+
+            ensure_quote_search_index(conn)
+            conn.commit()
+
         if constants.SERVICE == "trakaido":
             # Migration support for early classroom deployments without archived flag
             if "classrooms" in inspector.get_table_names():
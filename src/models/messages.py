@@ -1,13 +1,14 @@
 """Database functions for retrieving messages and message chains with configurable access control."""
 
 from flask import g
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy import or_, select
+from sqlalchemy.orm import defer, joinedload, noload, selectinload, with_polymorphic
+from sqlalchemy.sql.expression import CTE
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
 from models.database import db
-from models import Email, Message
+from models import Article, Email, Message, Quote, ReactWidget
 from models.users import check_channel_access, get_user_allowed_channels
 from common.config.channel_config import get_channel_manager
 from common.base.logging_config import get_logger
@@ -49,33 +50,61 @@ def get_message_by_id(message_id: int) -> Optional[Email]:
         return message
 
 
+def message_ancestors_cte(message_id: int) -> CTE:
+    """
+    Recursive CTE of (id, parent_id) for a message and all of its ancestors.
+
+    Uses UNION rather than UNION ALL, so a corrupt parent cycle still terminates.
+    Supported by both SQLite and PostgreSQL.
+
+    :param message_id: ID of the message to start from
+    :return: CTE with ``id`` and ``parent_id`` columns
+    """
+    ancestors = (
+        select(Email.id, Email.parent_id)
+        .where(Email.id == message_id)
+        .cte(name="chain_ancestors", recursive=True)
+    )
+    return ancestors.union(
+        select(Email.id, Email.parent_id).where(Email.id == ancestors.c.parent_id)
+    )
+
+
 def get_message_chain(message_id: int) -> List[Email]:
     """
     Retrieve the full chain of messages related to a given message ID.
 
+    The ancestors and direct replies are loaded in a single query over
+    :func:`message_ancestors_cte`, then ordered by following parent links.
+
     :param message_id: ID of the message to get chain for
     :return: List of accessible Email objects in chronological order
     """
     with db.session() as db_session:
         db_session.expire_on_commit = False
-        message = (
+        ancestors = message_ancestors_cte(message_id)
+        rows = (
             db_session.query(Email)
-            .options(joinedload(Email.parent), joinedload(Email.children), joinedload(Email.quotes))
-            .filter(Email.id == message_id)
-            .first()
+            .options(noload(Email.parent), noload(Email.children), noload(Email.quotes))
+            .filter(or_(Email.id.in_(select(ancestors.c.id)), Email.parent_id == message_id))
+            .all()
         )
+        by_id = {row.id: row for row in rows}
 
+        message = by_id.get(message_id)
         if not message or not check_message_access(message, ignore_preferences=True):
             return []
 
         chain: List[Email] = []
 
         # Add parent chain
-        current = message
-        while current.parent:
-            if check_message_access(current.parent, ignore_preferences=True):
-                chain.insert(0, current.parent)
-            current = current.parent
+        seen = {message_id}
+        parent = by_id.get(message.parent_id)
+        while parent is not None and parent.id not in seen:
+            seen.add(parent.id)
+            if check_message_access(parent, ignore_preferences=True):
+                chain.insert(0, parent)
+            parent = by_id.get(parent.parent_id)
 
         # Add target message
         chain.append(message)
@@ -83,16 +112,14 @@ def get_message_chain(message_id: int) -> List[Email]:
         # Add accessible children
         matching_children = [
             child
-            for child in message.children
-            if child.channel == message.channel
+            for child in rows
+            if child.parent_id == message_id
+            and child.id != message_id
+            and child.channel == message.channel
             and check_message_access(child, ignore_preferences=True)
         ]
         chain.extend(sorted(matching_children, key=lambda x: x.created_at))
 
-        # Refresh for good luck
-        for msg in chain:
-            db_session.refresh(msg)
-
         return chain
 
 
@@ -220,6 +247,57 @@ def get_domain_filtered_messages(
     )
 
 
+def get_polymorphic_messages(
+    db_session,
+    allowed_channels: List[str],
+    older_than_timestamp: Optional[datetime] = None,
+    limit: int = 10,
+) -> Tuple[List[Message], bool]:
+    """
+    Retrieve a page of mixed-type messages as their concrete subclasses.
+
+    All subtype tables are outer-joined into a single query, authors and
+    email/quote links are selectin-loaded, and body/code columns no listing
+    needs are deferred. The query count is therefore constant in the page size.
+
+    :param db_session: Database session
+    :param allowed_channels: Channels to include
+    :param older_than_timestamp: Only return messages created before this time
+    :param limit: Maximum messages to return
+    :return: Tuple of (messages, has_more)
+    """
+    poly = with_polymorphic(Message, [Email, Article, ReactWidget, Quote])
+    query = (
+        db_session.query(poly)
+        .options(
+            selectinload(poly.author),
+            # Load one hop of email<->quote links; stop the selectin cascade there
+            selectinload(poly.Email.quotes).lazyload(Quote.emails),
+            selectinload(poly.Quote.emails).lazyload(Email.quotes),
+            defer(poly.Email.preview_content),
+            defer(poly.Email.processed_content),
+            defer(poly.Email.public_content),
+            defer(poly.Email.public_processed_content),
+            defer(poly.Email.chinese_annotations),
+            defer(poly.Email.llm_annotations),
+            defer(poly.Email.english_annotations),
+            defer(poly.Article.content),
+            defer(poly.Article.llm_annotations),
+            defer(poly.ReactWidget.code),
+            defer(poly.ReactWidget.compiled_code),
+            defer(poly.ReactWidget.data_file),
+        )
+        .filter(poly.channel.in_(allowed_channels))
+    )
+
+    if older_than_timestamp:
+        query = query.filter(poly.created_at < older_than_timestamp)
+
+    messages = query.order_by(poly.created_at.desc()).limit(limit + 1).all()
+    has_more = len(messages) > limit
+    return messages[:limit], has_more
+
+
 def get_raw_message_by_id(db_session, message_id: int) -> Optional[Message]:
     """
     Retrieve a message by ID without access control checks.
@@ -1,5 +1,7 @@
 from datetime import datetime
+import hashlib
 import json
+import unicodedata
 from typing import Optional, List, Dict
 from sqlalchemy import (
     String,
@@ -11,8 +13,21 @@ from sqlalchemy import (
     Table,
     Column,
     Enum,
+    bindparam,
+    delete,
+    event,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+    relationship,
+    backref,
+    validates,
+    object_session,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship, backref, validates
 import enum
 
 from sqlalchemy.orm import DeclarativeBase
@@ -21,11 +36,16 @@ import constants
 from common.config.channel_config import get_channel_manager
 from common.base.logging_config import get_logger
 
-from react_compiler import WidgetBuilder
+from react_compiler import WidgetBuilder, get_widget_builder
+from react_compiler.bundle_size import describe_size_change, page_script_size
 from react_compiler.lib import sanitize_widget_title_for_component_name
+from react_compiler.widget_data import bundled_data_module, widget_data_hash, widget_data_json
 
 logger = get_logger(__name__)
 
+# Legacy emails read and hashed per query by backfill_message_hashes
+HASH_BACKFILL_BATCH_SIZE = 500
+
 
 class Base(DeclarativeBase):
     pass
@@ -149,6 +169,21 @@ class Message(Base):
     }
 
 
+@event.listens_for(Message, "before_update", propagate=True)
+def _touch_last_modified(mapper, connection, target):
+    """
+    Bump last_modified_at whenever a column of a message changes.
+
+    The ``onupdate`` default only fires when the ``messages`` row itself is
+    updated, so edits touching only subtype columns (e.g. ``emails.content``)
+    would otherwise leave the timestamp - and every validator derived from it -
+    unchanged.
+    """
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        target.last_modified_at = datetime.utcnow()
+
+
 class Quote(Message):
     """Stores tracked quotes and their metadata."""
 
@@ -163,6 +198,8 @@ class Quote(Message):
     commentary: Mapped[Optional[str]] = mapped_column(
         Text
     )  # For snowclone explanations or personal meanings
+    # sha256 of the normalized text; unique so each quote is stored once
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), unique=True, index=True)
 
     # Relationship with emails that reference this quote
     emails: Mapped[List["Email"]] = relationship(
@@ -172,6 +209,97 @@ class Quote(Message):
     __mapper_args__ = {"polymorphic_identity": MessageType.QUOTE}
 
 
+def normalize_quote_text(text: str) -> str:
+    """Normalize quote text for deduplication: NFC, trimmed, single-spaced."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def quote_content_hash(text: str) -> str:
+    """
+    Hash identifying a quote regardless of Unicode form and whitespace.
+
+    :param text: Quote text
+    :return: Hex sha256 of the normalized text
+    """
+    return hashlib.sha256(normalize_quote_text(text).encode("utf-8")).hexdigest()
+
+
+@event.listens_for(Quote, "before_insert")
+def _hash_new_quote(mapper, connection, target):
+    """Hash a new quote's text unless the caller already did."""
+    if target.content_hash is None:
+        target.content_hash = quote_content_hash(target.text)
+
+
+@event.listens_for(Quote, "before_update")
+def _refresh_quote_hash(mapper, connection, target):
+    """Keep content_hash in step with the quote text when the text is edited."""
+    if inspect(target).attrs.text.history.has_changes():
+        target.content_hash = quote_content_hash(target.text)
+
+
+def merge_quote_into(conn, duplicate_id: int, keeper_id: int) -> None:
+    """
+    Move a duplicate quote's email links to another quote and delete the duplicate.
+
+    :param conn: SQLAlchemy connection (committed by the caller)
+    :param duplicate_id: Quote to remove
+    :param keeper_id: Quote that takes over its links
+    """
+    links = Base.metadata.tables["email_quotes"]
+    already_linked = select(links.c.email_id).where(links.c.quote_id == keeper_id)
+    conn.execute(
+        delete(links).where(links.c.quote_id == duplicate_id, links.c.email_id.in_(already_linked))
+    )
+    conn.execute(update(links).where(links.c.quote_id == duplicate_id).values(quote_id=keeper_id))
+    conn.execute(delete(Quote.__table__).where(Quote.__table__.c.id == duplicate_id))
+    conn.execute(delete(Message.__table__).where(Message.__table__.c.id == duplicate_id))
+
+
+def backfill_quote_hashes(conn) -> int:
+    """
+    Set content_hash on quotes stored before the column existed.
+
+    Legacy duplicates of a text are merged into the oldest quote with that text
+    (see merge_quote_into), so every quote ends up hashed under the unique index.
+
+    :param conn: SQLAlchemy connection (committed by the caller)
+    :return: Number of quotes hashed
+    """
+    quotes = Quote.__table__
+    keepers = dict(
+        conn.execute(
+            select(quotes.c.content_hash, quotes.c.id).where(quotes.c.content_hash.isnot(None))
+        ).all()
+    )
+    rows = conn.execute(
+        select(quotes.c.id, quotes.c.text)
+        .where(quotes.c.content_hash.is_(None))
+        .order_by(quotes.c.id)
+    ).all()
+    updates = []
+    merges = []
+    for quote_id, quote_text in rows:
+        digest = quote_content_hash(quote_text)
+        if digest in keepers:
+            merges.append((quote_id, keepers[digest]))
+        else:
+            keepers[digest] = quote_id
+            updates.append({"quote_id": quote_id, "digest": digest})
+    if updates:
+        conn.execute(
+            update(quotes)
+            .where(quotes.c.id == bindparam("quote_id"))
+            .values(content_hash=bindparam("digest")),
+            updates,
+        )
+    for duplicate_id, keeper_id in merges:
+        merge_quote_into(conn, duplicate_id, keeper_id)
+    if merges:
+        logger.info(f"Merged {len(merges)} duplicate quotes into their originals")
+    return len(updates)
+
+
 class Email(Message):
     """Email model storing both original and processed content."""
 
@@ -193,7 +321,7 @@ class Email(Message):
     )  # Rendered HTML for public version
 
     # Chain relationships directly in Email
-    parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("emails.id"))
+    parent_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("emails.id"), index=True)
     children: Mapped[List["Email"]] = relationship(
         "Email",
         cascade="all, delete-orphan",
@@ -212,6 +340,12 @@ class Email(Message):
         Text
     )  # {word: {guid, lemma, definition, pos_type, ...}}
 
+    # Preview HTML cleaned for RSS readers, kept in step with the rendered content
+    rss_content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # sha256 of subject, content and author email; not unique since imports may be forced
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True)
+
     # Quote relationships
     quotes: Mapped[List["Quote"]] = relationship(
         "Quote", secondary="email_quotes", back_populates="emails", lazy="selectin"
@@ -220,6 +354,103 @@ class Email(Message):
     __mapper_args__ = {"polymorphic_identity": MessageType.EMAIL}
 
 
+@event.listens_for(Email, "before_insert")
+@event.listens_for(Email, "before_update")
+def _refresh_rss_content(mapper, connection, target):
+    """
+    Recompute rss_content whenever the rendered preview or full HTML changes.
+
+    Feeds then serve stored markup instead of running the RSS cleanup regexes
+    on every poll.
+    """
+    state = inspect(target)
+    if not (
+        state.attrs.preview_content.history.has_changes()
+        or state.attrs.processed_content.history.has_changes()
+    ):
+        return
+    from aml_parser.rss import clean_html_for_rss
+
+    source = target.preview_content or target.processed_content
+    target.rss_content = clean_html_for_rss(source) if source else None
+
+
+def message_content_hash(subject: Optional[str], content: Optional[str], author_email: str) -> str:
+    """
+    Hash identifying an email by subject, content and author.
+
+    :param subject: Email subject
+    :param content: Raw email content
+    :param author_email: Author's email address, or "" when there is none
+    :return: Hex sha256 of the joined fields
+    """
+    return hashlib.sha256(f"{subject}|{content}|{author_email}".encode("utf-8")).hexdigest()
+
+
+@event.listens_for(Email, "before_insert")
+@event.listens_for(Email, "before_update")
+def _refresh_message_hash(mapper, connection, target):
+    """Keep content_hash in step with the subject, content and author."""
+    state = inspect(target)
+    if target.content_hash is not None and not any(
+        state.attrs[key].history.has_changes()
+        for key in ("subject", "content", "author", "author_id")
+    ):
+        return
+    author = target.__dict__.get("author")
+    if author is not None:
+        author_email = author.email
+    elif target.author_id is not None:
+        author_email = connection.execute(
+            select(User.email).where(User.id == target.author_id)
+        ).scalar()
+    else:
+        author_email = None
+    target.content_hash = message_content_hash(target.subject, target.content, author_email or "")
+
+
+def backfill_message_hashes(conn, batch_size: int = HASH_BACKFILL_BATCH_SIZE) -> int:
+    """
+    Set content_hash on emails stored before the column existed.
+
+    Emails are read and updated batch_size at a time in id order, so only one
+    batch of subjects and contents is held in memory.
+
+    :param conn: SQLAlchemy connection (committed by the caller)
+    :param batch_size: Emails hashed per query
+    :return: Number of emails hashed
+    """
+    emails = Email.__table__
+    messages = Message.__table__
+    users = User.__table__
+    hashed, last_id = 0, 0
+    while True:
+        rows = conn.execute(
+            select(emails.c.id, emails.c.subject, emails.c.content, users.c.email)
+            .join(messages, messages.c.id == emails.c.id)
+            .outerjoin(users, users.c.id == messages.c.author_id)
+            .where(emails.c.content_hash.is_(None), emails.c.id > last_id)
+            .order_by(emails.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return hashed
+        conn.execute(
+            update(emails)
+            .where(emails.c.id == bindparam("email_id"))
+            .values(content_hash=bindparam("digest")),
+            [
+                {
+                    "email_id": email_id,
+                    "digest": message_content_hash(subject, content, author_email or ""),
+                }
+                for email_id, subject, content, author_email in rows
+            ],
+        )
+        hashed += len(rows)
+        last_id = rows[-1][0]
+
+
 # Association table for email-quote relationships
 email_quotes = Table(
     "email_quotes",
@@ -271,8 +502,12 @@ class ReactWidget(Message):
 
     code: Mapped[str] = mapped_column(Text)  # The React component code
     compiled_code: Mapped[Optional[str]] = mapped_column(Text)  # Compiled code for browser use
+    bundle_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True)  # Of compiled_code
     dependencies: Mapped[Optional[str]] = mapped_column(Text)  # Comma-separated list
     data_file: Mapped[Optional[str]] = mapped_column(Text)  # The data file for the widget
+    # data_file as JSON when it is served apart from the bundle (see react_compiler.widget_data)
+    data_json: Mapped[Optional[str]] = mapped_column(Text, deferred=True)
+    data_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True)  # Of data_json
 
     published: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
     published_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
@@ -297,30 +532,43 @@ class ReactWidget(Message):
         "WidgetVersion", foreign_keys=[active_version_id], post_update=True
     )
 
-    def build(self, development_mode: Optional[bool] = None):
+    def build(
+        self, development_mode: Optional[bool] = None, builder: Optional[WidgetBuilder] = None
+    ):
         """Build the widget code into a browser-ready bundle."""
-        builder = WidgetBuilder()
+        builder = builder or get_widget_builder()
         widget_name = self.title.replace(" ", "")
 
         # Determine development mode from environment if not explicitly provided
         if development_mode is None:
             development_mode = constants.is_development_mode()
 
-        # We auto-detect the dependencies
-        all_deps = builder.check_react_libraries(self.code)
-        deps = all_deps["target_libraries"]
-        self.dependencies = ",".join(deps)
+        # We auto-detect the dependencies; only external ones are loaded as page globals
+        before = (
+            page_script_size(self.compiled_code, (self.dependencies or "").split(","))
+            if self.compiled_code
+            else None
+        )
+        bundled, external = builder.split_dependencies(self.code)
+        self.dependencies = ",".join(external)
 
         success, built_code, error = builder.build_widget(
             self.code,
             widget_name,
-            external_dependencies=deps,
+            dependencies=bundled,
+            external_dependencies=external,
             development_mode=development_mode,
-            data_file=self.data_file,
+            data_file=bundled_data_module(self.data_file),
         )
 
         if success:
-            logger.info(f"Widget {self.slug} built successfully.")
+            after = page_script_size(built_code, external)
+            size = (
+                describe_size_change(before, after)
+                if before
+                else f"{after['total_bytes'] / 1024:.1f} KB"
+            )
+            logger.info(f"Widget {self.slug} built successfully; page script {size}")
             self.compiled_code = built_code
         else:
             logger.warning(f"Widget build failed: {error}")
@@ -345,6 +593,67 @@ class ReactWidget(Message):
         return slug.lower()
 
 
+def widget_bundle_hash(compiled_code: Optional[str]) -> Optional[str]:
+    """
+    Fingerprint of a compiled widget bundle, used in its asset URL.
+
+    :param compiled_code: Compiled bundle
+    :return: Hex sha256 of the bundle, or None if there is none
+    """
+    if not compiled_code:
+        return None
+    return hashlib.sha256(compiled_code.encode("utf-8")).hexdigest()
+
+
+@event.listens_for(ReactWidget, "before_insert")
+@event.listens_for(ReactWidget, "before_update")
+def _refresh_bundle_hash(mapper, connection, target):
+    """Keep bundle_hash in step with the compiled code."""
+    if inspect(target).attrs.compiled_code.history.has_changes() or (
+        target.bundle_hash is None and target.compiled_code
+    ):
+        target.bundle_hash = widget_bundle_hash(target.compiled_code)
+
+
+@event.listens_for(ReactWidget, "before_insert")
+@event.listens_for(ReactWidget, "before_update")
+def _refresh_data_json(mapper, connection, target):
+    """Keep data_json and data_hash in step with the data file."""
+    if inspect(target).attrs.data_file.history.has_changes() or (
+        target.data_hash is None and target.data_file
+    ):
+        target.data_json = widget_data_json(target.data_file)
+        target.data_hash = widget_data_hash(target.data_json)
+
+
+def backfill_widget_bundle_hashes(conn) -> int:
+    """
+    Set bundle_hash on widgets compiled before the column existed.
+
+    :param conn: SQLAlchemy connection (committed by the caller)
+    :return: Number of widgets hashed
+    """
+    widgets = ReactWidget.__table__
+    rows = conn.execute(
+        select(widgets.c.id, widgets.c.compiled_code).where(
+            widgets.c.bundle_hash.is_(None), widgets.c.compiled_code.isnot(None)
+        )
+    ).all()
+    updates = [
+        {"widget_id": widget_id, "digest": widget_bundle_hash(compiled_code)}
+        for widget_id, compiled_code in rows
+        if compiled_code
+    ]
+    if updates:
+        conn.execute(
+            update(widgets)
+            .where(widgets.c.id == bindparam("widget_id"))
+            .values(bundle_hash=bindparam("digest")),
+            updates,
+        )
+    return len(updates)
+
+
 class WidgetVersion(Base):
     """Stores different versions of widget code, including AI-improved iterations."""
 
@@ -394,11 +703,13 @@ class WidgetVersion(Base):
         "WidgetVersion", remote_side=[id]
     )
 
-    def build(self, development_mode: Optional[bool] = None):
+    def build(
+        self, development_mode: Optional[bool] = None, builder: Optional[WidgetBuilder] = None
+    ):
         """Build this version of the widget code."""
         import hashlib
 
-        builder = WidgetBuilder()
+        builder = builder or get_widget_builder()
         widget_name = sanitize_widget_title_for_component_name(self.widget.title)
 
         # Determine development mode from environment if not explicitly provided
@@ -409,17 +720,17 @@ class WidgetVersion(Base):
         if not self.code_hash:
             self.code_hash = hashlib.md5(self.code.encode("utf-8")).hexdigest()
 
-        # Auto-detect dependencies
-        all_deps = builder.check_react_libraries(self.code)
-        deps = all_deps["target_libraries"]
-        self.dependencies = ",".join(deps)
+        # Auto-detect dependencies; only external ones are loaded as page globals
+        bundled, external = builder.split_dependencies(self.code)
+        self.dependencies = ",".join(external)
 
         success, built_code, error = builder.build_widget(
             self.code,
             widget_name,
-            external_dependencies=deps,
+            dependencies=bundled,
+            external_dependencies=external,
             development_mode=development_mode,
-            data_file=self.data_file,
+            data_file=bundled_data_module(self.data_file),
         )
 
         if success:
@@ -434,3 +745,35 @@ class WidgetVersion(Base):
             self.build_error = error
 
         return success
+
+    def activate(self):
+        """Make this (built) version the widget's current code and bundle."""
+        widget = self.widget
+        widget.active_version_id = self.id
+        widget.code = self.code
+        widget.data_file = self.data_file
+        widget.compiled_code = self.compiled_code
+        widget.dependencies = self.dependencies
+        widget.last_modified_at = datetime.utcnow()
+
+
+class WidgetJob(Base):
+    """A background widget improvement or initiation job, visible to every worker process."""
+
+    __tablename__ = "widget_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)  # 'improve' or 'initiate'
+    status: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    progress: Mapped[Optional[str]] = mapped_column(Text)
+    result: Mapped[Optional[str]] = mapped_column(Text)  # JSON-encoded
+    error: Mapped[Optional[str]] = mapped_column(Text)
+
+    author_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"))
+    widget_slug: Mapped[Optional[str]] = mapped_column(String)
+    widget_title: Mapped[Optional[str]] = mapped_column(String)
+    details: Mapped[Optional[str]] = mapped_column(Text)  # JSON-encoded request data
+
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True)
+    accessed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
@@ -0,0 +1,206 @@
+"""Full-text index for quote search.
+
+SQLite uses an external-content FTS5 table (``quotes_fts``) kept in sync with
+``quotes`` by AFTER INSERT/UPDATE/DELETE triggers. PostgreSQL uses a generated
+``search_vector`` tsvector column with a GIN index, which the database keeps
+current by itself. Both are created by :func:`ensure_quote_search_index` during
+schema upgrade; when neither is available (e.g. SQLite built without FTS5),
+searches fall back to substring matching. Both indexes split words on spaces,
+so queries in scripts written without them (Chinese, Japanese, Korean, Thai)
+also use substring matching.
+"""
+
+import re
+import weakref
+from typing import List, Optional
+
+from sqlalchemy import Float, Integer, func, literal_column, or_, text
+from sqlalchemy.orm import Query
+
+from common.base.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+BACKEND_FTS5 = "fts5"
+BACKEND_TSVECTOR = "tsvector"
+BACKEND_LIKE = "like"
+
+# Column weights for ranking: quote text, original author, source, commentary
+_FTS5_WEIGHTS = "10.0, 5.0, 5.0, 1.0"
+
+# Thai, Hiragana/Katakana, CJK ideographs, Hangul and CJK compatibility ideographs:
+# a whole unspaced phrase is one index token, so a word inside it never matches
+_UNSPACED_SCRIPT = re.compile(
+    r"[\u0e00-\u0e7f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+)
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS quotes_fts USING fts5("
+    "text, original_author, source, commentary, "
+    "content='quotes', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS quotes_fts_ai AFTER INSERT ON quotes BEGIN "
+    "INSERT INTO quotes_fts(rowid, text, original_author, source, commentary) "
+    "VALUES (new.id, new.text, new.original_author, new.source, new.commentary); END",
+    "CREATE TRIGGER IF NOT EXISTS quotes_fts_ad AFTER DELETE ON quotes BEGIN "
+    "INSERT INTO quotes_fts(quotes_fts, rowid, text, original_author, source, commentary) "
+    "VALUES ('delete', old.id, old.text, old.original_author, old.source, old.commentary); END",
+    "CREATE TRIGGER IF NOT EXISTS quotes_fts_au AFTER UPDATE ON quotes BEGIN "
+    "INSERT INTO quotes_fts(quotes_fts, rowid, text, original_author, source, commentary) "
+    "VALUES ('delete', old.id, old.text, old.original_author, old.source, old.commentary); "
+    "INSERT INTO quotes_fts(rowid, text, original_author, source, commentary) "
+    "VALUES (new.id, new.text, new.original_author, new.source, new.commentary); END",
+]
+
+_POSTGRES_DDL = [
+    "ALTER TABLE quotes ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(text, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(original_author, '') || ' ' || "
+    "coalesce(source, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(commentary, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_quotes_search_vector ON quotes USING GIN (search_vector)",
+]
+
+# Backend per engine, recorded at schema upgrade or detected on first search
+_backends: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def ensure_quote_search_index(conn) -> str:
+    """
+    Create the full-text index for the connection's database if missing.
+
+    A newly created FTS5 table is populated from existing quotes.
+
+    :param conn: SQLAlchemy connection (committed by the caller)
+    :return: Backend name now in use
+    """
+    dialect = conn.dialect.name
+    try:
+        if dialect == "postgresql":
+            for stmt in _POSTGRES_DDL:
+                conn.execute(text(stmt))
+            backend = BACKEND_TSVECTOR
+        elif dialect == "sqlite":
+            existed = _sqlite_index_exists(conn)
+            for stmt in _SQLITE_DDL:
+                conn.execute(text(stmt))
+            if not existed:
+                conn.execute(text("INSERT INTO quotes_fts(quotes_fts) VALUES ('rebuild')"))
+            backend = BACKEND_FTS5
+        else:
+            backend = BACKEND_LIKE
+    except Exception as e:
+        logger.warning(f"Quote full-text index unavailable, using substring search: {e}")
+        conn.rollback()
+        backend = BACKEND_LIKE
+
+    _backends[conn.engine] = backend
+    return backend
+
+
+def rebuild_quote_search_index(conn) -> str:
+    """
+    Rebuild the full-text index from the quotes table.
+
+    :param conn: SQLAlchemy connection (committed by the caller)
+    :return: Backend that was rebuilt
+    """
+    backend = ensure_quote_search_index(conn)
+    if backend == BACKEND_FTS5:
+        conn.execute(text("INSERT INTO quotes_fts(quotes_fts) VALUES ('rebuild')"))
+        conn.execute(text("INSERT INTO quotes_fts(quotes_fts) VALUES ('optimize')"))
+    elif backend == BACKEND_TSVECTOR:
+        conn.execute(text("REINDEX INDEX ix_quotes_search_vector"))
+    return backend
+
+
+def quote_search_backend(db_session) -> str:
+    """
+    Backend available for the session's database.
+
+    :param db_session: SQLAlchemy session
+    :return: One of BACKEND_FTS5, BACKEND_TSVECTOR or BACKEND_LIKE
+    """
+    engine = db_session.get_bind()
+    backend = _backends.get(engine)
+    if backend is None:
+        if engine.dialect.name == "postgresql":
+            backend = BACKEND_TSVECTOR
+        elif engine.dialect.name == "sqlite" and _sqlite_index_exists(db_session.connection()):
+            backend = BACKEND_FTS5
+        else:
+            backend = BACKEND_LIKE
+        _backends[engine] = backend
+    return backend
+
+
+def _sqlite_index_exists(conn) -> bool:
+    return (
+        conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'quotes_fts'")
+        ).first()
+        is not None
+    )
+
+
+def search_terms(search_term: str) -> List[str]:
+    """
+    Split user input into word tokens, dropping full-text query syntax.
+
+    :param search_term: Raw search input
+    :return: List of word tokens
+    """
+    return re.findall(r"\w+", search_term or "")
+
+
+def apply_quote_search(query: Query, db_session, search_term: str) -> Optional[Query]:
+    """
+    Filter and rank a Quote query by a search term.
+
+    Every token must match (as a prefix) in text, original author, source or
+    commentary. Results are ordered best match first.
+
+    :param query: Query over Quote
+    :param db_session: SQLAlchemy session
+    :param search_term: Raw search input
+    :return: Filtered, ordered query, or None if the term has no searchable words
+    """
+    from models.models import Quote
+
+    terms = search_terms(search_term)
+    if not terms:
+        return None
+
+    backend = quote_search_backend(db_session)
+    if _UNSPACED_SCRIPT.search(search_term):
+        backend = BACKEND_LIKE
+    if backend == BACKEND_FTS5:
+        match = " ".join(f'"{term}"*' for term in terms)
+        matches = (
+            text(
+                f"SELECT rowid AS id, bm25(quotes_fts, {_FTS5_WEIGHTS}) AS rank "
+                "FROM quotes_fts WHERE quotes_fts MATCH :match"
+            )
+            .bindparams(match=match)
+            .columns(id=Integer, rank=Float)
+            .subquery("quote_matches")
+        )
+        return query.join(matches, matches.c.id == Quote.id).order_by(
+            matches.c.rank, Quote.created_at.desc()
+        )
+
+    if backend == BACKEND_TSVECTOR:
+        vector = literal_column("quotes.search_vector")
+        tsquery = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+        return query.filter(vector.op("@@")(tsquery)).order_by(
+            func.ts_rank(vector, tsquery).desc(), Quote.created_at.desc()
+        )
+
+    pattern = f"%{search_term}%"
+    return query.filter(
+        or_(
+            Quote.text.ilike(pattern),
+            Quote.original_author.ilike(pattern),
+            Quote.source.ilike(pattern),
+            Quote.commentary.ilike(pattern),
+        )
+    ).order_by(Quote.created_at.desc())
@@ -10,14 +10,14 @@ This module handles all quote-related functionality including:
 
 from typing import List, Dict, Optional, Tuple, Any, Union
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, lazyload
 from logging import getLogger
 
 from common.llm.openai_client import DEFAULT_MODEL, generate_chat
 from common.llm.telemetry import LLMUsage
 from common.llm.types import Schema, SchemaProperty
-from models.models import Email, Quote
+from models.models import Email, Quote, quote_content_hash
+from models.quote_search import apply_quote_search
 
 logger = getLogger(__name__)
 
@@ -30,6 +30,9 @@ QUOTE_TYPES = {
     "technical": "Technical or scientific statements",
 }
 
+# Quotes per page of search results
+QUOTE_SEARCH_PAGE_SIZE = 50
+
 
 class QuoteExtractionError(Exception):
     """Raised when quote extraction fails"""
@@ -310,6 +313,10 @@ def save_quotes(quotes: List[Dict], message: Email, db_session: Session) -> None
     """
     Save extracted quotes to database and associate with message.
 
+    Quotes are deduplicated by content hash: all candidate hashes are resolved
+    in one indexed IN query, and only quotes not already stored (or pending in
+    this session) are inserted.
+
     Args:
         quotes: List of quote dictionaries
         message: Email object to associate quotes with
@@ -319,39 +326,56 @@ def save_quotes(quotes: List[Dict], message: Email, db_session: Session) -> None
         QuoteValidationError: If quote validation fails
     """
     try:
+        candidates = []
         for quote_data in quotes:
             # Validate quote data
             is_valid, error = validate_quote(quote_data)
             if not is_valid:
                 raise QuoteValidationError(error)
-
-            # Check for existing identical quote. Suppress autoflush: this runs
-            # mid-render from generate_html, while the owning Email is pending
-            # in the session with its NOT NULL processed_content still unset,
-            # and a query-invoked flush would fail on that constraint.
-            with db_session.no_autoflush:
-                existing_quote = (
-                    db_session.query(Quote).filter(Quote.text == quote_data["text"]).first()
+            candidates.append((quote_content_hash(quote_data["text"]), quote_data))
+
+        if not candidates:
+            return
+
+        # Look up existing quotes. Suppress autoflush: this runs after rendering
+        # from generate_html, while the owning Email may be pending in the session
+        # with its NOT NULL processed_content still unset, and a query-invoked
+        # flush would fail on that constraint.
+        hashes = {digest for digest, _ in candidates}
+        with db_session.no_autoflush:
+            known = {
+                quote.content_hash: quote
+                for quote in db_session.query(Quote)
+                .options(lazyload(Quote.emails))
+                .filter(Quote.content_hash.in_(hashes))
+            }
+        # Quotes added earlier in this session are not flushed yet
+        for pending in db_session.new:
+            if isinstance(pending, Quote):
+                known.setdefault(pending.content_hash or quote_content_hash(pending.text), pending)
+
+        linked = {id(quote) for quote in message.quotes}
+        for digest, quote_data in candidates:
+            quote = known.get(digest)
+            if quote is None:
+                # Create new quote
+                quote = Quote(
+                    text=quote_data["text"],
+                    content_hash=digest,
+                    quote_type=quote_data.get("quote_type", "personal"),
+                    original_author=quote_data.get("original_author"),
+                    source=quote_data.get("source"),
+                    date=quote_data.get("date"),
+                    commentary=quote_data.get("commentary"),
+                    author=message.author,
+                    channel=message.channel,
                 )
+                db_session.add(quote)
+                known[digest] = quote
 
-            if existing_quote:
-                message.quotes.append(existing_quote)
-                continue
-
-            # Create new quote
-            quote = Quote(
-                text=quote_data["text"],
-                quote_type=quote_data.get("quote_type", "personal"),
-                original_author=quote_data.get("original_author"),
-                source=quote_data.get("source"),
-                date=quote_data.get("date"),
-                commentary=quote_data.get("commentary"),
-                author=message.author,
-                channel=message.channel,
-            )
-
-            message.quotes.append(quote)
-            db_session.add(quote)
+            if id(quote) not in linked:
+                message.quotes.append(quote)
+                linked.add(id(quote))
 
     except Exception as e:
         logger.error(f"Failed to save quotes: {str(e)}")
@@ -380,37 +404,39 @@ def get_quotes_by_type(db_session: Session, quote_type: Optional[str] = None) ->
 
 
 def search_quotes(
-    db_session: Session, search_term: str, quote_type: Optional[str] = None
-) -> List[Quote]:
+    db_session: Session,
+    search_term: str,
+    quote_type: Optional[str] = None,
+    page: int = 1,
+    per_page: int = QUOTE_SEARCH_PAGE_SIZE,
+) -> Tuple[List[Quote], bool]:
     """
-    Search quotes by text content and metadata.
+    Search quotes by text content and metadata using the full-text index.
 
     Args:
         db_session: SQLAlchemy session
         search_term: Term to search for
         quote_type: Optional type to filter by
+        page: 1-based page number
+        per_page: Results per page
 
     Returns:
-        List of matching Quote objects
+        Tuple of (matching Quote objects, best match first; whether more pages exist)
     """
-    query = db_session.query(Quote)
-
-    # Build search conditions
-    conditions = [
-        Quote.text.ilike(f"%{search_term}%"),
-        Quote.original_author.ilike(f"%{search_term}%"),
-        Quote.source.ilike(f"%{search_term}%"),
-        Quote.commentary.ilike(f"%{search_term}%"),
-    ]
-
-    query = query.filter(or_(*conditions))
+    if quote_type and quote_type not in QUOTE_TYPES:
+        raise ValueError(f"Invalid quote type: {quote_type}")
 
+    query = db_session.query(Quote)
     if quote_type:
-        if quote_type not in QUOTE_TYPES:
-            raise ValueError(f"Invalid quote type: {quote_type}")
         query = query.filter(Quote.quote_type == quote_type)
 
-    return query.order_by(Quote.created_at.desc()).all()
+    query = apply_quote_search(query, db_session, search_term)
+    if query is None:
+        return [], False
+
+    # Get one extra to check if there are more
+    quotes = query.offset((max(page, 1) - 1) * per_page).limit(per_page + 1).all()
+    return quotes[:per_page], len(quotes) > per_page
 
 
 def update_quote(db_session: Session, quote_id: int, quote_data: Dict) -> Optional[Quote]:
@@ -426,7 +452,7 @@ def update_quote(db_session: Session, quote_id: int, quote_data: Dict) -> Option
         Updated Quote object or None if not found
 
     Raises:
-        QuoteValidationError: If quote data is invalid
+        QuoteValidationError: If quote data is invalid or the text duplicates another quote
     """
     quote = db_session.query(Quote).get(quote_id)
     if not quote:
@@ -437,6 +463,19 @@ def update_quote(db_session: Session, quote_id: int, quote_data: Dict) -> Option
     if not is_valid:
         raise QuoteValidationError(error)
 
+    # Each text is stored once; refuse an edit that would duplicate another quote
+    new_text = quote_data.get("text", quote.text)
+    digest = quote_content_hash(new_text)
+    if digest != quote.content_hash:
+        with db_session.no_autoflush:
+            duplicate = (
+                db_session.query(Quote.id)
+                .filter(Quote.content_hash == digest, Quote.id != quote.id)
+                .first()
+            )
+        if duplicate:
+            raise QuoteValidationError(f"Quote {duplicate.id} already has this text")
+
     # Update fields
     quote.text = quote_data.get("text", quote.text)
     quote.quote_type = quote_data.get("quote_type", quote.quote_type)
@@ -1,20 +1,30 @@
 """User-related database functions."""
 
+import hashlib
 import json
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, FrozenSet, Tuple
 
+from flask import g, has_app_context
 from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 from models.database import db
 from models.models import User
 from common.base.logging_config import get_logger
+from common.cache import LRUCache
 from common.config.channel_config import get_channel_manager
 from common.config.user_config import get_user_config_manager
 
 logger = get_logger(__name__)
 
+# Seconds a resolved channel-access set is reused across requests for the same
+# user and access version. Grants and preference changes alter the version, so
+# the TTL only bounds how long a channel configuration reload takes to apply.
+CHANNEL_ACCESS_TTL = 30.0
+CHANNEL_ACCESS_CACHE_SIZE = 1024
+
 
 def is_user_admin(email: str) -> bool:
     """Check if a user is an admin based on their email."""
@@ -81,6 +91,125 @@ def check_admin_approval(user_id: int, channel: str) -> bool:
         return channel in access
 
 
+@dataclass(frozen=True)
+class ChannelAccess:
+    """Channels one viewer may see, resolved once from the loaded user row."""
+
+    # Channels passing system restrictions, in configuration order
+    system: Tuple[str, ...]
+    # The subset also enabled in the user's channel preferences
+    preferred: Tuple[str, ...]
+    _system_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    _preferred_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_system_set", frozenset(self.system))
+        object.__setattr__(self, "_preferred_set", frozenset(self.preferred))
+
+    def allowed(self, ignore_preferences: bool = False) -> List[str]:
+        """
+        List accessible channels in configuration order.
+
+        :param ignore_preferences: If True, only apply system restrictions
+        :return: List of channel names
+        """
+        return list(self.system if ignore_preferences else self.preferred)
+
+    def can_access(self, channel: str, ignore_preferences: bool = False) -> bool:
+        """
+        Check a single channel against the resolved sets.
+
+        :param channel: Channel name
+        :param ignore_preferences: If True, only apply system restrictions
+        :return: True if the channel is accessible
+        """
+        return channel in (self._system_set if ignore_preferences else self._preferred_set)
+
+
+_access_cache = LRUCache(maxsize=CHANNEL_ACCESS_CACHE_SIZE, ttl=CHANNEL_ACCESS_TTL)
+
+
+def _load_json_column(user: User, column: str) -> Dict[str, Any]:
+    try:
+        value = json.loads(getattr(user, column) or "{}")
+    except (TypeError, json.JSONDecodeError):
+        logger.error(f"Invalid {column} for user {user.id}")
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def channel_access_version(user: Optional[User]) -> Tuple:
+    """
+    Key identifying everything about a user that affects channel access.
+
+    :param user: Optional User model instance
+    :return: Hashable key; changes whenever email, preferences or grants change
+    """
+    if not user:
+        return ("anonymous",)
+    digest = hashlib.sha256(
+        f"{user.email or ''}|{user.channel_preferences or ''}|{user.admin_channel_access or ''}".encode()
+    ).hexdigest()[:16]
+    return (user.id, digest)
+
+
+def _compute_channel_access(user: Optional[User]) -> ChannelAccess:
+    channel_manager = get_channel_manager()
+    email = user.email if user else None
+    grants = _load_json_column(user, "admin_channel_access") if user else {}
+    prefs = _load_json_column(user, "channel_preferences") if user else {}
+
+    system = []
+    preferred = []
+    for channel in channel_manager.get_channel_names():
+        if not channel_manager.check_system_access(
+            channel, email=email, has_admin_access=channel in grants
+        ):
+            continue
+        system.append(channel)
+        if not user or prefs.get(channel, True):
+            preferred.append(channel)
+    return ChannelAccess(system=tuple(system), preferred=tuple(preferred))
+
+
+def resolve_channel_access(user: Optional[User] = None) -> ChannelAccess:
+    """
+    Resolve the channels a user may access, at most once per request.
+
+    Uses only columns already loaded on the user, so no database session is
+    opened. Inside an application context the result is memoized on ``g``;
+    it is also shared across requests for CHANNEL_ACCESS_TTL seconds, keyed by
+    user id and :func:`channel_access_version`.
+
+    :param user: Optional User model instance
+    :return: Resolved ChannelAccess
+    """
+    if not has_app_context():
+        return _compute_channel_access(user)
+
+    key = channel_access_version(user)
+    per_request = g.setdefault("_channel_access", {})
+    access = per_request.get(key)
+    if access is not None:
+        return access
+
+    channel_manager = get_channel_manager()
+    entry = _access_cache.get(key)
+    if entry and entry[0] is channel_manager:
+        access = entry[1]
+    if access is None:
+        access = _compute_channel_access(user)
+        _access_cache.put(key, (channel_manager, access))
+
+    per_request[key] = access
+    return access
+
+
+def clear_channel_access_cache() -> None:
+    """Drop every process-wide resolved channel-access entry."""
+    _access_cache.clear()
+
+
 def check_channel_access(
     channel: str, user: Optional[User] = None, ignore_preferences: bool = False
 ) -> bool:
@@ -101,10 +230,13 @@ def check_channel_access(
         logger.error(f"No configuration found for channel {channel}")
         return False
 
+    if has_app_context():
+        return resolve_channel_access(user).can_access(channel, ignore_preferences)
+
     # First check system access restrictions
-    has_admin_access = bool(user and check_admin_approval(user.id, channel))
+    grants = _load_json_column(user, "admin_channel_access") if user else {}
     system_access = channel_manager.check_system_access(
-        channel, email=user.email if user else None, has_admin_access=has_admin_access
+        channel, email=user.email if user else None, has_admin_access=channel in grants
     )
 
     if not system_access:
@@ -115,12 +247,7 @@ def check_channel_access(
         return True
 
     # Check user's channel preferences
-    try:
-        prefs = json.loads(user.channel_preferences or "{}")
-        return prefs.get(channel, True)  # Default to enabled if not set
-    except json.JSONDecodeError:
-        logger.error(f"Invalid channel preferences for user {user.id}")
-        return True
+    return _load_json_column(user, "channel_preferences").get(channel, True)
 
 
 def get_user_allowed_channels(
@@ -133,12 +260,7 @@ def get_user_allowed_channels(
     :param ignore_preferences: If True, only check system restrictions
     :return: List of accessible channel names
     """
-    allowed = []
-    channel_manager = get_channel_manager()
-    for channel in channel_manager.get_channel_names():
-        if check_channel_access(channel, user, ignore_preferences):
-            allowed.append(channel)
-    return allowed
+    return resolve_channel_access(user).allowed(ignore_preferences)
 
 
 def grant_channel_access_by_id(db_session: Session, user_id: int, channel: str) -> bool:
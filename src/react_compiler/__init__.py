@@ -1,5 +1,31 @@
 """React Compiler - Compiles React components for Atacama widgets."""
 
+from .build_cache import BuildCache, get_build_cache
+from .bundler_daemon import (
+    BundlerDaemon,
+    BundlerDaemonError,
+    BundlerDaemonPool,
+    get_bundler_pool,
+    set_bundler_pool_size,
+)
+from .hooks import HookLibrary, get_hook_library
 from .react_compiler import WidgetBuilder
+from .registry import get_widget_builder
+from .workspace import ToolchainWorkspace, WorkspaceInstallError, WorkspaceMissingError
 
-__all__ = ["WidgetBuilder"]
+__all__ = [
+    "WidgetBuilder",
+    "get_widget_builder",
+    "HookLibrary",
+    "get_hook_library",
+    "BuildCache",
+    "get_build_cache",
+    "BundlerDaemon",
+    "BundlerDaemonError",
+    "BundlerDaemonPool",
+    "get_bundler_pool",
+    "set_bundler_pool_size",
+    "ToolchainWorkspace",
+    "WorkspaceInstallError",
+    "WorkspaceMissingError",
+]
@@ -0,0 +1,222 @@
+"""Content-addressed cache of built widget bundles.
+
+A bundle is fully determined by the widget source, the hooks inlined into it,
+its dependency set, the rendered webpack config and the installed toolchain.
+The cache key hashes all of these, so an identical build - including rebuilding
+a restored WidgetVersion - returns the stored bundle without running webpack.
+Entries live on disk under ``DATA_DIR`` so every worker process shares them; the
+least recently used ones are evicted once the cache exceeds its size bound.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional
+
+import constants
+from common.base.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Total bytes of bundles kept on disk
+BUILD_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Bump to invalidate every entry when the wrapper code around bundles changes
+BUILD_CACHE_FORMAT = 1
+
+_SUFFIX = ".js"
+
+
+def normalize_source(code: Optional[str]) -> str:
+    """
+    Normalize source so insignificant differences share a cache entry.
+
+    :param code: Widget or data file source
+    :return: Source with LF line endings and no trailing whitespace at the end
+    """
+    return (code or "").replace("\r\n", "\n").replace("\r", "\n").rstrip()
+
+
+def build_key(
+    widget_code: str,
+    widget_name: str,
+    hooks: Dict[str, str],
+    dependencies: Iterable[str],
+    external_dependencies: Iterable[str],
+    development_mode: bool,
+    data_file: Optional[str],
+    webpack_config: str,
+    toolchain: str,
+) -> str:
+    """
+    Hash everything that determines a built bundle.
+
+    :param widget_code: Widget source
+    :param widget_name: Component name the bundle exports
+    :param hooks: Built-in hooks inlined into the widget, name -> source
+    :param dependencies: Bundled dependencies
+    :param external_dependencies: Dependencies left external
+    :param development_mode: Whether webpack runs in development mode
+    :param data_file: Optional data file source
+    :param webpack_config: Rendered webpack.config.js, covering externals and loader options
+    :param toolchain: Fingerprint of the installed toolchain
+    :return: Hex sha256 cache key
+    """
+    material = {
+        "format": BUILD_CACHE_FORMAT,
+        "code": normalize_source(widget_code),
+        "name": widget_name,
+        "hooks": {name: normalize_source(source) for name, source in sorted(hooks.items())},
+        "dependencies": sorted(set(dependencies)),
+        "external": sorted(set(external_dependencies)),
+        "mode": "development" if development_mode else "production",
+        "data_file": normalize_source(data_file) if data_file else None,
+        "webpack_config": webpack_config,
+        "toolchain": toolchain,
+    }
+    canonical = json.dumps(material, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _record(result: str, size_bytes: Optional[int] = None) -> None:
+    try:
+        from atacama.blueprints.metrics import record_widget_build_cache
+
+        record_widget_build_cache(result, size_bytes)
+    except ImportError:
+        pass  # Metrics not available
+
+
+class BuildCache:
+    """Size-bounded, on-disk LRU cache of widget bundles keyed by build_key."""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = BUILD_CACHE_MAX_BYTES):
+        """
+        :param root: Cache directory (default: DATA_DIR/widget_build_cache)
+        :param max_bytes: Evict least recently used bundles beyond this total size
+        """
+        self.root = root or os.path.join(constants.DATA_DIR, "widget_build_cache")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a bundle, marking it recently used.
+
+        :param key: Cache key from build_key
+        :return: Cached bundle, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                code = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            code = None
+
+        with self._lock:
+            if code is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        _record("miss" if code is None else "hit")
+        return code
+
+    def put(self, key: str, code: str) -> None:
+        """
+        Store a bundle, then evict old entries if the cache is over its bound.
+
+        :param key: Cache key from build_key
+        :param code: Built bundle
+        """
+        os.makedirs(self.root, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(code)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._evict(keep=key)
+
+    def _entries(self):
+        entries = []
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(_SUFFIX) or name.startswith("."):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.root, name))
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def size_bytes(self) -> int:
+        """
+        :return: Total size of cached bundles
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep: str) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            if name == keep + _SUFFIX:
+                continue
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+            logger.info(f"Evicted {evicted} widget bundles from the build cache")
+        _record("store", total)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: Hit, miss and eviction counts for this process, plus current size
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size_bytes": self.size_bytes(),
+            }
+
+
+_default_cache: Optional[BuildCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_build_cache() -> BuildCache:
+    """
+    Process-wide build cache under DATA_DIR.
+
+    :return: Shared BuildCache instance
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = BuildCache()
+        return _default_cache
@@ -0,0 +1,92 @@
+// Resident webpack compiler for widget builds.
+//
+// Started by react_compiler/bundler_daemon.py, one process per build worker, with
+// the workspace's node_modules as its only argument. webpack, Babel and the
+// loaders are required once and stay warm; each build is a JSON request on
+// stdin naming a prepared build directory:
+//
+//   {"id": 1, "dir": "/tmp/widget_builds/abc", "mode": "production"}
+//
+// and gets one JSON line back on stdout:
+//
+//   {"id": 1, "ok": true, "errors": ""}
+//
+// Requests are compiled one at a time, in order.
+
+'use strict';
+
+const path = require('path');
+const readline = require('readline');
+
+// stdout carries the protocol; send stray logging to stderr
+console.log = console.error;
+console.info = console.error;
+
+function send(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+const nodeModules = process.argv[2];
+let webpack;
+try {
+    webpack = require(path.join(nodeModules, 'webpack'));
+    // Load the loader chain now rather than on the first build
+    for (const name of ['babel-loader', '@babel/core', '@babel/preset-env', '@babel/preset-react']) {
+        try {
+            require(path.join(nodeModules, name));
+        } catch (e) {
+            // Resolved again by webpack at build time; a real problem surfaces there
+        }
+    }
+} catch (e) {
+    send({ ready: false, error: String(e && e.message || e) });
+    process.exit(1);
+}
+
+function compile(request) {
+    return new Promise(resolve => {
+        const finish = errors => resolve({ id: request.id, ok: !errors, errors: errors || '' });
+        let compiler;
+        try {
+            const configPath = path.join(request.dir, 'webpack.config.js');
+            delete require.cache[require.resolve(configPath)];
+            const config = require(configPath);
+            config.context = request.dir;
+            config.mode = request.mode || config.mode;
+            compiler = webpack(config);
+        } catch (e) {
+            finish(String(e && e.stack || e));
+            return;
+        }
+        compiler.run((err, stats) => {
+            let errors = '';
+            if (err) {
+                errors = String(err.stack || err);
+            } else if (stats.hasErrors()) {
+                errors = stats.toJson({ all: false, errors: true }).errors
+                    .map(error => error.message || String(error))
+                    .join('\n');
+            }
+            compiler.close(() => finish(errors));
+        });
+    });
+}
+
+let pending = Promise.resolve();
+const input = readline.createInterface({ input: process.stdin });
+input.on('line', line => {
+    if (!line.trim()) {
+        return;
+    }
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (e) {
+        send({ id: null, ok: false, errors: 'Malformed request: ' + e.message });
+        return;
+    }
+    pending = pending.then(() => compile(request)).then(send);
+});
+input.on('close', () => pending.then(() => process.exit(0)));
+
+send({ ready: true, pid: process.pid });
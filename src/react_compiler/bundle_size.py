@@ -0,0 +1,82 @@
+"""Script weight a widget page loads: its bundle plus any whole-library globals.
+
+A widget whose dependencies stay external makes widget.html load each
+library's complete UMD file; a tree-shaken build carries only the exports it
+imports inside its own bundle. These helpers measure both so builds can report
+the size before and after.
+"""
+
+import gzip
+import os
+from typing import Dict, Iterable, Optional
+
+import constants
+
+# Locally vendored UMD globals loaded by widget.html, by package name
+THIRD_PARTY_GLOBAL_FILES = {
+    "recharts": "Recharts.js",
+    "lucide-react": "lucide-react.js",
+}
+
+THIRD_PARTY_JS_DIR = os.path.join(constants.SRC_DIR, "atacama", "js", "third_party")
+
+
+def _file_sizes(path: str) -> Optional[Dict[str, int]]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return {"bytes": len(data), "gzip_bytes": len(gzip.compress(data, mtime=0))}
+
+
+def page_script_size(
+    compiled_code: Optional[str], external_dependencies: Iterable[str]
+) -> Dict[str, int]:
+    """
+    Measure the widget-specific script a page view downloads.
+
+    React and ReactDOM are shared by every widget and not counted. External
+    dependencies served from a CDN rather than a vendored file are not measured.
+
+    :param compiled_code: Built widget bundle
+    :param external_dependencies: Packages loaded as page globals
+    :return: Dict with bundle_bytes, globals_bytes and total_bytes, plus gzip_*
+        variants of each
+    """
+    data = (compiled_code or "").encode("utf-8")
+    bundle = {"bytes": len(data), "gzip_bytes": len(gzip.compress(data, mtime=0))}
+    globals_size = {"bytes": 0, "gzip_bytes": 0}
+    for dep in set(external_dependencies):
+        filename = THIRD_PARTY_GLOBAL_FILES.get(dep)
+        sizes = _file_sizes(os.path.join(THIRD_PARTY_JS_DIR, filename)) if filename else None
+        if sizes:
+            globals_size["bytes"] += sizes["bytes"]
+            globals_size["gzip_bytes"] += sizes["gzip_bytes"]
+
+    return {
+        "bundle_bytes": bundle["bytes"],
+        "globals_bytes": globals_size["bytes"],
+        "total_bytes": bundle["bytes"] + globals_size["bytes"],
+        "gzip_bundle_bytes": bundle["gzip_bytes"],
+        "gzip_globals_bytes": globals_size["gzip_bytes"],
+        "gzip_total_bytes": bundle["gzip_bytes"] + globals_size["gzip_bytes"],
+    }
+
+
+def describe_size_change(before: Dict[str, int], after: Dict[str, int]) -> str:
+    """
+    Summarize two page_script_size results.
+
+    :param before: Size of the previous build
+    :param after: Size of the new build
+    :return: e.g. "980.2 KB -> 61.4 KB (gzip 281.0 KB -> 19.8 KB)"
+    """
+
+    def kb(value: int) -> str:
+        return f"{value / 1024:.1f} KB"
+
+    return (
+        f"{kb(before['total_bytes'])} -> {kb(after['total_bytes'])} "
+        f"(gzip {kb(before['gzip_total_bytes'])} -> {kb(after['gzip_total_bytes'])})"
+    )
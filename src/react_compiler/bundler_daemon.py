@@ -0,0 +1,322 @@
+"""Long-lived Node bundler process for widget builds.
+
+Running ``webpack`` as a subprocess pays Node startup, module loading and
+compiler initialization on every build. BundlerDaemon keeps a Node process
+(``bundle_server.js``) with webpack and Babel already loaded, and sends it
+compile requests over its stdin/stdout pipe. Each process compiles one build at
+a time, so BundlerDaemonPool keeps up to one daemon per build worker for each
+toolchain workspace and hands every compile an idle one. If a daemon cannot
+start or dies, WidgetBuilder falls back to the subprocess path.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from common.base.logging_config import get_logger
+from react_compiler.workspace import ToolchainWorkspace
+
+logger = get_logger(__name__)
+
+BUNDLE_SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bundle_server.js")
+
+# Seconds to wait for the daemon to load webpack and report ready
+DAEMON_START_TIMEOUT = 30.0
+
+# Seconds after a failed start before trying again
+DAEMON_RETRY_INTERVAL = 60.0
+
+# Daemons per toolchain workspace; init_build_service sets this to its worker count
+DAEMON_POOL_SIZE = 2
+
+DAEMON_ENV_VAR = "ATACAMA_WIDGET_DAEMON"
+
+
+class BundlerDaemonError(Exception):
+    """Raised when the bundler daemon cannot start or stops responding."""
+
+    pass
+
+
+def is_daemon_enabled() -> bool:
+    """
+    Check whether widget builds should use the resident bundler.
+
+    :return: False if ATACAMA_WIDGET_DAEMON is set to 0/false/no
+    """
+    return os.getenv(DAEMON_ENV_VAR, "").lower() not in ("0", "false", "no")
+
+
+class BundlerDaemon:
+    """A resident bundle_server.js process serving compile requests one at a time."""
+
+    def __init__(
+        self,
+        workspace: ToolchainWorkspace,
+        env: Optional[Dict[str, str]] = None,
+        node: str = "node",
+        start_timeout: float = DAEMON_START_TIMEOUT,
+    ):
+        """
+        :param workspace: Installed toolchain the daemon loads webpack from
+        :param env: Environment for the Node process
+        :param node: Node executable
+        :param start_timeout: Seconds to wait for the daemon to report ready
+        """
+        self.workspace = workspace
+        self.env = env
+        self.node = node
+        self.start_timeout = start_timeout
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._failed_at: Optional[float] = None
+        self.builds = 0
+
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _start(self) -> None:
+        """Start the Node process and wait for its ready line; called with the lock held."""
+        if self._failed_at is not None and time.time() - self._failed_at < DAEMON_RETRY_INTERVAL:
+            raise BundlerDaemonError("Bundler daemon failed to start recently")
+
+        logger.info(f"Starting widget bundler daemon for toolchain {self.workspace.key}")
+        try:
+            self._process = subprocess.Popen(
+                [self.node, BUNDLE_SERVER_SCRIPT, self.workspace.node_modules],
+                env=self.env,
+                cwd=self.workspace.path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+        except OSError as e:
+            self._failed_at = time.time()
+            raise BundlerDaemonError(f"Could not start bundler daemon: {e}")
+
+        self._responses = queue.Queue()
+        threading.Thread(
+            target=self._read_stdout, args=(self._process, self._responses), daemon=True
+        ).start()
+        threading.Thread(target=self._read_stderr, args=(self._process,), daemon=True).start()
+
+        ready = self._receive(self.start_timeout)
+        if not ready or not ready.get("ready"):
+            self._failed_at = time.time()
+            self._kill()
+            error = (ready or {}).get("error", "no ready message")
+            raise BundlerDaemonError(f"Bundler daemon did not start: {error}")
+        self._failed_at = None
+        logger.info(f"Widget bundler daemon ready (pid {ready.get('pid')})")
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, responses: "queue.Queue[Optional[dict]]") -> None:
+        for line in process.stdout:
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                logger.warning(f"Unexpected bundler daemon output: {line.rstrip()}")
+        responses.put(None)  # Process exited
+
+    @staticmethod
+    def _read_stderr(process: subprocess.Popen) -> None:
+        for line in process.stderr:
+            logger.debug(f"bundler daemon: {line.rstrip()}")
+
+    def _receive(self, timeout: Optional[float]) -> Optional[dict]:
+        try:
+            return self._responses.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _kill(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def compile(
+        self, build_dir: str, mode: str, timeout: Optional[float] = None
+    ) -> Tuple[bool, str]:
+        """
+        Compile a prepared build directory (webpack.config.js, src/, node_modules).
+
+        :param build_dir: Build directory
+        :param mode: "production" or "development"
+        :param timeout: Seconds, including the wait for this daemon's lock, before the
+                        build is abandoned and the daemon restarted
+        :return: Tuple of (success, webpack error output)
+        :raises BundlerDaemonError: If the daemon cannot start or exits mid-build
+        :raises subprocess.TimeoutExpired: If the build takes longer than timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise subprocess.TimeoutExpired(["bundle_server.js", build_dir], timeout)
+        try:
+            if not self.is_running():
+                self._start()
+
+            request_id = next(self._ids)
+            request = {"id": request_id, "dir": build_dir, "mode": mode}
+            try:
+                self._process.stdin.write(json.dumps(request) + "\n")
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self._kill()
+                raise BundlerDaemonError(f"Bundler daemon is not accepting requests: {e}")
+
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            response = self._receive(remaining)
+            if response is None:
+                exited = not self.is_running()
+                self._kill()  # A stuck compiler would block every later request
+                if exited:
+                    raise BundlerDaemonError("Bundler daemon exited during a build")
+                raise subprocess.TimeoutExpired(["bundle_server.js", build_dir], timeout)
+            if response.get("id") != request_id:
+                self._kill()
+                raise BundlerDaemonError(f"Bundler daemon answered out of order: {response}")
+
+            self.builds += 1
+            return bool(response.get("ok")), response.get("errors", "")
+        finally:
+            self._lock.release()
+
+    def stop(self) -> None:
+        """Shut the daemon down; the next compile starts it again."""
+        with self._lock:
+            if self._process is not None:
+                try:
+                    self._process.stdin.close()
+                    self._process.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+                self._kill()
+
+
+class BundlerDaemonPool:
+    """Up to ``size`` daemons for one toolchain workspace, each serving one build at a time."""
+
+    def __init__(
+        self,
+        workspace: ToolchainWorkspace,
+        env: Optional[Dict[str, str]] = None,
+        size: int = DAEMON_POOL_SIZE,
+    ):
+        """
+        :param workspace: Installed toolchain the daemons load webpack from
+        :param env: Environment for the Node processes
+        :param size: Most daemons to run, i.e. concurrent builds
+        """
+        self.workspace = workspace
+        self.env = env
+        self.size = max(1, size)
+        self._lock = threading.Lock()
+        self._daemons: List[BundlerDaemon] = []
+        # Most recently used first, so sequential builds keep reusing one warm daemon
+        self._idle: "queue.LifoQueue[BundlerDaemon]" = queue.LifoQueue()
+
+    @property
+    def builds(self) -> int:
+        return sum(daemon.builds for daemon in self._daemons)
+
+    def _acquire(self, timeout: Optional[float]) -> Optional[BundlerDaemon]:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._daemons) < self.size:
+                daemon = BundlerDaemon(self.workspace, env=self.env)
+                self._daemons.append(daemon)
+                return daemon
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def compile(
+        self, build_dir: str, mode: str, timeout: Optional[float] = None
+    ) -> Tuple[bool, str]:
+        """
+        Compile on an idle daemon, starting another if all are busy and the pool has room.
+
+        :param build_dir: Build directory
+        :param mode: "production" or "development"
+        :param timeout: Seconds, including the wait for an idle daemon, before the
+                        build is abandoned
+        :return: Tuple of (success, webpack error output)
+        :raises BundlerDaemonError: If the daemon cannot start or exits mid-build
+        :raises subprocess.TimeoutExpired: If no daemon frees up or the build takes too long
+        """
+        start = time.monotonic()
+        daemon = self._acquire(timeout)
+        if daemon is None:
+            raise subprocess.TimeoutExpired(["bundle_server.js", build_dir], timeout)
+        try:
+            remaining = None if timeout is None else max(timeout - (time.monotonic() - start), 0.0)
+            return daemon.compile(build_dir, mode, timeout=remaining)
+        finally:
+            # A failed daemon goes back too, so its retry interval still applies
+            self._idle.put(daemon)
+
+    def stop(self) -> None:
+        """Shut every daemon down; later compiles start them again."""
+        with self._lock:
+            daemons = list(self._daemons)
+        for daemon in daemons:
+            daemon.stop()
+
+
+_pools: Dict[str, BundlerDaemonPool] = {}
+_pools_lock = threading.Lock()
+_pool_size = DAEMON_POOL_SIZE
+
+
+def set_bundler_pool_size(size: int) -> None:
+    """
+    Set how many daemons each workspace may run, normally one per build worker.
+
+    :param size: Daemons per toolchain workspace
+    """
+    global _pool_size
+    with _pools_lock:
+        _pool_size = max(1, size)
+        for pool in _pools.values():
+            pool.size = _pool_size
+
+
+def get_bundler_pool(
+    workspace: ToolchainWorkspace, env: Optional[Dict[str, str]] = None
+) -> BundlerDaemonPool:
+    """
+    Process-wide daemon pool for a toolchain workspace, shared by all WidgetBuilders.
+
+    :param workspace: Installed toolchain workspace
+    :param env: Environment for the Node processes
+    :return: BundlerDaemonPool (daemons start on demand)
+    """
+    with _pools_lock:
+        pool = _pools.get(workspace.path)
+        if pool is None:
+            pool = _pools[workspace.path] = BundlerDaemonPool(workspace, env=env, size=_pool_size)
+        return pool
+
+
+@atexit.register
+def stop_bundler_daemons() -> None:
+    """Stop every daemon started by this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.stop()
@@ -0,0 +1,189 @@
+"""Built-in hooks that widgets may import from "./useFullscreen" and the like.
+
+The hook sources in ``react_compiler/js`` are read and transformed for inlining
+once per process rather than once per WidgetBuilder. File mtimes are checked
+(at most every HOOK_CHECK_INTERVAL seconds) so an edited hook is picked up
+without a restart.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import constants
+from common.base.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Hook name -> file in the hooks directory
+HOOK_FILES = {
+    "useFullscreen": "useFullscreen.js",
+    "useGlobalSettings": "useGlobalSettings.js",
+}
+
+# Seconds between mtime checks of the hook files
+HOOK_CHECK_INTERVAL = 2.0
+
+REACT_HOOKS_PREAMBLE = (
+    "// Access React hooks from the global React object\n"
+    "const { useState, useEffect, useRef, useCallback, useMemo } = React;\n\n"
+)
+
+
+def transform_hook_for_bundling(hook_code: str, hook_name: str, is_first_hook: bool = True) -> str:
+    """
+    Transform a hook's code to work properly when bundled.
+    Converts ES6 imports/exports to work within the webpack bundle.
+
+    :param hook_code: Original hook source code
+    :param hook_name: Name of the hook
+    :param is_first_hook: Whether this is the first hook being processed
+    :return: Transformed hook code
+    """
+    # Remove ES6 import statements and collect what was imported
+    import_pattern = r"import\s+(?:{([^}]+)}|(\w+))\s+from\s+['\"]([^'\"]+)['\"];"
+    imports_found = []
+
+    def replace_import(match):
+        if match.group(1):  # Named imports
+            imports_found.append((match.group(1), match.group(3)))
+        else:  # Default import
+            imports_found.append((match.group(2), match.group(3)))
+        return ""  # Remove the import line
+
+    code = re.sub(import_pattern, replace_import, hook_code)
+
+    # For hooks, we know they use React hooks, so we'll access them from React
+    # But only add the destructuring for the first hook to avoid duplicates
+    if "react" in str(imports_found).lower() and is_first_hook:
+        code = REACT_HOOKS_PREAMBLE + code
+
+    # Remove export statements and just ensure the hook is defined
+    # Handle: export const hookName = ...
+    code = re.sub(
+        r"export\s+const\s+" + re.escape(hook_name) + r"\s*=", f"const {hook_name} =", code
+    )
+    # Handle: export default hookName;
+    code = re.sub(r"export\s+default\s+" + re.escape(hook_name) + r";?", "", code)
+    # Handle: export { hookName };
+    code = re.sub(r"export\s*{\s*" + re.escape(hook_name) + r"\s*};?", "", code)
+
+    # Add a comment to indicate this is a built-in hook
+    return f"// Built-in hook: {hook_name}\n" + code
+
+
+def inline_hook_code(hook_code: str, hook_name: str) -> str:
+    """
+    Transform a hook for inlining after a shared React hooks preamble.
+
+    :param hook_code: Original hook source code
+    :param hook_name: Name of the hook
+    :return: Hook code without imports, exports or its own React destructuring
+    """
+    transformed = transform_hook_for_bundling(hook_code, hook_name, is_first_hook=False)
+    return re.sub(
+        r"//\s*Access React hooks from the global React object\s*\n\s*const\s*\{\s*[^}]+\s*\}\s*=\s*React;\s*\n+",
+        "",
+        transformed,
+    )
+
+
+class HookLibrary:
+    """Hook sources and their inlinable forms, reloaded when a file changes."""
+
+    def __init__(self, js_dir: Optional[str] = None, hook_files: Optional[Dict[str, str]] = None):
+        """
+        :param js_dir: Directory holding the hook files (default: REACT_COMPILER_JS_DIR)
+        :param hook_files: Hook name -> file name (default: HOOK_FILES)
+        """
+        self.js_dir = js_dir or constants.REACT_COMPILER_JS_DIR
+        self.hook_files = dict(hook_files or HOOK_FILES)
+        self._lock = threading.Lock()
+        self._mtimes: Dict[str, Optional[float]] = {}
+        self._sources: Dict[str, str] = {}
+        self._inline: Dict[str, str] = {}
+        self._checked_at = 0.0
+        self.loads = 0
+
+    def _stat(self) -> Dict[str, Optional[float]]:
+        mtimes = {}
+        for hook_name, filename in self.hook_files.items():
+            try:
+                mtimes[hook_name] = os.stat(os.path.join(self.js_dir, filename)).st_mtime_ns
+            except FileNotFoundError:
+                mtimes[hook_name] = None
+        return mtimes
+
+    def _load(self, hook_name: str) -> None:
+        path = os.path.join(self.js_dir, self.hook_files[hook_name])
+        try:
+            with open(path, "r") as f:
+                source = f.read()
+        except FileNotFoundError:
+            logger.warning(f"Hook file not found: {path}")
+            self._sources.pop(hook_name, None)
+            self._inline.pop(hook_name, None)
+            return
+        self._sources[hook_name] = source
+        self._inline[hook_name] = inline_hook_code(source, hook_name)
+        self.loads += 1
+        logger.info(f"Loaded built-in hook: {hook_name} from {self.hook_files[hook_name]}")
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Reload hooks whose files changed since they were last read.
+
+        :param force: Check mtimes even if checked within HOOK_CHECK_INTERVAL
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._mtimes and now - self._checked_at < HOOK_CHECK_INTERVAL:
+                return
+            self._checked_at = now
+            mtimes = self._stat()
+            for hook_name, mtime in mtimes.items():
+                if hook_name not in self._mtimes or self._mtimes[hook_name] != mtime:
+                    self._load(hook_name)
+            self._mtimes = mtimes
+
+    def sources(self) -> Dict[str, str]:
+        """
+        :return: Hook name -> original source, for hooks whose file exists
+        """
+        self.refresh()
+        with self._lock:
+            return dict(self._sources)
+
+    def inline_code(self, hook_name: str) -> Optional[str]:
+        """
+        :param hook_name: Hook name
+        :return: Pre-transformed code for inlining, or None if the hook is missing
+        """
+        self.refresh()
+        with self._lock:
+            return self._inline.get(hook_name)
+
+    def names(self) -> Tuple[str, ...]:
+        """
+        :return: Names of the available hooks, sorted
+        """
+        return tuple(sorted(self.sources()))
+
+
+_default_library: Optional[HookLibrary] = None
+_default_library_lock = threading.Lock()
+
+
+def get_hook_library() -> HookLibrary:
+    """
+    Process-wide hook library over REACT_COMPILER_JS_DIR.
+
+    :return: Shared HookLibrary instance
+    """
+    global _default_library
+    with _default_library_lock:
+        if _default_library is None:
+            _default_library = HookLibrary()
+        return _default_library
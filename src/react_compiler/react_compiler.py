@@ -7,8 +7,22 @@ import re
 from pathlib import Path
 from typing import Any, Dict, Tuple, List, Optional
 
-import constants
 from common.base.logging_config import get_logger
+from react_compiler.build_cache import BuildCache, build_key, get_build_cache
+from react_compiler.bundler_daemon import BundlerDaemonError, get_bundler_pool, is_daemon_enabled
+from react_compiler.hooks import (
+    REACT_HOOKS_PREAMBLE,
+    HookLibrary,
+    get_hook_library,
+    transform_hook_for_bundling,
+)
+from react_compiler.registry import SourceAnalysisCache, get_analysis_cache
+from react_compiler.workspace import (
+    ToolchainWorkspace,
+    WorkspaceInstallError,
+    WorkspaceMissingError,
+    is_offline_mode,
+)
 
 logger = get_logger(__name__)
 
@@ -43,100 +57,130 @@ class WidgetBuilder:
         "lucide-react": "LucideReact",
     }
 
-    def __init__(self, build_dir: Optional[str] = None):
+    # Large libraries bundled per widget, keeping only the exports it imports,
+    # instead of loading their whole UMD file as a page global
+    TREE_SHAKEN_PACKAGES = ("recharts", "lucide-react")
+
+    def __init__(
+        self,
+        build_dir: Optional[str] = None,
+        offline: Optional[bool] = None,
+        workspace_root: Optional[str] = None,
+        build_cache: Optional[BuildCache] = None,
+        use_cache: bool = True,
+        timeout: Optional[float] = None,
+        use_daemon: Optional[bool] = None,
+        tree_shake: bool = True,
+        hook_library: Optional[HookLibrary] = None,
+        analysis_cache: Optional[SourceAnalysisCache] = None,
+    ):
+        """
+        :param build_dir: Parent directory for per-build temp dirs
+        :param offline: Never run npm install; defaults to ATACAMA_WIDGET_OFFLINE
+        :param workspace_root: Directory holding shared toolchain workspaces
+        :param build_cache: Bundle cache to use (default: the process-wide cache)
+        :param use_cache: Set False to always run webpack
+        :param timeout: Seconds before a webpack run is killed (None for no limit)
+        :param use_daemon: Compile through the resident bundler daemon, falling back to
+            a webpack subprocess; defaults to ATACAMA_WIDGET_DAEMON (on unless disabled)
+        :param tree_shake: Bundle TREE_SHAKEN_PACKAGES into each widget instead of
+            leaving them external
+        :param hook_library: Built-in hooks (default: the process-wide library)
+        :param analysis_cache: Cache of source analysis (default: the process-wide cache)
+        """
         self.build_dir = build_dir or os.path.join(tempfile.gettempdir(), "widget_builds")
         Path(self.build_dir).mkdir(parents=True, exist_ok=True)
-
-        # Load built-in hooks from files
-        self.BUILT_IN_HOOKS = self._load_built_in_hooks()
-
-    def _load_built_in_hooks(self) -> Dict[str, str]:
+        self.offline = is_offline_mode() if offline is None else offline
+        self.workspace = ToolchainWorkspace(self.AVAILABLE_PACKAGES, root=workspace_root)
+        if not use_cache:
+            self.build_cache = None
+        else:
+            self.build_cache = build_cache if build_cache is not None else get_build_cache()
+        self.timeout = timeout
+        self.use_daemon = is_daemon_enabled() if use_daemon is None else use_daemon
+        self.tree_shake = tree_shake
+        self.hooks = hook_library if hook_library is not None else get_hook_library()
+        self.analysis = analysis_cache if analysis_cache is not None else get_analysis_cache()
+
+    @property
+    def BUILT_IN_HOOKS(self) -> Dict[str, str]:
+        """Hook name -> source of the built-in hooks, reloaded when a hook file changes."""
+        return self.hooks.sources()
+
+    def warm_up(self) -> str:
         """
-        Load built-in hooks from the react_compiler directory.
+        Install the shared toolchain workspace if it is not installed yet.
 
-        :return: Dictionary mapping hook names to their source code
+        :return: Path to the workspace's node_modules
+        :raises WorkspaceInstallError: If npm install fails
         """
-        hooks = {}
+        return self.workspace.ensure(offline=False, env=env)
 
-        # Define hook file mappings
-        hook_files = {
-            "useFullscreen": "useFullscreen.js",
-            "useGlobalSettings": "useGlobalSettings.js",
-        }
+    def _run_webpack(self, build_dir: str, mode: str) -> Tuple[bool, str]:
+        """
+        Compile a prepared build directory.
 
-        # Get the directory where this file is located
-        react_compiler_dir = Path(constants.REACT_COMPILER_JS_DIR)
+        Uses a warm bundler daemon when enabled and falls back to running
+        webpack as a subprocess if the daemon is unavailable.
 
-        for hook_name, filename in hook_files.items():
-            hook_file_path = react_compiler_dir / filename
+        :param build_dir: Directory with webpack.config.js, src/ and node_modules
+        :param mode: "production" or "development"
+        :return: Tuple of (success, error output)
+        :raises subprocess.TimeoutExpired: If the build exceeds self.timeout
+        """
+        if self.use_daemon:
             try:
-                if hook_file_path.exists():
-                    with open(hook_file_path, "r") as f:
-                        hooks[hook_name] = f.read()
-                    logger.info(f"Loaded built-in hook: {hook_name} from {filename}")
-                else:
-                    logger.warning(f"Hook file not found: {hook_file_path}")
-            except Exception as e:
-                logger.error(f"Error loading hook {hook_name} from {filename}: {e}")
-
-        return hooks
+                pool = get_bundler_pool(self.workspace, env=env)
+                return pool.compile(build_dir, mode, timeout=self.timeout)
+            except BundlerDaemonError as e:
+                logger.warning(f"Bundler daemon unavailable, running webpack directly: {e}")
+
+        result = subprocess.run(
+            [self.workspace.bin_path("webpack"), "--mode", mode],
+            env=env,
+            cwd=build_dir,
+            capture_output=True,
+            text=True,
+            timeout=self.timeout,
+        )
+        if result.returncode != 0:
+            logger.info(f"Build output: {result.stdout}")
+        return result.returncode == 0, result.stderr
 
     def _transform_hook_for_bundling(
         self, hook_code: str, hook_name: str, is_first_hook: bool = True
     ) -> str:
         """
         Transform a hook's code to work properly when bundled.
-        Converts ES6 imports/exports to work within the webpack bundle.
 
         :param hook_code: Original hook source code
         :param hook_name: Name of the hook
         :param is_first_hook: Whether this is the first hook being processed
         :return: Transformed hook code
         """
-        # Remove ES6 import statements and collect what was imported
-        import_pattern = r"import\s+(?:{([^}]+)}|(\w+))\s+from\s+['\"]([^'\"]+)['\"];"
-        imports_found = []
-
-        def replace_import(match):
-            if match.group(1):  # Named imports
-                imports_found.append((match.group(1), match.group(3)))
-            else:  # Default import
-                imports_found.append((match.group(2), match.group(3)))
-            return ""  # Remove the import line
-
-        code = re.sub(import_pattern, replace_import, hook_code)
-
-        # For hooks, we know they use React hooks, so we'll access them from React
-        # But only add the destructuring for the first hook to avoid duplicates
-        if "react" in str(imports_found).lower() and is_first_hook:
-            # Add React hooks extraction at the top
-            react_hooks = ["useState", "useEffect", "useRef", "useCallback", "useMemo"]
-            hook_extraction = "// Access React hooks from the global React object\n"
-            hook_extraction += "const { " + ", ".join(react_hooks) + " } = React;\n\n"
-            code = hook_extraction + code
-
-        # Remove export statements and just ensure the hook is defined
-        # Handle: export const hookName = ...
-        code = re.sub(
-            r"export\s+const\s+" + re.escape(hook_name) + r"\s*=", f"const {hook_name} =", code
-        )
-        # Handle: export default hookName;
-        code = re.sub(r"export\s+default\s+" + re.escape(hook_name) + r";?", "", code)
-        # Handle: export { hookName };
-        code = re.sub(r"export\s*{\s*" + re.escape(hook_name) + r"\s*};?", "", code)
-
-        # Add a comment to indicate this is a built-in hook
-        code = f"// Built-in hook: {hook_name}\n" + code
-
-        return code
+        return transform_hook_for_bundling(hook_code, hook_name, is_first_hook)
 
     def _detect_hook_imports(self, widget_code: str) -> List[str]:
         """
-        Detect imports of built-in hooks from widget code.
+        Detect imports of built-in hooks from widget code, cached by source hash.
 
         :param widget_code: The widget source code
         :return: List of hook names that need to be created
         """
+        hook_names = self.hooks.names()
+        return self.analysis.get_or_compute(
+            "hooks",
+            widget_code,
+            lambda: self._scan_hook_imports(widget_code, set(hook_names)),
+            extra=hook_names,
+        )
+
+    def _scan_hook_imports(self, widget_code: str, available: set) -> List[str]:
+        """
+        :param widget_code: The widget source code
+        :param available: Names of the available built-in hooks
+        :return: Sorted hook names imported by the widget
+        """
         hooks_needed = []
 
         # Look for imports like: import { useFullscreen } from './useFullscreen';
@@ -158,15 +202,15 @@ class WidgetBuilder:
                         hook_names = hook_names.strip()
                         for hook in hook_names.split(","):
                             hook = hook.strip()
-                            if hook in self.BUILT_IN_HOOKS:
+                            if hook in available:
                                 hooks_needed.append(hook)
                     else:  # Default import pattern
                         # Check if file_name corresponds to a built-in hook
                         clean_file_name = file_name.replace(".js", "").replace(".jsx", "")
-                        if clean_file_name in self.BUILT_IN_HOOKS:
+                        if clean_file_name in available:
                             hooks_needed.append(clean_file_name)
 
-        return list(set(hooks_needed))  # Remove duplicates
+        return sorted(set(hooks_needed))  # Remove duplicates
 
     def _prepare_widget_code_with_hooks(self, widget_code: str, hooks_needed: List[str]) -> str:
         """
@@ -226,30 +270,13 @@ class WidgetBuilder:
                     widget_code = "import React from 'react';\n" + widget_code
                     logger.info("Added React default import")
 
-        # Build the hooks code to prepend
-        hooks_code = ""
-
-        # Add React hooks destructuring once at the beginning
-        if hooks_needed:
-            hooks_code = "// Access React hooks from the global React object\n"
-            hooks_code += "const { useState, useEffect, useRef, useCallback, useMemo } = React;\n\n"
-
-        # Process each hook
-        for i, hook_name in enumerate(hooks_needed):
-            if hook_name in self.BUILT_IN_HOOKS:
-                # Transform hook without adding React destructuring (we already did it)
-                transformed_hook = self._transform_hook_for_bundling(
-                    self.BUILT_IN_HOOKS[hook_name],
-                    hook_name,
-                    is_first_hook=False,  # Never add React destructuring for individual hooks
-                )
-                # Remove any React destructuring that might still be in the hook code
-                transformed_hook = re.sub(
-                    r"//\s*Access React hooks from the global React object\s*\n\s*const\s*\{\s*[^}]+\s*\}\s*=\s*React;\s*\n+",
-                    "",
-                    transformed_hook,
-                )
-                hooks_code += transformed_hook + "\n\n"
+        # Build the hooks code to prepend: React hooks destructuring once, then
+        # each hook as pre-transformed by the hook library
+        hooks_code = REACT_HOOKS_PREAMBLE if hooks_needed else ""
+        for hook_name in hooks_needed:
+            inline_code = self.hooks.inline_code(hook_name)
+            if inline_code is not None:
+                hooks_code += inline_code + "\n\n"
 
         # Combine hooks code with widget code
         if hooks_code:
@@ -277,8 +304,21 @@ class WidgetBuilder:
 
     def _handle_exports(self, widget_code: str, widget_name: str) -> str:
         """
-        Handle export statements in widget code intelligently.
+        Handle export statements in widget code intelligently, cached by source hash.
+
+        :param widget_code: The original widget code
+        :param widget_name: Expected name of the widget component
+        :return: Code with proper export statement
+        """
+        return self.analysis.get_or_compute(
+            "exports",
+            widget_code,
+            lambda: self._rewrite_exports(widget_code, widget_name),
+            extra=widget_name,
+        )
 
+    def _rewrite_exports(self, widget_code: str, widget_name: str) -> str:
+        """
         :param widget_code: The original widget code
         :param widget_name: Expected name of the widget component
         :return: Code with proper export statement
@@ -364,80 +404,38 @@ class WidgetBuilder:
             logger.info(f"No existing export found, adding export for {widget_name}")
             return f"{code}\n\n// Export the component\nexport default {widget_name};"
 
-    def build_widget(
-        self,
-        widget_code: str,
-        widget_name: str,
-        dependencies: Optional[List[str]] = None,
-        external_dependencies: Optional[List[str]] = None,
-        development_mode: bool = False,
-        data_file: Optional[str] = None,
-    ) -> Tuple[bool, str, str]:
+    def _externals(self, external_dependencies: List[str]) -> Dict[str, str]:
         """
-        Build a widget with webpack to create a browser-ready bundle.
+        :param external_dependencies: Dependencies left external
+        :return: webpack externals, package name -> browser global
+        """
+        externals = self.DEFAULT_EXTERNAL_PACKAGES.copy()
+        for dep in external_dependencies:
+            if dep in self.EXTERNAL_PACKAGE_MAPPINGS:
+                externals[dep] = self.EXTERNAL_PACKAGE_MAPPINGS[dep]
+            else:
+                # Use PascalCase as default for unknown packages
+                externals[dep] = "".join(word.capitalize() for word in dep.split("-"))
+                logger.warning(
+                    f"Using default external name '{externals[dep]}' for dependency '{dep}'"
+                )
+        return externals
+
+    def _webpack_config(
+        self, widget_name: str, externals: Dict[str, str], development_mode: bool
+    ) -> str:
+        """
+        Render webpack.config.js for a widget build.
 
-        :param widget_code: The widget source code
         :param widget_name: Name of the widget
-        :param dependencies: List of dependencies to include (e.g., ['recharts', 'lodash'])
-        :param external_dependencies: List of dependencies to treat as external (not bundled)
+        :param externals: webpack externals from _externals
         :param development_mode: Whether to build in development mode (disables minification)
-        :param data_file: Optional separate data file content
-        :return: Tuple of (success, built_code, error_message)
+        :return: webpack.config.js source
         """
-        dependencies = dependencies or []
-        external_dependencies = external_dependencies or []
-        temp_dir = tempfile.mkdtemp(dir=self.build_dir)
-
-        try:
-            # Detect hooks needed for this widget
-            hooks_needed = self._detect_hook_imports(widget_code)
-            if hooks_needed:
-                logger.info(f"Detected built-in hooks needed: {', '.join(hooks_needed)}")
-
-            # Build package.json with only required dependencies
-            package_json: Dict[str, Any] = {
-                "name": f"widget-{widget_name}",
-                "version": "1.0.0",
-                "private": True,
-                "dependencies": {"react": "^18.0.0", "react-dom": "^18.0.0"},
-                "devDependencies": {
-                    "@babel/core": "^7.0.0",
-                    "@babel/preset-env": "^7.0.0",
-                    "@babel/preset-react": "^7.0.0",
-                    "babel-loader": "^9.0.0",
-                    "webpack": "^5.0.0",
-                    "webpack-cli": "^5.0.0",
-                },
-            }
-
-            # Add only requested dependencies
-            all_dependencies = set(dependencies + external_dependencies)
-            for dep in all_dependencies:
-                if dep in self.AVAILABLE_PACKAGES:
-                    package_json["dependencies"][dep] = self.AVAILABLE_PACKAGES[dep]
-                else:
-                    logger.warning(f"Unknown dependency requested: {dep}")
-
-            with open(os.path.join(temp_dir, "package.json"), "w") as f:
-                json.dump(package_json, f, indent=2)
-
-            # Build externals configuration
-            externals = self.DEFAULT_EXTERNAL_PACKAGES.copy()
-            for dep in external_dependencies:
-                if dep in self.EXTERNAL_PACKAGE_MAPPINGS:
-                    externals[dep] = self.EXTERNAL_PACKAGE_MAPPINGS[dep]
-                else:
-                    # Use PascalCase as default for unknown packages
-                    externals[dep] = "".join(word.capitalize() for word in dep.split("-"))
-                    logger.warning(
-                        f"Using default external name '{externals[dep]}' for dependency '{dep}'"
-                    )
-
-            # Create webpack.config.js
-            webpack_mode = "development" if development_mode else "production"
-            minimize_setting = "false" if development_mode else "true"
+        webpack_mode = "development" if development_mode else "production"
+        minimize_setting = "false" if development_mode else "true"
 
-            webpack_config = f"""
+        return f"""
 const path = require('path');
 
 module.exports = {{
@@ -468,11 +466,84 @@ module.exports = {{
         extensions: ['.js', '.jsx']
     }},
     optimization: {{
-        minimize: {minimize_setting}
+        minimize: {minimize_setting},
+        usedExports: true,
+        sideEffects: true
     }}
 }};
 """
 
+    def build_widget(
+        self,
+        widget_code: str,
+        widget_name: str,
+        dependencies: Optional[List[str]] = None,
+        external_dependencies: Optional[List[str]] = None,
+        development_mode: bool = False,
+        data_file: Optional[str] = None,
+    ) -> Tuple[bool, str, str]:
+        """
+        Build a widget with webpack to create a browser-ready bundle.
+
+        :param widget_code: The widget source code
+        :param widget_name: Name of the widget
+        :param dependencies: List of dependencies to include (e.g., ['recharts', 'lodash'])
+        :param external_dependencies: List of dependencies to treat as external (not bundled)
+        :param development_mode: Whether to build in development mode (disables minification)
+        :param data_file: Optional separate data file content
+        :return: Tuple of (success, built_code, error_message)
+        """
+        dependencies = dependencies or []
+        external_dependencies = external_dependencies or []
+
+        # Detect hooks needed for this widget
+        hooks_needed = self._detect_hook_imports(widget_code)
+        if hooks_needed:
+            logger.info(f"Detected built-in hooks needed: {', '.join(hooks_needed)}")
+
+        webpack_mode = "development" if development_mode else "production"
+        webpack_config = self._webpack_config(
+            widget_name, self._externals(external_dependencies), development_mode
+        )
+
+        def cache_key() -> Optional[str]:
+            toolchain = self.workspace.fingerprint()
+            if self.build_cache is None or toolchain is None:
+                return None
+            return build_key(
+                widget_code,
+                widget_name,
+                {hook: self.BUILT_IN_HOOKS[hook] for hook in hooks_needed},
+                dependencies,
+                external_dependencies,
+                development_mode,
+                data_file,
+                webpack_config,
+                toolchain,
+            )
+
+        # Identical inputs on the same toolchain produce the same bundle
+        key = cache_key()
+        if key is not None:
+            cached = self.build_cache.get(key)
+            if cached is not None:
+                logger.info(f"Using cached build of widget {widget_name}")
+                return True, cached, ""
+
+        temp_dir = tempfile.mkdtemp(dir=self.build_dir)
+
+        try:
+            # Every bundleable package is in the shared workspace; warn about the rest
+            all_dependencies = set(dependencies + external_dependencies)
+            for dep in all_dependencies:
+                if dep not in self.AVAILABLE_PACKAGES:
+                    logger.warning(f"Unknown dependency requested: {dep}")
+
+            # Reuse the shared toolchain instead of installing per build
+            self.workspace.ensure(offline=self.offline, env=env)
+            self.workspace.link_into(temp_dir)
+
+            # Create webpack.config.js
             with open(os.path.join(temp_dir, "webpack.config.js"), "w") as f:
                 f.write(webpack_config)
 
@@ -503,34 +574,13 @@ module.exports = {{
                     f.write(data_file)
                 logger.info(f"Created data file for widget {widget_name}")
 
-            # Install dependencies - use --include=dev to ensure dev dependencies are installed
-            logger.info(f"Installing dependencies for widget {widget_name}")
-            install_result = subprocess.run(
-                ["npm", "install", "--include=dev"],
-                env=env,
-                cwd=temp_dir,
-                capture_output=True,
-                text=True,
-            )
-
-            if install_result.returncode != 0:
-                logger.error(f"npm install failed: {install_result.stderr}")
-                return False, "", f"npm install failed: {install_result.stderr}"
-
             # Build with webpack
             logger.info(f"Building widget {widget_name} in {webpack_mode} mode")
-            build_result = subprocess.run(
-                ["npx", "webpack", "--mode", webpack_mode],
-                env=env,
-                cwd=temp_dir,
-                capture_output=True,
-                text=True,
-            )
+            build_ok, build_errors = self._run_webpack(temp_dir, webpack_mode)
 
-            if build_result.returncode != 0:
-                logger.error(f"webpack build failed: {build_result.stderr}")
-                logger.info(f"Build output: {build_result.stdout}")
-                return False, "", f"webpack build failed: {build_result.stderr}"
+            if not build_ok:
+                logger.error(f"webpack build failed: {build_errors}")
+                return False, "", f"webpack build failed: {build_errors}"
 
             # Read the built bundle
             bundle_path = os.path.join(temp_dir, "dist", "widget.bundle.js")
@@ -552,8 +602,20 @@ module.exports = {{
 }})();
 """
 
+            # The workspace may have been installed by this build
+            key = key or cache_key()
+            if key is not None:
+                self.build_cache.put(key, final_code)
+
             return True, final_code, ""
 
+        except (WorkspaceMissingError, WorkspaceInstallError) as e:
+            logger.error(f"Widget toolchain unavailable: {str(e)}")
+            return False, "", str(e)
+        except subprocess.TimeoutExpired:
+            error_msg = f"webpack build timed out after {self.timeout:g}s"
+            logger.error(error_msg)
+            return False, "", error_msg
         except subprocess.CalledProcessError as e:
             error_msg = f"Command failed: {e.stderr}"
             logger.error(error_msg)
@@ -564,9 +626,23 @@ module.exports = {{
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
 
+    def split_dependencies(self, code: str) -> Tuple[List[str], List[str]]:
+        """
+        Decide which detected libraries are bundled and which stay page globals.
+
+        :param code: Widget source
+        :return: Tuple of (bundled, external) package names
+        """
+        libraries = self.check_react_libraries(code)["target_libraries"]
+        if not self.tree_shake:
+            return [], libraries
+        bundled = [lib for lib in libraries if lib in self.TREE_SHAKEN_PACKAGES]
+        external = [lib for lib in libraries if lib not in self.TREE_SHAKEN_PACKAGES]
+        return bundled, external
+
     def check_react_libraries(self, code):
         """
-        Checks a React code fragment for library usage.
+        Checks a React code fragment for library usage, cached by source hash.
 
         Args:
             code (str): The React code to analyze
@@ -574,6 +650,20 @@ module.exports = {{
         Returns:
             dict: Analysis results with used libraries and their components
         """
+        hook_names = self.hooks.names()
+        return self.analysis.get_or_compute(
+            "libraries",
+            code,
+            lambda: self._scan_react_libraries(code, hook_names),
+            extra=hook_names,
+        )
+
+    def _scan_react_libraries(self, code, hook_names):
+        """
+        :param code: The React code to analyze
+        :param hook_names: Names of the available built-in hooks
+        :return: Analysis results with used libraries and their components
+        """
         # Target libraries to check for
         target_libraries = ["recharts", "lodash", "d3", "axios", "date-fns", "lucide-react"]
 
@@ -592,7 +682,7 @@ module.exports = {{
                 hook_name = (
                     imp.replace("./", "").replace("../", "").replace(".js", "").replace(".jsx", "")
                 )
-                if hook_name in self.BUILT_IN_HOOKS:
+                if hook_name in hook_names:
                     built_in_hooks.append(hook_name)
                 continue
 
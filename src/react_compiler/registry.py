@@ -0,0 +1,81 @@
+"""Process-wide WidgetBuilder instances and a cache of source analysis results.
+
+Constructing a WidgetBuilder per build repeated hook loading and workspace
+setup, and every build re-ran the same regex passes over unchanged widget
+source. get_widget_builder() hands out one builder per configuration, and
+SourceAnalysisCache remembers import, hook and export analysis by source hash.
+"""
+
+import copy
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from common.cache import LRUCache
+
+# Analysis results kept per process
+ANALYSIS_CACHE_SIZE = 512
+
+# Distinguishes a miss from a cached None
+_MISSING = object()
+
+
+class SourceAnalysisCache(LRUCache):
+    """Bounded LRU of analysis results keyed by (kind, source hash, extra key)."""
+
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_SIZE):
+        """
+        :param max_entries: Entries kept before the least recently used is dropped
+        """
+        super().__init__(maxsize=max_entries)
+
+    def get_or_compute(
+        self, kind: str, source: str, compute: Callable[[], Any], extra: Hashable = None
+    ) -> Any:
+        """
+        Return a cached result for this source, computing it on a miss.
+
+        :param kind: Analysis name, e.g. "libraries"
+        :param source: Source text analysed
+        :param compute: Produces the result on a miss
+        :param extra: Other inputs the result depends on
+        :return: A copy of the result, so callers may modify it
+        """
+        key = (kind, hashlib.sha256(source.encode("utf-8")).hexdigest(), extra)
+        result = self.get(key, _MISSING)
+        if result is _MISSING:
+            result = compute()
+            self.put(key, result)
+        return copy.deepcopy(result)
+
+
+_analysis_cache = SourceAnalysisCache()
+
+
+def get_analysis_cache() -> SourceAnalysisCache:
+    """
+    :return: Process-wide SourceAnalysisCache
+    """
+    return _analysis_cache
+
+
+_builders: Dict[Tuple, Any] = {}
+_builders_lock = threading.Lock()
+
+
+def get_widget_builder(timeout: Optional[float] = None, **options):
+    """
+    Shared WidgetBuilder for a configuration, created on first use.
+
+    :param timeout: Seconds before a webpack run is killed
+    :param options: Other WidgetBuilder keyword arguments
+    :return: WidgetBuilder instance shared by all callers asking for the same options
+    """
+    from react_compiler.react_compiler import WidgetBuilder
+
+    key = (timeout,) + tuple(sorted(options.items()))
+    with _builders_lock:
+        builder = _builders.get(key)
+        if builder is None:
+            builder = _builders[key] = WidgetBuilder(timeout=timeout, **options)
+        return builder
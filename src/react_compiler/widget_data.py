@@ -0,0 +1,93 @@
+"""Widget data files delivered as JSON at runtime instead of bundled.
+
+A widget's data module (``src/data.js``, imported as ``./data.js``) is often
+far larger than its code and changes more often. When the module is JSON, or
+``export default`` followed by JSON, it is served as its own asset and the
+widget is built against a stub module that reads the data from
+``window[WIDGET_DATA_GLOBAL]``. The bundle then no longer depends on the data,
+so editing the data needs no webpack run and page views download the data only
+when it changed. Any other module stays bundled as before; data modules are
+never executed on the server.
+"""
+
+import hashlib
+import json
+import re
+from typing import Optional
+
+from react_compiler.registry import get_analysis_cache
+
+# Global the widget page assigns the fetched data to before loading the bundle
+WIDGET_DATA_GLOBAL = "__atacamaWidgetData"
+
+# Data module compiled into bundles whose data is delivered separately
+EXTERNAL_DATA_MODULE = f"export default window.{WIDGET_DATA_GLOBAL};\n"
+
+_EXPORT_DEFAULT = re.compile(r"^\s*export\s+default\s+(.*?);?\s*$", re.DOTALL)
+
+
+def _literal_json(source: str) -> Optional[str]:
+    """
+    :param source: Data module source
+    :return: Compact JSON if the module is JSON, or ``export default <JSON>``
+    """
+    match = _EXPORT_DEFAULT.match(source)
+    for candidate in (source, match.group(1) if match else None):
+        if candidate is None:
+            continue
+        try:
+            return json.dumps(
+                json.loads(candidate), ensure_ascii=False, separators=(",", ":"), allow_nan=False
+            )
+        except ValueError:
+            continue
+    return None
+
+
+def widget_data_json(data_file: Optional[str]) -> Optional[str]:
+    """
+    JSON form of a data module, if it can be delivered separately from the bundle.
+
+    Results are cached by source hash, so repeated builds and saves of the same
+    data parse it once.
+
+    :param data_file: Data module source
+    :return: Compact JSON text, or None if the data must stay bundled
+    """
+    if not data_file or not data_file.strip():
+        return None
+    return get_analysis_cache().get_or_compute(
+        "data_json", data_file, lambda: _literal_json(data_file)
+    )
+
+
+def widget_data_hash(data_json: Optional[str]) -> Optional[str]:
+    """
+    Fingerprint of a widget's JSON data, used in its asset URL.
+
+    :param data_json: JSON text
+    :return: Hex sha256, or None if there is no separate data
+    """
+    if data_json is None:
+        return None
+    return hashlib.sha256(data_json.encode("utf-8")).hexdigest()
+
+
+def bundled_data_module(data_file: Optional[str]) -> Optional[str]:
+    """
+    The data module to compile into a widget bundle.
+
+    :param data_file: Widget data module source
+    :return: EXTERNAL_DATA_MODULE if the data is delivered as JSON, else data_file
+    """
+    if widget_data_json(data_file) is not None:
+        return EXTERNAL_DATA_MODULE
+    return data_file
+
+
+def reads_external_data(compiled_code: Optional[str]) -> bool:
+    """
+    :param compiled_code: Compiled widget bundle
+    :return: Whether the bundle takes its data from WIDGET_DATA_GLOBAL
+    """
+    return bool(compiled_code) and WIDGET_DATA_GLOBAL in compiled_code
@@ -0,0 +1,203 @@
+"""Shared node_modules workspace for widget builds.
+
+Every widget build needs the same Babel/webpack toolchain plus some subset of
+the bundleable packages. Rather than running ``npm install`` per build, the full
+dependency set is installed once into a directory under ``DATA_DIR`` named after
+a hash of that set, and each build links its ``node_modules`` to it. Changing a
+version produces a new hash and hence a fresh workspace; old ones can simply be
+deleted.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Dict, Optional
+
+import constants
+from common.atomic_file import file_lock
+from common.base.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Runtime packages every widget is built against
+TOOLCHAIN_DEPENDENCIES = {"react": "^18.0.0", "react-dom": "^18.0.0"}
+
+# Build-time toolchain
+TOOLCHAIN_DEV_DEPENDENCIES = {
+    "@babel/core": "^7.0.0",
+    "@babel/preset-env": "^7.0.0",
+    "@babel/preset-react": "^7.0.0",
+    "babel-loader": "^9.0.0",
+    "webpack": "^5.0.0",
+    "webpack-cli": "^5.0.0",
+}
+
+# Seconds to wait for another process installing the same workspace
+INSTALL_LOCK_TIMEOUT = 900
+
+# Written last, so a workspace without it is incomplete
+READY_MARKER = ".atacama-ready"
+
+OFFLINE_ENV_VAR = "ATACAMA_WIDGET_OFFLINE"
+
+
+class WorkspaceMissingError(Exception):
+    """Raised when the toolchain workspace is not installed and installing is not allowed."""
+
+    pass
+
+
+class WorkspaceInstallError(Exception):
+    """Raised when npm fails to install the toolchain workspace."""
+
+    pass
+
+
+def is_offline_mode() -> bool:
+    """
+    Check whether widget builds must not touch the network.
+
+    :return: True if ATACAMA_WIDGET_OFFLINE is set to 1/true/yes
+    """
+    return os.getenv(OFFLINE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+class ToolchainWorkspace:
+    """A content-addressed node_modules directory shared by all widget builds."""
+
+    def __init__(self, dependencies: Dict[str, str], root: Optional[str] = None):
+        """
+        :param dependencies: Bundleable packages (name -> version range) to install
+            alongside the toolchain
+        :param root: Directory holding workspaces (default: DATA_DIR/widget_toolchain)
+        """
+        self.package_json = {
+            "name": "atacama-widget-toolchain",
+            "version": "1.0.0",
+            "private": True,
+            "dependencies": {**TOOLCHAIN_DEPENDENCIES, **dependencies},
+            "devDependencies": dict(TOOLCHAIN_DEV_DEPENDENCIES),
+        }
+        self.root = root or os.path.join(constants.DATA_DIR, "widget_toolchain")
+        self.key = self.compute_key(self.package_json)
+        self.path = os.path.join(self.root, self.key)
+        self._fingerprint: Optional[str] = None
+
+    @staticmethod
+    def compute_key(package_json: Dict) -> str:
+        """
+        Hash a package.json's dependency set.
+
+        :param package_json: package.json contents
+        :return: Short hex digest identifying the dependency set
+        """
+        deps = {
+            "dependencies": package_json.get("dependencies", {}),
+            "devDependencies": package_json.get("devDependencies", {}),
+        }
+        canonical = json.dumps(deps, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def node_modules(self) -> str:
+        return os.path.join(self.path, "node_modules")
+
+    def bin_path(self, name: str) -> str:
+        """
+        Path of an executable installed in the workspace.
+
+        :param name: Executable name, e.g. "webpack"
+        :return: Absolute path under node_modules/.bin
+        """
+        return os.path.join(self.node_modules, ".bin", name)
+
+    def is_ready(self) -> bool:
+        return os.path.exists(os.path.join(self.path, READY_MARKER))
+
+    def fingerprint(self) -> Optional[str]:
+        """
+        Identify the exact installed toolchain, not just its version ranges.
+
+        :return: Hash of the workspace's package-lock.json (or of the
+            dependency set when npm wrote none), or None if not installed
+        """
+        if self._fingerprint is None and self.is_ready():
+            lock_path = os.path.join(self.path, "package-lock.json")
+            try:
+                with open(lock_path, "rb") as f:
+                    self._fingerprint = hashlib.sha256(f.read()).hexdigest()[:16]
+            except FileNotFoundError:
+                self._fingerprint = self.key
+        return self._fingerprint
+
+    def ensure(self, offline: bool = False, env: Optional[Dict[str, str]] = None) -> str:
+        """
+        Make sure the workspace is installed, installing it if needed.
+
+        Concurrent callers (threads or processes) wait on a file lock so the
+        toolchain is installed only once.
+
+        :param offline: Fail instead of installing when the workspace is missing
+        :param env: Environment for the npm subprocess
+        :return: Path to the workspace's node_modules
+        :raises WorkspaceMissingError: If offline and the workspace is not installed
+        :raises WorkspaceInstallError: If npm install fails
+        """
+        if self.is_ready():
+            return self.node_modules
+        if offline:
+            raise WorkspaceMissingError(
+                f"Widget toolchain {self.key} is not installed in {self.root}; "
+                "run 'launch.py --warm-widgets' with network access"
+            )
+
+        with file_lock(self.path, timeout=INSTALL_LOCK_TIMEOUT):
+            # Another process may have finished while we waited
+            if not self.is_ready():
+                self._install(env)
+        return self.node_modules
+
+    def _install(self, env: Optional[Dict[str, str]]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        # Staging dirs left by an interrupted install; safe to drop while holding the lock
+        for name in os.listdir(self.root):
+            if name.startswith(f".{self.key}-"):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix=f".{self.key}-")
+        try:
+            with open(os.path.join(staging, "package.json"), "w") as f:
+                json.dump(self.package_json, f, indent=2)
+
+            logger.info(f"Installing widget toolchain {self.key} into {self.path}")
+            result = subprocess.run(
+                ["npm", "install", "--include=dev", "--no-audit", "--no-fund"],
+                env=env,
+                cwd=staging,
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise WorkspaceInstallError(f"npm install failed: {result.stderr}")
+
+            with open(os.path.join(staging, READY_MARKER), "w") as f:
+                f.write(self.key)
+
+            # Replace any incomplete leftover, then publish atomically
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.rename(staging, self.path)
+            staging = None
+            logger.info(f"Widget toolchain {self.key} installed")
+        finally:
+            if staging:
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def link_into(self, build_dir: str) -> None:
+        """
+        Point a build directory's node_modules at the shared workspace.
+
+        :param build_dir: Per-build directory
+        """
+        os.symlink(self.node_modules, os.path.join(build_dir, "node_modules"))
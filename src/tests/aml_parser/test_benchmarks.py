@@ -0,0 +1,77 @@
+"""Tests for the AML benchmark corpus generator and baseline comparison."""
+
+import unittest
+
+from aml_parser import process_message
+from benchmarks.aml_corpus import CORPUS_KINDS, generate_corpus
+from benchmarks.aml_parser_bench import compare_to_baseline, measure_stage
+
+
+class TestAmlCorpus(unittest.TestCase):
+    """Test suite for the synthetic corpus generator."""
+
+    def test_corpus_is_deterministic(self):
+        """The same kind/count/seed should always produce the same messages."""
+        for kind in CORPUS_KINDS:
+            self.assertEqual(generate_corpus(kind, 3, seed=7), generate_corpus(kind, 3, seed=7))
+
+    def test_seed_changes_corpus(self):
+        """Different seeds should produce different messages."""
+        self.assertNotEqual(
+            generate_corpus("plain", 3, seed=1), generate_corpus("plain", 3, seed=2)
+        )
+
+    def test_every_kind_renders(self):
+        """Every corpus kind should run through the full pipeline."""
+        for kind in CORPUS_KINDS:
+            for message in generate_corpus(kind, 2):
+                self.assertTrue(process_message(message))
+
+    def test_unknown_kind_raises(self):
+        """Unknown corpus kinds should be rejected."""
+        with self.assertRaises(ValueError):
+            generate_corpus("nonexistent", 1)
+
+
+class TestBaselineComparison(unittest.TestCase):
+    """Test suite for compare_to_baseline and measure_stage."""
+
+    BASELINE = {"results": {"lexer": {"plain": {"ops_per_sec": 100.0, "peak_kib": 200.0}}}}
+
+    def report(self, ops, peak):
+        return {"results": {"lexer": {"plain": {"ops_per_sec": ops, "peak_kib": peak}}}}
+
+    def test_within_threshold_passes(self):
+        """Changes inside the threshold should not be reported."""
+        self.assertEqual(compare_to_baseline(self.report(80.0, 240.0), self.BASELINE, 0.25), [])
+
+    def test_throughput_regression_reported(self):
+        """A throughput drop beyond the threshold should be reported."""
+        regressions = compare_to_baseline(self.report(50.0, 200.0), self.BASELINE, 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("ops/s", regressions[0])
+
+    def test_memory_regression_reported(self):
+        """Peak memory growth beyond the threshold should be reported."""
+        regressions = compare_to_baseline(self.report(100.0, 400.0), self.BASELINE, 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("KiB", regressions[0])
+
+    def test_small_memory_noise_ignored(self):
+        """Tiny absolute memory changes should not count as regressions."""
+        baseline = {"results": {"lexer": {"plain": {"ops_per_sec": 100.0, "peak_kib": 1.0}}}}
+        self.assertEqual(compare_to_baseline(self.report(100.0, 4.0), baseline, 0.25), [])
+
+    def test_missing_baseline_entries_ignored(self):
+        """Stages absent from the baseline should be skipped."""
+        self.assertEqual(compare_to_baseline(self.report(1.0, 1.0), {"results": {}}), [])
+
+    def test_measure_stage_reports_metrics(self):
+        """measure_stage should return throughput and peak memory."""
+        result = measure_stage("lexer", generate_corpus("plain", 2), min_time=0.01)
+        self.assertGreater(result["ops_per_sec"], 0)
+        self.assertGreaterEqual(result["peak_kib"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
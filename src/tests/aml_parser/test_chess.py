@@ -3,7 +3,17 @@
 import unittest
 from unittest.mock import MagicMock
 
-from aml_parser.chess import get_piece_map, validate_fen, fen_to_board, fen_to_board_old
+from aml_parser.chess import (
+    BOARD_CACHE_SIZE,
+    board_cache_info,
+    clear_board_cache,
+    fen_to_board,
+    fen_to_board_old,
+    get_piece_map,
+    normalize_fen,
+    prerender_boards,
+    validate_fen,
+)
 
 
 class TestGetPieceMap(unittest.TestCase):
@@ -246,5 +256,56 @@ class TestFenToBoardOld(unittest.TestCase):
         self.assertIn('class="invalid-pgn"', result)
 
 
+class TestBoardCache(unittest.TestCase):
+    """Test suite for the memoized board renderer."""
+
+    START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+    def setUp(self):
+        clear_board_cache()
+
+    def test_normalize_fen_collapses_whitespace(self):
+        """normalize_fen should strip and collapse whitespace."""
+        self.assertEqual(normalize_fen("  8/8/8/8/8/8/8/8   w \n - "), "8/8/8/8/8/8/8/8 w -")
+
+    def test_repeat_render_hits_cache(self):
+        """Rendering the same position twice should only render once."""
+        first = fen_to_board(self.START)
+        second = fen_to_board(self.START)
+
+        self.assertEqual(first, second)
+        info = board_cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_cosmetic_whitespace_shares_entry(self):
+        """FENs differing only in whitespace should share one cache entry."""
+        fen_to_board(self.START)
+        fen_to_board(f"  {self.START.replace(' ', '   ')} ")
+
+        self.assertEqual(board_cache_info().currsize, 1)
+
+    def test_prerender_boards_warms_cache(self):
+        """prerender_boards should render each distinct position once."""
+        count = prerender_boards([self.START, self.START, "8/8/8/8/8/8/8/8"])
+
+        self.assertEqual(count, 2)
+        fen_to_board("8/8/8/8/8/8/8/8")
+        self.assertEqual(board_cache_info().hits, 1)
+
+    def test_cache_is_bounded(self):
+        """The board cache should never exceed its capacity."""
+        for i in range(BOARD_CACHE_SIZE + 10):
+            fen_to_board(f"8/8/8/8/8/8/8/8 w - - 0 {i}")
+
+        self.assertEqual(board_cache_info().currsize, BOARD_CACHE_SIZE)
+
+    def test_invalid_fen_is_cached_too(self):
+        """Invalid positions should also be memoized."""
+        fen_to_board("invalid")
+        self.assertIn('class="invalid-pgn"', fen_to_board("invalid"))
+        self.assertEqual(board_cache_info().hits, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+"""Tests for memoized URL classification and link rendering."""
+
+import unittest
+
+from aml_parser.colorblocks import create_url_link
+from aml_parser.lexer import AtacamaLexer, TokenType, tokenize
+from aml_parser.urls import (
+    URL_KIND_LINK,
+    URL_KIND_YOUTUBE,
+    classify_url,
+    classify_urls,
+    clear_url_cache,
+    url_cache_info,
+)
+
+
+class TestClassifyUrl(unittest.TestCase):
+    """Test suite for classify_url and classify_urls."""
+
+    def setUp(self):
+        clear_url_cache()
+
+    def test_youtube_url_classified(self):
+        """YouTube watch and short links should carry their video id."""
+        for url in (
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://youtu.be/dQw4w9WgXcQ",
+            "https://youtube.com/watch?list=abc&v=dQw4w9WgXcQ",
+        ):
+            classified = classify_url(url)
+            self.assertEqual(classified.kind, URL_KIND_YOUTUBE)
+            self.assertEqual(classified.video_id, "dQw4w9WgXcQ")
+
+    def test_plain_link_classified(self):
+        """Other URLs are plain links with quote-encoded hrefs and raw display text."""
+        classified = classify_url("https://example.com/a'b\"c")
+        self.assertEqual(classified.kind, URL_KIND_LINK)
+        self.assertIsNone(classified.video_id)
+        self.assertEqual(classified.href, "https://example.com/a%27b%22c")
+        self.assertEqual(classified.display_text, "https://example.com/a'b\"c")
+
+    def test_repeated_url_served_from_cache(self):
+        """Rendering the same URL twice should classify and render it once."""
+        url = "https://example.com/cached"
+        first = create_url_link(url)
+        second = create_url_link(url)
+        self.assertEqual(first, second)
+        info = url_cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_batch_deduplicates_and_warms_cache(self):
+        """classify_urls should return one entry per distinct URL and warm the link cache."""
+        urls = ["https://example.com/a", "https://youtu.be/dQw4w9WgXcQ", "https://example.com/a"]
+        classified = classify_urls(urls)
+        self.assertEqual(list(classified), urls[:2])
+        self.assertEqual(url_cache_info().currsize, 2)
+
+        create_url_link("https://example.com/a")
+        self.assertEqual(url_cache_info().hits, 1)
+
+
+class TestLexerUrlProbe(unittest.TestCase):
+    """The lexer should match URL_PATTERN once per URL, not once per check."""
+
+    def test_url_matched_once(self):
+        """Text-stop detection and URL handling share a single pattern match."""
+        calls = []
+        pattern = AtacamaLexer.URL_PATTERN
+
+        class CountingPattern:
+            def match(self, text, pos):
+                calls.append(pos)
+                return pattern.match(text, pos)
+
+        lexer = AtacamaLexer()
+        lexer.URL_PATTERN = CountingPattern()
+        tokens = list(lexer.tokenize("see https://example.com/x now"))
+
+        self.assertEqual(
+            [t.value for t in tokens if t.type == TokenType.URL], ["https://example.com/x"]
+        )
+        self.assertEqual(calls, [4])
+
+    def test_tokens_unchanged(self):
+        """Memoizing the probe must not change tokenization."""
+        tokens = tokenize("a https://example.com b http c https://youtu.be/dQw4w9WgXcQ")
+        urls = [t.value for t in tokens if t.type == TokenType.URL]
+        self.assertEqual(urls, ["https://example.com", "https://youtu.be/dQw4w9WgXcQ"])
+
+
+if __name__ == "__main__":
+    unittest.main()
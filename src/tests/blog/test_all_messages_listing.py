@@ -0,0 +1,134 @@
+"""Query-count regression tests for the polymorphic /all message listing."""
+
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from atacama.server import create_app
+from models.database import db
+from models.messages import get_polymorphic_messages
+from models.models import Article, Email, Quote, ReactWidget, User
+
+
+class AllMessagesListingTests(unittest.TestCase):
+    """The /all listing loads any mix of message types in a constant number of queries."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+        self.created = 0
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="listing@example.com", name="Listing User")
+                db_session.add(user)
+                db_session.flush()
+                self.user_id = user.id
+
+    def tearDown(self):
+        db.cleanup()
+
+    def add_messages(self, per_type):
+        """Add per_type messages of each type, each email linked to a quote."""
+        with self.app.app_context():
+            with db.session() as db_session:
+                for _ in range(per_type):
+                    self.created += 1
+                    n = self.created
+                    when = datetime.utcnow() - timedelta(minutes=n)
+                    quote = Quote(
+                        author_id=self.user_id,
+                        channel="misc",
+                        text=f"Quote number {n}",
+                        quote_type="reference",
+                        created_at=when,
+                    )
+                    email = Email(
+                        author_id=self.user_id,
+                        channel="misc",
+                        subject=f"Email {n}",
+                        content=f"email body {n}",
+                        processed_content=f"<p>email body {n}</p>",
+                        created_at=when,
+                        quotes=[quote],
+                    )
+                    article = Article(
+                        author_id=self.user_id,
+                        channel="misc",
+                        title=f"Article {n}",
+                        slug=f"article-{n}",
+                        content="body",
+                        processed_content="<p>body</p>",
+                        published=True,
+                        published_at=when,
+                        created_at=when,
+                    )
+                    widget = ReactWidget(
+                        author_id=self.user_id,
+                        channel="misc",
+                        title=f"Widget {n}",
+                        slug=f"widget-{n}",
+                        code="export default () => null;",
+                        published=True,
+                        published_at=when,
+                        created_at=when,
+                    )
+                    db_session.add_all([quote, email, article, widget])
+
+    def count_queries(self, fn):
+        """Run fn and return (result, executed statement count)."""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db._engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            result = fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        return result, len(statements)
+
+    def test_query_count_independent_of_page_contents(self):
+        """A page of 2 messages and a full page of mixed types cost the same queries."""
+        self.add_messages(1)
+        small, small_queries = self.count_queries(lambda: self.client.get("/all"))
+        self.assertEqual(small.status_code, 200)
+        self.assertIn(b"Email 1", small.data)
+
+        self.add_messages(10)
+        full, full_queries = self.count_queries(lambda: self.client.get("/all"))
+        self.assertEqual(full.status_code, 200)
+        self.assertIn(b"Show Older Messages", full.data)
+        for title in (b"Email 1", b"Article 1", b"Widget 1", b"Quote number 1"):
+            self.assertIn(title, full.data)
+
+        self.assertEqual(full_queries, small_queries)
+        self.assertLessEqual(full_queries, 5)
+
+    def test_loader_returns_concrete_subclasses(self):
+        """Rows come back as their subclasses with authors and quotes already loaded."""
+        self.add_messages(2)
+        with self.app.app_context():
+            with db.session() as db_session:
+                messages, has_more = get_polymorphic_messages(db_session, ["misc"], limit=6)
+
+                def touch():
+                    for message in messages:
+                        message.author.name
+                        if isinstance(message, Email):
+                            [quote.text for quote in message.quotes]
+
+                _, queries = self.count_queries(touch)
+
+        self.assertTrue(has_more)
+        self.assertEqual(len(messages), 6)
+        self.assertEqual({type(m) for m in messages}, {Email, Article, ReactWidget, Quote})
+        self.assertEqual(queries, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
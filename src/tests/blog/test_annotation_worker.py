@@ -0,0 +1,120 @@
+"""Tests for paragraph-incremental English annotation and the annotation worker."""
+
+import json
+import unittest
+
+from aml_parser.english_annotations import (
+    ParagraphAnnotationCache,
+    annotate_english,
+    annotate_english_paragraphs,
+    split_paragraphs,
+)
+from atacama.server import create_app
+from blog.annotation_worker import EnglishAnnotationWorker
+from models.database import db
+from models.models import Email, User
+
+TEXT = (
+    "The children were running to the library.\n\n"
+    "Teachers answered questions slowly.\n\n"
+    "The wolves studied the river history."
+)
+
+
+class ParagraphAnnotationTests(unittest.TestCase):
+    """annotate_english_paragraphs caches by paragraph and matches annotate_english."""
+
+    def test_split_skips_blank_paragraphs(self):
+        self.assertEqual(split_paragraphs("a\n\n  \n\nb\n \nc"), ["a", "b", "c"])
+
+    def test_matches_whole_text_annotation(self):
+        """Merging paragraph results gives the same mapping as annotating the whole text."""
+        result = annotate_english_paragraphs(TEXT, cache=ParagraphAnnotationCache())
+        self.assertTrue(result.complete)
+        self.assertEqual(result.annotations, annotate_english(TEXT))
+
+    def test_edit_only_reannotates_changed_paragraphs(self):
+        cache = ParagraphAnnotationCache()
+        first = annotate_english_paragraphs(TEXT, cache=cache)
+        self.assertEqual((first.cached, first.annotated), (0, 3))
+
+        edited = TEXT.replace("slowly", "brightly")
+        second = annotate_english_paragraphs(edited, cache=cache)
+        self.assertEqual((second.cached, second.annotated), (2, 1))
+        self.assertEqual(second.annotations, annotate_english(edited))
+
+    def test_cpu_budget_stops_after_first_uncached_paragraph(self):
+        """A zero budget still makes progress: one paragraph per pass, then cache hits."""
+        cache = ParagraphAnnotationCache()
+        partial = annotate_english_paragraphs(TEXT, cache=cache, cpu_budget=0.0)
+        self.assertFalse(partial.complete)
+        self.assertEqual(partial.annotated, 1)
+
+        passes = 1
+        while not partial.complete:
+            partial = annotate_english_paragraphs(TEXT, cache=cache, cpu_budget=0.0)
+            passes += 1
+        self.assertEqual(passes, 3)
+        self.assertEqual(partial.annotations, annotate_english(TEXT))
+
+    def test_cache_is_bounded(self):
+        cache = ParagraphAnnotationCache(maxsize=2)
+        annotate_english_paragraphs(TEXT, cache=cache)
+        self.assertEqual(len(cache), 2)
+
+
+class AnnotationWorkerTests(unittest.TestCase):
+    """EnglishAnnotationWorker stores annotations for queued messages."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="annotate@example.com", name="Annotator")
+                db_session.add(user)
+                db_session.flush()
+                message = Email(
+                    author_id=user.id,
+                    channel="misc",
+                    subject="Annotate",
+                    content=TEXT,
+                    processed_content="<p>annotate</p>",
+                )
+                db_session.add(message)
+                db_session.flush()
+                self.message_id = message.id
+
+    def tearDown(self):
+        db.cleanup()
+
+    def stored_annotations(self):
+        with db.session() as db_session:
+            value = db_session.query(Email.english_annotations).filter_by(id=self.message_id)
+            return json.loads(value.scalar() or "null")
+
+    def test_annotate_message_stores_annotations(self):
+        worker = EnglishAnnotationWorker(cpu_budget=None, cache=ParagraphAnnotationCache())
+        with self.app.app_context():
+            result = worker.annotate_message(self.message_id)
+            self.assertTrue(result.complete)
+            self.assertEqual(self.stored_annotations(), annotate_english(TEXT))
+
+    def test_edit_reuses_cached_paragraphs(self):
+        worker = EnglishAnnotationWorker(cpu_budget=None, cache=ParagraphAnnotationCache())
+        with self.app.app_context():
+            worker.annotate_message(self.message_id)
+            with db.session() as db_session:
+                db_session.query(Email).get(self.message_id).content = TEXT + "\n\nBright winter."
+
+            result = worker.annotate_message(self.message_id)
+            self.assertEqual((result.cached, result.annotated), (3, 1))
+            self.assertIn("winter", self.stored_annotations())
+
+    def test_missing_message_is_ignored(self):
+        worker = EnglishAnnotationWorker(cpu_budget=None, cache=ParagraphAnnotationCache())
+        with self.app.app_context():
+            self.assertIsNone(worker.annotate_message(self.message_id + 1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for the widget build worker pool."""
+
+import threading
+import unittest
+
+from blog.build_service import (
+    FAILED,
+    PRIORITY_BACKGROUND,
+    QUEUED,
+    SUCCEEDED,
+    WidgetBuildService,
+)
+
+
+class WidgetBuildServiceTests(unittest.TestCase):
+    """Jobs run in priority order, capped per user, with queued duplicates merged."""
+
+    def setUp(self):
+        self.order = []
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()  # Let any blocked worker finish
+
+    def task(self, name, block=False, success=True):
+        def run(builder):
+            self.order.append(name)
+            if block:
+                self.release.wait(5)
+            return success, None if success else f"{name} failed"
+
+        return run
+
+    def test_inline_runs_on_submit(self):
+        service = WidgetBuildService(inline=True, builder=object())
+        ok = service.submit("widget:1", self.task("ok"))
+        bad = service.submit("widget:2", self.task("bad", success=False))
+        self.assertEqual((ok.status, bad.status), (SUCCEEDED, FAILED))
+        self.assertEqual(bad.error, "bad failed")
+        self.assertEqual(service.stats()[SUCCEEDED], 1)
+
+    def test_priority_order_and_dedupe(self):
+        service = WidgetBuildService(workers=1, builder=object())
+        blocker = service.submit("widget:0", self.task("blocker", block=True))
+        background = service.submit(
+            "widget:1", self.task("background"), priority=PRIORITY_BACKGROUND
+        )
+        interactive = service.submit("widget:2", self.task("interactive"))
+        duplicate = service.submit("widget:2", self.task("duplicate"))
+        self.assertIs(duplicate, interactive)
+        self.assertEqual(background.status, QUEUED)
+
+        self.release.set()
+        for job in (blocker, background, interactive):
+            self.assertEqual(service.wait(job.id, 5).status, SUCCEEDED)
+        self.assertEqual(self.order, ["blocker", "interactive", "background"])
+
+    def test_per_user_limit(self):
+        service = WidgetBuildService(workers=2, per_user_limit=1, builder=object())
+        first = service.submit("widget:1", self.task("alice-1", block=True), user_id=1)
+        second = service.submit("widget:2", self.task("alice-2"), user_id=1)
+        other = service.submit("widget:3", self.task("bob"), user_id=2)
+
+        # Bob's build runs on the free worker while Alice's second waits for her first
+        self.assertEqual(service.wait(other.id, 5).status, SUCCEEDED)
+        self.assertEqual(service.get(second.id).status, QUEUED)
+
+        self.release.set()
+        self.assertEqual(service.wait(second.id, 5).status, SUCCEEDED)
+        self.assertEqual(self.order[-1], "alice-2")
+        self.assertTrue(service.get(first.id).finished)
+
+    def test_task_exception_fails_job(self):
+        def explode(builder):
+            raise RuntimeError("boom")
+
+        service = WidgetBuildService(inline=True, builder=object())
+        job = service.submit("widget:1", explode)
+        self.assertEqual((job.status, job.error), (FAILED, "boom"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""Tests for grouped channel statistics and their cache."""
+
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from atacama.server import create_app
+from blog.blueprints.statistics import compute_statistics, statistics_cache
+from models.database import db
+from models.models import Email, User
+
+
+class ChannelStatisticsTests(unittest.TestCase):
+    """/stats costs a fixed number of queries and is cached until emails change."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+        statistics_cache.invalidate()
+        self.now = datetime.utcnow()
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                users = [User(email=f"author{n}@example.com", name=f"Author {n}") for n in range(5)]
+                db_session.add_all(users)
+                db_session.flush()
+                self.user_ids = [user.id for user in users]
+
+    def tearDown(self):
+        statistics_cache.invalidate()
+        db.cleanup()
+
+    def add_emails(self, channel, author_index, count, days_ago=0):
+        with self.app.app_context():
+            with db.session() as db_session:
+                for _ in range(count):
+                    db_session.add(
+                        Email(
+                            author_id=self.user_ids[author_index],
+                            channel=channel,
+                            subject="Stats",
+                            content="body",
+                            processed_content="<p>body</p>",
+                            created_at=self.now - timedelta(days=days_ago),
+                        )
+                    )
+
+    def count_queries(self, fn):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db._engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            result = fn()
+        finally:
+            event.remove(db._engine, "before_cursor_execute", before_cursor_execute)
+        return result, len(statements)
+
+    def test_counts_and_ranked_authors(self):
+        self.add_emails("misc", 0, 1)
+        self.add_emails("misc", 1, 3, days_ago=10)
+        self.add_emails("misc", 2, 2, days_ago=40)
+        self.add_emails("misc", 3, 4, days_ago=2)
+        self.add_emails("private", 4, 1)
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                snapshot, queries = self.count_queries(
+                    lambda: compute_statistics(db_session, now=self.now)
+                )
+
+        self.assertEqual(queries, 3)
+        misc = snapshot.channels["misc"]
+        self.assertEqual(misc["total_count"], 10)
+        self.assertEqual(misc["month_count"], 8)
+        self.assertEqual(misc["week_count"], 5)
+        self.assertEqual(
+            [(a["name"], a["count"]) for a in misc["authors"]],
+            [("Author 3", 4), ("Author 1", 3), ("Author 2", 2)],
+        )
+        self.assertEqual(misc["latest_date"], self.now)
+        self.assertEqual([a["name"] for a in snapshot.channels["private"]["authors"]], ["Author 4"])
+        self.assertEqual(sum(snapshot.activity.values()), 9)
+
+    def test_query_count_independent_of_channels_and_authors(self):
+        self.add_emails("misc", 0, 1)
+        self.client.get("/stats")
+        statistics_cache.invalidate()
+        _, few = self.count_queries(lambda: self.client.get("/stats"))
+
+        for index in range(5):
+            self.add_emails("misc", index, 2)
+            self.add_emails("private", index, 1)
+        statistics_cache.invalidate()
+        _, many = self.count_queries(lambda: self.client.get("/stats"))
+        self.assertEqual(few, many)
+
+    def test_cached_until_new_message(self):
+        self.add_emails("misc", 0, 1)
+        first = self.client.get("/stats")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn(b"Author 0", first.data)
+
+        _, queries = self.count_queries(lambda: self.client.get("/stats"))
+        self.assertEqual(queries, 0)
+
+        self.add_emails("misc", 1, 2)
+        self.assertIn(b"Author 1", self.client.get("/stats").data)
+
+    def test_invalidated_on_commit_not_flush(self):
+        self.add_emails("misc", 0, 1)
+        self.client.get("/stats")
+        with self.app.app_context():
+            db_session = db._session_factory()
+            try:
+                db_session.add(
+                    Email(
+                        author_id=self.user_ids[1],
+                        channel="misc",
+                        subject="Stats",
+                        content="body",
+                        processed_content="<p>body</p>",
+                    )
+                )
+                db_session.flush()
+                self.assertEqual(len(statistics_cache), 1)  # Not yet visible to readers
+                db_session.rollback()
+                self.assertEqual(len(statistics_cache), 1)
+            finally:
+                db_session.close()
+
+        self.add_emails("misc", 1, 1)
+        self.assertEqual(len(statistics_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
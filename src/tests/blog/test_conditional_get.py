@@ -0,0 +1,226 @@
+"""Tests for conditional GET (ETag / Last-Modified -> 304) on message, chain and article views."""
+
+import time
+import unittest
+from datetime import datetime
+
+from sqlalchemy import event
+
+from atacama.server import create_app
+from models.database import db
+from models.models import Article, Email, User
+
+
+class ConditionalGetTests(unittest.TestCase):
+    """Validators are derived before rendering and answer revalidation with 304."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="etag@example.com", name="ETag User")
+                db_session.add(user)
+                db_session.flush()
+                self.user_id = user.id
+
+                parent = Email(
+                    author_id=user.id,
+                    channel="misc",
+                    subject="Parent",
+                    content="parent",
+                    processed_content="<p>parent</p>",
+                )
+                db_session.add(parent)
+                db_session.flush()
+                child = Email(
+                    author_id=user.id,
+                    channel="misc",
+                    subject="Child",
+                    content="child",
+                    processed_content="<p>child</p>",
+                    parent_id=parent.id,
+                )
+                article = Article(
+                    author_id=user.id,
+                    channel="misc",
+                    title="Conditional Article",
+                    slug="conditional-article",
+                    content="body",
+                    processed_content="<p>body</p>",
+                    published=True,
+                    published_at=datetime.utcnow(),
+                )
+                db_session.add_all([child, article])
+                db_session.commit()
+                self.parent_id = parent.id
+                self.child_id = child.id
+
+    def tearDown(self):
+        db.cleanup()
+
+    def count_queries(self, fn):
+        """Run fn and return (result, executed statement count, elapsed seconds)."""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db._engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        return result, len(statements), elapsed
+
+    def test_message_json_revalidates_with_single_query(self):
+        """A matching If-None-Match on the JSON view returns 304 after one query."""
+        first = self.client.get(f"/messages/{self.child_id}")
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        self.assertIn("Last-Modified", first.headers)
+
+        response, queries, elapsed = self.count_queries(
+            lambda: self.client.get(f"/messages/{self.child_id}", headers={"If-None-Match": etag})
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(queries, 1)
+        self.assertLess(elapsed, 0.5)
+
+        _, render_queries, _ = self.count_queries(
+            lambda: self.client.get(f"/messages/{self.child_id}")
+        )
+        self.assertGreater(render_queries, queries)
+
+    def test_html_and_json_variants_have_distinct_etags(self):
+        """HTML, JSON and ea=0 renders must not validate each other."""
+        json_etag = self.client.get(f"/messages/{self.child_id}").headers["ETag"]
+        html = self.client.get(f"/messages/{self.child_id}", headers={"Accept": "text/html"})
+        html_no_ea = self.client.get(
+            f"/messages/{self.child_id}?ea=0", headers={"Accept": "text/html"}
+        )
+        self.assertEqual(html.status_code, 200)
+        self.assertEqual(len({json_etag, html.headers["ETag"], html_no_ea.headers["ETag"]}), 3)
+
+        cross = self.client.get(
+            f"/messages/{self.child_id}",
+            headers={"Accept": "text/html", "If-None-Match": json_etag},
+        )
+        self.assertEqual(cross.status_code, 200)
+
+    def test_compressed_etag_suffix_still_matches(self):
+        """Flask-Compress appends ':gzip' to strong ETags; echoes of that must match."""
+        etag = self.client.get(f"/messages/{self.child_id}").get_etag()[0]
+        response = self.client.get(
+            f"/messages/{self.child_id}", headers={"If-None-Match": f'"{etag}:gzip"'}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_changes_etag(self):
+        """Editing subtype columns bumps last_modified_at and therefore the ETag."""
+        etag = self.client.get(f"/messages/{self.child_id}").headers["ETag"]
+        time.sleep(0.01)
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                message = db_session.query(Email).get(self.child_id)
+                message.content = "edited"
+
+        response = self.client.get(f"/messages/{self.child_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["content"], "edited")
+
+    def test_new_reply_invalidates_parent(self):
+        """Adding a reply changes the parent's and the chain's validators."""
+        message_etag = self.client.get(f"/messages/{self.parent_id}").headers["ETag"]
+        chain_etag = self.client.get(f"/messages/{self.parent_id}/chain").headers["ETag"]
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                db_session.add(
+                    Email(
+                        author_id=self.user_id,
+                        channel="misc",
+                        subject="Second reply",
+                        content="reply",
+                        processed_content="<p>reply</p>",
+                        parent_id=self.parent_id,
+                    )
+                )
+
+        message = self.client.get(
+            f"/messages/{self.parent_id}", headers={"If-None-Match": message_etag}
+        )
+        chain = self.client.get(
+            f"/messages/{self.parent_id}/chain", headers={"If-None-Match": chain_etag}
+        )
+        self.assertEqual(message.status_code, 200)
+        self.assertEqual(chain.status_code, 200)
+
+    def test_chain_revalidates_with_single_query(self):
+        """The chain view answers a matching If-None-Match with a single CTE query."""
+        etag = self.client.get(f"/messages/{self.child_id}/chain").headers["ETag"]
+
+        response, queries, _ = self.count_queries(
+            lambda: self.client.get(
+                f"/messages/{self.child_id}/chain", headers={"If-None-Match": etag}
+            )
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, 1)
+
+    def test_article_if_modified_since(self):
+        """Articles answer If-Modified-Since with 304 when unchanged."""
+        first = self.client.get("/p/conditional-article")
+        self.assertEqual(first.status_code, 200)
+
+        response = self.client.get(
+            "/p/conditional-article",
+            headers={"If-Modified-Since": first.headers["Last-Modified"]},
+        )
+        self.assertEqual(response.status_code, 304)
+
+        stale = self.client.get(
+            "/p/conditional-article",
+            headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"},
+        )
+        self.assertEqual(stale.status_code, 200)
+
+    def test_article_validator_uses_view_lookup(self):
+        """A slug the view does not resolve never answers 304."""
+        first = self.client.get("/p/conditional-article")
+        plain = self.client.get("/p/Conditional-Article")
+        response = self.client.get(
+            "/p/Conditional-Article",
+            headers={"If-Modified-Since": first.headers["Last-Modified"]},
+        )
+        self.assertEqual(response.status_code, plain.status_code)
+
+    def test_private_message_never_answers_304(self):
+        """Validators for inaccessible messages fall through to the access check."""
+        with self.app.app_context():
+            with db.session() as db_session:
+                private = Email(
+                    author_id=self.user_id,
+                    channel="private",
+                    subject="Secret",
+                    content="secret",
+                    processed_content="<p>secret</p>",
+                )
+                db_session.add(private)
+                db_session.flush()
+                private_id = private.id
+
+        response = self.client.get(f"/messages/{private_id}", headers={"If-None-Match": "*"})
+        self.assertNotEqual(response.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
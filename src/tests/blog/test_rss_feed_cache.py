@@ -0,0 +1,151 @@
+"""Tests for cached RSS feeds with ETag / Last-Modified revalidation."""
+
+import time
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import event, update
+
+from atacama.server import create_app
+from blog.blueprints import feeds
+from models.database import db
+from models.models import Email, User
+
+COLORBLOCK = (
+    '<p><span class="colorblock color-red"><span class="sigil">💡</span>'
+    '<span class="colortext-content">certain</span></span></p>'
+)
+
+
+class RssFeedCacheTests(unittest.TestCase):
+    """Feeds are rendered once per message state and revalidate with 304."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+        feeds.clear_feed_cache()
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="rss-cache@example.com", name="RSS Cache")
+                db_session.add(user)
+                db_session.flush()
+                self.user_id = user.id
+        self.message_id = self.add_email("First", COLORBLOCK)
+
+    def tearDown(self):
+        feeds.clear_feed_cache()
+        db.cleanup()
+
+    def add_email(self, subject, processed):
+        with self.app.app_context():
+            with db.session() as db_session:
+                email = Email(
+                    author_id=self.user_id,
+                    channel="misc",
+                    subject=subject,
+                    content="body",
+                    processed_content=processed,
+                )
+                db_session.add(email)
+                db_session.flush()
+                return email.id
+
+    def count_queries(self, fn):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db._engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            result = fn()
+        finally:
+            event.remove(db._engine, "before_cursor_execute", before_cursor_execute)
+        return result, len(statements)
+
+    def test_rss_content_computed_at_write_time(self):
+        with self.app.app_context():
+            with db.session() as db_session:
+                email = db_session.query(Email).get(self.message_id)
+                self.assertIn("💡 certain", email.rss_content)
+                self.assertNotIn("colorblock", email.rss_content)
+
+                email.processed_content = "<p>rewritten</p>"
+                db_session.flush()
+                self.assertEqual(email.rss_content, "<p>rewritten</p>")
+
+    def test_if_none_match_returns_304_with_one_query(self):
+        first = self.client.get("/feed.xml")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("💡 certain", first.get_data(as_text=True))
+        etag = first.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        self.assertIn("Last-Modified", first.headers)
+
+        response, queries = self.count_queries(
+            lambda: self.client.get("/feed.xml", headers={"If-None-Match": etag})
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, 1)
+
+    def test_if_modified_since_returns_304(self):
+        first = self.client.get("/feed.xml")
+        response = self.client.get(
+            "/feed.xml", headers={"If-Modified-Since": first.headers["Last-Modified"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_feed_served_from_cache(self):
+        first = self.client.get("/feed.xml").get_data()
+        with patch.object(feeds, "render_template_string") as render:
+            second, queries = self.count_queries(lambda: self.client.get("/feed.xml").get_data())
+        render.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertEqual(queries, 1)
+
+    def test_new_and_edited_messages_change_etag(self):
+        etag = self.client.get("/feed.xml").headers["ETag"]
+
+        self.add_email("Second", "<p>second</p>")
+        response = self.client.get("/feed.xml", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Second", response.get_data(as_text=True))
+
+        etag = response.headers["ETag"]
+        time.sleep(0.01)
+        with self.app.app_context():
+            with db.session() as db_session:
+                db_session.query(Email).get(self.message_id).subject = "Renamed"
+        response = self.client.get("/feed.xml", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Renamed", response.get_data(as_text=True))
+
+    def test_channel_feed_keyed_separately(self):
+        all_etag = self.client.get("/feed.xml").headers["ETag"]
+        channel = self.client.get("/channel/misc/feed.xml")
+        self.assertEqual(channel.status_code, 200)
+        self.assertNotEqual(channel.headers["ETag"], all_etag)
+
+    def test_legacy_rows_backfilled_without_touching_timestamp(self):
+        with self.app.app_context():
+            with db.session() as db_session:
+                emails = Email.__table__
+                db_session.execute(
+                    update(emails).where(emails.c.id == self.message_id).values(rss_content=None)
+                )
+                before = db_session.query(Email.last_modified_at).filter_by(id=self.message_id)
+                before = before.scalar()
+
+        self.assertIn("💡 certain", self.client.get("/feed.xml").get_data(as_text=True))
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                email = db_session.query(Email).get(self.message_id)
+                self.assertIn("💡 certain", email.rss_content)
+                self.assertEqual(email.last_modified_at, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""Tests for the streaming, sharded and cached sitemap."""
+
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+from atacama.server import create_app
+from blog.blueprints import sitemap as sitemap_module
+from blog.blueprints.sitemap import (
+    cached_stream,
+    get_cached_sitemap,
+    sitemap_base_url,
+    sitemap_cache,
+    sitemap_channels,
+)
+from models.database import db
+from models.models import Email, User
+
+
+class SitemapTests(unittest.TestCase):
+    """sitemap.xml lists public messages, shards large sitemaps and caches documents."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+        sitemap_cache.clear()
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="sitemap@example.com", name="Sitemap User")
+                db_session.add(user)
+                db_session.flush()
+                self.user_id = user.id
+            self.public_channels = sitemap_channels("default")
+
+    def tearDown(self):
+        sitemap_cache.clear()
+        db.cleanup()
+
+    def add_email(self, channel="misc"):
+        with self.app.app_context():
+            with db.session() as db_session:
+                email = Email(
+                    author_id=self.user_id,
+                    channel=channel,
+                    subject="Sitemap",
+                    content="body",
+                    processed_content="<p>body</p>",
+                )
+                db_session.add(email)
+                db_session.flush()
+                return email.id
+
+    def count_queries(self, fn):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db._engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            result = fn()
+        finally:
+            event.remove(db._engine, "before_cursor_execute", before_cursor_execute)
+        return result, statements
+
+    def test_lists_public_messages_only(self):
+        public_id = self.add_email("misc")
+        private_id = self.add_email("private")
+
+        response = self.client.get("/sitemap.xml")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "application/xml")
+        body = response.get_data(as_text=True)
+        self.assertIn("<urlset", body)
+        self.assertIn(f"/messages/{public_id}</loc>", body)
+        self.assertNotIn(f"/messages/{private_id}</loc>", body)
+
+    def test_selects_only_needed_columns(self):
+        """The message query selects ids and dates, never content columns."""
+        self.add_email()
+        _, statements = self.count_queries(lambda: self.client.get("/sitemap.xml").get_data())
+        self.assertFalse(any("processed_content" in statement for statement in statements))
+
+    def test_cached_until_messages_change(self):
+        first = self.client.get("/sitemap.xml").get_data(as_text=True)
+
+        cached, statements = self.count_queries(
+            lambda: self.client.get("/sitemap.xml").get_data(as_text=True)
+        )
+        self.assertEqual(cached, first)
+        self.assertEqual(statements, [])
+
+        new_id = self.add_email("misc")
+        self.assertIn(f"/messages/{new_id}</loc>", self.client.get("/sitemap.xml").get_data(True))
+
+    def test_rechannel_invalidates(self):
+        message_id = self.add_email("misc")
+        self.assertIn(f"/messages/{message_id}<", self.client.get("/sitemap.xml").get_data(True))
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                db_session.query(Email).get(message_id).channel = "private"
+
+        self.assertNotIn(f"/messages/{message_id}<", self.client.get("/sitemap.xml").get_data(True))
+
+    def test_private_channel_change_keeps_cache(self):
+        """Messages in channels no sitemap covers leave cached documents alone."""
+        self.client.get("/sitemap.xml").get_data()
+        self.assertEqual(len(sitemap_cache), 1)
+        self.add_email("private")
+        self.assertEqual(len(sitemap_cache), 1)
+
+    def test_invalidated_only_when_the_transaction_commits(self):
+        self.client.get("/sitemap.xml").get_data()
+        with self.app.app_context():
+            with db.session() as db_session:
+                email = Email(
+                    author_id=self.user_id,
+                    channel="misc",
+                    subject="Draft",
+                    content="x",
+                    processed_content="<p>x</p>",
+                )
+                db_session.add(email)
+                db_session.flush()
+                self.assertEqual(len(sitemap_cache), 1)  # Not committed yet
+                db_session.rollback()
+            self.assertEqual(len(sitemap_cache), 1)
+
+        self.add_email("misc")
+        self.assertEqual(len(sitemap_cache), 0)
+
+    def test_cache_is_bounded_and_daily(self):
+        with patch.object(sitemap_cache, "maxsize", 2):
+            for name in ("root", "1", "2"):
+                key = ("default", "http://test.local", name)
+                list(cached_stream(key, "2024-01-01", ["misc"], iter([name])))
+        self.assertEqual(len(sitemap_cache), 2)
+        self.assertIsNone(
+            get_cached_sitemap(("default", "http://test.local", "root"), "2024-01-01")
+        )
+        self.assertEqual(
+            get_cached_sitemap(("default", "http://test.local", "2"), "2024-01-01"), "2"
+        )
+        self.assertIsNone(get_cached_sitemap(("default", "http://test.local", "2"), "2024-01-02"))
+
+    def test_base_url_comes_from_domain_config(self):
+        self.assertEqual(
+            sitemap_base_url("earlyversion", "http://www.example.org"), "https://earlyversion.com"
+        )
+        self.assertEqual(sitemap_base_url("default", "http://test.local"), "http://test.local")
+
+    def test_shards_into_index(self):
+        ids = [self.add_email("misc") for _ in range(5)]
+        static_urls = 1 + len(self.public_channels)
+        total = static_urls + len(ids)
+
+        with patch.object(sitemap_module, "SITEMAP_MAX_URLS", 3):
+            index = self.client.get("/sitemap.xml").get_data(as_text=True)
+            shards = [
+                self.client.get(f"/sitemap-{n}.xml").get_data(as_text=True)
+                for n in range(1, (total + 2) // 3 + 1)
+            ]
+            missing = self.client.get(f"/sitemap-{len(shards) + 1}.xml")
+
+        self.assertIn("<sitemapindex", index)
+        self.assertEqual(index.count("<sitemap>"), len(shards))
+        self.assertEqual(missing.status_code, 404)
+
+        locs = [body.count("<url>") for body in shards]
+        self.assertTrue(all(count <= 3 for count in locs))
+        self.assertEqual(sum(locs), total)
+        combined = "".join(shards)
+        for message_id in ids:
+            self.assertEqual(combined.count(f"/messages/{message_id}</loc>"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
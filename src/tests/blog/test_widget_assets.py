@@ -0,0 +1,115 @@
+"""Tests for serving compiled widget bundles as fingerprinted, immutable assets."""
+
+import gzip
+import tempfile
+import unittest
+
+import brotli
+
+from atacama.server import create_app
+from blog import widget_assets
+from blog.widget_assets import WidgetAssetStore
+from models.database import db
+from models.models import ReactWidget, User, widget_bundle_hash
+
+BUNDLE = "(function() { window.Hello = function Hello() { return null; }; })();\n" * 50
+
+
+class WidgetAssetTests(unittest.TestCase):
+    """Widget pages link the bundle by hash; the asset route serves precompressed variants."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        widget_assets._default_store = WidgetAssetStore(root=self.tmp.name)
+
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="widgets@example.com", name="Widget User")
+                db_session.add(user)
+                db_session.flush()
+                widget = ReactWidget(
+                    author_id=user.id,
+                    channel="misc",
+                    title="Hello",
+                    slug="hello",
+                    code="export default () => null;",
+                    compiled_code=BUNDLE,
+                )
+                db_session.add(widget)
+                db_session.commit()
+                self.widget_id = widget.id
+                self.bundle_hash = widget.bundle_hash
+
+        self.asset_url = f"/widgets/assets/{self.bundle_hash}.js"
+
+    def tearDown(self):
+        db.cleanup()
+        widget_assets._default_store = None
+        self.tmp.cleanup()
+
+    def test_hash_follows_compiled_code(self):
+        self.assertEqual(self.bundle_hash, widget_bundle_hash(BUNDLE))
+        with self.app.app_context():
+            with db.session() as db_session:
+                widget = db_session.get(ReactWidget, self.widget_id)
+                widget.compiled_code = BUNDLE + "// rebuilt\n"
+                db_session.commit()
+                self.assertEqual(widget.bundle_hash, widget_bundle_hash(BUNDLE + "// rebuilt\n"))
+
+    def test_page_references_asset_instead_of_inlining(self):
+        response = self.client.get("/widget/hello")
+        self.assertEqual(response.status_code, 200)
+        page = response.get_data(as_text=True)
+        self.assertIn(self.asset_url, page)
+        self.assertNotIn("window.Hello = function Hello", page)
+
+    def test_serves_precompressed_variants(self):
+        plain = self.client.get(self.asset_url, headers={"Accept-Encoding": "identity"})
+        self.assertEqual(plain.status_code, 200)
+        self.assertEqual(plain.get_data(as_text=True), BUNDLE)
+        self.assertIsNone(plain.headers.get("Content-Encoding"))
+        self.assertEqual(plain.headers["ETag"], f'"{self.bundle_hash}"')
+        cache_control = plain.headers["Cache-Control"]
+        for directive in ("public", "immutable", "max-age=31536000"):
+            self.assertIn(directive, cache_control)
+        self.assertIn("Accept-Encoding", plain.headers["Vary"])
+
+        gzipped = self.client.get(self.asset_url, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(gzipped.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gzipped.get_data()).decode(), BUNDLE)
+        self.assertEqual(gzipped.headers["ETag"], f'"{self.bundle_hash}.gzip"')
+
+        best = self.client.get(self.asset_url, headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(best.headers["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(best.get_data()).decode(), BUNDLE)
+
+    def test_revalidation_and_unknown_hashes(self):
+        response = self.client.get(
+            self.asset_url, headers={"If-None-Match": f'"{self.bundle_hash}"'}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("immutable", response.headers["Cache-Control"])
+
+        # A validator for one encoding does not revalidate another
+        gzip_etag = f'"{self.bundle_hash}.gzip"'
+        response = self.client.get(
+            self.asset_url, headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], gzip_etag)
+        response = self.client.get(
+            self.asset_url, headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(as_text=True), BUNDLE)
+
+        self.assertEqual(self.client.get(f"/widgets/assets/{'0' * 64}.js").status_code, 404)
+        self.assertEqual(self.client.get("/widgets/assets/not-a-hash.js").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+"""Tests for delivering widget data files as separate, cacheable JSON assets."""
+
+import gzip
+import json
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from atacama.server import create_app
+from blog import widget_assets
+from blog.widget_assets import WidgetAssetStore
+from models.database import db
+from models.models import ReactWidget, User
+from react_compiler.widget_data import (
+    EXTERNAL_DATA_MODULE,
+    WIDGET_DATA_GLOBAL,
+    bundled_data_module,
+    widget_data_hash,
+    widget_data_json,
+)
+
+WORDS = [{"word": f"word{i}", "meaning": f"meaning {i}"} for i in range(200)]
+DATA_FILE = "export default " + json.dumps(WORDS) + ";\n"
+BUNDLE = f"(function() {{ window.Words = function Words() {{ return window.{WIDGET_DATA_GLOBAL}; }}; }})();\n"
+
+
+class WidgetDataConversionTests(unittest.TestCase):
+    """Only plain default-exported data is taken out of the bundle."""
+
+    def test_json_modules(self):
+        self.assertEqual(widget_data_json(DATA_FILE), json.dumps(WORDS, separators=(",", ":")))
+        self.assertEqual(widget_data_json('{"a": 1}'), '{"a":1}')
+        self.assertEqual(bundled_data_module(DATA_FILE), EXTERNAL_DATA_MODULE)
+        self.assertIsNone(widget_data_json(None))
+        self.assertIsNone(widget_data_hash(None))
+
+    def test_modules_that_stay_bundled(self):
+        for source in (
+            "import extra from './extra.js';\nexport default extra;",
+            "export const words = [];\nexport default words;",
+            "const words = [];",
+        ):
+            self.assertIsNone(widget_data_json(source), source)
+            self.assertEqual(bundled_data_module(source), source)
+
+    def test_javascript_modules_are_never_executed(self):
+        for source in (
+            "const words = [{word: 'labas'}];\nexport default { words };",
+            'const x = this.constructor.constructor("return process")();\n'
+            "export default {pid: x.pid};",
+        ):
+            self.assertIsNone(widget_data_json(source), source)
+            self.assertEqual(bundled_data_module(source), source)
+
+
+class WidgetDataAssetTests(unittest.TestCase):
+    """The data file is served by hash with compression, range and conditional support."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        widget_assets._default_store = WidgetAssetStore(root=self.tmp.name)
+        widget_assets._default_data_store = WidgetAssetStore(root=self.tmp.name, suffix=".json")
+
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="data@example.com", name="Data User")
+                db_session.add(user)
+                db_session.flush()
+                widget = ReactWidget(
+                    author_id=user.id,
+                    channel="misc",
+                    title="Words",
+                    slug="words",
+                    code="import data from './data.js';\nexport default () => null;",
+                    compiled_code=BUNDLE,
+                    data_file=DATA_FILE,
+                    published=True,
+                )
+                db_session.add(widget)
+                db_session.commit()
+                self.data_hash = widget.data_hash
+
+        self.data_url = f"/widgets/data/{self.data_hash}.json"
+
+    def tearDown(self):
+        db.cleanup()
+        widget_assets._default_store = None
+        widget_assets._default_data_store = None
+        self.tmp.cleanup()
+
+    def test_page_fetches_data_before_bundle(self):
+        self.assertEqual(self.data_hash, widget_data_hash(widget_data_json(DATA_FILE)))
+        page = self.client.get("/widget/words").get_data(as_text=True)
+        self.assertIn(self.data_url, page)
+        self.assertIn(WIDGET_DATA_GLOBAL, page)
+        self.assertNotIn("word199", page)
+
+    def test_serves_json_with_validators(self):
+        plain = self.client.get(self.data_url, headers={"Accept-Encoding": "identity"})
+        self.assertEqual(plain.status_code, 200)
+        self.assertEqual(plain.mimetype, "application/json")
+        self.assertEqual(plain.get_json(), WORDS)
+        self.assertEqual(plain.headers["ETag"], f'"{self.data_hash}"')
+        self.assertIn("immutable", plain.headers["Cache-Control"])
+        self.assertEqual(plain.headers["Accept-Ranges"], "bytes")
+
+        gzipped = self.client.get(self.data_url, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(gzipped.headers["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(gzipped.get_data())), WORDS)
+
+        revalidated = self.client.get(
+            self.data_url,
+            headers={"Accept-Encoding": "identity", "If-None-Match": f'"{self.data_hash}"'},
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+        partial = self.client.get(
+            self.data_url, headers={"Accept-Encoding": "identity", "Range": "bytes=0-9"}
+        )
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.get_data(as_text=True), plain.get_data(as_text=True)[:10])
+
+        self.assertEqual(self.client.get(f"/widgets/data/{'0' * 64}.json").status_code, 404)
+
+    @patch("blog.blueprints.widgets.submit_widget_build")
+    @patch("atacama.decorators.auth.get_user_config_manager")
+    def test_data_only_edit_skips_the_build(self, config_manager, submit_build):
+        config_manager.return_value = MagicMock(is_admin=MagicMock(return_value=True))
+        with self.client.session_transaction() as sess:
+            sess["user"] = {"email": "data@example.com", "name": "Data User"}
+
+        new_words = WORDS + [{"word": "labas", "meaning": "hello"}]
+        with patch("blog.blueprints.widgets.submit_version_build"):
+            response = self.client.post(
+                "/widget/words/edit",
+                data={
+                    "code": "import data from './data.js';\nexport default () => null;",
+                    "data_file": "export default " + json.dumps(new_words) + ";",
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        submit_build.assert_not_called()
+
+        with db.session() as db_session:
+            widget = db_session.query(ReactWidget).filter_by(slug="words").one()
+            self.assertNotEqual(widget.data_hash, self.data_hash)
+            self.assertEqual(widget.compiled_code, BUNDLE)
+            new_url = f"/widgets/data/{widget.data_hash}.json"
+        self.assertEqual(self.client.get(new_url).get_json(), new_words)
+
+    @patch("blog.blueprints.widgets.submit_widget_build")
+    @patch("atacama.decorators.auth.get_user_config_manager")
+    def test_renaming_rebuilds_even_if_only_data_changed(self, config_manager, submit_build):
+        config_manager.return_value = MagicMock(is_admin=MagicMock(return_value=True))
+        submit_build.return_value = MagicMock(status="queued", finished=False)
+        with self.client.session_transaction() as sess:
+            sess["user"] = {"email": "data@example.com", "name": "Data User"}
+
+        with patch("blog.blueprints.widgets.submit_version_build"):
+            response = self.client.post(
+                "/widget/words/edit",
+                data={
+                    "title": "Word List",
+                    "code": "import data from './data.js';\nexport default () => null;",
+                    "data_file": "export default " + json.dumps(WORDS[:10]) + ";",
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        submit_build.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Tests for the durable widget job store and executor."""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from atacama.server import create_app
+from blog.widget_jobs import (
+    COMPLETED,
+    ERROR,
+    PROCESSING,
+    JobQueueFullError,
+    WidgetJobExecutor,
+    create_job,
+    get_job,
+    list_recent_jobs,
+    sweep_expired_jobs,
+)
+from models.database import db
+from models.models import User, WidgetJob
+
+
+class WidgetJobTests(unittest.TestCase):
+    """Jobs are rows in widget_jobs, run on the executor and swept when expired."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+        self.executor = WidgetJobExecutor(inline=True)
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="jobs@example.com", name="Jobs User")
+                db_session.add(user)
+                db_session.flush()
+                self.user_id = user.id
+
+    def tearDown(self):
+        db.cleanup()
+
+    def new_job(self, slug="chart", kind="initiate"):
+        return create_job(
+            kind,
+            author_id=self.user_id,
+            widget_slug=slug,
+            widget_title="Chart",
+            progress="Starting...",
+            details={"slug": slug, "title": "Chart"},
+        )
+
+    def test_completed_job_records_progress_and_result(self):
+        job_id = self.new_job()
+        self.assertEqual(get_job(job_id)["status"], PROCESSING)
+
+        seen = []
+
+        def work(progress):
+            progress("Halfway")
+            seen.append(get_job(job_id)["progress"])
+            return {"widget_slug": "chart", "build_success": True}
+
+        self.executor.submit(job_id, work)
+        job = get_job(job_id, mark_accessed=True)
+        self.assertEqual(seen, ["Halfway"])
+        self.assertEqual(job["status"], COMPLETED)
+        self.assertEqual(job["result"], {"widget_slug": "chart", "build_success": True})
+        self.assertEqual(job["details"]["title"], "Chart")
+        self.assertIsNotNone(job["finished_at"])
+        self.assertIsNotNone(get_job(job_id)["accessed_at"])
+
+    def test_failed_job_and_full_queue(self):
+        job_id = self.new_job()
+
+        def fail(progress):
+            raise RuntimeError("Failed to generate widget: quota")
+
+        self.executor.submit(job_id, fail, error_progress="Error during generation")
+        job = get_job(job_id)
+        self.assertEqual(job["status"], ERROR)
+        self.assertEqual(job["error"], "Failed to generate widget: quota")
+        self.assertEqual(job["progress"], "Error during generation")
+
+        full = WidgetJobExecutor(inline=True, max_pending=0)
+        refused = self.new_job()
+        with self.assertRaises(JobQueueFullError):
+            full.submit(refused, lambda progress: {})
+        self.assertEqual(get_job(refused)["status"], ERROR)
+
+    def test_sweep_expires_finished_and_fails_stale_jobs(self):
+        old, stale, fresh = self.new_job(), self.new_job(), self.new_job()
+        self.executor.submit(old, lambda progress: {})
+        long_ago = datetime.utcnow() - timedelta(days=2)
+        with db.session() as db_session:
+            for job_id in (old, stale):
+                db_session.get(WidgetJob, job_id).started_at = long_ago
+
+        self.assertEqual(sweep_expired_jobs(), (1, 1))
+        self.assertIsNone(get_job(old))
+        self.assertEqual(get_job(stale)["status"], ERROR)
+        self.assertEqual(get_job(fresh)["status"], PROCESSING)
+
+        running, finished = list_recent_jobs()
+        self.assertEqual([job["id"] for job in running], [fresh])
+        self.assertEqual([job["id"] for job in finished], [stale])
+
+    @patch("atacama.decorators.auth.get_user_config_manager")
+    def test_status_endpoints_read_the_store(self, config_manager):
+        config_manager.return_value = MagicMock(is_admin=MagicMock(return_value=True))
+        with self.client.session_transaction() as sess:
+            sess["user"] = {"email": "jobs@example.com", "name": "Jobs User"}
+
+        job_id = self.new_job()
+        response = self.client.get(f"/widget/initiate_status/{job_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["status"], PROCESSING)
+
+        self.executor.submit(job_id, lambda progress: {"widget_slug": "chart"})
+        data = self.client.get(f"/widget/initiate_status/{job_id}").get_json()
+        self.assertEqual((data["status"], data["result"]), (COMPLETED, {"widget_slug": "chart"}))
+
+        self.assertEqual(self.client.get("/widget/initiate_status/missing").status_code, 404)
+        self.assertEqual(self.client.get("/jobs").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Tests for the keyset-paginated widget listing and its JSON API."""
+
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+
+from atacama.server import create_app
+from blog.widget_listing import count_widgets, get_widget_page, widget_count_cache
+from models.database import db
+from models.models import ReactWidget, User
+
+
+class WidgetListingTests(unittest.TestCase):
+    """Listing pages load only card columns and walk widgets newest first."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.client = self.app.test_client()
+        widget_count_cache.invalidate()
+
+        start = datetime(2024, 1, 1)
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="lister@example.com", name="Lister")
+                db_session.add(user)
+                db_session.flush()
+                # Two widgets share a timestamp so the id tiebreak is exercised
+                for i, minutes in enumerate([0, 1, 2, 2, 3]):
+                    db_session.add(
+                        ReactWidget(
+                            author_id=user.id,
+                            channel="misc",
+                            title=f"Widget {i}",
+                            slug=f"widget-{i}",
+                            code="export default () => null;",
+                            compiled_code="x" * 1000,
+                            data_file="{}",
+                            published=True,
+                            created_at=start + timedelta(minutes=minutes),
+                        )
+                    )
+                db_session.add(
+                    ReactWidget(
+                        author_id=user.id,
+                        channel="misc",
+                        title="Draft",
+                        slug="draft",
+                        code="export default () => null;",
+                        published=False,
+                    )
+                )
+
+    def tearDown(self):
+        db.cleanup()
+        widget_count_cache.invalidate()
+
+    def test_keyset_pages_cover_every_widget_once(self):
+        with db.session() as db_session:
+            slugs, cursor, has_more = [], None, True
+            while has_more:
+                widgets, has_more = get_widget_page(
+                    db_session, ["misc"], older_than_id=cursor, limit=2
+                )
+                for widget in widgets:
+                    self.assertIn("compiled_code", inspect(widget).unloaded)
+                    self.assertIn("code", inspect(widget).unloaded)
+                slugs.extend(widget.slug for widget in widgets)
+                cursor = widgets[-1].id if widgets else None
+
+        self.assertEqual(slugs, ["widget-4", "widget-3", "widget-2", "widget-1", "widget-0"])
+
+    def test_count_is_cached_until_publish_changes(self):
+        with db.session() as db_session:
+            self.assertEqual(count_widgets(db_session, ["misc"]), 5)
+            self.assertEqual(count_widgets(db_session, []), 0)
+            db_session.query(ReactWidget).filter_by(slug="draft").one().published = True
+
+        with db.session() as db_session:
+            self.assertEqual(count_widgets(db_session, ["misc"]), 6)
+
+    def test_count_is_invalidated_on_commit_not_flush(self):
+        with db.session() as db_session:
+            self.assertEqual(count_widgets(db_session, ["misc"]), 5)
+            db_session.query(ReactWidget).filter_by(slug="draft").one().published = True
+            db_session.flush()
+            self.assertEqual(len(widget_count_cache), 1)  # Not yet visible to readers
+            db_session.rollback()
+            self.assertEqual(len(widget_count_cache), 1)
+
+            db_session.query(ReactWidget).filter_by(slug="draft").one().published = True
+            db_session.commit()
+            self.assertEqual(len(widget_count_cache), 0)
+
+    def test_api_and_page_routes(self):
+        data = self.client.get("/api/widgets?limit=3").get_json()
+        self.assertEqual([w["slug"] for w in data["widgets"]], ["widget-4", "widget-3", "widget-2"])
+        self.assertTrue(data["has_more"])
+        self.assertEqual(data["total"], 5)
+        self.assertNotIn("code", data["widgets"][0])
+
+        data = self.client.get(f"/api/widgets?limit=3&older_than={data['next_older_than']}")
+        data = data.get_json()
+        self.assertEqual([w["slug"] for w in data["widgets"]], ["widget-1", "widget-0"])
+        self.assertIsNone(data["next_older_than"])
+
+        response = self.client.get("/widgets")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Widget 4", response.data)
+        self.assertNotIn(b"Draft", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Tests for the shared bounded TTL/LRU cache."""
+
+import unittest
+from unittest.mock import patch
+
+from common.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """LRUCache evicts least recently used entries, expires them and guards stores."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # a is now most recent
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("missing", "default"), "default")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "entries": 2})
+
+    def test_entries_expire_after_ttl(self):
+        cache = LRUCache(ttl=10.0)
+        with patch("common.cache.time.monotonic", return_value=100.0):
+            cache.put("a", None)
+            self.assertIsNone(cache.get("a", "expired"))  # A cached None is a hit
+        with patch("common.cache.time.monotonic", return_value=110.0):
+            self.assertEqual(cache.get("a", "expired"), "expired")
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidation_drops_entries_and_stale_stores(self):
+        cache = LRUCache()
+        cache.put("misc", {"misc"})
+        cache.put("books", {"books", "film"})
+        generation = cache.generation
+
+        cache.invalidate(lambda key, channels: "film" in channels)
+        self.assertEqual(len(cache), 1)
+        cache.put("books", {"books"}, generation)  # Computed before the invalidation
+        self.assertIsNone(cache.get("books"))
+
+        cache.put("books", {"books"}, cache.generation)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
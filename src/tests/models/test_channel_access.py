@@ -0,0 +1,89 @@
+"""Tests for per-request channel access resolution."""
+
+import json
+import unittest
+from unittest.mock import patch
+
+from atacama.server import create_app
+from models import users
+from models.models import User
+from models.users import (
+    check_channel_access,
+    clear_channel_access_cache,
+    get_user_allowed_channels,
+    resolve_channel_access,
+)
+
+
+class ChannelAccessResolverTests(unittest.TestCase):
+    """Allowed channels are resolved once per request without opening DB sessions."""
+
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        clear_channel_access_cache()
+        self.user = User(
+            id=7,
+            email="reader@example.com",
+            name="Reader",
+            channel_preferences=json.dumps({"misc": False}),
+            admin_channel_access="{}",
+        )
+
+    def tearDown(self):
+        clear_channel_access_cache()
+
+    def test_resolved_once_per_request_without_db(self):
+        with self.app.test_request_context("/"):
+            with patch.object(
+                users, "_compute_channel_access", wraps=users._compute_channel_access
+            ) as compute, patch.object(users.db, "session") as session:
+                allowed = get_user_allowed_channels(self.user)
+                for channel in users.get_channel_manager().get_channel_names():
+                    check_channel_access(channel, self.user)
+                    check_channel_access(channel, self.user, ignore_preferences=True)
+                get_user_allowed_channels(self.user, ignore_preferences=True)
+
+        self.assertEqual(compute.call_count, 1)
+        session.assert_not_called()
+        self.assertNotIn("misc", allowed)
+        self.assertIn("private", allowed)
+
+    def test_matches_per_channel_check(self):
+        """The resolver agrees with check_channel_access evaluated outside a request."""
+        expected = {
+            ignore: [
+                channel
+                for channel in users.get_channel_manager().get_channel_names()
+                if check_channel_access(channel, self.user, ignore)
+            ]
+            for ignore in (False, True)
+        }
+        with self.app.test_request_context("/"):
+            for ignore in (False, True):
+                self.assertEqual(get_user_allowed_channels(self.user, ignore), expected[ignore])
+
+    def test_process_cache_shared_until_access_changes(self):
+        with patch.object(
+            users, "_compute_channel_access", wraps=users._compute_channel_access
+        ) as compute:
+            with self.app.test_request_context("/"):
+                resolve_channel_access(self.user)
+            with self.app.test_request_context("/"):
+                resolve_channel_access(self.user)
+            self.assertEqual(compute.call_count, 1)
+
+            self.user.channel_preferences = "{}"
+            with self.app.test_request_context("/"):
+                self.assertIn("misc", get_user_allowed_channels(self.user))
+            self.assertEqual(compute.call_count, 2)
+
+    def test_anonymous_viewer(self):
+        with self.app.test_request_context("/"):
+            access = resolve_channel_access(None)
+            self.assertFalse(access.can_access("private"))
+            self.assertEqual(access.allowed(), access.allowed(ignore_preferences=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
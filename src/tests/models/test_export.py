@@ -0,0 +1,111 @@
+"""Tests for the streaming message exporter."""
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, update
+
+import constants
+from atacama.server import create_app
+from models.database import db
+from models.models import Email, Message, Quote, User
+from util.export import detect_format, export_messages
+from util.importer import read_messages
+
+
+class StreamingExportTests(unittest.TestCase):
+    """export_messages streams keyset batches to JSON, JSON Lines and gzip."""
+
+    def setUp(self):
+        constants.init_testing(test_db_path="sqlite:///:memory:", service="blog")
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.tmp = tempfile.TemporaryDirectory()
+
+        with db.session() as db_session:
+            user = User(email="export@example.com", name="Exporter")
+            db_session.add(user)
+            db_session.flush()
+            self.ids = []
+            for n in range(7):
+                email = Email(
+                    author=user,
+                    channel="misc",
+                    subject=f"Export {n}",
+                    content=f"body {n}",
+                    processed_content=f"<p>body {n}</p>",
+                    quotes=[
+                        Quote(author=user, channel="misc", text=f"Quote {n}", quote_type="personal")
+                    ],
+                )
+                db_session.add(email)
+                db_session.flush()
+                self.ids.append(email.id)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        self.ctx.pop()
+        db.cleanup()
+        constants.reset()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_json_document_in_batches(self):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db._engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            count = export_messages(self.path("out.json"), pretty=False, batch_size=3)
+        finally:
+            event.remove(db._engine, "before_cursor_execute", before_cursor_execute)
+
+        with open(self.path("out.json"), encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(count, 7)
+        self.assertEqual(data["total_messages"], 7)
+        self.assertEqual([m["id"] for m in data["messages"]], self.ids)
+        self.assertEqual(data["messages"][2]["quotes"][0]["text"], "Quote 2")
+        self.assertEqual(data["messages"][0]["author"]["name"], "Exporter")
+        # Three batches of (emails, quotes, authors) plus the empty final page
+        self.assertLessEqual(len(statements), 3 * 3 + 1)
+        self.assertEqual(os.listdir(self.tmp.name), ["out.json"])
+
+    def test_gzipped_json_lines_since(self):
+        cutoff = datetime.utcnow() + timedelta(seconds=1)
+        with db.session() as db_session:
+            db_session.execute(
+                update(Message)
+                .where(Message.id.in_(self.ids[-2:]))
+                .values(last_modified_at=cutoff + timedelta(minutes=1))
+            )
+
+        count = export_messages(self.path("backup.jsonl.gz"), since=cutoff, batch_size=1)
+        with gzip.open(self.path("backup.jsonl.gz"), "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(count, 2)
+        self.assertEqual([line["id"] for line in lines], self.ids[-2:])
+
+    def test_zstd_json_lines_round_trip(self):
+        count = export_messages(self.path("backup.jsonl.zst"), batch_size=4)
+        messages = list(read_messages(self.path("backup.jsonl.zst")))
+        self.assertEqual(count, 7)
+        self.assertEqual([message["id"] for message in messages], self.ids)
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("a.json"), ("json", None))
+        self.assertEqual(detect_format("a.jsonl"), ("jsonl", None))
+        self.assertEqual(detect_format("a.json.gz"), ("json", "gzip"))
+        self.assertEqual(detect_format("dir/a.jsonl.zst"), ("jsonl", "zstd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""Tests for the batched message importer."""
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import event, update
+
+import constants
+from atacama.server import create_app
+from models.database import db
+from models.models import Email, Quote, User, backfill_message_hashes, message_content_hash
+from util.importer import generate_message_hash, import_messages
+
+
+def message_record(n, **fields):
+    record = {
+        "id": n,
+        "subject": f"Imported {n}",
+        "content": f"body {n}",
+        "processed_content": f"<p>body {n}</p>",
+        "created_at": "2024-01-02T03:04:05",
+        "channel": "misc",
+        "author": {"email": "importer@example.com", "name": "Importer"},
+        "quotes": [],
+    }
+    record.update(fields)
+    return record
+
+
+class ImporterTests(unittest.TestCase):
+    """import_messages checks hashes per chunk and inserts new rows in bulk."""
+
+    def setUp(self):
+        constants.init_testing(test_db_path="sqlite:///:memory:", service="blog")
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        self.ctx.pop()
+        db.cleanup()
+        constants.reset()
+
+    def write(self, name, messages):
+        path = os.path.join(self.tmp.name, name)
+        if name.endswith(".jsonl.gz"):
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                f.writelines(json.dumps(message) + "\n" for message in messages)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"messages": messages}, f)
+        return path
+
+    def test_stored_hash_matches_import_hash(self):
+        with db.session() as db_session:
+            user = User(email="importer@example.com", name="Importer")
+            db_session.add(user)
+            db_session.flush()
+            email = Email(
+                author_id=user.id,
+                channel="misc",
+                subject="Imported 1",
+                content="body 1",
+                processed_content="<p>body 1</p>",
+            )
+            db_session.add(email)
+            db_session.flush()
+            self.assertEqual(email.content_hash, generate_message_hash(message_record(1)))
+
+            email.content = "edited"
+            db_session.flush()
+            self.assertEqual(
+                email.content_hash,
+                message_content_hash("Imported 1", "edited", "importer@example.com"),
+            )
+
+    def test_chunked_import_skips_known_messages(self):
+        with db.session() as db_session:
+            user = User(email="importer@example.com", name="Importer")
+            db_session.add(user)
+            db_session.flush()
+            db_session.add(
+                Email(
+                    author=user,
+                    channel="misc",
+                    subject="Imported 2",
+                    content="body 2",
+                    processed_content="<p>2</p>",
+                )
+            )
+
+        messages = [message_record(n) for n in range(1, 9)]
+        messages.append(
+            message_record(
+                9, subject="Imported 1", content="body 1", processed_content="<p>body 1</p>"
+            )
+        )
+        messages[3]["parent_id"] = 1
+        messages[4]["quotes"] = [
+            {"text": "Imported quote", "quote_type": "reference", "created_at": "2024-01-02"}
+        ]
+        path = self.write("messages.json", messages)
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if "emails.content_hash IN" in statement:
+                statements.append(statement)
+
+        event.listen(db._engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            report = import_messages(path, batch_size=4)
+        finally:
+            event.remove(db._engine, "before_cursor_execute", before_cursor_execute)
+
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(report.read, 9)
+        self.assertEqual(report.imported, 7)
+        self.assertEqual(report.skipped_existing, 1)
+        self.assertEqual(report.skipped_in_file, 1)
+        self.assertGreater(report.messages_per_second, 0)
+        self.assertIn("messages/s", report.summary())
+
+        with db.session() as db_session:
+            self.assertEqual(db_session.query(Email).count(), 8)
+            self.assertEqual(db_session.query(User).count(), 1)
+            child = db_session.query(Email).filter_by(subject="Imported 4").one()
+            self.assertEqual(child.parent.subject, "Imported 1")
+            quoted = db_session.query(Email).filter_by(subject="Imported 5").one()
+            self.assertEqual([quote.text for quote in quoted.quotes], ["Imported quote"])
+            self.assertEqual(db_session.query(Quote).one().author.email, "importer@example.com")
+
+        # A second run finds everything already stored
+        again = import_messages(path)
+        self.assertEqual((again.imported, again.skipped_existing), (0, 8))
+
+    def test_force_and_gzipped_json_lines(self):
+        path = self.write("messages.jsonl.gz", [message_record(n) for n in range(3)])
+        import_messages(path)
+        report = import_messages(path, skip_duplicates=False)
+        self.assertEqual(report.imported, 3)
+        with db.session() as db_session:
+            self.assertEqual(db_session.query(Email).count(), 6)
+
+    def test_backfill_hashes_legacy_rows(self):
+        with db.session() as db_session:
+            user = User(email="legacy@example.com", name="Legacy")
+            emails = [
+                Email(
+                    author=user,
+                    channel="misc",
+                    subject=f"Old {n}",
+                    content="words",
+                    processed_content="words",
+                )
+                for n in range(5)
+            ]
+            db_session.add_all(emails)
+            db_session.flush()
+            db_session.execute(
+                update(Email.__table__)
+                .where(Email.__table__.c.id != emails[2].id)
+                .values(content_hash=None)
+            )
+            # Two batches of two, skipping the email that already has a hash
+            self.assertEqual(backfill_message_hashes(db_session.connection(), batch_size=2), 4)
+            for n, email in enumerate(emails):
+                db_session.expire(email)
+                self.assertEqual(
+                    email.content_hash,
+                    message_content_hash(f"Old {n}", "words", "legacy@example.com"),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Tests for CTE-based message chain loading and parent cycle checks."""
+
+import unittest
+from datetime import datetime, timedelta
+
+from flask import g
+from sqlalchemy import event
+
+import constants
+from atacama.server import create_app
+from models.database import db
+from models.messages import get_message_chain
+from models.models import Email, User
+from util.db import set_message_parent
+
+
+class MessageChainTests(unittest.TestCase):
+    """Chains load in constant queries however deep the thread is."""
+
+    def setUp(self):
+        constants.init_testing(test_db_path="sqlite:///:memory:", service="blog")
+        self.app = create_app(testing=True)
+        self.app.config.update({"TESTING": True, "SERVER_NAME": "test.local"})
+        self.start = datetime.utcnow() - timedelta(days=1)
+
+        with self.app.app_context():
+            with db.session() as db_session:
+                user = User(email="chain@example.com", name="Chain User")
+                db_session.add(user)
+                db_session.flush()
+                self.user_id = user.id
+
+    def tearDown(self):
+        db.cleanup()
+        constants.reset()
+
+    def add_thread(self, depth, channel="misc"):
+        """Add a linear thread of depth emails and return their ids, root first."""
+        ids = []
+        with self.app.app_context():
+            with db.session() as db_session:
+                parent_id = None
+                for n in range(depth):
+                    email = Email(
+                        author_id=self.user_id,
+                        channel=channel,
+                        subject=f"Message {n}",
+                        content="body",
+                        processed_content="<p>body</p>",
+                        parent_id=parent_id,
+                        created_at=self.start + timedelta(minutes=n),
+                    )
+                    db_session.add(email)
+                    db_session.flush()
+                    parent_id = email.id
+                    ids.append(email.id)
+        return ids
+
+    def load_chain(self, message_id):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app.test_request_context("/"):
+            g.user = None
+            event.listen(db._engine, "before_cursor_execute", before_cursor_execute)
+            try:
+                chain = get_message_chain(message_id)
+            finally:
+                event.remove(db._engine, "before_cursor_execute", before_cursor_execute)
+        return chain, len(statements)
+
+    def test_chain_order_and_constant_queries(self):
+        short_ids = self.add_thread(3)
+        long_ids = self.add_thread(25)
+
+        chain, short_queries = self.load_chain(short_ids[1])
+        self.assertEqual([m.id for m in chain], short_ids)
+
+        chain, long_queries = self.load_chain(long_ids[-2])
+        self.assertEqual([m.id for m in chain], long_ids)
+        self.assertEqual(short_queries, long_queries)
+        self.assertEqual(long_queries, 1)
+
+    def test_children_in_other_channels_are_skipped(self):
+        root_id = self.add_thread(1)[0]
+        with self.app.app_context():
+            with db.session() as db_session:
+                db_session.add(
+                    Email(
+                        author_id=self.user_id,
+                        channel="private",
+                        subject="Elsewhere",
+                        content="body",
+                        processed_content="<p>body</p>",
+                        parent_id=root_id,
+                    )
+                )
+        chain, _ = self.load_chain(root_id)
+        self.assertEqual([m.id for m in chain], [root_id])
+
+    def test_set_parent_rejects_cycles(self):
+        ids = self.add_thread(10)
+        with self.app.app_context():
+            ok, error = set_message_parent(ids[0], ids[-1])
+            self.assertFalse(ok)
+            self.assertIn("Circular", error)
+
+            ok, error = set_message_parent(ids[3], ids[3])
+            self.assertFalse(ok)
+
+            other = self.add_thread(1)[0]
+            ok, error = set_message_parent(other, ids[-1])
+            self.assertTrue(ok, error)
+            with db.session() as db_session:
+                self.assertEqual(db_session.get(Email, other).parent_id, ids[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -100,24 +100,16 @@ class TestMessages(unittest.TestCase):
         mock_manager.get_channel_names.return_value = ["private", "public", "restricted"]
         mock_get_manager.return_value = mock_manager
 
-        # Mock check_channel_access to respect user preferences
-        with patch("models.users.check_channel_access") as mock_check_access:
-
-            def check_access_side_effect(channel, user, ignore_preferences=False):
-                if ignore_preferences:
-                    return True
-                preferences = json.loads(user.channel_preferences)
-                return preferences.get(channel, False)
-
-            mock_check_access.side_effect = check_access_side_effect
+        mock_manager.check_system_access.return_value = True
+        self.user.channel_preferences = json.dumps({"restricted": False})
 
-            # Test with preferences
-            allowed = get_user_allowed_channels(self.user)
-            self.assertEqual(set(allowed), {"private", "public"})
+        # Test with preferences
+        allowed = get_user_allowed_channels(self.user)
+        self.assertEqual(set(allowed), {"private", "public"})
 
-            # Test with preferences ignored
-            allowed = get_user_allowed_channels(self.user, ignore_preferences=True)
-            self.assertEqual(set(allowed), {"private", "public", "restricted"})
+        # Test with preferences ignored
+        allowed = get_user_allowed_channels(self.user, ignore_preferences=True)
+        self.assertEqual(set(allowed), {"private", "public", "restricted"})
 
     def test_check_message_access(self):
         """Test checking access to specific messages."""
@@ -151,12 +143,15 @@ class TestMessages(unittest.TestCase):
     def test_get_message_chain(self, mock_session):
         """Test retrieving full message chain."""
         parent = Email(id=2, channel="private")
-        child = Email(id=3, channel="private")
-        self.message.parent = parent
-        self.message.children = [child]
+        child = Email(id=3, channel="private", parent_id=1, created_at=datetime.utcnow())
+        self.message.parent_id = 2
 
         mock_query = MagicMock()
-        mock_query.options.return_value.filter.return_value.first.return_value = self.message
+        mock_query.options.return_value.filter.return_value.all.return_value = [
+            child,
+            self.message,
+            parent,
+        ]
         mock_session.return_value.__enter__.return_value.query.return_value = mock_query
 
         with patch("models.messages.check_message_access") as mock_check:
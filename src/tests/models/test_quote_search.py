@@ -0,0 +1,123 @@
+"""Tests for full-text quote search."""
+
+import unittest
+
+from sqlalchemy import text
+
+import constants
+from atacama.server import create_app
+from models.database import db
+from models.models import Quote, User
+from models.quote_search import BACKEND_FTS5, quote_search_backend, rebuild_quote_search_index
+from models.quotes import search_quotes
+
+
+class QuoteSearchTests(unittest.TestCase):
+    """search_quotes uses the FTS5 index, ranks matches and paginates."""
+
+    def setUp(self):
+        constants.init_testing(test_db_path="sqlite:///:memory:", service="blog")
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        with db.session() as db_session:
+            user = User(email="quotes@example.com", name="Quoter")
+            db_session.add(user)
+            db_session.flush()
+            self.user_id = user.id
+
+    def tearDown(self):
+        self.ctx.pop()
+        db.cleanup()
+        constants.reset()
+
+    def add_quote(self, quote_text, quote_type="personal", **fields):
+        with db.session() as db_session:
+            quote = Quote(
+                author_id=self.user_id,
+                channel="misc",
+                text=quote_text,
+                quote_type=quote_type,
+                **fields,
+            )
+            db_session.add(quote)
+            db_session.flush()
+            return quote.id
+
+    def search(self, term, **kwargs):
+        with db.session() as db_session:
+            quotes, has_more = search_quotes(db_session, term, **kwargs)
+            return [quote.id for quote in quotes], has_more
+
+    def test_uses_fts5_backend(self):
+        with db.session() as db_session:
+            self.assertEqual(quote_search_backend(db_session), BACKEND_FTS5)
+
+    def test_ranked_prefix_matches(self):
+        in_commentary = self.add_quote("Something else", commentary="about persistence")
+        in_text = self.add_quote("Persistence beats talent")
+        self.add_quote("Unrelated words")
+
+        ids, has_more = self.search("persist")
+        self.assertEqual(ids, [in_text, in_commentary])
+        self.assertFalse(has_more)
+
+        self.assertEqual(self.search("persistence talent")[0], [in_text])
+        self.assertEqual(self.search("Twain")[0], [])
+
+    def test_index_follows_update_and_delete(self):
+        quote_id = self.add_quote("Original words", original_author="Anon")
+        self.assertEqual(self.search("anon")[0], [quote_id])
+
+        with db.session() as db_session:
+            db_session.get(Quote, quote_id).original_author = "Mark Twain"
+        self.assertEqual(self.search("anon")[0], [])
+        self.assertEqual(self.search("twain")[0], [quote_id])
+
+        with db.session() as db_session:
+            db_session.delete(db_session.get(Quote, quote_id))
+        self.assertEqual(self.search("twain")[0], [])
+
+    def test_pagination_and_type_filter(self):
+        ids = [self.add_quote(f"River number {n}") for n in range(5)]
+        self.add_quote("River technical", quote_type="technical")
+
+        first, more = self.search("river", per_page=4)
+        second, last = self.search("river", per_page=4, page=2)
+        self.assertTrue(more)
+        self.assertFalse(last)
+        self.assertEqual(len(first) + len(second), 6)
+        self.assertEqual(set(first) & set(second), set())
+
+        technical, _ = self.search("river", quote_type="technical")
+        self.assertEqual(len(technical), 1)
+        self.assertNotIn(technical[0], ids)
+
+    def test_query_syntax_is_neutralized(self):
+        quote_id = self.add_quote("Near the end")
+        self.assertEqual(self.search('NEAR("end*')[0], [quote_id])
+        self.assertEqual(self.search("***")[0], [])
+
+    def test_cjk_substring_matches(self):
+        chinese = self.add_quote("人生如梦，一尊还酹江月")
+        japanese = self.add_quote("猿も木から落ちる", original_author="ことわざ")
+        self.add_quote("Unrelated words")
+
+        self.assertEqual(self.search("江月")[0], [chinese])
+        self.assertEqual(self.search("木から")[0], [japanese])
+        self.assertEqual(self.search("ことわざ")[0], [japanese])
+        self.assertEqual(self.search("月江")[0], [])
+
+    def test_rebuild(self):
+        quote_id = self.add_quote("Rebuilt index entry")
+        with db.session() as db_session:
+            db_session.execute(text("INSERT INTO quotes_fts(quotes_fts) VALUES ('delete-all')"))
+        self.assertEqual(self.search("rebuilt")[0], [])
+
+        with db.session() as db_session:
+            rebuild_quote_search_index(db_session.connection())
+        self.assertEqual(self.search("rebuilt")[0], [quote_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
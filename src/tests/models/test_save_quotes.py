@@ -0,0 +1,185 @@
+"""Tests for hash-indexed quote deduplication."""
+
+import unittest
+
+from sqlalchemy import event, select, update
+
+import aml_parser
+import constants
+from atacama.server import create_app
+from models.database import db
+from models.models import (
+    Email,
+    Quote,
+    User,
+    backfill_quote_hashes,
+    email_quotes,
+    quote_content_hash,
+)
+from models.quotes import QuoteValidationError, save_quotes, update_quote
+
+
+class SaveQuotesTests(unittest.TestCase):
+    """save_quotes resolves every candidate in one lookup and never duplicates a quote."""
+
+    def setUp(self):
+        constants.init_testing(test_db_path="sqlite:///:memory:", service="blog")
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        with db.session() as db_session:
+            user = User(email="saver@example.com", name="Saver")
+            db_session.add(user)
+            db_session.flush()
+            self.user_id = user.id
+
+    def tearDown(self):
+        self.ctx.pop()
+        db.cleanup()
+        constants.reset()
+
+    def new_email(self, db_session):
+        email = Email(
+            author=db_session.get(User, self.user_id),
+            channel="misc",
+            subject="Quotes",
+            content="body",
+            processed_content="<p>body</p>",
+        )
+        db_session.add(email)
+        return email
+
+    def test_hash_ignores_whitespace_and_unicode_form(self):
+        self.assertEqual(
+            quote_content_hash(" To be,\n or  not "), quote_content_hash("To be, or not")
+        )
+        self.assertEqual(quote_content_hash("café"), quote_content_hash("café"))
+        self.assertNotEqual(quote_content_hash("To be"), quote_content_hash("to be"))
+
+    def test_single_lookup_and_only_missing_inserted(self):
+        with db.session() as db_session:
+            existing = Quote(
+                author_id=self.user_id, channel="misc", text="Known quote", quote_type="reference"
+            )
+            db_session.add(existing)
+            db_session.flush()
+            existing_id = existing.id
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with db.session() as db_session:
+            email = self.new_email(db_session)
+            event.listen(db._engine, "before_cursor_execute", before_cursor_execute)
+            try:
+                save_quotes(
+                    [
+                        {"text": "Known  quote", "quote_type": "reference"},
+                        {"text": "Fresh quote", "quote_type": "reference"},
+                        {"text": "Fresh quote ", "quote_type": "reference"},
+                    ],
+                    email,
+                    db_session,
+                )
+            finally:
+                event.remove(db._engine, "before_cursor_execute", before_cursor_execute)
+            db_session.flush()
+            linked = sorted(quote.text for quote in email.quotes)
+
+        self.assertEqual(len(statements), 1)
+        self.assertIn("content_hash IN", statements[0])
+        self.assertEqual(linked, ["Fresh quote", "Known quote"])
+        with db.session() as db_session:
+            self.assertEqual(db_session.query(Quote).count(), 2)
+            self.assertIsNotNone(db_session.get(Quote, existing_id).content_hash)
+
+    def test_rendering_saves_repeated_quotes_once(self):
+        with db.session() as db_session:
+            first = self.new_email(db_session)
+            aml_parser.process_message(
+                "<yellow> Same words\n\n<yellow> Same words", db_session=db_session, message=first
+            )
+            second = self.new_email(db_session)
+            aml_parser.process_message("<quote> Same words", db_session=db_session, message=second)
+            db_session.flush()
+            self.assertEqual(len(first.quotes), 1)
+            self.assertEqual(second.quotes, first.quotes)
+            self.assertEqual(db_session.query(Quote).count(), 1)
+
+    def test_hash_follows_text_edits(self):
+        with db.session() as db_session:
+            quote = Quote(
+                author_id=self.user_id, channel="misc", text="Before", quote_type="personal"
+            )
+            db_session.add(quote)
+            db_session.flush()
+            quote.text = "After"
+            db_session.flush()
+            self.assertEqual(quote.content_hash, quote_content_hash("After"))
+
+    def legacy_quotes(self, db_session, texts):
+        """Insert quotes as if written before content_hash existed."""
+        ids = []
+        for text in texts:
+            quote = Quote(author_id=self.user_id, channel="misc", text=text, quote_type="personal")
+            db_session.add(quote)
+            db_session.flush()
+            ids.append(quote.id)
+            db_session.execute(
+                update(Quote.__table__)
+                .where(Quote.__table__.c.id == quote.id)
+                .values(content_hash=None)
+            )
+        db_session.expire_all()
+        return ids
+
+    def test_backfill_merges_legacy_duplicates(self):
+        with db.session() as db_session:
+            ids = self.legacy_quotes(db_session, ("Legacy", "Other", "Legacy"))
+            first, second = self.new_email(db_session), self.new_email(db_session)
+            db_session.flush()
+            first, second = first.id, second.id
+            links = email_quotes.insert()
+            db_session.execute(links.values(email_id=first, quote_id=ids[0]))
+            db_session.execute(links.values(email_id=first, quote_id=ids[2]))
+            db_session.execute(links.values(email_id=second, quote_id=ids[2]))
+
+            self.assertEqual(backfill_quote_hashes(db_session.connection()), 2)
+            db_session.expire_all()
+            hashes = dict(db_session.query(Quote.id, Quote.content_hash))
+            linked = sorted(
+                db_session.execute(select(email_quotes.c.email_id, email_quotes.c.quote_id)).all()
+            )
+
+        self.assertEqual(
+            hashes, {ids[0]: quote_content_hash("Legacy"), ids[1]: quote_content_hash("Other")}
+        )
+        self.assertEqual(linked, [(first, ids[0]), (second, ids[0])])
+
+    def test_metadata_edit_keeps_hash_and_text_collision_is_refused(self):
+        with db.session() as db_session:
+            kept, edited = self.legacy_quotes(db_session, ("Kept", "Edited"))
+            db_session.execute(
+                update(Quote.__table__)
+                .where(Quote.__table__.c.id == kept)
+                .values(content_hash=quote_content_hash("Kept"))
+            )
+            # A commentary edit does not hash the quote, so it cannot collide
+            db_session.get(Quote, edited).commentary = "Only commentary"
+            db_session.flush()
+            self.assertIsNone(db_session.get(Quote, edited).content_hash)
+
+            data = {"text": "Kept", "quote_type": "personal"}
+            with self.assertRaises(QuoteValidationError):
+                update_quote(db_session, edited, data)
+            data["text"] = "Edited again"
+            self.assertEqual(
+                update_quote(db_session, edited, data).content_hash,
+                quote_content_hash("Edited again"),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -182,27 +182,25 @@ class TestUsers(unittest.TestCase):
         mock_manager.get_channel_names.return_value = ["private", "public", "restricted"]
         mock_get_manager.return_value = mock_manager
 
-        # Mock check_channel_access to respect user preferences
-        with patch("models.users.check_channel_access") as mock_check_access:
-
-            def check_access_side_effect(channel, user, ignore_preferences=False):
-                if channel == "private" or channel == "public":
-                    return True
-                return False
+        mock_manager.check_system_access.side_effect = (
+            lambda channel, email=None, has_admin_access=False: channel != "restricted"
+            or has_admin_access
+        )
 
-            mock_check_access.side_effect = check_access_side_effect
+        # "restricted" is granted by admin_channel_access; preferences only cover some channels
+        allowed = get_user_allowed_channels(self.user)
+        self.assertEqual(allowed, ["private", "public", "restricted"])
 
-            # Test with user
-            allowed = get_user_allowed_channels(self.user)
-            self.assertEqual(set(allowed), {"private", "public"})
+        self.user.channel_preferences = json.dumps({"public": False})
+        allowed = get_user_allowed_channels(self.user)
+        self.assertEqual(allowed, ["private", "restricted"])
 
-            # Test with ignore_preferences
-            def check_access_all(channel, user, ignore_preferences=False):
-                return True
+        # Test with ignore_preferences
+        allowed = get_user_allowed_channels(self.user, ignore_preferences=True)
+        self.assertEqual(allowed, ["private", "public", "restricted"])
 
-            mock_check_access.side_effect = check_access_all
-            allowed = get_user_allowed_channels(self.user, ignore_preferences=True)
-            self.assertEqual(set(allowed), {"private", "public", "restricted"})
+        # Anonymous viewers never get admin-granted channels
+        self.assertEqual(get_user_allowed_channels(None), ["private", "public"])
 
     def test_grant_channel_access_by_id(self):
         """Test granting channel access to a user."""
@@ -0,0 +1,61 @@
+"""Fake widget toolchain shared by the WidgetBuilder tests.
+
+install_fake_toolchain marks a builder's workspace as installed without running
+npm, and optionally puts a shell script at node_modules/.bin/webpack in place of
+the webpack CLI, so builds run end to end in milliseconds.
+"""
+
+import os
+import stat
+from typing import Optional
+
+from react_compiler.react_compiler import WidgetBuilder
+from react_compiler.workspace import READY_MARKER, ToolchainWorkspace
+
+
+def make_builder(root: str, **options) -> WidgetBuilder:
+    """
+    WidgetBuilder that builds offline with its build and toolchain directories under root.
+
+    :param root: Temporary directory owned by the test
+    :param options: Other WidgetBuilder keyword arguments; the build cache is off
+                    unless use_cache or build_cache is given
+    :return: WidgetBuilder
+    """
+    if "build_cache" not in options:
+        options.setdefault("use_cache", False)
+    return WidgetBuilder(
+        build_dir=os.path.join(root, "builds"),
+        offline=True,
+        workspace_root=os.path.join(root, "toolchain"),
+        **options,
+    )
+
+
+def install_fake_toolchain(
+    workspace: ToolchainWorkspace, webpack_script: Optional[str] = None
+) -> None:
+    """
+    Mark a workspace installed: the ready marker, a lockfile and node_modules/.bin.
+
+    :param workspace: Workspace of the builder under test
+    :param webpack_script: Shell script installed as the webpack CLI (None for none)
+    """
+    os.makedirs(os.path.join(workspace.node_modules, ".bin"), exist_ok=True)
+    with open(os.path.join(workspace.path, READY_MARKER), "w") as f:
+        f.write(workspace.key)
+    with open(os.path.join(workspace.path, "package-lock.json"), "w") as f:
+        f.write("{}")
+    if webpack_script is not None:
+        install_webpack_script(workspace, webpack_script)
+
+
+def install_webpack_script(workspace: ToolchainWorkspace, script: str) -> None:
+    """
+    :param workspace: Workspace prepared by install_fake_toolchain
+    :param script: Shell script installed as the webpack CLI
+    """
+    webpack = workspace.bin_path("webpack")
+    with open(webpack, "w") as f:
+        f.write(script)
+    os.chmod(webpack, os.stat(webpack).st_mode | stat.S_IEXEC)
@@ -0,0 +1,111 @@
+"""Tests for the widget build cache, using a stub webpack in a prepared workspace."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from react_compiler.build_cache import BuildCache, build_key
+from react_compiler.react_compiler import WidgetBuilder
+from tests.react_compiler.fake_toolchain import install_fake_toolchain, make_builder
+
+STUB_WEBPACK = """#!/bin/sh
+echo "$@" >> "{log}"
+mkdir -p dist
+echo "var Widget_Hello = {{ default: function Hello() {{}} }};" > dist/widget.bundle.js
+"""
+
+WIDGET = "const Hello = () => <div>Hi</div>;\nexport default Hello;"
+
+CONFIG = 'module.exports = { externals: {"lodash": "_"} };'
+
+
+class BuildCacheTests(unittest.TestCase):
+    """BuildCache stores bundles by key, counts hits and evicts least recently used."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = BuildCache(root=self.tmp.name, max_bytes=25)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_line_endings_but_not_mode_config_or_toolchain(self):
+        def key(code=WIDGET, hooks=None, development=False, config=CONFIG, toolchain="tc1"):
+            return build_key(
+                code, "Hello", hooks or {}, [], ["lodash"], development, None, config, toolchain
+            )
+
+        self.assertEqual(key(), key(code=WIDGET.replace("\n", "\r\n") + "\n"))
+        self.assertNotEqual(key(), key(development=True))
+        self.assertNotEqual(key(), key(toolchain="tc2"))
+        self.assertNotEqual(key(), key(hooks={"useFullscreen": "x"}))
+        self.assertNotEqual(key(), key(config=CONFIG.replace('"_"', '"lodash"')))
+
+    def test_hits_misses_and_lru_eviction(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", "x" * 10)
+        self.cache.put("b", "y" * 10)
+        os.utime(os.path.join(self.tmp.name, "a.js"), (1, 1))
+        os.utime(os.path.join(self.tmp.name, "b.js"), (2, 2))
+        self.assertEqual(self.cache.get("a"), "x" * 10)  # a is now most recent
+
+        self.cache.put("c", "z" * 10)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), "z" * 10)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 2, 1))
+        self.assertEqual(stats["size_bytes"], 20)
+
+
+class WidgetBuilderCacheTests(unittest.TestCase):
+    """build_widget skips webpack when an identical build is cached."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "webpack.log")
+        self.builder = make_builder(
+            self.tmp.name, build_cache=BuildCache(root=os.path.join(self.tmp.name, "cache"))
+        )
+        install_fake_toolchain(self.builder.workspace, STUB_WEBPACK.format(log=self.log))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def webpack_runs(self):
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as f:
+            return len(f.readlines())
+
+    def test_identical_build_served_from_cache(self):
+        first = self.builder.build_widget(WIDGET, "Hello", external_dependencies=["lodash"])
+        second = self.builder.build_widget(WIDGET, "Hello", external_dependencies=["lodash"])
+        self.assertTrue(first[0], first[2])
+        self.assertEqual(first, second)
+        self.assertIn("window.Hello", second[1])
+        self.assertEqual(self.webpack_runs(), 1)
+        self.assertEqual(self.builder.build_cache.stats()["hits"], 1)
+
+        self.builder.build_widget(
+            WIDGET, "Hello", external_dependencies=["lodash"], development_mode=True
+        )
+        self.builder.build_widget(WIDGET + "\n// edited", "Hello", external_dependencies=["lodash"])
+        self.assertEqual(self.webpack_runs(), 3)
+
+    def test_config_change_misses_the_cache(self):
+        self.builder.build_widget(WIDGET, "Hello", external_dependencies=["lodash"])
+        with patch.dict(WidgetBuilder.EXTERNAL_PACKAGE_MAPPINGS, {"lodash": "lodash"}):
+            self.builder.build_widget(WIDGET, "Hello", external_dependencies=["lodash"])
+        self.assertEqual(self.webpack_runs(), 2)
+
+    def test_cache_can_be_disabled(self):
+        builder = make_builder(self.tmp.name)
+        builder.build_widget(WIDGET, "Hello")
+        builder.build_widget(WIDGET, "Hello")
+        self.assertEqual(self.webpack_runs(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
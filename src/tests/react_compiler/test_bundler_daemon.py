@@ -0,0 +1,169 @@
+"""Tests for the resident bundler daemon, using a stub webpack Node module."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+
+from react_compiler.bundler_daemon import BundlerDaemonPool, get_bundler_pool
+from tests.react_compiler.fake_toolchain import (
+    install_fake_toolchain,
+    install_webpack_script,
+    make_builder,
+)
+
+# Stands in for webpack's Node API: logs each load and run, and writes a bundle
+STUB_WEBPACK_MODULE = """
+const fs = require('fs');
+const path = require('path');
+fs.appendFileSync('LOG', 'load\\n');
+module.exports = function webpack(config) {
+    return {
+        run(callback) {
+            fs.appendFileSync('LOG', 'run\\n');
+            const source = fs.readFileSync(path.join(config.context, 'src', 'widget.js'), 'utf8');
+            if (source.includes('HANG')) {
+                return;
+            }
+            if (source.includes('BROKEN')) {
+                callback(null, {
+                    hasErrors: () => true,
+                    toJson: () => ({ errors: [{ message: 'Unexpected token' }] }),
+                });
+                return;
+            }
+            const finish = () => {
+                fs.mkdirSync(config.output.path, { recursive: true });
+                fs.writeFileSync(
+                    path.join(config.output.path, config.output.filename),
+                    'var ' + config.output.library + ' = { default: function() {} };'
+                );
+                callback(null, { hasErrors: () => false });
+            };
+            setTimeout(finish, source.includes('SLOW') ? 1000 : 0);
+        },
+        close(callback) {
+            callback();
+        },
+    };
+};
+"""
+
+STUB_WEBPACK_BIN = """#!/bin/sh
+echo cli >> "{log}"
+mkdir -p dist
+echo "var Widget_Hello = {{ default: function Hello() {{}} }};" > dist/widget.bundle.js
+"""
+
+WIDGET = "const Hello = () => <div>Hi</div>;\nexport default Hello;"
+
+
+@unittest.skipUnless(shutil.which("node"), "node is not installed")
+class BundlerDaemonTests(unittest.TestCase):
+    """Builds go to warm Node processes, with the webpack CLI as fallback."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "webpack.log")
+        self.builder = self.make_builder(timeout=10)
+        install_fake_toolchain(self.builder.workspace)
+
+    def tearDown(self):
+        get_bundler_pool(self.builder.workspace).stop()
+        self.tmp.cleanup()
+
+    def make_builder(self, **kwargs):
+        return make_builder(self.tmp.name, use_daemon=True, **kwargs)
+
+    def install_webpack_module(self):
+        module_dir = os.path.join(self.builder.workspace.node_modules, "webpack")
+        os.makedirs(module_dir)
+        with open(os.path.join(module_dir, "index.js"), "w") as f:
+            f.write(STUB_WEBPACK_MODULE.replace("LOG", self.log))
+
+    def log_lines(self):
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as f:
+            return f.read().split()
+
+    def test_builds_share_one_warm_process(self):
+        self.install_webpack_module()
+        first = self.builder.build_widget(WIDGET, "Hello")
+        second = self.builder.build_widget(WIDGET + "\n// edited", "Hello", development_mode=True)
+        self.assertTrue(first[0], first[2])
+        self.assertTrue(second[0], second[2])
+        self.assertIn("window.Hello", first[1])
+        self.assertEqual(self.log_lines(), ["load", "run", "run"])
+        self.assertEqual(get_bundler_pool(self.builder.workspace).builds, 2)
+
+    def test_concurrent_builds_get_their_own_daemon(self):
+        self.install_webpack_module()
+        results = []
+        slow = threading.Thread(
+            target=lambda: results.append(self.builder.build_widget(WIDGET + "\n// SLOW", "Hello"))
+        )
+        slow.start()
+        time.sleep(0.3)  # The slow build holds the first daemon
+
+        start = time.monotonic()
+        results.append(self.builder.build_widget(WIDGET, "Hello"))
+        self.assertLess(time.monotonic() - start, 1.0)  # Did not wait for the slow build
+        slow.join()
+
+        self.assertTrue(all(success for success, _, _ in results), results)
+        self.assertEqual(self.log_lines().count("load"), 2)
+
+    def test_wait_for_a_busy_pool_is_bounded(self):
+        self.install_webpack_module()
+        pool = BundlerDaemonPool(self.builder.workspace, size=1)
+        self.addCleanup(pool.stop)
+        build_dir = os.path.join(self.tmp.name, "slow")
+        os.makedirs(os.path.join(build_dir, "src"))
+        with open(os.path.join(build_dir, "src", "widget.js"), "w") as f:
+            f.write("// SLOW")
+        with open(os.path.join(build_dir, "webpack.config.js"), "w") as f:
+            f.write(
+                "module.exports = {output: {path: __dirname + '/dist', "
+                "filename: 'widget.bundle.js', library: 'Widget_Hello'}};"
+            )
+
+        busy = threading.Thread(target=pool.compile, args=(build_dir, "production", 10))
+        busy.start()
+        time.sleep(0.3)
+        with self.assertRaises(subprocess.TimeoutExpired):
+            pool.compile(build_dir, "production", timeout=0.1)
+        busy.join()
+        self.assertEqual(pool.compile(build_dir, "production", timeout=10), (True, ""))
+
+    def test_compile_errors_are_reported(self):
+        self.install_webpack_module()
+        success, _, error = self.builder.build_widget(WIDGET + "\n// BROKEN", "Hello")
+        self.assertFalse(success)
+        self.assertIn("Unexpected token", error)
+
+    def test_timeout_restarts_daemon(self):
+        self.install_webpack_module()
+        builder = self.make_builder(timeout=1)
+        success, _, error = builder.build_widget(WIDGET + "\n// HANG", "Hello")
+        self.assertFalse(success)
+        self.assertIn("timed out", error)
+
+        success, _, error = builder.build_widget(WIDGET, "Hello")
+        self.assertTrue(success, error)
+        self.assertEqual(self.log_lines().count("load"), 2)
+
+    def test_falls_back_to_webpack_cli(self):
+        # No webpack module, so the daemon cannot start
+        install_webpack_script(self.builder.workspace, STUB_WEBPACK_BIN.format(log=self.log))
+        success, code, error = self.builder.build_widget(WIDGET, "Hello")
+        self.assertTrue(success, error)
+        self.assertIn("window.Hello", code)
+        self.assertEqual(self.log_lines(), ["cli"])
+
+
+if __name__ == "__main__":
+    unittest.main()
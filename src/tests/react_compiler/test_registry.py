@@ -0,0 +1,96 @@
+"""Tests for the shared hook library, source analysis cache and builder registry."""
+
+import os
+import tempfile
+import unittest
+
+from react_compiler.hooks import REACT_HOOKS_PREAMBLE, HookLibrary
+from react_compiler.react_compiler import WidgetBuilder
+from react_compiler.registry import SourceAnalysisCache, get_widget_builder
+
+HOOK = """import {{ useState }} from 'react';
+
+export const useCounter = () => {{
+  const [count, setCount] = useState({start});
+  return [count, setCount];
+}};
+"""
+
+WIDGET = """import React from 'react';
+import { useCounter } from './useCounter';
+import { LineChart } from 'recharts';
+
+const Counter = () => <LineChart>{useCounter()[0]}</LineChart>;
+export default Counter;
+"""
+
+
+class HookLibraryTests(unittest.TestCase):
+    """Hooks are read once and re-read only when their file changes."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "useCounter.js")
+        self.write_hook(0)
+        self.library = HookLibrary(self.tmp.name, {"useCounter": "useCounter.js"})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_hook(self, start, mtime=None):
+        with open(self.path, "w") as f:
+            f.write(HOOK.format(start=start))
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_loads_once_and_reloads_on_change(self):
+        self.assertEqual(self.library.names(), ("useCounter",))
+        inline = self.library.inline_code("useCounter")
+        self.assertIn("const useCounter =", inline)
+        self.assertNotIn("export", inline)
+        self.assertNotIn("import", inline)
+
+        self.library.refresh(force=True)
+        self.assertEqual(self.library.loads, 1)
+
+        self.write_hook(5, mtime=os.stat(self.path).st_mtime + 10)
+        self.library.refresh(force=True)
+        self.assertEqual(self.library.loads, 2)
+        self.assertIn("useState(5)", self.library.inline_code("useCounter"))
+
+    def test_builder_inlines_preloaded_hooks(self):
+        builder = WidgetBuilder(
+            build_dir=os.path.join(self.tmp.name, "builds"),
+            offline=True,
+            workspace_root=os.path.join(self.tmp.name, "toolchain"),
+            use_cache=False,
+            use_daemon=False,
+            hook_library=self.library,
+            analysis_cache=SourceAnalysisCache(),
+        )
+        hooks = builder._detect_hook_imports(WIDGET)
+        self.assertEqual(hooks, ["useCounter"])
+        code = builder._prepare_widget_code_with_hooks(WIDGET, hooks)
+        self.assertEqual(code.count(REACT_HOOKS_PREAMBLE.strip()), 1)
+        self.assertIn("const useCounter =", code)
+        self.assertNotIn("from './useCounter'", code)
+
+        first = builder.check_react_libraries(WIDGET)
+        first["target_libraries"].clear()  # Callers get copies and cannot corrupt the cache
+        second = builder.check_react_libraries(WIDGET)
+        self.assertIn("recharts", second["target_libraries"])
+        self.assertEqual(second["built_in_hooks"], ["useCounter"])
+        self.assertEqual(builder.analysis.stats()["hits"], 1)
+
+
+class BuilderRegistryTests(unittest.TestCase):
+    """get_widget_builder shares one builder per configuration."""
+
+    def test_same_options_share_a_builder(self):
+        builder = get_widget_builder(timeout=30, use_daemon=False)
+        self.assertIs(get_widget_builder(timeout=30, use_daemon=False), builder)
+        self.assertIsNot(get_widget_builder(timeout=60, use_daemon=False), builder)
+
+
+if __name__ == "__main__":
+    unittest.main()
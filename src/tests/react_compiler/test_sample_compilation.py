@@ -63,7 +63,12 @@ class TestSampleCompilation(unittest.TestCase):
 
         # Create a temporary build directory for all tests
         cls.build_dir = tempfile.mkdtemp(prefix="react_compiler_test_")
-        cls.widget_builder = WidgetBuilder(build_dir=cls.build_dir)
+        # Keep the npm toolchain and bundle cache out of the repo's data directory
+        cls.widget_builder = WidgetBuilder(
+            build_dir=cls.build_dir,
+            workspace_root=os.path.join(cls.build_dir, "toolchain"),
+            use_cache=False,
+        )
 
         logger.info(f"Test setup complete. Build dir: {cls.build_dir}")
 
@@ -434,7 +439,11 @@ class TestWidgetBuilderMethods(unittest.TestCase):
     def setUp(self):
         """Set up for each test."""
         self.build_dir = tempfile.mkdtemp(prefix="widget_builder_test_")
-        self.widget_builder = WidgetBuilder(build_dir=self.build_dir)
+        self.widget_builder = WidgetBuilder(
+            build_dir=self.build_dir,
+            workspace_root=os.path.join(self.build_dir, "toolchain"),
+            use_cache=False,
+        )
 
     def tearDown(self):
         """Clean up after each test."""
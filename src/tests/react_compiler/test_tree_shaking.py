@@ -0,0 +1,77 @@
+"""Tests for bundling large libraries per widget instead of loading them as page globals."""
+
+import os
+import tempfile
+import unittest
+
+from react_compiler.bundle_size import describe_size_change, page_script_size
+from tests.react_compiler.fake_toolchain import install_fake_toolchain, make_builder
+
+# Keeps a copy of the generated config so the test can inspect it
+STUB_WEBPACK = """#!/bin/sh
+cp webpack.config.js "{config_copy}"
+mkdir -p dist
+echo "var Widget_Chart = {{ default: function Chart() {{}} }};" > dist/widget.bundle.js
+"""
+
+WIDGET = """import React from 'react';
+import { LineChart, Line } from 'recharts';
+import { Star } from 'lucide-react';
+import _ from 'lodash';
+
+const Chart = () => <LineChart data={_.range(3)}><Line dataKey="y" /><Star /></LineChart>;
+export default Chart;
+"""
+
+
+class TreeShakingTests(unittest.TestCase):
+    """recharts and lucide-react are bundled; other libraries stay external."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_copy = os.path.join(self.tmp.name, "webpack.config.js")
+        self.builder = self.make_builder(tree_shake=True)
+        install_fake_toolchain(
+            self.builder.workspace, STUB_WEBPACK.format(config_copy=self.config_copy)
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_builder(self, tree_shake):
+        return make_builder(self.tmp.name, use_daemon=False, tree_shake=tree_shake)
+
+    def test_split_dependencies(self):
+        self.assertEqual(
+            self.builder.split_dependencies(WIDGET), (["recharts", "lucide-react"], ["lodash"])
+        )
+        self.assertEqual(
+            self.make_builder(tree_shake=False).split_dependencies(WIDGET),
+            ([], ["recharts", "lucide-react", "lodash"]),
+        )
+
+    def test_bundled_packages_are_not_externals(self):
+        bundled, external = self.builder.split_dependencies(WIDGET)
+        success, _, error = self.builder.build_widget(
+            WIDGET, "Chart", dependencies=bundled, external_dependencies=external
+        )
+        self.assertTrue(success, error)
+        with open(self.config_copy) as f:
+            config = f.read()
+        self.assertIn('"lodash": "_"', config)
+        self.assertNotIn("Recharts", config)
+        self.assertNotIn("LucideReact", config)
+        self.assertIn("usedExports: true", config)
+
+    def test_page_script_size_counts_vendored_globals(self):
+        bundle = "x" * 2048
+        whole = page_script_size(bundle, ["recharts", "lodash"])
+        shaken = page_script_size(bundle, ["lodash"])
+        self.assertEqual(shaken["total_bytes"], 2048)
+        self.assertEqual(shaken["globals_bytes"], 0)
+        self.assertGreater(whole["globals_bytes"], 100 * 1024)  # The full Recharts UMD file
+        self.assertIn("-> 2.0 KB", describe_size_change(whole, shaken))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for the shared widget toolchain workspace, using a stub npm."""
+
+import os
+import stat
+import tempfile
+import threading
+import unittest
+
+from react_compiler.workspace import (
+    READY_MARKER,
+    ToolchainWorkspace,
+    WorkspaceInstallError,
+    WorkspaceMissingError,
+)
+
+STUB_NPM = """#!/bin/sh
+echo install >> "{log}"
+[ -n "$FAIL_NPM" ] && exit 1
+mkdir -p node_modules/.bin
+"""
+
+
+class ToolchainWorkspaceTests(unittest.TestCase):
+    """The toolchain is installed once per dependency set and shared."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "toolchain")
+        self.log = os.path.join(self.tmp.name, "npm.log")
+        bin_dir = os.path.join(self.tmp.name, "bin")
+        os.makedirs(bin_dir)
+        npm = os.path.join(bin_dir, "npm")
+        with open(npm, "w") as f:
+            f.write(STUB_NPM.format(log=self.log))
+        os.chmod(npm, os.stat(npm).st_mode | stat.S_IEXEC)
+        self.env = dict(os.environ, PATH=bin_dir + os.pathsep + os.environ.get("PATH", ""))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def installs(self):
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as f:
+            return len(f.readlines())
+
+    def test_key_depends_only_on_dependency_set(self):
+        a = ToolchainWorkspace({"lodash": "^4.17.21", "d3": "^7.8.5"}, root=self.root)
+        b = ToolchainWorkspace({"d3": "^7.8.5", "lodash": "^4.17.21"}, root=self.root)
+        c = ToolchainWorkspace({"lodash": "^4.17.22"}, root=self.root)
+        self.assertEqual(a.key, b.key)
+        self.assertNotEqual(a.key, c.key)
+
+    def test_installs_once_and_reuses(self):
+        workspace = ToolchainWorkspace({"lodash": "^4.17.21"}, root=self.root)
+        threads = [
+            threading.Thread(target=workspace.ensure, kwargs={"env": self.env}) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(workspace.is_ready())
+        self.assertEqual(self.installs(), 1)
+        self.assertEqual(os.listdir(self.root), [workspace.key, workspace.key + ".lock"])
+
+        build_dir = os.path.join(self.tmp.name, "build")
+        os.makedirs(build_dir)
+        workspace.link_into(build_dir)
+        self.assertEqual(
+            os.path.realpath(os.path.join(build_dir, "node_modules")),
+            os.path.realpath(workspace.node_modules),
+        )
+
+    def test_offline_fails_fast_without_workspace(self):
+        workspace = ToolchainWorkspace({}, root=self.root)
+        with self.assertRaises(WorkspaceMissingError):
+            workspace.ensure(offline=True, env=self.env)
+        self.assertEqual(self.installs(), 0)
+
+        workspace.ensure(env=self.env)
+        self.assertEqual(workspace.ensure(offline=True), workspace.node_modules)
+
+    def test_failed_install_leaves_no_workspace(self):
+        workspace = ToolchainWorkspace({}, root=self.root)
+        with self.assertRaises(WorkspaceInstallError):
+            workspace.ensure(env=dict(self.env, FAIL_NPM="1"))
+        self.assertFalse(os.path.exists(workspace.path))
+        self.assertFalse(os.path.exists(os.path.join(workspace.path, READY_MARKER)))
+
+
+if __name__ == "__main__":
+    unittest.main()
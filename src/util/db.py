@@ -1,10 +1,12 @@
 from typing import Optional, Tuple
 import logging
 
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 
 from common.config.channel_config import get_channel_manager
 from models.database import db
+from models.messages import message_ancestors_cte
 from models.models import Email, Message, email_quotes
 
 import aml_parser
@@ -46,12 +48,10 @@ def set_message_parent(child_id: int, parent_id: int) -> Tuple[bool, Optional[st
             if child.channel != parent.channel:
                 return False, "Parent and child messages must be in the same channel"
 
-            # Check for circular references
-            current = parent
-            while current:
-                if current.id == child_id:
-                    return False, "Circular reference detected - cannot set parent"
-                current = current.parent
+            # Check for circular references: the child must not be an ancestor of the parent
+            ancestors = message_ancestors_cte(parent_id)
+            if session.execute(select(ancestors.c.id).where(ancestors.c.id == child_id)).first():
+                return False, "Circular reference detected - cannot set parent"
 
             # Set the relationship
             child.parent = parent
@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 
-"""Export messages from the Atacama database to JSON format."""
+"""Export messages from the Atacama database to JSON or JSON Lines, streaming."""
 
+import gzip
+import io
 import json
 import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, TextIO, Tuple
 
-from sqlalchemy.orm import joinedload
+import zstandard
+from sqlalchemy.orm import selectinload
 
 # Gross hack for imports
 import os, sys
@@ -17,11 +20,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 import constants
 from models.database import db
-from models.models import Email
+from models.models import Email, Quote
 from common.base.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Messages fetched per keyset-paginated round trip
+EXPORT_BATCH_SIZE = 500
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
 
 def serialize_message(message: Email) -> Dict[str, Any]:
     """
@@ -62,47 +70,135 @@ def serialize_message(message: Email) -> Dict[str, Any]:
     }
 
 
-def export_messages(output_path: str, pretty: bool = True) -> None:
+def iter_messages(
+    db_session, since: Optional[datetime] = None, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[Email]:
     """
-    Export all messages from the database to a JSON file.
+    Stream messages in id order, one keyset-paginated batch at a time.
 
-    :param output_path: Path where the JSON file should be saved
-    :param pretty: Whether to format the JSON output for readability
-    """
-    with db.session() as db_session:
+    Each batch loads its quotes and authors with one extra query apiece and is
+    expunged from the session once consumed, so memory stays bounded by
+    batch_size regardless of archive size.
 
-        # Query all messages with their relationships
-        messages = (
+    :param db_session: Database session
+    :param since: Only include messages modified at or after this time
+    :param batch_size: Messages fetched per round trip
+    :return: Iterator of Email objects
+    """
+    last_id = 0
+    while True:
+        query = (
             db_session.query(Email)
-            .options(
-                joinedload(Email.parent),
-                joinedload(Email.children),
-                joinedload(Email.quotes),
-                joinedload(Email.author),
-            )
-            .order_by(Email.created_at)
-            .all()
+            .options(selectinload(Email.quotes).lazyload(Quote.emails), selectinload(Email.author))
+            .filter(Email.id > last_id)
         )
+        if since is not None:
+            query = query.filter(Email.last_modified_at >= since)
+        batch = query.order_by(Email.id).limit(batch_size).all()
+        if not batch:
+            return
+        yield from batch
+        last_id = batch[-1].id
+        db_session.expunge_all()
+
+
+def detect_format(output_path: str) -> Tuple[str, Optional[str]]:
+    """
+    Infer (format, compression) from an output file name.
+
+    :param output_path: e.g. "backup.jsonl.zst" or "messages_export.json"
+    :return: Tuple of ("json" | "jsonl", None | "gzip" | "zstd")
+    """
+    suffixes = Path(output_path).suffixes
+    compression = COMPRESSION_SUFFIXES.get(suffixes[-1]) if suffixes else None
+    if compression:
+        suffixes = suffixes[:-1]
+    fmt = "jsonl" if suffixes and suffixes[-1] == ".jsonl" else "json"
+    return fmt, compression
+
+
+def open_output(path: Path, compression: Optional[str]) -> TextIO:
+    """
+    Open a text stream that writes (optionally compressed) UTF-8 to path.
+
+    :param path: Destination file
+    :param compression: None, "gzip" or "zstd"
+    :return: Writable text stream
+    :raises ValueError: If the compression is unknown
+    """
+    if compression is None:
+        return open(path, "w", encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8")
+    if compression == "zstd":
+        raw = zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    raise ValueError(f"Unknown compression: {compression}")
 
-        # Serialize all messages
-        data = {
-            "exported_at": datetime.utcnow().isoformat(),
-            "total_messages": len(messages),
-            "messages": [serialize_message(msg) for msg in messages],
-        }
 
-        # Create output directory if it doesn't exist
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+def export_messages(
+    output_path: str,
+    pretty: bool = True,
+    since: Optional[datetime] = None,
+    fmt: Optional[str] = None,
+    compression: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> int:
+    """
+    Stream messages from the database to a JSON or JSON Lines file.
 
-        # Write to file
-        with open(output_file, "w", encoding="utf-8") as f:
-            if pretty:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            else:
-                json.dump(data, f, ensure_ascii=False)
+    The JSON format keeps the original document shape ("exported_at",
+    "messages", "total_messages"); JSON Lines writes one message per line.
+    Output goes to a temporary file that replaces output_path only once the
+    export completes.
 
-        logger.info(f"Successfully exported {len(messages)} messages to {output_path}")
+    :param output_path: Path where the export should be saved
+    :param pretty: Whether to indent each message (JSON format only)
+    :param since: Only export messages modified at or after this time
+    :param fmt: "json" or "jsonl" (default: inferred from output_path)
+    :param compression: None, "gzip" or "zstd" (default: inferred from output_path)
+    :param batch_size: Messages fetched per round trip
+    :return: Number of messages exported
+    """
+    detected_fmt, detected_compression = detect_format(output_path)
+    fmt = fmt or detected_fmt
+    compression = compression or detected_compression
+
+    # Create output directory if it doesn't exist
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    partial_file = output_file.with_name(output_file.name + ".partial")
+
+    count = 0
+    try:
+        with db.session() as db_session, open_output(partial_file, compression) as f:
+            if fmt == "json":
+                header = {"exported_at": datetime.utcnow().isoformat()}
+                if since is not None:
+                    header["since"] = since.isoformat()
+                f.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "messages": [')
+
+            for message in iter_messages(db_session, since=since, batch_size=batch_size):
+                data = serialize_message(message)
+                if fmt == "jsonl":
+                    f.write(json.dumps(data, ensure_ascii=False))
+                    f.write("\n")
+                else:
+                    if count:
+                        f.write(",")
+                    f.write("\n")
+                    f.write(json.dumps(data, indent=2 if pretty else None, ensure_ascii=False))
+                count += 1
+
+            if fmt == "json":
+                f.write(f'\n], "total_messages": {count}}}\n')
+        os.replace(partial_file, output_file)
+    finally:
+        if partial_file.exists():
+            partial_file.unlink()
+
+    logger.info(f"Successfully exported {count} messages to {output_path}")
+    return count
 
 
 def main() -> None:
@@ -114,6 +210,24 @@ def main() -> None:
     parser.add_argument(
         "--pretty", "-p", action="store_true", help="Format JSON output for readability"
     )
+    parser.add_argument(
+        "--format",
+        choices=["json", "jsonl"],
+        help="Output format (default: from the file name, .jsonl for JSON Lines)",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["gzip", "zstd"],
+        help="Compress the output (default: from the file name, .gz or .zst)",
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Only export messages modified at or after this ISO timestamp",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="Messages fetched per query"
+    )
     parser.add_argument(
         "--postgres",
         action="store_true",
@@ -126,7 +240,14 @@ def main() -> None:
         if args.postgres:
             constants.enable_postgres()
         constants.init_production(service="blog")
-        export_messages(args.output, args.pretty)
+        export_messages(
+            args.output,
+            args.pretty,
+            since=args.since,
+            fmt=args.format,
+            compression=args.compress,
+            batch_size=args.batch_size,
+        )
     except Exception as e:
         logger.error(f"Export failed: {str(e)}")
         exit(1)
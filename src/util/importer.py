@@ -2,14 +2,21 @@
 
 """Import messages from JSON format into the Atacama database."""
 
+import gzip
+import io
 import json
-import hashlib
+import time
 import argparse
+from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 
+import zstandard
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import lazyload
 
 # Gross hack for imports
 import os, sys
@@ -17,12 +24,16 @@ import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from models.database import db
-from models.models import Email, Quote, User
+from models.models import Email, Quote, User, message_content_hash, quote_content_hash
 from models import get_or_create_user
+from util.export import detect_format
 from common.base.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Messages checked and inserted per round trip
+IMPORT_BATCH_SIZE = 500
+
 
 class ImportError(Exception):
     """Custom exception for import errors."""
@@ -34,13 +45,14 @@ def generate_message_hash(msg_data: Dict[str, Any]) -> str:
     """
     Generate a unique hash for message content to detect duplicates.
 
+    Matches the content_hash stored on each Email.
+
     :param msg_data: Message data from import file
     :return: SHA-256 hash of key message fields
     """
     author = msg_data.get("author", None)
     author_email = author.get("email", "") if author else ""
-    hash_content = f"{msg_data['subject']}|{msg_data['content']}|{author_email}"
-    return hashlib.sha256(hash_content.encode("utf-8")).hexdigest()
+    return message_content_hash(msg_data["subject"], msg_data["content"], author_email)
 
 
 def find_duplicate_message(db_session, msg_data: Dict[str, Any]) -> Optional[Email]:
@@ -51,20 +63,33 @@ def find_duplicate_message(db_session, msg_data: Dict[str, Any]) -> Optional[Ema
     :param msg_data: Message data from import
     :return: Existing Email object if found, None otherwise
     """
-    author = msg_data.get("author", None)
-    author_email = author.get("email", "") if author else ""
     return (
         db_session.query(Email)
-        .join(Email.author)
-        .filter(
-            Email.subject == msg_data["subject"],
-            Email.content == msg_data["content"],
-            User.email == author_email,
-        )
+        .filter(Email.content_hash == generate_message_hash(msg_data))
+        .order_by(Email.id)
         .first()
     )
 
 
+def find_existing_hashes(db_session, hashes: Iterable[str]) -> Dict[str, int]:
+    """
+    Look up which message hashes are already stored, in one query.
+
+    :param db_session: Database session
+    :param hashes: Content hashes to check
+    :return: Dictionary mapping each stored hash to the oldest matching email id
+    """
+    hashes = set(hashes)
+    if not hashes:
+        return {}
+    rows = db_session.execute(
+        select(Email.content_hash, func.min(Email.id))
+        .where(Email.content_hash.in_(hashes))
+        .group_by(Email.content_hash)
+    )
+    return {digest: email_id for digest, email_id in rows}
+
+
 def get_or_create_author(db_session, author_data: Optional[Dict[str, Any]]) -> Optional[User]:
     """
     Get existing user or create new one from import data.
@@ -81,133 +106,355 @@ def get_or_create_author(db_session, author_data: Optional[Dict[str, Any]]) -> O
     )
 
 
-def create_quotes(db_session, quotes_data: List[Dict[str, Any]], message: Email) -> None:
+def get_or_create_authors(
+    db_session, authors_data: Iterable[Optional[Dict[str, Any]]], users: Dict[str, User]
+) -> None:
+    """
+    Resolve the authors of a chunk of messages with one lookup.
+
+    :param db_session: Database session
+    :param authors_data: Author data from import (entries may be None)
+    :param users: Users already resolved, by email; updated in place
+    """
+    wanted = {}
+    for author_data in authors_data:
+        if author_data and author_data["email"] not in users:
+            wanted.setdefault(author_data["email"], author_data)
+    if not wanted:
+        return
+    for user in db_session.query(User).filter(User.email.in_(wanted)):
+        users[user.email] = user
+    for email, author_data in wanted.items():
+        if email not in users:
+            user = User(email=email, name=author_data["name"])
+            db_session.add(user)
+            users[email] = user
+
+
+def create_quotes(
+    db_session,
+    quotes_data: List[Dict[str, Any]],
+    message: Email,
+    known: Optional[Dict[str, Quote]] = None,
+) -> None:
     """
     Create quotes for a message from import data.
 
+    Quotes already stored (matched by content hash) are linked instead of duplicated.
+
     :param db_session: Database session
     :param quotes_data: List of quote data from import
     :param message: Email object to associate quotes with
+    :param known: Quotes already looked up, by content hash; queried when omitted
     """
+    if known is None:
+        hashes = {quote_content_hash(quote_data["text"]) for quote_data in quotes_data}
+        if not hashes:
+            return
+        known = {
+            quote.content_hash: quote
+            for quote in db_session.query(Quote).filter(Quote.content_hash.in_(hashes))
+        }
     for quote_data in quotes_data:
-        quote = Quote(
-            text=quote_data["text"],
-            quote_type=quote_data["quote_type"],
-            author=quote_data.get("author"),
-            source=quote_data.get("source"),
-            commentary=quote_data.get("commentary"),
-            created_at=datetime.fromisoformat(quote_data["created_at"]),
+        digest = quote_content_hash(quote_data["text"])
+        quote = known.get(digest)
+        if quote is None:
+            quote = Quote(
+                text=quote_data["text"],
+                content_hash=digest,
+                quote_type=quote_data["quote_type"],
+                author=message.author,
+                channel=message.channel,
+                original_author=quote_data.get("original_author"),
+                source=quote_data.get("source"),
+                commentary=quote_data.get("commentary"),
+                created_at=datetime.fromisoformat(quote_data["created_at"]),
+            )
+            db_session.add(quote)
+            known[digest] = quote
+        if quote not in message.quotes:
+            message.quotes.append(quote)
+
+
+def build_message(msg_data: Dict[str, Any], msg_hash: str, author: Optional[User]) -> Email:
+    """
+    Build an Email from import data.
+
+    :param msg_data: Message data from import
+    :param msg_hash: Precomputed content hash
+    :param author: Resolved author, if any
+    :return: New, unsaved Email
+    """
+    return Email(
+        subject=msg_data["subject"],
+        content=msg_data["content"],
+        processed_content=msg_data["processed_content"],
+        created_at=datetime.fromisoformat(msg_data["created_at"]),
+        channel=msg_data.get("channel", "private"),
+        chinese_annotations=json.dumps(msg_data.get("chinese_annotations")),
+        llm_annotations=json.dumps(msg_data.get("llm_annotations")),
+        content_hash=msg_hash,
+        author=author,
+    )
+
+
+@dataclass
+class ImportReport:
+    """Counts and timing for one import run."""
+
+    read: int = 0
+    imported: int = 0
+    skipped_existing: int = 0
+    skipped_in_file: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Read {self.read} messages in {self.elapsed:.2f}s "
+            f"({self.messages_per_second:.1f} messages/s): {self.imported} imported, "
+            f"{self.skipped_existing} already stored, {self.skipped_in_file} repeated in file, "
+            f"{self.failed} failed"
         )
-        message.quotes.append(quote)
-        db_session.add(quote)
 
 
-def import_messages(input_path: str, skip_duplicates: bool = True) -> None:
+def open_input(path: Path, compression: Optional[str]) -> TextIO:
     """
-    Import messages from a JSON file into the database.
+    Open a text stream reading (optionally compressed) UTF-8 from path.
 
-    :param input_path: Path to JSON file containing messages
-    :param skip_duplicates: Whether to skip duplicate messages
+    :param path: Source file
+    :param compression: None, "gzip" or "zstd"
+    :return: Readable text stream
+    :raises ImportError: If the compression is unknown
+    """
+    if compression is None:
+        return open(path, "r", encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    raise ImportError(f"Unknown compression: {compression}")
+
+
+def read_messages(input_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield message records from an export file.
+
+    Accepts the JSON document and JSON Lines formats written by util/export.py,
+    optionally gzip or zstd compressed. JSON Lines files are streamed.
+
+    :param input_path: Path to the export file
+    :return: Iterator of message dictionaries
+    :raises ImportError: If the file is missing or malformed
     """
-    # Read import file
     input_file = Path(input_path)
     if not input_file.exists():
         raise ImportError(f"Import file not found: {input_path}")
 
-    with open(input_file, "r", encoding="utf-8") as f:
+    fmt, compression = detect_format(input_path)
+    with open_input(input_file, compression) as f:
+        if fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
         import_data = json.load(f)
+        if "messages" not in import_data:
+            raise ImportError("Invalid import file format - missing 'messages' array")
+        yield from import_data["messages"]
+
+
+def _add_message(
+    db_session,
+    msg_data: Dict[str, Any],
+    msg_hash: str,
+    users: Dict[str, User],
+    known_quotes: Dict[str, Quote],
+) -> Email:
+    author_data = msg_data.get("author")
+    message = build_message(
+        msg_data, msg_hash, users[author_data["email"]] if author_data else None
+    )
+    db_session.add(message)
+    if msg_data.get("quotes"):
+        create_quotes(db_session, msg_data["quotes"], message, known_quotes)
+    return message
+
+
+def _insert_chunk(
+    db_session,
+    pending: List[Tuple[Dict[str, Any], str]],
+    users: Dict[str, User],
+    known_quotes: Dict[str, Quote],
+) -> List[Tuple[Dict[str, Any], Email]]:
+    """
+    Insert a chunk of new messages with one flush, falling back to one row at a time.
+
+    Each attempt runs in a savepoint, so a failing row only discards itself.
+
+    :param db_session: Database session
+    :param pending: (import data, content hash) pairs to insert
+    :param users: Authors of the chunk, by email
+    :param known_quotes: Stored quotes by content hash; updated with new quotes
+    :return: (import data, new Email) pairs that were inserted
+    """
+    attempt = dict(known_quotes)
+    try:
+        with db_session.begin_nested():
+            inserted = [
+                (msg_data, _add_message(db_session, msg_data, msg_hash, users, attempt))
+                for msg_data, msg_hash in pending
+            ]
+        known_quotes.update(attempt)
+        return inserted
+    except IntegrityError as e:
+        logger.warning(f"Batch insert failed, retrying messages one by one: {str(e)}")
+
+    inserted = []
+    for msg_data, msg_hash in pending:
+        attempt = dict(known_quotes)
+        try:
+            with db_session.begin_nested():
+                message = _add_message(db_session, msg_data, msg_hash, users, attempt)
+            known_quotes.update(attempt)
+            inserted.append((msg_data, message))
+        except IntegrityError as e:
+            logger.error(f"Failed to import message {msg_data['id']}: {str(e)}")
+    return inserted
+
+
+def import_messages(
+    input_path: str, skip_duplicates: bool = True, batch_size: int = IMPORT_BATCH_SIZE
+) -> ImportReport:
+    """
+    Import messages from an export file into the database.
 
-    if "messages" not in import_data:
-        raise ImportError("Invalid import file format - missing 'messages' array")
+    Messages are processed in chunks: each chunk's hashes are checked against
+    the database in one query, and its new messages are inserted in one flush.
+
+    :param input_path: Path to JSON or JSON Lines file containing messages
+    :param skip_duplicates: Whether to skip duplicate messages
+    :param batch_size: Messages handled per chunk
+    :return: Counts and throughput for the run
+    """
+    report = ImportReport()
+    started = time.perf_counter()
 
     # Track processed hashes to detect duplicates within import file
     processed_hashes: Set[str] = set()
+    users: Dict[str, User] = {}
+    parents: List[Tuple[Any, Any]] = []  # (old_id, old_parent_id)
 
     with db.session() as db_session:
         # Track id mappings for parent relationships
         id_map = {}  # old_id -> new_id
 
         # First pass - create messages without parent relationships
-        for msg_data in import_data["messages"]:
-            # Check for duplicates using content hash
-            msg_hash = generate_message_hash(msg_data)
-
-            if msg_hash in processed_hashes:
-                logger.info(f"Skipping duplicate message within import: {msg_data['id']}")
-                continue
-
-            # Check for existing message in database
-            existing = find_duplicate_message(db_session, msg_data) if skip_duplicates else None
-
-            if existing:
-                logger.info(f"Skipping duplicate message: {msg_data['id']}")
-                id_map[msg_data["id"]] = existing.id
+        messages = read_messages(input_path)
+        while True:
+            chunk = list(islice(messages, batch_size))
+            if not chunk:
+                break
+            report.read += len(chunk)
+
+            hashes = [generate_message_hash(msg_data) for msg_data in chunk]
+            existing = find_existing_hashes(db_session, hashes) if skip_duplicates else {}
+            get_or_create_authors(db_session, (msg_data.get("author") for msg_data in chunk), users)
+            quote_hashes = {
+                quote_content_hash(quote_data["text"])
+                for msg_data in chunk
+                for quote_data in msg_data.get("quotes") or []
+            }
+            known_quotes = {
+                quote.content_hash: quote
+                for quote in db_session.query(Quote)
+                .options(lazyload(Quote.emails))
+                .filter(Quote.content_hash.in_(quote_hashes))
+            }
+
+            pending = []
+            for msg_data, msg_hash in zip(chunk, hashes):
+                if msg_data.get("parent_id"):
+                    parents.append((msg_data["id"], msg_data["parent_id"]))
+
+                if msg_hash in processed_hashes:
+                    logger.info(f"Skipping duplicate message within import: {msg_data['id']}")
+                    report.skipped_in_file += 1
+                    continue
+
+                if msg_hash in existing:
+                    logger.info(f"Skipping duplicate message: {msg_data['id']}")
+                    id_map[msg_data["id"]] = existing[msg_hash]
+                    processed_hashes.add(msg_hash)
+                    report.skipped_existing += 1
+                    continue
+
+                pending.append((msg_data, msg_hash))
                 processed_hashes.add(msg_hash)
-                continue
-
-            # Create message
-            message = Email(
-                subject=msg_data["subject"],
-                content=msg_data["content"],
-                processed_content=msg_data["processed_content"],
-                created_at=datetime.fromisoformat(msg_data["created_at"]),
-                channel=msg_data.get("channel", "private"),
-                chinese_annotations=json.dumps(msg_data.get("chinese_annotations")),
-                llm_annotations=json.dumps(msg_data.get("llm_annotations")),
-            )
-
-            # Set author if present
-            message.author = get_or_create_author(db_session, msg_data.get("author"))
 
-            # Create associated quotes
-            if msg_data.get("quotes"):
-                create_quotes(db_session, msg_data["quotes"], message)
-
-            try:
-                db_session.add(message)
-                db_session.flush()  # Get new ID
+            inserted = _insert_chunk(db_session, pending, users, known_quotes)
+            for msg_data, message in inserted:
                 id_map[msg_data["id"]] = message.id
-                processed_hashes.add(msg_hash)
-            except IntegrityError as e:
-                logger.error(f"Failed to import message {msg_data['id']}: {str(e)}")
-                db_session.rollback()
-                continue
-
-        # Second pass - update parent relationships
-        for msg_data in import_data["messages"]:
-            if msg_data.get("parent_id"):
-                new_id = id_map.get(msg_data["id"])
-                new_parent_id = id_map.get(msg_data["parent_id"])
-
-                if new_id and new_parent_id:
-                    message = db_session.query(Email).get(new_id)
-                    if message:
-                        message.parent_id = new_parent_id
+            report.imported += len(inserted)
+            report.failed += len(pending) - len(inserted)
+
+        # Second pass - update parent relationships in one statement
+        links = [
+            {"email_id": id_map[old_id], "new_parent_id": id_map[old_parent_id]}
+            for old_id, old_parent_id in parents
+            if old_id in id_map and old_parent_id in id_map
+        ]
+        if links:
+            emails = Email.__table__
+            db_session.execute(
+                update(emails)
+                .where(emails.c.id == bindparam("email_id"))
+                .values(parent_id=bindparam("new_parent_id")),
+                links,
+            )
 
         try:
             db_session.commit()
-            logger.info(f"Successfully imported {len(id_map)} messages")
         except Exception as e:
             logger.error(f"Failed to update parent relationships: {str(e)}")
             db_session.rollback()
             raise ImportError("Failed to update parent relationships")
 
+    report.elapsed = time.perf_counter() - started
+    logger.info(report.summary())
+    return report
+
 
 def main() -> None:
     """Main entry point for the import script."""
     parser = argparse.ArgumentParser(description="Import Atacama messages from JSON")
-    parser.add_argument("input", help="Input JSON file path")
+    parser.add_argument("input", help="Input JSON or JSON Lines file (optionally .gz or .zst)")
     parser.add_argument(
         "--force",
         "-f",
         action="store_true",
         help="Import duplicate messages instead of skipping them",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=IMPORT_BATCH_SIZE,
+        help=f"Messages checked and inserted per round trip (default: {IMPORT_BATCH_SIZE})",
+    )
 
     args = parser.parse_args()
 
     try:
-        import_messages(args.input, skip_duplicates=not args.force)
+        report = import_messages(
+            args.input, skip_duplicates=not args.force, batch_size=args.batch_size
+        )
+        print(report.summary())
     except Exception as e:
         logger.error(f"Import failed: {str(e)}")
         exit(1)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""Rebuild the full-text quote search index from the quotes table."""
+
+import argparse
+
+# Gross hack for imports
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants
+from models.database import db
+from models.quote_search import rebuild_quote_search_index
+from common.base.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def rebuild_index() -> str:
+    """
+    Rebuild the quote search index for the configured database.
+
+    :return: Backend that was rebuilt
+    """
+    with db.session() as db_session:
+        backend = rebuild_quote_search_index(db_session.connection())
+    logger.info(f"Rebuilt quote search index ({backend})")
+    return backend
+
+
+def main() -> None:
+    """Main entry point for the rebuild script."""
+    parser = argparse.ArgumentParser(description="Rebuild the Atacama quote search index")
+    parser.add_argument(
+        "--postgres",
+        action="store_true",
+        help="Use PostgreSQL via keys/database_url or DATABASE_URL instead of emails.db",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        if args.postgres:
+            constants.enable_postgres()
+        constants.init_production(service="blog")
+        rebuild_index()
+    except Exception as e:
+        logger.error(f"Rebuild failed: {str(e)}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,12 @@ from sqlalchemy.orm import Session
 
 from models.database import db
 from models import Email
-from aml_parser.lexer import tokenize
+from aml_parser.chess import prerender_boards
+from aml_parser.lexer import TokenType, tokenize
 from aml_parser.parser import parse
+from aml_parser.urls import classify_urls
 from aml_parser.html_generator import generate_html
-from aml_parser.english_annotations import annotate_english
+from aml_parser.english_annotations import annotate_english_paragraphs
 
 
 def regenerate_email_content(
@@ -50,6 +52,16 @@ def regenerate_email_content(
         # Tokenize
         tokens = tokenize(email.content)
 
+        # Render every chess position up front; both the full and the preview
+        # render below (and later views of the same position) hit the cache
+        prerender_boards(
+            token.value
+            for token in tokens
+            if token.type == TokenType.TEMPLATE and token.template_name == "pgn"
+        )
+        # Same for links: each distinct URL is classified and rendered once
+        classify_urls(token.value for token in tokens if token.type == TokenType.URL)
+
         # Parse
         ast = parse(iter(tokens))
 
@@ -62,7 +74,8 @@ def regenerate_email_content(
         new_preview = generate_html(ast, db_session=db_session, message=email, truncated=True)
 
         # Regenerate English annotations from raw content
-        new_annotations = annotate_english(email.content)
+        # (paragraph-cached, so paragraphs shared between messages are looked up once)
+        new_annotations = annotate_english_paragraphs(email.content).annotations
         new_annotations_json = (
             json.dumps(new_annotations, ensure_ascii=False) if new_annotations else None
         )